@@ -0,0 +1,54 @@
+"""Add import_jobs table for background imports
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create import_jobs table"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'import_jobs' not in inspector.get_table_names():
+        op.create_table(
+            'import_jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('job_type', sa.String(length=50), nullable=False),
+            sa.Column('status', sa.String(length=50), nullable=False, server_default='queued'),
+            sa.Column('filename', sa.String(), nullable=True),
+            sa.Column('file_path', sa.String(), nullable=True),
+            sa.Column('parsed_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('inserted_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('failed_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('errors', sa.JSON(), nullable=True),
+            sa.Column('result', sa.JSON(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_import_jobs_id', 'import_jobs', ['id'], unique=False)
+        op.create_index('ix_import_jobs_status', 'import_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop import_jobs table"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'import_jobs' in inspector.get_table_names():
+        op.drop_index('ix_import_jobs_status', table_name='import_jobs')
+        op.drop_index('ix_import_jobs_id', table_name='import_jobs')
+        op.drop_table('import_jobs')
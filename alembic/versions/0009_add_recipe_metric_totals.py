@@ -0,0 +1,223 @@
+"""Add stored ingredient totals for derived recipe metrics
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+
+"""
+import math
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+TOTAL_COLUMNS = (
+    'extract_points_mash',
+    'extract_points_direct',
+    'color_units',
+    'hop_utilization_tinseth',
+    'hop_utilization_rager',
+    'attenuation_total',
+    'attenuation_samples',
+)
+
+BACKFILL_CHUNK_SIZE = 500
+
+# The backfill is frozen here rather than calling modules.recipe_metrics, so
+# later changes to the application's formulas or models cannot change what
+# this revision does. Constants and formulas are those of revision 0009.
+LITER_TO_GALLON = 0.264172
+KILOGRAM_TO_POUND = 2.20462
+SUCROSE_PPG = 46.214
+DEFAULT_EFFICIENCY = 75.0
+DEFAULT_ATTENUATION = 75.0
+BOIL_UTILIZATION_USES = {'boil', 'first wort', 'aroma', 'whirlpool'}
+NO_EFFICIENCY_TYPES = {'sugar', 'extract', 'dry extract'}
+
+recipes = sa.table(
+    'recipes',
+    sa.column('id', sa.Integer),
+    sa.column('batch_size', sa.Float),
+    sa.column('boil_size', sa.Float),
+    sa.column('efficiency', sa.Float),
+    sa.column('og', sa.Float),
+    sa.column('fg', sa.Float),
+    sa.column('ibu_method', sa.String),
+    sa.column('est_og', sa.Float),
+    sa.column('est_fg', sa.Float),
+    sa.column('est_abv', sa.Float),
+    sa.column('est_color', sa.Float),
+    sa.column('ibu', sa.Float),
+    *(sa.column(column, sa.Float) for column in TOTAL_COLUMNS),
+)
+recipe_hops = sa.table(
+    'recipe_hops',
+    sa.column('recipe_id', sa.Integer),
+    sa.column('alpha', sa.Float),
+    sa.column('amount', sa.Float),
+    sa.column('time', sa.Integer),
+    sa.column('use', sa.String),
+)
+recipe_fermentables = sa.table(
+    'recipe_fermentables',
+    sa.column('recipe_id', sa.Integer),
+    sa.column('amount', sa.Float),
+    sa.column('color', sa.Float),
+    sa.column('yield_', sa.Float),
+    sa.column('potential', sa.Float),
+    sa.column('type', sa.String),
+    sa.column('not_fermentable', sa.Boolean),
+)
+recipe_yeasts = sa.table(
+    'recipe_yeasts',
+    sa.column('recipe_id', sa.Integer),
+    sa.column('attenuation', sa.Float),
+)
+
+
+def _gallons(liters):
+    return None if liters is None else liters * LITER_TO_GALLON
+
+
+def _ppg(fermentable):
+    if fermentable.not_fermentable:
+        return 0.0
+    if fermentable.yield_ is not None:
+        return fermentable.yield_ / 100.0 * SUCROSE_PPG
+    if fermentable.potential is not None and 1.0 < fermentable.potential < 2.0:
+        return (fermentable.potential - 1.0) * 1000.0
+    return None
+
+
+def _ingredient_totals(conn, recipe_ids):
+    """Sums of hop utilization, extract, color and attenuation per recipe."""
+    totals = defaultdict(lambda: dict.fromkeys(TOTAL_COLUMNS, 0.0))
+
+    for hop in conn.execute(
+        sa.select(recipe_hops).where(recipe_hops.c.recipe_id.in_(recipe_ids))
+    ):
+        if (hop.use or '').lower() not in BOIL_UTILIZATION_USES:
+            continue
+        if hop.alpha is None or hop.amount is None or hop.time is None or hop.time <= 0:
+            continue
+        alpha_weight = hop.alpha / 100.0 * hop.amount
+        tinseth = alpha_weight * (1.0 - math.exp(-0.04 * hop.time)) / 4.15
+        rager = alpha_weight * (18.11 + 13.86 * math.tanh((hop.time - 31.32) / 18.27)) / 100.0
+        totals[hop.recipe_id]['hop_utilization_tinseth'] += max(tinseth, 0.0)
+        totals[hop.recipe_id]['hop_utilization_rager'] += max(rager, 0.0)
+
+    for fermentable in conn.execute(
+        sa.select(recipe_fermentables).where(recipe_fermentables.c.recipe_id.in_(recipe_ids))
+    ):
+        if fermentable.amount is None:
+            continue
+        weight_lb = fermentable.amount * KILOGRAM_TO_POUND
+        ppg = _ppg(fermentable)
+        if ppg is not None:
+            mashed = (fermentable.type or '').lower() not in NO_EFFICIENCY_TYPES
+            column = 'extract_points_mash' if mashed else 'extract_points_direct'
+            totals[fermentable.recipe_id][column] += weight_lb * ppg
+        if fermentable.color is not None:
+            totals[fermentable.recipe_id]['color_units'] += weight_lb * fermentable.color
+
+    for yeast in conn.execute(
+        sa.select(recipe_yeasts).where(recipe_yeasts.c.recipe_id.in_(recipe_ids))
+    ):
+        if yeast.attenuation is not None:
+            totals[yeast.recipe_id]['attenuation_total'] += yeast.attenuation
+            totals[yeast.recipe_id]['attenuation_samples'] += 1.0
+
+    return totals
+
+
+def _derived_metrics(recipe, totals):
+    """Estimated OG, FG, ABV, color and IBU from a recipe's totals."""
+    batch = _gallons(recipe.batch_size)
+    boil = _gallons(recipe.boil_size)
+    volume = batch if boil is None else boil
+    efficiency = DEFAULT_EFFICIENCY if recipe.efficiency is None else recipe.efficiency
+    points = totals['extract_points_mash'] * efficiency / 100.0 + totals['extract_points_direct']
+
+    est_og = est_fg = est_abv = ibu = srm = None
+    if points > 0 and batch is not None and batch > 0:
+        est_og = 1.0 + points / batch / 1000.0
+        samples = totals['attenuation_samples']
+        attenuation = (
+            totals['attenuation_total'] / samples if samples > 0 else DEFAULT_ATTENUATION
+        )
+        est_fg = est_og - (est_og - 1.0) * attenuation / 100.0
+        est_abv = (est_og - est_fg) * 131.25
+
+    gravity = est_og if recipe.og is None else recipe.og
+    use_rager = (recipe.ibu_method or '').strip().lower() == 'rager'
+    if volume is not None and volume > 0:
+        if use_rager and totals['hop_utilization_rager'] > 0:
+            adjustment = (gravity - 1.050) / 0.2 if gravity is not None and gravity > 1.050 else 0.0
+            ibu = totals['hop_utilization_rager'] * 7490 / (volume * (1.0 + adjustment))
+        elif not use_rager and totals['hop_utilization_tinseth'] > 0 and gravity is not None:
+            ibu = (
+                1.65 * math.pow(0.000125, gravity - 1.0)
+                * totals['hop_utilization_tinseth'] * 7490 / volume
+            )
+
+    if totals['color_units'] > 0 and batch is not None and batch > 0:
+        srm = 1.4922 * math.pow(totals['color_units'] / batch, 0.6859)
+
+    return {'est_og': est_og, 'est_fg': est_fg, 'est_abv': est_abv, 'est_color': srm, 'ibu': ibu}
+
+
+def _backfill(conn, recipe_ids):
+    totals = _ingredient_totals(conn, recipe_ids)
+    values = []
+    for recipe in conn.execute(sa.select(recipes).where(recipes.c.id.in_(recipe_ids))):
+        recipe_totals = totals[recipe.id]
+        values.append({
+            'recipe_id': recipe.id,
+            **recipe_totals,
+            **_derived_metrics(recipe, recipe_totals),
+        })
+    if values:
+        columns = (*TOTAL_COLUMNS, 'est_og', 'est_fg', 'est_abv', 'est_color', 'ibu')
+        conn.execute(
+            recipes.update()
+            .where(recipes.c.id == sa.bindparam('recipe_id'))
+            .values({column: sa.bindparam(column) for column in columns}),
+            values,
+        )
+
+
+def upgrade() -> None:
+    """Add metric total columns to recipes and backfill derived metrics"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [col['name'] for col in inspector.get_columns('recipes')]
+
+    for column in TOTAL_COLUMNS:
+        if column not in existing_columns:
+            op.add_column(
+                'recipes',
+                sa.Column(column, sa.Float(), nullable=False, server_default='0'),
+            )
+
+    # Compute totals and est_og/est_fg/est_color/ibu/est_abv for existing recipes
+    recipe_ids = [row[0] for row in conn.execute(sa.select(recipes.c.id).order_by(recipes.c.id))]
+    for start in range(0, len(recipe_ids), BACKFILL_CHUNK_SIZE):
+        _backfill(conn, recipe_ids[start:start + BACKFILL_CHUNK_SIZE])
+
+
+def downgrade() -> None:
+    """Remove metric total columns from recipes"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_columns = [col['name'] for col in inspector.get_columns('recipes')]
+
+    for column in TOTAL_COLUMNS:
+        if column in existing_columns:
+            op.drop_column('recipes', column)
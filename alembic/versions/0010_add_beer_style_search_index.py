@@ -0,0 +1,100 @@
+"""Add full-text search index for beer styles
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+# Search objects as of this revision, written out here rather than taken from
+# Database.Models.beer_styles so later changes to the model's DDL do not
+# change this migration. Every statement is idempotent.
+SEARCH_DDL = {
+    'postgresql': [
+        """
+        ALTER TABLE beer_styles ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(style_code, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(examples, '')), 'B')
+            || setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+        ) STORED
+        """,
+        'CREATE INDEX IF NOT EXISTS idx_beer_style_search ON beer_styles USING GIN (search_vector)',
+    ],
+    'sqlite': [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS beer_styles_fts USING fts5(
+            name, style_code, examples, description,
+            content='beer_styles', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS beer_styles_fts_insert AFTER INSERT ON beer_styles BEGIN
+            INSERT INTO beer_styles_fts(rowid, name, style_code, examples, description)
+            VALUES (new.id, new.name, new.style_code, new.examples, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS beer_styles_fts_delete AFTER DELETE ON beer_styles BEGIN
+            INSERT INTO beer_styles_fts(beer_styles_fts, rowid, name, style_code, examples, description)
+            VALUES ('delete', old.id, old.name, old.style_code, old.examples, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS beer_styles_fts_update
+        AFTER UPDATE OF name, style_code, examples, description ON beer_styles BEGIN
+            INSERT INTO beer_styles_fts(beer_styles_fts, rowid, name, style_code, examples, description)
+            VALUES ('delete', old.id, old.name, old.style_code, old.examples, old.description);
+            INSERT INTO beer_styles_fts(rowid, name, style_code, examples, description)
+            VALUES (new.id, new.name, new.style_code, new.examples, new.description);
+        END
+        """,
+        # Index the rows that already exist
+        "INSERT INTO beer_styles_fts(beer_styles_fts) VALUES ('rebuild')",
+    ],
+}
+
+SEARCH_DROP_DDL = {
+    'postgresql': [
+        'DROP INDEX IF EXISTS idx_beer_style_search',
+        'ALTER TABLE beer_styles DROP COLUMN IF EXISTS search_vector',
+    ],
+    'sqlite': [
+        'DROP TRIGGER IF EXISTS beer_styles_fts_insert',
+        'DROP TRIGGER IF EXISTS beer_styles_fts_delete',
+        'DROP TRIGGER IF EXISTS beer_styles_fts_update',
+        'DROP TABLE IF EXISTS beer_styles_fts',
+    ],
+}
+
+
+def upgrade() -> None:
+    """Create the tsvector column and GIN index (PostgreSQL) or FTS5 table and triggers (SQLite)"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    if 'beer_styles' not in inspector.get_table_names():
+        return
+
+    for statement in SEARCH_DDL.get(conn.dialect.name, ()):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Remove the beer style search index"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    if 'beer_styles' not in inspector.get_table_names():
+        return
+
+    for statement in SEARCH_DROP_DDL.get(conn.dialect.name, ()):
+        op.execute(statement)
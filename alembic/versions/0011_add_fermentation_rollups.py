@@ -0,0 +1,165 @@
+"""Add hourly/daily fermentation reading rollups
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+METRICS = ('gravity', 'temperature', 'ph')
+
+RESOLUTIONS = ('hour', 'day')
+
+BACKFILL_CHUNK_SIZE = 5000
+
+# The backfill is frozen here rather than calling modules.fermentation_rollups,
+# so later changes to the application's aggregation or models cannot change
+# what this revision does. Buckets are those of revision 0011.
+fermentation_readings = sa.table(
+    'fermentation_readings',
+    sa.column('batch_id', sa.Integer),
+    sa.column('timestamp', sa.DateTime),
+    *(sa.column(metric, sa.Float) for metric in METRICS),
+)
+
+
+def _metric_columns():
+    columns = []
+    for metric in METRICS:
+        columns += [
+            sa.Column(f'{metric}_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column(f'{metric}_sum', sa.Float(), nullable=True),
+            sa.Column(f'{metric}_min', sa.Float(), nullable=True),
+            sa.Column(f'{metric}_max', sa.Float(), nullable=True),
+            sa.Column(f'{metric}_last', sa.Float(), nullable=True),
+            sa.Column(f'{metric}_last_at', sa.DateTime(), nullable=True),
+        ]
+    return columns
+
+
+rollups = sa.table(
+    'fermentation_reading_rollups',
+    sa.column('batch_id', sa.Integer),
+    sa.column('resolution', sa.String),
+    sa.column('bucket_start', sa.DateTime),
+    sa.column('reading_count', sa.Integer),
+    *(sa.column(column.name, column.type) for column in _metric_columns()),
+)
+
+
+def _bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    if resolution == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _empty_stats():
+    stats = {'reading_count': 0}
+    for metric in METRICS:
+        stats.update({
+            f'{metric}_count': 0,
+            f'{metric}_sum': None,
+            f'{metric}_min': None,
+            f'{metric}_max': None,
+            f'{metric}_last': None,
+            f'{metric}_last_at': None,
+        })
+    return stats
+
+
+def _add_value(stats, metric, value, at):
+    if stats[f'{metric}_count']:
+        stats[f'{metric}_sum'] += value
+        stats[f'{metric}_min'] = min(stats[f'{metric}_min'], value)
+        stats[f'{metric}_max'] = max(stats[f'{metric}_max'], value)
+    else:
+        stats[f'{metric}_sum'] = value
+        stats[f'{metric}_min'] = value
+        stats[f'{metric}_max'] = value
+    stats[f'{metric}_count'] += 1
+    last_at = stats[f'{metric}_last_at']
+    if last_at is None or at >= last_at:
+        stats[f'{metric}_last'] = value
+        stats[f'{metric}_last_at'] = at
+
+
+def _backfill(conn):
+    """Aggregate every reading into its hour and day buckets."""
+    aggregates = {}
+    result = conn.execute(
+        sa.select(fermentation_readings).execution_options(yield_per=BACKFILL_CHUNK_SIZE)
+    )
+    for reading in result:
+        timestamp = reading.timestamp.replace(tzinfo=None)
+        for resolution in RESOLUTIONS:
+            key = (reading.batch_id, resolution, _bucket_start(timestamp, resolution))
+            stats = aggregates.get(key)
+            if stats is None:
+                stats = aggregates[key] = _empty_stats()
+            stats['reading_count'] += 1
+            for metric in METRICS:
+                value = getattr(reading, metric)
+                if value is not None:
+                    _add_value(stats, metric, value, timestamp)
+
+    values = [
+        {'batch_id': batch_id, 'resolution': resolution, 'bucket_start': start, **stats}
+        for (batch_id, resolution, start), stats in aggregates.items()
+    ]
+    for start in range(0, len(values), BACKFILL_CHUNK_SIZE):
+        conn.execute(rollups.insert(), values[start:start + BACKFILL_CHUNK_SIZE])
+
+
+def upgrade() -> None:
+    """Create fermentation_reading_rollups and backfill it from existing readings"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'fermentation_reading_rollups' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'fermentation_reading_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('batch_id', sa.Integer(), nullable=False),
+        sa.Column('resolution', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('reading_count', sa.Integer(), nullable=False, server_default='0'),
+        *_metric_columns(),
+        sa.ForeignKeyConstraint(['batch_id'], ['batches.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'batch_id',
+            'resolution',
+            'bucket_start',
+            name='uq_fermentation_rollups_batch_resolution_bucket',
+        ),
+    )
+    op.create_index(
+        'ix_fermentation_reading_rollups_id', 'fermentation_reading_rollups', ['id'], unique=False
+    )
+
+    _backfill(conn)
+
+
+def downgrade() -> None:
+    """Drop fermentation_reading_rollups"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'fermentation_reading_rollups' in inspector.get_table_names():
+        op.drop_index(
+            'ix_fermentation_reading_rollups_id', table_name='fermentation_reading_rollups'
+        )
+        op.drop_table('fermentation_reading_rollups')
@@ -0,0 +1,94 @@
+"""Add numeric stock and version columns to inventory tables
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-17
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+INVENTORY_TABLES = (
+    'inventory_hops',
+    'inventory_fermentables',
+    'inventory_miscs',
+    'inventory_yeasts',
+)
+
+BACKFILL_CHUNK_SIZE = 500
+
+# Copy of utils.inventory_stock as of this revision, so the stock it
+# derives does not follow later changes to the application's parsing
+_LEADING_NUMBER = re.compile(r'(\d+(\.\d+)?)')
+
+
+def _inventory_stock(inventory, amount):
+    """Leading number of inventory, falling back to amount"""
+    if isinstance(inventory, (int, float)):
+        return float(inventory)
+    if isinstance(inventory, str):
+        match = _LEADING_NUMBER.match(inventory)
+        return float(match.group(1)) if match else 0.0
+    if amount is not None:
+        return float(amount)
+    return None
+
+
+def _backfill_stock(conn, table_name: str, has_inventory: bool) -> None:
+    inventory = 'inventory' if has_inventory else 'NULL'
+    rows = conn.execute(
+        sa.text(f'SELECT id, {inventory} AS inventory, amount FROM {table_name} ORDER BY id')
+    ).all()
+    updates = [
+        {'item_id': row.id, 'stock': _inventory_stock(row.inventory, row.amount)}
+        for row in rows
+    ]
+    statement = sa.text(f'UPDATE {table_name} SET stock = :stock WHERE id = :item_id')
+    for start in range(0, len(updates), BACKFILL_CHUNK_SIZE):
+        chunk = updates[start:start + BACKFILL_CHUNK_SIZE]
+        if chunk:
+            conn.execute(statement, chunk)
+
+
+def upgrade() -> None:
+    """Add stock and version columns and derive stock from inventory/amount"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_tables = inspector.get_table_names()
+
+    for table_name in INVENTORY_TABLES:
+        if table_name not in existing_tables:
+            continue
+        existing_columns = [col['name'] for col in inspector.get_columns(table_name)]
+        if 'stock' not in existing_columns:
+            op.add_column(table_name, sa.Column('stock', sa.Float(), nullable=True))
+        if 'version' not in existing_columns:
+            op.add_column(
+                table_name,
+                sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+            )
+        _backfill_stock(conn, table_name, 'inventory' in existing_columns)
+
+
+def downgrade() -> None:
+    """Remove stock and version columns from inventory tables"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_tables = inspector.get_table_names()
+
+    for table_name in INVENTORY_TABLES:
+        if table_name not in existing_tables:
+            continue
+        existing_columns = [col['name'] for col in inspector.get_columns(table_name)]
+        for column in ('version', 'stock'):
+            if column in existing_columns:
+                op.drop_column(table_name, column)
@@ -0,0 +1,93 @@
+"""Add normalized ingredient name column and index to inventory tables
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-17
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+INVENTORY_TABLES = (
+    'inventory_hops',
+    'inventory_fermentables',
+    'inventory_miscs',
+    'inventory_yeasts',
+)
+
+BACKFILL_CHUNK_SIZE = 500
+
+# Normalization as of this revision, copied from utils.inventory_stock so
+# the backfilled values do not depend on the application at upgrade time
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _index_name(table_name: str) -> str:
+    return f'ix_{table_name}_name_normalized'
+
+
+def _normalize_ingredient_name(name):
+    """Case-folded name with surrounding and repeated whitespace removed"""
+    return _WHITESPACE.sub(' ', name).strip().casefold() or None
+
+
+def _backfill_name_normalized(conn, table_name: str) -> None:
+    rows = conn.execute(
+        sa.text(f'SELECT id, name FROM {table_name} WHERE name IS NOT NULL ORDER BY id')
+    ).all()
+    updates = [
+        {'item_id': row.id, 'name_normalized': _normalize_ingredient_name(row.name)}
+        for row in rows
+    ]
+    statement = sa.text(
+        f'UPDATE {table_name} SET name_normalized = :name_normalized WHERE id = :item_id'
+    )
+    for start in range(0, len(updates), BACKFILL_CHUNK_SIZE):
+        chunk = updates[start:start + BACKFILL_CHUNK_SIZE]
+        if chunk:
+            conn.execute(statement, chunk)
+
+
+def upgrade() -> None:
+    """Add name_normalized, backfill it from name and index it"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_tables = inspector.get_table_names()
+
+    for table_name in INVENTORY_TABLES:
+        if table_name not in existing_tables:
+            continue
+        existing_columns = [col['name'] for col in inspector.get_columns(table_name)]
+        if 'name_normalized' not in existing_columns:
+            op.add_column(table_name, sa.Column('name_normalized', sa.String(), nullable=True))
+        _backfill_name_normalized(conn, table_name)
+
+        existing_indexes = [idx['name'] for idx in inspector.get_indexes(table_name)]
+        if _index_name(table_name) not in existing_indexes:
+            op.create_index(_index_name(table_name), table_name, ['name_normalized'])
+
+
+def downgrade() -> None:
+    """Remove the name_normalized index and column"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_tables = inspector.get_table_names()
+
+    for table_name in INVENTORY_TABLES:
+        if table_name not in existing_tables:
+            continue
+        existing_indexes = [idx['name'] for idx in inspector.get_indexes(table_name)]
+        if _index_name(table_name) in existing_indexes:
+            op.drop_index(_index_name(table_name), table_name=table_name)
+        existing_columns = [col['name'] for col in inspector.get_columns(table_name)]
+        if 'name_normalized' in existing_columns:
+            op.drop_column(table_name, 'name_normalized')
@@ -0,0 +1,72 @@
+"""Add yeast harvest lineage closure table
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+# Closure rows for existing harvests, derived from their parent links
+BACKFILL_SQL = """
+INSERT INTO yeast_harvest_lineage (ancestor_id, descendant_id, depth)
+WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+    SELECT id, id, 0 FROM yeast_harvests
+    UNION ALL
+    SELECT tree.ancestor_id, yeast_harvests.id, tree.depth + 1
+    FROM tree
+    JOIN yeast_harvests ON yeast_harvests.parent_harvest_id = tree.descendant_id
+    WHERE tree.depth < 1000
+)
+SELECT ancestor_id, descendant_id, depth FROM tree
+"""
+
+
+def upgrade() -> None:
+    """Create yeast_harvest_lineage and fill it from existing harvests"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    existing_tables = inspector.get_table_names()
+
+    if 'yeast_harvests' not in existing_tables or 'yeast_harvest_lineage' in existing_tables:
+        return
+
+    op.create_table(
+        'yeast_harvest_lineage',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['yeast_harvests.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['yeast_harvests.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id'),
+    )
+    op.create_index(
+        'idx_yeast_harvest_lineage_ancestor_depth',
+        'yeast_harvest_lineage',
+        ['ancestor_id', 'depth'],
+    )
+    op.create_index(
+        'idx_yeast_harvest_lineage_descendant_depth',
+        'yeast_harvest_lineage',
+        ['descendant_id', 'depth'],
+    )
+    conn.execute(sa.text(BACKFILL_SQL))
+
+
+def downgrade() -> None:
+    """Drop yeast_harvest_lineage"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'yeast_harvest_lineage' in inspector.get_table_names():
+        op.drop_index('idx_yeast_harvest_lineage_descendant_depth', table_name='yeast_harvest_lineage')
+        op.drop_index('idx_yeast_harvest_lineage_ancestor_depth', table_name='yeast_harvest_lineage')
+        op.drop_table('yeast_harvest_lineage')
@@ -0,0 +1,44 @@
+"""Add owner and lease columns to import_jobs
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = '0015'
+down_revision = '0014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add import_jobs.owner_id and import_jobs.lease_expires_at"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'import_jobs' not in inspector.get_table_names():
+        return
+    columns = {column['name'] for column in inspector.get_columns('import_jobs')}
+    if 'owner_id' not in columns:
+        op.add_column('import_jobs', sa.Column('owner_id', sa.String(length=255), nullable=True))
+    if 'lease_expires_at' not in columns:
+        op.add_column('import_jobs', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop the import job lease columns"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'import_jobs' not in inspector.get_table_names():
+        return
+    columns = {column['name'] for column in inspector.get_columns('import_jobs')}
+    if 'lease_expires_at' in columns:
+        op.drop_column('import_jobs', 'lease_expires_at')
+    if 'owner_id' in columns:
+        op.drop_column('import_jobs', 'owner_id')
@@ -0,0 +1,43 @@
+"""Add a version column to fermentation_readings
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = '0016'
+down_revision = '0015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add fermentation_readings.version, bumped on every update"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'fermentation_readings' not in inspector.get_table_names():
+        return
+    columns = {column['name'] for column in inspector.get_columns('fermentation_readings')}
+    if 'version' not in columns:
+        op.add_column(
+            'fermentation_readings',
+            sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+        )
+
+
+def downgrade() -> None:
+    """Drop fermentation_readings.version"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'fermentation_readings' not in inspector.get_table_names():
+        return
+    columns = {column['name'] for column in inspector.get_columns('fermentation_readings')}
+    if 'version' in columns:
+        op.drop_column('fermentation_readings', 'version')
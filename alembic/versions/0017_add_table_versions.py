@@ -0,0 +1,38 @@
+"""Add table_versions change counters
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = '0017'
+down_revision = '0016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create table_versions; counters start at 0 and are created on first write"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'table_versions' not in inspector.get_table_names():
+        op.create_table(
+            'table_versions',
+            sa.Column('name', sa.String(length=64), primary_key=True),
+            sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        )
+
+
+def downgrade() -> None:
+    """Drop table_versions"""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+
+    if 'table_versions' in inspector.get_table_names():
+        op.drop_table('table_versions')
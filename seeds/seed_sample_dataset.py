@@ -27,6 +27,7 @@ from logger_config import get_logger  # type: ignore
 from database import Base, SessionLocal, engine  # type: ignore
 import Database.Models as models  # type: ignore
 from Database.Models.users import Users  # type: ignore
+from modules.recipe_cloning import clone_recipe, copy_recipe_to_inventory  # type: ignore
 
 LOGGER = get_logger("SampleDataset")
 DATASET_PATH = Path(__file__).resolve().parents[1] / "data" / "sample_dataset.json"
@@ -148,165 +149,6 @@ def _upsert_recipe(session: Session, payload: Dict[str, Any]) -> Tuple[models.Re
     return recipe, created
 
 
-def _clone_recipe_for_batch(session: Session, recipe: models.Recipes) -> models.Recipes:
-    clone = models.Recipes(
-        name=recipe.name,
-        is_batch=True,
-        origin_recipe_id=recipe.id,
-        version=recipe.version,
-        type=recipe.type,
-        brewer=recipe.brewer,
-        asst_brewer=recipe.asst_brewer,
-        batch_size=recipe.batch_size,
-        boil_size=recipe.boil_size,
-        boil_time=recipe.boil_time,
-        efficiency=recipe.efficiency,
-        notes=recipe.notes,
-        taste_notes=recipe.taste_notes,
-        taste_rating=recipe.taste_rating,
-        og=recipe.og,
-        fg=recipe.fg,
-        fermentation_stages=recipe.fermentation_stages,
-        primary_age=recipe.primary_age,
-        primary_temp=recipe.primary_temp,
-        secondary_age=recipe.secondary_age,
-        secondary_temp=recipe.secondary_temp,
-        tertiary_age=recipe.tertiary_age,
-        age=recipe.age,
-        age_temp=recipe.age_temp,
-        carbonation_used=recipe.carbonation_used,
-        est_og=recipe.est_og,
-        est_fg=recipe.est_fg,
-        est_color=recipe.est_color,
-        ibu=recipe.ibu,
-        ibu_method=recipe.ibu_method,
-        est_abv=recipe.est_abv,
-        abv=recipe.abv,
-        actual_efficiency=recipe.actual_efficiency,
-        calories=recipe.calories,
-        display_batch_size=recipe.display_batch_size,
-        display_boil_size=recipe.display_boil_size,
-        display_og=recipe.display_og,
-        display_fg=recipe.display_fg,
-        display_primary_temp=recipe.display_primary_temp,
-        display_secondary_temp=recipe.display_secondary_temp,
-        display_tertiary_temp=recipe.display_tertiary_temp,
-        display_age_temp=recipe.display_age_temp,
-    )
-    session.add(clone)
-    session.flush()
-
-    _replace_children(
-        session,
-        clone.hops,
-        models.RecipeHop,
-        "recipe_id",
-        clone.id,
-        [
-            {
-                "name": hop.name,
-                "origin": hop.origin,
-                "alpha": hop.alpha,
-                "type": hop.type,
-                "form": hop.form,
-                "beta": hop.beta,
-                "hsi": hop.hsi,
-                "amount": hop.amount,
-                "use": hop.use,
-                "time": hop.time,
-                "notes": hop.notes,
-                "display_amount": hop.display_amount,
-                "inventory": hop.inventory,
-                "display_time": hop.display_time,
-            }
-            for hop in recipe.hops
-        ],
-    )
-    _replace_children(
-        session,
-        clone.fermentables,
-        models.RecipeFermentable,
-        "recipe_id",
-        clone.id,
-        [
-            {
-                "name": item.name,
-                "type": item.type,
-                "yield_": item.yield_,
-                "color": item.color,
-                "origin": item.origin,
-                "supplier": item.supplier,
-                "notes": item.notes,
-                "potential": item.potential,
-                "amount": item.amount,
-                "cost_per_unit": item.cost_per_unit,
-                "manufacturing_date": item.manufacturing_date,
-                "expiry_date": item.expiry_date,
-                "lot_number": item.lot_number,
-                "exclude_from_total": item.exclude_from_total,
-                "not_fermentable": item.not_fermentable,
-                "description": item.description,
-                "substitutes": item.substitutes,
-                "used_in": item.used_in,
-            }
-            for item in recipe.fermentables
-        ],
-    )
-    _replace_children(
-        session,
-        clone.miscs,
-        models.RecipeMisc,
-        "recipe_id",
-        clone.id,
-        [
-            {
-                "name": item.name,
-                "type": item.type,
-                "use": item.use,
-                "amount_is_weight": item.amount_is_weight,
-                "use_for": item.use_for,
-                "notes": item.notes,
-                "amount": item.amount,
-                "time": item.time,
-                "display_amount": item.display_amount,
-                "inventory": item.inventory,
-                "display_time": item.display_time,
-                "batch_size": item.batch_size,
-            }
-            for item in recipe.miscs
-        ],
-    )
-    _replace_children(
-        session,
-        clone.yeasts,
-        models.RecipeYeast,
-        "recipe_id",
-        clone.id,
-        [
-            {
-                "name": item.name,
-                "type": item.type,
-                "form": item.form,
-                "amount": item.amount,
-                "amount_is_weight": item.amount_is_weight,
-                "laboratory": item.laboratory,
-                "product_id": item.product_id,
-                "min_temperature": item.min_temperature,
-                "max_temperature": item.max_temperature,
-                "flocculation": item.flocculation,
-                "attenuation": item.attenuation,
-                "notes": item.notes,
-                "best_for": item.best_for,
-                "times_cultured": item.times_cultured,
-                "max_reuse": item.max_reuse,
-                "add_to_secondary": item.add_to_secondary,
-            }
-            for item in recipe.yeasts
-        ],
-    )
-    return clone
-
-
 def _ensure_datetime(value: Any) -> datetime:
     if isinstance(value, datetime):
         return value
@@ -344,9 +186,9 @@ def _seed_batches(session: Session, payloads: Iterable[Dict[str, Any]]) -> int:
             LOGGER.info("Batch already exists: %s", payload["batch_name"])
             continue
 
-        clone = _clone_recipe_for_batch(session, recipe)
+        clone_id = clone_recipe(session, recipe.id)
         batch = models.Batches(
-            recipe_id=clone.id,
+            recipe_id=clone_id,
             batch_name=payload["batch_name"],
             batch_number=payload["batch_number"],
             batch_size=payload["batch_size"],
@@ -357,87 +199,7 @@ def _seed_batches(session: Session, payloads: Iterable[Dict[str, Any]]) -> int:
         )
         session.add(batch)
         session.flush()
-
-        for hop in clone.hops:
-            session.add(
-                models.InventoryHop(
-                    name=hop.name,
-                    origin=hop.origin,
-                    alpha=hop.alpha,
-                    type=hop.type,
-                    form=hop.form,
-                    beta=hop.beta,
-                    hsi=hop.hsi,
-                    amount=hop.amount,
-                    use=hop.use,
-                    time=hop.time,
-                    notes=hop.notes,
-                    display_amount=hop.display_amount,
-                    inventory=hop.inventory,
-                    display_time=hop.display_time,
-                    batch_id=batch.id,
-                )
-            )
-        for fermentable in clone.fermentables:
-            session.add(
-                models.InventoryFermentable(
-                    name=fermentable.name,
-                    type=fermentable.type,
-                    yield_=fermentable.yield_,
-                    color=fermentable.color,
-                    origin=fermentable.origin,
-                    supplier=fermentable.supplier,
-                    notes=fermentable.notes,
-                    potential=fermentable.potential,
-                    amount=fermentable.amount,
-                    cost_per_unit=fermentable.cost_per_unit,
-                    manufacturing_date=fermentable.manufacturing_date,
-                    expiry_date=fermentable.expiry_date,
-                    lot_number=fermentable.lot_number,
-                    exclude_from_total=fermentable.exclude_from_total,
-                    not_fermentable=fermentable.not_fermentable,
-                    description=fermentable.description,
-                    substitutes=fermentable.substitutes,
-                    used_in=fermentable.used_in,
-                    batch_id=batch.id,
-                )
-            )
-        for misc in clone.miscs:
-            session.add(
-                models.InventoryMisc(
-                    name=misc.name,
-                    type=misc.type,
-                    use=misc.use,
-                    amount_is_weight=misc.amount_is_weight,
-                    use_for=misc.use_for,
-                    notes=misc.notes,
-                    amount=misc.amount,
-                    time=misc.time,
-                    display_amount=misc.display_amount,
-                    inventory=misc.inventory,
-                    display_time=misc.display_time,
-                    batch_size=misc.batch_size,
-                    batch_id=batch.id,
-                )
-            )
-        for yeast in clone.yeasts:
-            session.add(
-                models.InventoryYeast(
-                    name=yeast.name,
-                    type=yeast.type,
-                    form=yeast.form,
-                    laboratory=yeast.laboratory,
-                    product_id=yeast.product_id,
-                    min_temperature=yeast.min_temperature,
-                    max_temperature=yeast.max_temperature,
-                    flocculation=yeast.flocculation,
-                    attenuation=yeast.attenuation,
-                    notes=yeast.notes,
-                    best_for=yeast.best_for,
-                    max_reuse=yeast.max_reuse,
-                    batch_id=batch.id,
-                )
-            )
+        copy_recipe_to_inventory(session, clone_id, batch.id)
 
         created += 1
     return created
@@ -11,6 +11,7 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship
 from database import Base
+from .inventory_stock import InventoryStockMixin
 
 
 class RecipeFermentable(Base):
@@ -52,7 +53,7 @@ class RecipeFermentable(Base):
     recipe = relationship("Recipes", back_populates="fermentables")
 
 
-class InventoryFermentable(Base):
+class InventoryFermentable(InventoryStockMixin, Base):
     __tablename__ = "inventory_fermentables"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=True)
@@ -3,6 +3,7 @@
 from sqlalchemy import Column, Integer, String, Float, ForeignKey
 from sqlalchemy.orm import relationship
 from database import Base
+from .inventory_stock import InventoryStockMixin
 
 
 class RecipeHop(Base):
@@ -34,7 +35,7 @@ class RecipeHop(Base):
     recipe = relationship("Recipes", back_populates="hops")
 
 
-class InventoryHop(Base):
+class InventoryHop(InventoryStockMixin, Base):
     __tablename__ = "inventory_hops"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=True)
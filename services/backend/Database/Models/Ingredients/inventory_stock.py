@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy.orm import declared_attr, validates
+
+from utils.inventory_stock import inventory_stock, normalize_ingredient_name
+
+
+class InventoryStockMixin:
+    """
+    Numeric stock and a version counter for inventory tables.
+
+    ``stock`` follows ``inventory`` (or ``amount`` when there is no
+    inventory value) on every ORM write. ``version`` is the mapper's
+    version_id_col, so ORM updates of a row that changed since it was
+    loaded fail instead of overwriting it; bulk consumption checks it
+    explicitly on backends without row locks. ``name_normalized`` follows
+    ``name`` and is indexed for matching inventory to recipe ingredients.
+    """
+
+    stock = Column(Float, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    name_normalized = Column(String, nullable=True, index=True)
+
+    @declared_attr.directive
+    def __mapper_args__(cls):
+        return {"version_id_col": cls.version}
+
+    @validates("inventory", "amount")
+    def _sync_stock(self, key, value):
+        inventory = value if key == "inventory" else getattr(self, "inventory", None)
+        amount = value if key == "amount" else self.amount
+        self.stock = inventory_stock(inventory, amount)
+        return value
+
+    @validates("name")
+    def _sync_name_normalized(self, key, value):
+        self.name_normalized = normalize_ingredient_name(value)
+        return value
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey
 from sqlalchemy.orm import relationship
 from database import Base
+from .inventory_stock import InventoryStockMixin
 
 
 class RecipeMisc(Base):
@@ -25,7 +26,7 @@ class RecipeMisc(Base):
     recipe = relationship("Recipes", back_populates="miscs")
 
 
-class InventoryMisc(Base):
+class InventoryMisc(InventoryStockMixin, Base):
     __tablename__ = "inventory_miscs"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=True)
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 from database import Base
+from .inventory_stock import InventoryStockMixin
 
 
 class RecipeYeast(Base):
@@ -34,7 +35,7 @@ class RecipeYeast(Base):
     recipe = relationship("Recipes", back_populates="yeasts")
 
 
-class InventoryYeast(Base):
+class InventoryYeast(InventoryStockMixin, Base):
     __tablename__ = "inventory_yeasts"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=True)
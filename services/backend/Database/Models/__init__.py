@@ -29,13 +29,15 @@ from .Ingredients.fermentables import RecipeFermentable, InventoryFermentable
 from .Ingredients.hops import RecipeHop, InventoryHop
 from .Ingredients.miscs import RecipeMisc, InventoryMisc
 from .Ingredients.yeasts import RecipeYeast, InventoryYeast
-from .yeast_management import YeastStrain, YeastHarvest
+from .yeast_management import YeastStrain, YeastHarvest, YeastHarvestLineage
 from .references import References
 from .devices import Device
-from .fermentation_readings import FermentationReadings
+from .fermentation_readings import FermentationReadings, FermentationReadingRollup
 from .recipe_versions import RecipeVersion
 from .batch_ingredients import BatchIngredient, InventoryTransaction
 from .users import Users
+from .import_jobs import ImportJob
+from .table_versions import TableVersion
 
 __all__ = [
     "Recipes",
@@ -77,11 +79,15 @@ __all__ = [
     "InventoryYeast",
     "YeastStrain",
     "YeastHarvest",
+    "YeastHarvestLineage",
     "References",
     "Device",
     "FermentationReadings",
+    "FermentationReadingRollup",
     "RecipeVersion",
     "BatchIngredient",
     "InventoryTransaction",
     "Users",
+    "ImportJob",
+    "TableVersion",
 ]
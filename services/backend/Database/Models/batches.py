@@ -72,6 +72,12 @@ class Batches(Base):
         cascade="all, delete-orphan",
         order_by="FermentationReadings.timestamp",
     )
+    fermentation_rollups = relationship(
+        "FermentationReadingRollup",
+        back_populates="batch",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
     batch_ingredients = relationship(
         "BatchIngredient",
         back_populates="batch",
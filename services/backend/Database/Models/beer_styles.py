@@ -8,6 +8,7 @@ from sqlalchemy import (
     Numeric,
     DateTime,
     Index,
+    event,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -124,3 +125,81 @@ class BeerStyle(Base):
         Index("idx_beer_style_abv", "abv_min", "abv_max"),
         Index("idx_beer_style_ibu", "ibu_min", "ibu_max"),
     )
+
+
+# Full-text search over name, style_code, examples and description. These
+# objects are not mapped on the model: PostgreSQL stores a generated tsvector
+# column with a GIN index, SQLite an external-content FTS5 table kept in sync
+# by triggers. Both use plain, unstemmed tokens so prefix typeahead matches
+# what the user typed.
+BEER_STYLE_SEARCH_DDL = {
+    "postgresql": [
+        """
+        ALTER TABLE beer_styles ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(style_code, '')), 'A')
+            || setweight(to_tsvector('simple', coalesce(examples, '')), 'B')
+            || setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_beer_style_search ON beer_styles USING GIN (search_vector)",
+    ],
+    "sqlite": [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS beer_styles_fts USING fts5(
+            name, style_code, examples, description,
+            content='beer_styles', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS beer_styles_fts_insert AFTER INSERT ON beer_styles BEGIN
+            INSERT INTO beer_styles_fts(rowid, name, style_code, examples, description)
+            VALUES (new.id, new.name, new.style_code, new.examples, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS beer_styles_fts_delete AFTER DELETE ON beer_styles BEGIN
+            INSERT INTO beer_styles_fts(beer_styles_fts, rowid, name, style_code, examples, description)
+            VALUES ('delete', old.id, old.name, old.style_code, old.examples, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS beer_styles_fts_update
+        AFTER UPDATE OF name, style_code, examples, description ON beer_styles BEGIN
+            INSERT INTO beer_styles_fts(beer_styles_fts, rowid, name, style_code, examples, description)
+            VALUES ('delete', old.id, old.name, old.style_code, old.examples, old.description);
+            INSERT INTO beer_styles_fts(rowid, name, style_code, examples, description)
+            VALUES (new.id, new.name, new.style_code, new.examples, new.description);
+        END
+        """,
+        # Index any rows that already exist
+        "INSERT INTO beer_styles_fts(beer_styles_fts) VALUES ('rebuild')",
+    ],
+}
+
+BEER_STYLE_SEARCH_DROP_DDL = {
+    "postgresql": [
+        "DROP INDEX IF EXISTS idx_beer_style_search",
+        "ALTER TABLE beer_styles DROP COLUMN IF EXISTS search_vector",
+    ],
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS beer_styles_fts_insert",
+        "DROP TRIGGER IF EXISTS beer_styles_fts_delete",
+        "DROP TRIGGER IF EXISTS beer_styles_fts_update",
+        "DROP TABLE IF EXISTS beer_styles_fts",
+    ],
+}
+
+
+@event.listens_for(BeerStyle.__table__, "after_create")
+def _create_beer_style_search(target, connection, **kw):
+    for statement in BEER_STYLE_SEARCH_DDL.get(connection.dialect.name, ()):
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(BeerStyle.__table__, "before_drop")
+def _drop_beer_style_search(target, connection, **kw):
+    for statement in BEER_STYLE_SEARCH_DROP_DDL.get(connection.dialect.name, ()):
+        connection.exec_driver_sql(statement)
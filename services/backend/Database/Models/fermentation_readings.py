@@ -1,6 +1,16 @@
 # services/backend/Database/Models/fermentation_readings.py
 
-from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Index, Text
+from sqlalchemy import (
+    Column,
+    Integer,
+    Float,
+    ForeignKey,
+    DateTime,
+    Index,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -26,6 +36,64 @@ class FermentationReadings(Base):
     ph = Column(Float, nullable=True)  # pH reading
     notes = Column(Text, nullable=True)  # User notes
     created_at = Column(DateTime, default=datetime.now, nullable=False)
+    # Bumped by every ORM update, so caches can tell an edited reading apart
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # Relationship to Batches
     batch = relationship("Batches", back_populates="fermentation_readings")
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+class FermentationReadingRollup(Base):
+    """
+    Hourly or daily aggregate of a batch's fermentation readings.
+
+    Maintained by modules.fermentation_rollups as readings are written, so
+    charts over long windows read one row per bucket instead of every raw
+    reading. Sums and counts are stored rather than means so new readings
+    can be folded into an existing bucket.
+    """
+
+    __tablename__ = "fermentation_reading_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "batch_id",
+            "resolution",
+            "bucket_start",
+            name="uq_fermentation_rollups_batch_resolution_bucket",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(
+        Integer,
+        ForeignKey("batches.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    resolution = Column(String(8), nullable=False)  # "hour" or "day"
+    bucket_start = Column(DateTime, nullable=False)
+    reading_count = Column(Integer, nullable=False, default=0)
+
+    gravity_count = Column(Integer, nullable=False, default=0)
+    gravity_sum = Column(Float, nullable=True)
+    gravity_min = Column(Float, nullable=True)
+    gravity_max = Column(Float, nullable=True)
+    gravity_last = Column(Float, nullable=True)
+    gravity_last_at = Column(DateTime, nullable=True)
+
+    temperature_count = Column(Integer, nullable=False, default=0)
+    temperature_sum = Column(Float, nullable=True)
+    temperature_min = Column(Float, nullable=True)
+    temperature_max = Column(Float, nullable=True)
+    temperature_last = Column(Float, nullable=True)
+    temperature_last_at = Column(DateTime, nullable=True)
+
+    ph_count = Column(Integer, nullable=False, default=0)
+    ph_sum = Column(Float, nullable=True)
+    ph_min = Column(Float, nullable=True)
+    ph_max = Column(Float, nullable=True)
+    ph_last = Column(Float, nullable=True)
+    ph_last_at = Column(DateTime, nullable=True)
+
+    batch = relationship("Batches", back_populates="fermentation_rollups")
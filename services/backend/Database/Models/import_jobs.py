@@ -0,0 +1,39 @@
+"""
+Import job model for tracking background BeerXML and reference imports
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Index, JSON
+from database import Base
+from datetime import datetime
+
+
+class ImportJob(Base):
+    """
+    A file import processed by the background job runner.
+
+    The uploaded file is kept on disk at ``file_path`` until the job
+    finishes, so queued jobs can be picked up again after a restart.
+
+    ``owner_id`` names the worker process responsible for a queued or
+    running job; it renews ``lease_expires_at`` while the job is pending, so
+    other workers only take over jobs whose owner stopped renewing.
+    """
+
+    __tablename__ = "import_jobs"
+    __table_args__ = (Index("ix_import_jobs_status", "status"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(50), nullable=False)
+    status = Column(String(50), nullable=False, default="queued")
+    filename = Column(String, nullable=True)
+    file_path = Column(String, nullable=True)
+    parsed_count = Column(Integer, nullable=False, default=0)
+    inserted_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    owner_id = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
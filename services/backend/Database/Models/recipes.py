@@ -64,6 +64,15 @@ class Recipes(Base):
     display_secondary_temp = Column(String)
     display_tertiary_temp = Column(String)
     display_age_temp = Column(String)
+    # Running ingredient totals behind est_og/est_fg/est_color/ibu/est_abv,
+    # maintained by modules.recipe_metrics on every ingredient change
+    extract_points_mash = Column(Float, nullable=False, default=0.0, server_default="0")
+    extract_points_direct = Column(Float, nullable=False, default=0.0, server_default="0")
+    color_units = Column(Float, nullable=False, default=0.0, server_default="0")
+    hop_utilization_tinseth = Column(Float, nullable=False, default=0.0, server_default="0")
+    hop_utilization_rager = Column(Float, nullable=False, default=0.0, server_default="0")
+    attenuation_total = Column(Float, nullable=False, default=0.0, server_default="0")
+    attenuation_samples = Column(Float, nullable=False, default=0.0, server_default="0")
     hops = relationship(
         "RecipeHop",
         back_populates="recipe",
@@ -0,0 +1,129 @@
+"""
+Change counters for groups of tables.
+
+Caches built from whole tables (see modules.recipe_feasibility) compare a
+group's counter with the one they were built from instead of aggregating
+the tables on every lookup. Every session transaction that writes one of a
+group's tables, through the unit of work or a bulk insert/update/delete,
+increments the group's counter once, just before it commits. Increments
+are made in one statement with the groups in name order, so concurrent
+transactions take the counter row locks in the same order and hold them
+only while committing.
+
+Writes made outside a Session (raw connections, migrations) do not count;
+call ``bump_table_versions`` for them.
+"""
+
+from typing import Dict, Iterable
+
+from sqlalchemy import Column, Integer, String, event, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from database import Base
+
+# Group name -> tables whose writes increment it
+VERSIONED_TABLE_GROUPS = {
+    "recipe_ingredients": (
+        "recipes",
+        "recipe_hops",
+        "recipe_fermentables",
+        "recipe_yeasts",
+        "recipe_miscs",
+    ),
+    "inventory": (
+        "inventory_hops",
+        "inventory_fermentables",
+        "inventory_yeasts",
+        "inventory_miscs",
+    ),
+}
+
+_GROUP_OF_TABLE = {
+    table: group for group, tables in VERSIONED_TABLE_GROUPS.items() for table in tables
+}
+
+# Session.info key collecting the groups written in the current transaction
+_PENDING_KEY = "pending_table_versions"
+
+
+class TableVersion(Base):
+    """Number of committed transactions that wrote a group of tables."""
+
+    __tablename__ = "table_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+def table_versions(db: Session, groups: Iterable[str]) -> Dict[str, int]:
+    """Current counter of each group, 0 for groups never written."""
+    groups = list(groups)
+    versions = dict.fromkeys(groups, 0)
+    versions.update(
+        db.execute(
+            select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(groups))
+        ).all()
+    )
+    return versions
+
+
+def bump_table_versions(connection, groups: Iterable[str]) -> None:
+    """Increment the counters of ``groups`` in the connection's transaction."""
+    groups = sorted(set(groups))
+    if not groups:
+        return
+    table = TableVersion.__table__
+    dialect_name = connection.dialect.name
+    if dialect_name == "postgresql":
+        upsert = postgresql_insert(table)
+    elif dialect_name == "sqlite":
+        upsert = sqlite_insert(table)
+    else:
+        raise NotImplementedError(f"Table versions are not supported on {dialect_name}")
+    connection.execute(
+        upsert.values([{"name": group, "version": 1} for group in groups]).on_conflict_do_update(
+            index_elements=["name"], set_={"version": table.c.version + 1}
+        )
+    )
+
+
+def _mark_written(session: Session, tables: Iterable[str]) -> None:
+    groups = {_GROUP_OF_TABLE[table] for table in tables if table in _GROUP_OF_TABLE}
+    if groups:
+        session.info.setdefault(_PENDING_KEY, set()).update(groups)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    _mark_written(
+        session,
+        (
+            getattr(instance, "__tablename__", None)
+            for instance in (*session.new, *session.dirty, *session.deleted)
+        ),
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_written(orm_execute_state.session, (orm_execute_state.statement.table.name,))
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_written_groups(session):
+    # commit() flushes after this event; flush now so those writes count
+    session.flush()
+    groups = session.info.pop(_PENDING_KEY, None)
+    if groups:
+        bump_table_versions(session.connection(), groups)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_written_groups(session, previous_transaction):
+    # Rolling back a savepoint keeps the writes of the enclosing transaction
+    if not session.in_transaction():
+        session.info.pop(_PENDING_KEY, None)
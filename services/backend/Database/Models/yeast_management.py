@@ -1,7 +1,21 @@
 """
 Yeast Management Models for tracking yeast strains, viability, harvesting, and generations.
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    DateTime,
+    ForeignKey,
+    Text,
+    Index,
+    delete,
+    event,
+    insert,
+    literal,
+    select,
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base
@@ -95,3 +109,62 @@ class YeastHarvest(Base):
     yeast_strain = relationship("YeastStrain")
     parent_harvest = relationship("YeastHarvest", remote_side=[id], foreign_keys=[parent_harvest_id])
     child_harvests = relationship("YeastHarvest", foreign_keys=[parent_harvest_id], remote_side=[parent_harvest_id])
+
+
+class YeastHarvestLineage(Base):
+    """
+    Closure table of the harvest genealogy: one row per (ancestor,
+    descendant) pair, including each harvest paired with itself at depth 0,
+    so ancestors and descendants at any depth are one indexed lookup.
+
+    Rows are written when a harvest is inserted and removed when it is
+    deleted, by the mapper events below.
+    """
+    __tablename__ = "yeast_harvest_lineage"
+
+    ancestor_id = Column(Integer, ForeignKey("yeast_harvests.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("yeast_harvests.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("idx_yeast_harvest_lineage_ancestor_depth", "ancestor_id", "depth"),
+        Index("idx_yeast_harvest_lineage_descendant_depth", "descendant_id", "depth"),
+    )
+
+
+@event.listens_for(YeastHarvest, "after_insert")
+def _insert_harvest_lineage(mapper, connection, target):
+    lineage = YeastHarvestLineage.__table__
+    connection.execute(
+        insert(lineage).values(ancestor_id=target.id, descendant_id=target.id, depth=0)
+    )
+    if target.parent_harvest_id is not None:
+        connection.execute(
+            insert(lineage).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(
+                    lineage.c.ancestor_id,
+                    literal(target.id, Integer),
+                    lineage.c.depth + 1,
+                ).where(lineage.c.descendant_id == target.parent_harvest_id),
+            )
+        )
+
+
+@event.listens_for(YeastHarvest, "before_delete")
+def _delete_harvest_lineage(mapper, connection, target):
+    # Detach the harvest's subtree from the harvest and its ancestors; the
+    # children keep their own subtrees, as their parent link now dangles.
+    # Runs before the delete, while ON DELETE CASCADE has not yet removed
+    # the rows the subqueries rely on.
+    lineage = YeastHarvestLineage.__table__
+    connection.execute(
+        delete(lineage).where(
+            lineage.c.descendant_id.in_(
+                select(lineage.c.descendant_id).where(lineage.c.ancestor_id == target.id)
+            ),
+            lineage.c.ancestor_id.in_(
+                select(lineage.c.ancestor_id).where(lineage.c.descendant_id == target.id)
+            ),
+        )
+    )
@@ -9,7 +9,15 @@ from .choices import ChoiceBase
 from .recipes import (
     RecipeBase,
     Recipe,
+    RecipeSummary,
     RecipeMetrics,
+    RecipeMetricsBatchRequest,
+    RecipeMetricsBatchItem,
+    RecipeMetricsBatchResponse,
+    StyleMatch,
+    RecipeStyleMatches,
+    MissingIngredient,
+    RecipeBrewability,
     RecipeScaleRequest,
     RecipeScaleResponse,
     RecipeScaleToEquipmentResponse,
@@ -91,8 +99,10 @@ from .yeast_management import (
     YeastHarvestCreate,
     YeastHarvestUpdate,
     YeastHarvest,
+    YeastHarvestRelative,
     ViabilityCalculationRequest,
     ViabilityCalculationResponse,
+    YeastViabilityReportItem,
 )
 from .references import (
     ReferenceBase,
@@ -111,9 +121,13 @@ from .devices import (
 from .fermentation_readings import (
     FermentationReadingBase,
     FermentationReadingCreate,
+    FermentationReadingBulkCreate,
+    DeviceReadingCreate,
+    FermentationReadingBulkResult,
     FermentationReadingUpdate,
     FermentationReading,
     FermentationChartData,
+    FermentationForecast,
 )
 from .recipe_versions import (
     RecipeVersionBase,
@@ -130,7 +144,11 @@ from .batch_ingredients import (
     ConsumeIngredientsRequest,
     IngredientTrackingResponse,
     InventoryAvailability,
+    InventoryAvailabilityBatchRequest,
+    RecipeInventoryAvailability,
+    InventoryAvailabilityBatchResponse,
 )
+from .import_jobs import ImportJob
 
 __all__ = [
     "SugarBase",
@@ -141,7 +159,15 @@ __all__ = [
     "GrainBase",
     "RecipeBase",
     "Recipe",
+    "RecipeSummary",
     "RecipeMetrics",
+    "RecipeMetricsBatchRequest",
+    "RecipeMetricsBatchItem",
+    "RecipeMetricsBatchResponse",
+    "StyleMatch",
+    "RecipeStyleMatches",
+    "MissingIngredient",
+    "RecipeBrewability",
     "RecipeScaleRequest",
     "RecipeScaleResponse",
     "RecipeScaleToEquipmentResponse",
@@ -210,8 +236,10 @@ __all__ = [
     "YeastHarvestCreate",
     "YeastHarvestUpdate",
     "YeastHarvest",
+    "YeastHarvestRelative",
     "ViabilityCalculationRequest",
     "ViabilityCalculationResponse",
+    "YeastViabilityReportItem",
     "ReferenceBase",
     "ReferenceCreate",
     "ReferenceUpdate",
@@ -226,9 +254,13 @@ __all__ = [
     "ChoiceBase",
     "FermentationReadingBase",
     "FermentationReadingCreate",
+    "FermentationReadingBulkCreate",
+    "DeviceReadingCreate",
+    "FermentationReadingBulkResult",
     "FermentationReadingUpdate",
     "FermentationReading",
     "FermentationChartData",
+    "FermentationForecast",
     "RecipeVersionBase",
     "RecipeVersionCreate",
     "RecipeVersion",
@@ -241,4 +273,8 @@ __all__ = [
     "ConsumeIngredientsRequest",
     "IngredientTrackingResponse",
     "InventoryAvailability",
+    "InventoryAvailabilityBatchRequest",
+    "RecipeInventoryAvailability",
+    "InventoryAvailabilityBatchResponse",
+    "ImportJob",
 ]
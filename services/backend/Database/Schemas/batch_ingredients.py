@@ -1,7 +1,7 @@
 # services/backend/Database/Schemas/batch_ingredients.py
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -92,3 +92,25 @@ class InventoryAvailability(BaseModel):
     unit: str
     is_available: bool
     warning_level: Optional[str] = None  # 'low_stock', 'out_of_stock', None
+
+
+class InventoryAvailabilityBatchRequest(BaseModel):
+    """Schema for checking inventory availability of many recipes"""
+
+    recipe_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+
+class RecipeInventoryAvailability(BaseModel):
+    """Inventory availability of one recipe's ingredients"""
+
+    recipe_id: int
+    can_brew: bool  # every ingredient is in stock
+    missing_count: int
+    ingredients: List[InventoryAvailability]
+
+
+class InventoryAvailabilityBatchResponse(BaseModel):
+    """Schema for inventory availability of many recipes"""
+
+    results: List[RecipeInventoryAvailability]
+    missing_ids: List[int] = Field(default_factory=list)
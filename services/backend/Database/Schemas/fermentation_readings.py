@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 FERMENTATION_READING_BASE_EXAMPLE = {
@@ -31,6 +31,8 @@ CHART_DATA_EXAMPLE = {
     "ph": [5.4, 5.2, 5.1],
     "abv": [0.0, 2.1, 3.7],
     "attenuation": [0.0, 33.3, 58.3],
+    "total_points": 3,
+    "resolution": "raw",
 }
 
 
@@ -54,6 +56,53 @@ class FermentationReadingCreate(FermentationReadingBase):
     pass
 
 
+class FermentationReadingBulkCreate(FermentationReadingBase):
+    device_id: Optional[int] = Field(
+        None, description="Device that took the reading; its calibration is applied"
+    )
+    angle: Optional[float] = Field(
+        None,
+        description="Raw tilt angle (iSpindel), converted to gravity with the device polynomial",
+    )
+
+
+class DeviceReadingCreate(BaseModel):
+    timestamp: Optional[datetime] = Field(
+        None, description="Time when the reading was taken, defaults to receipt time"
+    )
+    batch_id: Optional[int] = Field(
+        None, description="Batch being monitored, defaults to the device's configured batch"
+    )
+    gravity: Optional[float] = Field(None, description="Specific gravity reading")
+    angle: Optional[float] = Field(
+        None, description="Raw tilt angle, converted to gravity with the device polynomial"
+    )
+    temperature: Optional[float] = Field(
+        None, description="Temperature in degrees Celsius"
+    )
+    ph: Optional[float] = None
+    notes: Optional[str] = None
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "timestamp": "2024-03-21T14:30:00Z",
+                "angle": 52.4,
+                "temperature": 18.5,
+            }
+        }
+    )
+
+
+class FermentationReadingBulkResult(BaseModel):
+    inserted_count: int
+    batch_ids: List[int]
+
+    model_config = ConfigDict(
+        json_schema_extra={"example": {"inserted_count": 96, "batch_ids": [11]}}
+    )
+
+
 class FermentationReadingUpdate(BaseModel):
     timestamp: Optional[datetime] = None
     gravity: Optional[float] = None
@@ -96,5 +145,56 @@ class FermentationChartData(BaseModel):
     attenuation: list[float] = Field(
         ..., description="Calculated attenuation percentage at each reading"
     )
+    total_points: Optional[int] = Field(
+        None, description="Readings in the requested window before downsampling"
+    )
+    resolution: Optional[str] = Field(
+        None, description="Source of the series: raw readings, or hour/day rollup means"
+    )
 
     model_config = ConfigDict(json_schema_extra={"example": CHART_DATA_EXAMPLE})
+
+
+class FermentationForecast(BaseModel):
+    batch_id: int
+    status: str = Field(
+        ..., description="'ok', or 'insufficient_data' until enough readings exist to fit"
+    )
+    reading_count: int = Field(..., description="Gravity readings (or hourly means) fitted")
+    current_gravity: Optional[float] = None
+    last_reading_at: Optional[datetime] = None
+    model: Optional[str] = Field(
+        None, description="Fitted curve: 'exponential' or 'logistic'"
+    )
+    predicted_fg: Optional[float] = Field(None, description="Predicted final gravity")
+    terminal_at: Optional[datetime] = Field(
+        None, description="When gravity is predicted to be within 0.001 of the final gravity"
+    )
+    hours_to_terminal: Optional[float] = None
+    is_terminal: bool = False
+    is_stuck: bool = Field(
+        False, description="Gravity has stalled while still short of the expected finish"
+    )
+    rmse: Optional[float] = Field(None, description="Root mean square error of the fit")
+    fitted_at: datetime
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "batch_id": 11,
+                "status": "ok",
+                "reading_count": 240,
+                "current_gravity": 1.018,
+                "last_reading_at": "2024-03-24T14:30:00",
+                "model": "logistic",
+                "predicted_fg": 1.0115,
+                "terminal_at": "2024-03-27T02:00:00",
+                "hours_to_terminal": 59.5,
+                "is_terminal": False,
+                "is_stuck": False,
+                "rmse": 0.00041,
+                "fitted_at": "2024-03-24T14:31:02",
+            }
+        },
+    )
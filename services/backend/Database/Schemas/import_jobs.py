@@ -0,0 +1,40 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+from Database.enums import ImportJobStatus, ImportJobType
+
+
+class ImportJob(BaseModel):
+    id: int
+    job_type: ImportJobType
+    status: ImportJobStatus
+    filename: Optional[str] = None
+    parsed_count: int = 0
+    inserted_count: int = 0
+    failed_count: int = 0
+    errors: List[str] = Field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "id": 7,
+                "job_type": "beerxml",
+                "status": "running",
+                "filename": "beersmith_export.xml",
+                "parsed_count": 1200,
+                "inserted_count": 1000,
+                "failed_count": 1,
+                "errors": ["Failed to import recipe 'Broken Stout': ..."],
+                "result": None,
+                "created_at": "2025-11-10T09:15:00",
+                "started_at": "2025-11-10T09:15:01",
+                "finished_at": None,
+            }
+        },
+    )
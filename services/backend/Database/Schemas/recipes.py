@@ -1,7 +1,7 @@
 # Database/Schemas/recipes_hops.py
 
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import List, Literal, Optional
 from .hops import RecipeHopBase, RecipeHop
 from .fermentables import RecipeFermentableBase, RecipeFermentable
 from .miscs import RecipeMiscBase, RecipeMisc
@@ -152,12 +152,180 @@ class Recipe(RecipeBase):
     )
 
 
+class RecipeSummary(BaseModel):
+    """Recipe columns plus ingredient counts, used by the paginated list view."""
+
+    id: int
+    name: str
+    version: Optional[int] = None
+    type: Optional[str] = None
+    brewer: Optional[str] = None
+    is_batch: Optional[bool] = False
+    origin_recipe_id: Optional[int] = None
+    batch_size: Optional[float] = None
+    boil_size: Optional[float] = None
+    boil_time: Optional[int] = None
+    efficiency: Optional[float] = None
+    og: Optional[float] = None
+    fg: Optional[float] = None
+    est_og: Optional[float] = None
+    est_fg: Optional[float] = None
+    est_color: Optional[float] = None
+    ibu: Optional[float] = None
+    est_abv: Optional[float] = None
+    abv: Optional[float] = None
+    hop_count: int = 0
+    fermentable_count: int = 0
+    yeast_count: int = 0
+    misc_count: int = 0
+
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
+            "example": {
+                "id": 42,
+                "name": "Citrus IPA",
+                "version": 1,
+                "type": "All Grain",
+                "brewer": "Alex Brewer",
+                "is_batch": False,
+                "origin_recipe_id": None,
+                "batch_size": 20.0,
+                "ibu": 65.0,
+                "est_abv": 6.4,
+                "hop_count": 3,
+                "fermentable_count": 2,
+                "yeast_count": 1,
+                "misc_count": 1,
+            }
+        },
+    )
+
+
 class RecipeMetrics(BaseModel):
     abv: Optional[float] = None
     ibu: Optional[float] = None
     srm: Optional[float] = None
 
 
+class RecipeMetricsBatchRequest(BaseModel):
+    recipe_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    # Defaults to each recipe's own ibu_method
+    ibu_method: Optional[Literal["tinseth", "rager"]] = None
+
+    model_config = ConfigDict(
+        json_schema_extra={"example": {"recipe_ids": [42, 43], "ibu_method": "tinseth"}}
+    )
+
+
+class RecipeMetricsBatchItem(BaseModel):
+    recipe_id: int
+    est_og: Optional[float] = None
+    est_fg: Optional[float] = None
+    est_abv: Optional[float] = None
+    abv: Optional[float] = None
+    ibu: Optional[float] = None
+    srm: Optional[float] = None
+
+
+class RecipeMetricsBatchResponse(BaseModel):
+    results: List[RecipeMetricsBatchItem]
+    missing_ids: List[int] = Field(default_factory=list)
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "results": [
+                    {
+                        "recipe_id": 42,
+                        "est_og": 1.061,
+                        "est_fg": 1.013,
+                        "est_abv": 6.3,
+                        "abv": 6.4,
+                        "ibu": 65.0,
+                        "srm": 8.0,
+                    }
+                ],
+                "missing_ids": [43],
+            }
+        }
+    )
+
+
+class StyleMatch(BaseModel):
+    style_id: int
+    name: str
+    style_code: Optional[str] = None
+    guideline_source_id: Optional[int] = None
+    # 1.0 when every metric sits at the centre of the style's range
+    score: float
+    # True when every compared metric lies inside the style's range
+    in_range: bool
+    compared_metrics: int
+    out_of_range: List[Literal["og", "fg", "abv", "ibu", "srm"]] = Field(
+        default_factory=list
+    )
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RecipeStyleMatches(BaseModel):
+    recipe_id: int
+    recipe_name: Optional[str] = None
+    matches: List[StyleMatch]
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "recipe_id": 42,
+                "recipe_name": "West Coast IPA",
+                "matches": [
+                    {
+                        "style_id": 87,
+                        "name": "American IPA",
+                        "style_code": "21A",
+                        "guideline_source_id": 1,
+                        "score": 0.8125,
+                        "in_range": True,
+                        "compared_metrics": 5,
+                        "out_of_range": [],
+                    }
+                ],
+            }
+        }
+    )
+
+
+class MissingIngredient(BaseModel):
+    inventory_item_type: Literal["hop", "fermentable", "yeast", "misc"]
+    # Normalized ingredient name
+    name: str
+
+
+class RecipeBrewability(BaseModel):
+    recipe_id: int
+    recipe_name: Optional[str] = None
+    # True when every ingredient is in stock
+    brewable: bool
+    # Mean fraction of each ingredient's requirement that is in stock
+    coverage: float
+    ingredient_count: int
+    missing: List[MissingIngredient] = Field(default_factory=list)
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "recipe_id": 42,
+                "recipe_name": "West Coast IPA",
+                "brewable": False,
+                "coverage": 0.9,
+                "ingredient_count": 5,
+                "missing": [{"inventory_item_type": "hop", "name": "citra"}],
+            }
+        }
+    )
+
+
 class RecipeScaleRequest(BaseModel):
     target_batch_size: float = Field(..., gt=0)
     target_boil_size: Optional[float] = Field(None, gt=0)
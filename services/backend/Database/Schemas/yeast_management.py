@@ -2,7 +2,7 @@
 Pydantic schemas for yeast management features.
 """
 from pydantic import BaseModel, ConfigDict, Field
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
 
@@ -149,6 +149,11 @@ class YeastHarvest(YeastHarvestBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class YeastHarvestRelative(YeastHarvest):
+    """Schema for an ancestor or descendant of a yeast harvest"""
+    depth: int = Field(..., description="Generations between the two harvests (1 for parent or child)")
+
+
 # Viability Calculation Schemas
 class ViabilityCalculationRequest(BaseModel):
     """Schema for viability calculation request"""
@@ -194,3 +199,24 @@ class ViabilityCalculationResponse(BaseModel):
             }
         }
     )
+
+
+class YeastViabilityReportItem(BaseModel):
+    """Schema for one yeast in the fleet-wide viability report"""
+    source: Literal["inventory", "harvest"] = Field(..., description="Inventory yeast or yeast harvest")
+    id: int = Field(..., description="Inventory yeast or harvest id")
+    name: Optional[str] = Field(None, description="Yeast name, or strain name for harvests")
+    form: str = Field(..., description="Form used for the decay rate (storage method for harvests)")
+    generation: int = Field(..., description="Generation number")
+    current_viability: float = Field(..., description="Current estimated viability (0-100%)")
+    viability_status: str = Field(..., description="Status (excellent, good, fair, poor, expired)")
+    recommendation: str = Field(..., description="Recommendation for use")
+    days_since_manufacture: Optional[int] = Field(None, description="Days since manufacture or harvest")
+    days_until_expiry: Optional[int] = Field(None, description="Days until the labelled expiry date")
+    predicted_expiry_date: Optional[datetime] = Field(
+        None, description="Earlier of the labelled expiry and the date viability falls below 50%"
+    )
+    starter_recommended: bool = Field(..., description="Whether a starter is recommended")
+    starter_size_liters: Optional[float] = Field(
+        None, description="Recommended starter size; empty when fresh yeast is needed"
+    )
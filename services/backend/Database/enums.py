@@ -27,3 +27,19 @@ BATCH_STATUS_TRANSITIONS = {
     BatchStatus.COMPLETE: [BatchStatus.ARCHIVED],
     BatchStatus.ARCHIVED: [],  # Terminal state
 }
+
+
+class ImportJobStatus(str, Enum):
+    """Background import job status enum"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJobType(str, Enum):
+    """Kinds of background import jobs"""
+
+    BEERXML = "beerxml"
+    REFERENCES = "references"
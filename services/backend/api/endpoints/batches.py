@@ -1,15 +1,21 @@
 # api/endpoints/batches.py
 
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session, joinedload
-from database import get_db
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from database import get_async_db
 import Database.Models as models
 import Database.Schemas as schemas
 from Database.enums import BatchStatus
+from api.events import batch_topic, event_broker
 from api.state_machine import validate_status_transition, get_valid_transitions
+from modules.inventory_availability import recipe_availability
+from modules.recipe_cloning import clone_recipe, copy_recipe_to_inventory
+from modules.recipe_feasibility import feasibility_cache
+from utils.inventory_stock import inventory_stock
 from datetime import datetime
-from typing import List
-import re
+from typing import Dict, List, Optional, Tuple
 import logging
 
 router = APIRouter()
@@ -20,87 +26,38 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def parse_numeric_value(value):
-    match = re.match(r"(\d+(\.\d+)?)", value)
-    if match:
-        return float(match.group(1))
-    return 0.0
+def _batch_payload_query():
+    """Batches with every relationship returned in the Batch schema loaded."""
+    return select(models.Batches).options(
+        selectinload(models.Batches.inventory_fermentables),
+        selectinload(models.Batches.inventory_hops),
+        selectinload(models.Batches.inventory_miscs),
+        selectinload(models.Batches.inventory_yeasts),
+        selectinload(models.Batches.batch_log),
+    )
+
+
+async def _fetch_batch(db: AsyncSession, batch_id: int) -> Optional[models.Batches]:
+    return (
+        await db.scalars(_batch_payload_query().where(models.Batches.id == batch_id))
+    ).first()
 
 
 # Create a new batch
 
 
 @router.post("/batches", response_model=schemas.Batch)
-async def create_batch(batch: schemas.BatchCreate, db: Session = Depends(get_db)):
+async def create_batch(batch: schemas.BatchCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        # Fetch the recipe to copy
-
-        recipe = (
-            db.query(models.Recipes)
-            .options(
-                joinedload(models.Recipes.hops),
-                joinedload(models.Recipes.fermentables),
-                joinedload(models.Recipes.yeasts),
-                joinedload(models.Recipes.miscs),
-            )
-            .filter(models.Recipes.id == batch.recipe_id)
-            .first()
-        )
-        if not recipe:
+        # Copy the recipe, with the is_batch flag set, and its ingredients
+
+        batch_recipe_id = await db.run_sync(clone_recipe, batch.recipe_id)
+        if batch_recipe_id is None:
             raise HTTPException(status_code=404, detail="Recipe not found")
-        # Create a copy of the recipe with the is_batch flag set to true
-
-        batch_recipe = models.Recipes(
-            name=recipe.name,
-            is_batch=True,
-            origin_recipe_id=recipe.id,
-            version=recipe.version,
-            type=recipe.type,
-            brewer=recipe.brewer,
-            asst_brewer=recipe.asst_brewer,
-            batch_size=recipe.batch_size,
-            boil_size=recipe.boil_size,
-            boil_time=recipe.boil_time,
-            efficiency=recipe.efficiency,
-            notes=recipe.notes,
-            taste_notes=recipe.taste_notes,
-            taste_rating=recipe.taste_rating,
-            og=recipe.og,
-            fg=recipe.fg,
-            fermentation_stages=recipe.fermentation_stages,
-            primary_age=recipe.primary_age,
-            primary_temp=recipe.primary_temp,
-            secondary_age=recipe.secondary_age,
-            secondary_temp=recipe.secondary_temp,
-            tertiary_age=recipe.tertiary_age,
-            age=recipe.age,
-            age_temp=recipe.age_temp,
-            carbonation_used=recipe.carbonation_used,
-            est_og=recipe.est_og,
-            est_fg=recipe.est_fg,
-            est_color=recipe.est_color,
-            ibu=recipe.ibu,
-            ibu_method=recipe.ibu_method,
-            est_abv=recipe.est_abv,
-            abv=recipe.abv,
-            actual_efficiency=recipe.actual_efficiency,
-            calories=recipe.calories,
-            display_batch_size=recipe.display_batch_size,
-            display_boil_size=recipe.display_boil_size,
-            display_og=recipe.display_og,
-            display_fg=recipe.display_fg,
-            display_primary_temp=recipe.display_primary_temp,
-            display_secondary_temp=recipe.display_secondary_temp,
-            display_tertiary_temp=recipe.display_tertiary_temp,
-            display_age_temp=recipe.display_age_temp,
-        )
-        db.add(batch_recipe)
-        db.commit()
-        db.refresh(batch_recipe)
         # Create a new batch
 
         db_batch = models.Batches(
-            recipe_id=batch_recipe.id,
+            recipe_id=batch_recipe_id,
             batch_name=batch.batch_name,
             batch_number=batch.batch_number,
             batch_size=batch.batch_size,
@@ -111,8 +68,7 @@ async def create_batch(batch: schemas.BatchCreate, db: Session = Depends(get_db)
             updated_at=datetime.now(),
         )
         db.add(db_batch)
-        db.commit()
-        db.refresh(db_batch)
+        await db.flush()
 
         # Create initial workflow history entry
         initial_workflow = models.BatchWorkflowHistory(
@@ -123,100 +79,21 @@ async def create_batch(batch: schemas.BatchCreate, db: Session = Depends(get_db)
             notes="Batch created",
         )
         db.add(initial_workflow)
-        db.commit()
 
         # Copy ingredients to inventory tables
-
-        for hop in recipe.hops:
-            db_inventory_hop = models.InventoryHop(
-                name=hop.name,
-                origin=hop.origin,
-                alpha=hop.alpha,
-                type=hop.type,
-                form=hop.form,
-                beta=hop.beta,
-                hsi=hop.hsi,
-                amount=hop.amount,
-                use=hop.use,
-                time=hop.time,
-                notes=hop.notes,
-                display_amount=(hop.display_amount if hop.display_amount else ""),
-                inventory=(
-                    parse_numeric_value(hop.inventory) if hop.inventory else 0.0
-                ),
-                display_time=hop.display_time if hop.display_time else "",
-                batch_id=db_batch.id,
-            )
-            db.add(db_inventory_hop)
-        for fermentable in recipe.fermentables:
-            db_inventory_fermentable = models.InventoryFermentable(
-                name=fermentable.name,
-                type=fermentable.type,
-                yield_=fermentable.yield_,
-                color=fermentable.color,
-                origin=fermentable.origin,
-                supplier=fermentable.supplier,
-                notes=fermentable.notes,
-                potential=fermentable.potential,
-                amount=fermentable.amount,
-                cost_per_unit=fermentable.cost_per_unit,
-                manufacturing_date=fermentable.manufacturing_date,
-                expiry_date=fermentable.expiry_date,
-                lot_number=fermentable.lot_number,
-                exclude_from_total=fermentable.exclude_from_total,
-                not_fermentable=fermentable.not_fermentable,
-                description=fermentable.description,
-                substitutes=fermentable.substitutes,
-                used_in=fermentable.used_in,
-                batch_id=db_batch.id,
-            )
-            db.add(db_inventory_fermentable)
-        for misc in recipe.miscs:
-            db_inventory_misc = models.InventoryMisc(
-                name=misc.name,
-                type=misc.type,
-                use=misc.use,
-                amount_is_weight=misc.amount_is_weight,
-                use_for=misc.use_for,
-                notes=misc.notes,
-                amount=misc.amount,
-                time=misc.time,
-                display_amount=(misc.display_amount if misc.display_amount else ""),
-                inventory=(
-                    parse_numeric_value(misc.inventory) if misc.inventory else 0.0
-                ),
-                display_time=misc.display_time if misc.display_time else "",
-                batch_size=misc.batch_size,
-                batch_id=db_batch.id,
-            )
-            db.add(db_inventory_misc)
-        for yeast in recipe.yeasts:
-            db_inventory_yeast = models.InventoryYeast(
-                name=yeast.name,
-                type=yeast.type,
-                form=yeast.form,
-                laboratory=yeast.laboratory,
-                product_id=yeast.product_id,
-                min_temperature=yeast.min_temperature,
-                max_temperature=yeast.max_temperature,
-                flocculation=yeast.flocculation,
-                attenuation=yeast.attenuation,
-                notes=yeast.notes,
-                best_for=yeast.best_for,
-                max_reuse=yeast.max_reuse,
-                amount=yeast.amount,
-                amount_is_weight=yeast.amount_is_weight,
-                batch_id=db_batch.id,
-            )
-            db.add(db_inventory_yeast)
-        db.commit()
-        return db_batch
+        await db.run_sync(copy_recipe_to_inventory, batch_recipe_id, db_batch.id)
+        await db.commit()
+        event_broker.publish(
+            batch_topic(db_batch.id), "batch_created", {"batch_id": db_batch.id}
+        )
+        db.expunge(db_batch)
+        return await _fetch_batch(db, db_batch.id)
     except HTTPException:
         # Re-raise HTTP exceptions (like 404) without converting to 500
         raise
     except Exception as e:
         logger.error(f"Error creating batch: {e}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
@@ -224,21 +101,10 @@ async def create_batch(batch: schemas.BatchCreate, db: Session = Depends(get_db)
 
 
 @router.get("/batches", response_model=List[schemas.Batch])
-async def get_all_batches(db: Session = Depends(get_db)):
+async def get_all_batches(db: AsyncSession = Depends(get_async_db)):
     try:
-        batches = (
-            db.query(models.Batches)
-            .options(
-                joinedload(models.Batches.recipe),
-                joinedload(models.Batches.inventory_fermentables),
-                joinedload(models.Batches.inventory_hops),
-                joinedload(models.Batches.inventory_miscs),
-                joinedload(models.Batches.inventory_yeasts),
-                joinedload(models.Batches.batch_log),
-            )
-            .all()
-        )
-        return batches
+        batches = await db.scalars(_batch_payload_query().order_by(models.Batches.id))
+        return batches.all()
     except Exception as e:
         logger.error(f"Error fetching batches: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error fetching batches")
@@ -248,19 +114,8 @@ async def get_all_batches(db: Session = Depends(get_db)):
 
 
 @router.get("/batches/{batch_id}", response_model=schemas.Batch)
-async def get_batch_by_id(batch_id: int, db: Session = Depends(get_db)):
-    batch = (
-        db.query(models.Batches)
-        .options(
-            joinedload(models.Batches.recipe),
-            joinedload(models.Batches.inventory_fermentables),
-            joinedload(models.Batches.inventory_hops),
-            joinedload(models.Batches.inventory_miscs),
-            joinedload(models.Batches.inventory_yeasts),
-        )
-        .filter(models.Batches.id == batch_id)
-        .first()
-    )
+async def get_batch_by_id(batch_id: int, db: AsyncSession = Depends(get_async_db)):
+    batch = await _fetch_batch(db, batch_id)
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
     return batch
@@ -271,17 +126,22 @@ async def get_batch_by_id(batch_id: int, db: Session = Depends(get_db)):
 
 @router.put("/batches/{batch_id}", response_model=schemas.Batch)
 async def update_batch(
-    batch_id: int, batch: schemas.BatchUpdate, db: Session = Depends(get_db)
+    batch_id: int, batch: schemas.BatchUpdate, db: AsyncSession = Depends(get_async_db)
 ):
-    db_batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
+    db_batch = await _fetch_batch(db, batch_id)
     if not db_batch:
         raise HTTPException(status_code=404, detail="Batch not found")
     # Update the batch
 
-    for key, value in batch.model_dump(exclude_unset=True).items():
+    changes = batch.model_dump(exclude_unset=True)
+    for key, value in changes.items():
         setattr(db_batch, key, value)
-    db.commit()
-    db.refresh(db_batch)
+    await db.commit()
+    event_broker.publish(
+        batch_topic(batch_id),
+        "batch_updated",
+        {"batch_id": batch_id, "fields": sorted(changes)},
+    )
     return db_batch
 
 
@@ -289,28 +149,24 @@ async def update_batch(
 
 
 @router.delete("/batches/{batch_id}")
-async def delete_batch(batch_id: int, db: Session = Depends(get_db)):
-    db_batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
+async def delete_batch(batch_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_batch = await db.get(models.Batches, batch_id)
     if not db_batch:
         raise HTTPException(status_code=404, detail="Batch not found")
     # Delete related inventory items
 
-    db.query(models.InventoryHop).filter(
-        models.InventoryHop.batch_id == batch_id
-    ).delete()
-    db.query(models.InventoryFermentable).filter(
-        models.InventoryFermentable.batch_id == batch_id
-    ).delete()
-    db.query(models.InventoryMisc).filter(
-        models.InventoryMisc.batch_id == batch_id
-    ).delete()
-    db.query(models.InventoryYeast).filter(
-        models.InventoryYeast.batch_id == batch_id
-    ).delete()
+    for model in (
+        models.InventoryHop,
+        models.InventoryFermentable,
+        models.InventoryMisc,
+        models.InventoryYeast,
+    ):
+        await db.execute(delete(model).where(model.batch_id == batch_id))
     # Delete the batch
 
-    db.delete(db_batch)
-    db.commit()
+    await db.delete(db_batch)
+    await db.commit()
+    event_broker.publish(batch_topic(batch_id), "batch_deleted", {"batch_id": batch_id})
     return {"message": "Batch deleted successfully"}
 
 
@@ -321,103 +177,48 @@ async def delete_batch(batch_id: int, db: Session = Depends(get_db)):
 async def consume_ingredients(
     batch_id: int,
     request: schemas.ConsumeIngredientsRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Deduct ingredients from inventory for a batch.
     Creates batch_ingredients records and inventory_transactions.
+
+    Referenced items are loaded with one query per item type and locked
+    (SELECT ... FOR UPDATE) until the commit. Stock updates also require
+    each row's version to be unchanged, so on databases without row locks
+    (SQLite) a concurrent consumption gets a 409 instead of overdrawing.
     """
     try:
         # Verify batch exists
-        batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
+        batch = await db.get(models.Batches, batch_id)
         if not batch:
             raise HTTPException(status_code=404, detail="Batch not found")
 
-        consumed_items = []
-        transactions = []
-
-        for ingredient in request.ingredients:
-            # Get the inventory item based on type
-            inventory_model = _get_inventory_model(ingredient.inventory_item_type)
-            inventory_item = (
-                db.query(inventory_model)
-                .filter(inventory_model.id == ingredient.inventory_item_id)
-                .first()
-            )
-
-            if not inventory_item:
-                raise HTTPException(
-                    status_code=404,
-                    detail=(
-                        f"Inventory item {ingredient.inventory_item_id} "
-                        f"of type {ingredient.inventory_item_type} not found"
-                    ),
-                )
-
-            # Check if item has sufficient stock (if inventory field exists and is numeric)
-            current_stock = _get_inventory_stock(inventory_item)
-            if current_stock is not None and current_stock < ingredient.quantity_used:
-                item_name = getattr(inventory_item, 'name', 'item')
-                raise HTTPException(
-                    status_code=400,
-                    detail=(
-                        f"Insufficient stock for {item_name}. "
-                        f"Available: {current_stock}, Required: {ingredient.quantity_used}"
-                    ),
-                )
-
-            # Create batch_ingredient record
-            batch_ingredient = models.BatchIngredient(
-                batch_id=batch_id,
-                inventory_item_id=ingredient.inventory_item_id,
-                inventory_item_type=ingredient.inventory_item_type,
-                quantity_used=ingredient.quantity_used,
-                unit=ingredient.unit,
-                created_at=datetime.now(),
-            )
-            db.add(batch_ingredient)
-            consumed_items.append(batch_ingredient)
-
-            # Update inventory stock
-            new_stock = (
-                current_stock - ingredient.quantity_used
-                if current_stock is not None
-                else None
+        consumed = await db.run_sync(
+            _consume_inventory, batch_id, batch.batch_name, request.ingredients
+        )
+        if consumed is None:
+            await db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail="Inventory changed while consuming ingredients, please retry",
             )
-            if new_stock is not None:
-                _set_inventory_stock(inventory_item, new_stock)
-
-                # Create transaction record
-                transaction = models.InventoryTransaction(
-                    inventory_item_id=ingredient.inventory_item_id,
-                    inventory_item_type=ingredient.inventory_item_type,
-                    transaction_type="consumption",
-                    quantity_change=-ingredient.quantity_used,
-                    quantity_before=current_stock,
-                    quantity_after=new_stock,
-                    unit=ingredient.unit,
-                    reference_type="batch",
-                    reference_id=batch_id,
-                    notes=f"Consumed for batch {batch.batch_name}",
-                    created_at=datetime.now(),
-                )
-                db.add(transaction)
-                transactions.append(transaction)
-
-        db.commit()
+        items, stock, consumed_count, transaction_count = consumed
+        await db.commit()
+        _report_stock_writes(items, stock)
 
         return {
             "message": "Ingredients consumed successfully",
             "batch_id": batch_id,
-            "consumed_count": len(consumed_items),
-            "transactions_created": len(transactions),
+            "consumed_count": consumed_count,
+            "transactions_created": transaction_count,
         }
 
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error consuming ingredients: {e}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -425,39 +226,35 @@ async def consume_ingredients(
     "/batches/{batch_id}/ingredient-tracking",
     response_model=schemas.IngredientTrackingResponse,
 )
-async def get_ingredient_tracking(batch_id: int, db: Session = Depends(get_db)):
+async def get_ingredient_tracking(batch_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get ingredient consumption tracking for a batch.
     Returns consumed ingredients and related transactions.
     """
     try:
         # Verify batch exists
-        batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
+        batch = await db.get(models.Batches, batch_id)
         if not batch:
             raise HTTPException(status_code=404, detail="Batch not found")
 
         # Get batch ingredients
-        batch_ingredients = (
-            db.query(models.BatchIngredient)
-            .filter(models.BatchIngredient.batch_id == batch_id)
-            .all()
+        batch_ingredients = await db.scalars(
+            select(models.BatchIngredient).where(models.BatchIngredient.batch_id == batch_id)
         )
 
         # Get related transactions
-        transactions = (
-            db.query(models.InventoryTransaction)
-            .filter(
+        transactions = await db.scalars(
+            select(models.InventoryTransaction).where(
                 models.InventoryTransaction.reference_type == "batch",
                 models.InventoryTransaction.reference_id == batch_id,
             )
-            .all()
         )
 
         return schemas.IngredientTrackingResponse(
             batch_id=batch_id,
             batch_name=batch.batch_name,
-            consumed_ingredients=batch_ingredients,
-            transactions=transactions,
+            consumed_ingredients=batch_ingredients.all(),
+            transactions=transactions.all(),
         )
 
     except HTTPException:
@@ -471,78 +268,21 @@ async def get_ingredient_tracking(batch_id: int, db: Session = Depends(get_db)):
     "/batches/check-inventory-availability/{recipe_id}",
     response_model=List[schemas.InventoryAvailability],
 )
-async def check_inventory_availability(recipe_id: int, db: Session = Depends(get_db)):
+async def check_inventory_availability(
+    recipe_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Check inventory availability for a recipe's ingredients.
     Returns availability status for each ingredient.
+
+    Stock is summed per normalized ingredient name across inventory items
+    not attached to a batch.
     """
     try:
-        # Get recipe with ingredients
-        recipe = (
-            db.query(models.Recipes)
-            .options(
-                joinedload(models.Recipes.hops),
-                joinedload(models.Recipes.fermentables),
-                joinedload(models.Recipes.yeasts),
-                joinedload(models.Recipes.miscs),
-            )
-            .filter(models.Recipes.id == recipe_id)
-            .first()
-        )
-
-        if not recipe:
+        availability = await db.run_sync(recipe_availability, [recipe_id])
+        if recipe_id not in availability:
             raise HTTPException(status_code=404, detail="Recipe not found")
-
-        availability = []
-
-        # Check hops
-        for hop in recipe.hops:
-            available_qty = _get_total_inventory_for_item("hop", hop.name)
-            required_qty = hop.amount or 0
-            availability.append(
-                _create_availability_response(
-                    hop.id, "hop", hop.name, available_qty, required_qty, "kg"
-                )
-            )
-
-        # Check fermentables
-        for fermentable in recipe.fermentables:
-            available_qty = _get_total_inventory_for_item(
-                "fermentable", fermentable.name
-            )
-            required_qty = fermentable.amount or 0
-            availability.append(
-                _create_availability_response(
-                    fermentable.id,
-                    "fermentable",
-                    fermentable.name,
-                    available_qty,
-                    required_qty,
-                    "kg",
-                )
-            )
-
-        # Check yeasts
-        for yeast in recipe.yeasts:
-            available_qty = _get_total_inventory_for_item("yeast", yeast.name)
-            required_qty = yeast.amount or 0
-            availability.append(
-                _create_availability_response(
-                    yeast.id, "yeast", yeast.name, available_qty, required_qty, "g"
-                )
-            )
-
-        # Check miscs
-        for misc in recipe.miscs:
-            available_qty = _get_total_inventory_for_item("misc", misc.name)
-            required_qty = misc.amount or 0
-            availability.append(
-                _create_availability_response(
-                    misc.id, "misc", misc.name, available_qty, required_qty, "g"
-                )
-            )
-
-        return availability
+        return availability[recipe_id]
 
     except HTTPException:
         raise
@@ -551,6 +291,40 @@ async def check_inventory_availability(recipe_id: int, db: Session = Depends(get
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post(
+    "/inventory/availability:batch",
+    response_model=schemas.InventoryAvailabilityBatchResponse,
+)
+async def check_inventory_availability_batch(
+    payload: schemas.InventoryAvailabilityBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Check inventory availability for many recipes at once.
+
+    Uses one query per ingredient table however many recipes are checked,
+    so the planning view can flag which recipes can be brewed now.
+    """
+    availability = await db.run_sync(recipe_availability, payload.recipe_ids)
+    results = [
+        schemas.RecipeInventoryAvailability(
+            recipe_id=recipe_id,
+            can_brew=all(item.is_available for item in items),
+            missing_count=sum(not item.is_available for item in items),
+            ingredients=items,
+        )
+        for recipe_id, items in availability.items()
+    ]
+    missing_ids = [
+        recipe_id
+        for recipe_id in dict.fromkeys(payload.recipe_ids)
+        if recipe_id not in availability
+    ]
+    return schemas.InventoryAvailabilityBatchResponse(
+        results=results, missing_ids=missing_ids
+    )
+
+
 # Update batch status with validation and logging
 
 
@@ -558,14 +332,14 @@ async def check_inventory_availability(recipe_id: int, db: Session = Depends(get
 async def update_batch_status(
     batch_id: int,
     status_update: schemas.StatusUpdateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Update batch status with state machine validation.
 
     Status changes are validated to ensure valid transitions and logged in workflow history.
     """
-    db_batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
+    db_batch = await _fetch_batch(db, batch_id)
     if not db_batch:
         raise HTTPException(status_code=404, detail="Batch not found")
 
@@ -599,8 +373,19 @@ async def update_batch_status(
     db_batch.status = new_status.value
     db_batch.updated_at = datetime.now()
 
-    db.commit()
-    db.refresh(db_batch)
+    await db.commit()
+
+    event_broker.publish(
+        batch_topic(batch_id),
+        "status",
+        {
+            "batch_id": batch_id,
+            "from_status": workflow_entry.from_status,
+            "to_status": workflow_entry.to_status,
+            "changed_at": workflow_entry.changed_at,
+            "notes": workflow_entry.notes,
+        },
+    )
 
     return db_batch
 
@@ -611,37 +396,38 @@ async def update_batch_status(
 @router.get(
     "/batches/{batch_id}/workflow", response_model=List[schemas.BatchWorkflowHistory]
 )
-async def get_batch_workflow(batch_id: int, db: Session = Depends(get_db)):
+async def get_batch_workflow(batch_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get the complete workflow history for a batch.
 
     Returns all status changes in chronological order (most recent first).
     """
-    db_batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
+    db_batch = await db.get(models.Batches, batch_id)
     if not db_batch:
         raise HTTPException(status_code=404, detail="Batch not found")
 
-    workflow_history = (
-        db.query(models.BatchWorkflowHistory)
-        .filter(models.BatchWorkflowHistory.batch_id == batch_id)
+    workflow_history = await db.scalars(
+        select(models.BatchWorkflowHistory)
+        .where(models.BatchWorkflowHistory.batch_id == batch_id)
         .order_by(models.BatchWorkflowHistory.changed_at.desc())
-        .all()
     )
 
-    return workflow_history
+    return workflow_history.all()
 
 
 # Get valid transitions for a batch's current status
 
 
 @router.get("/batches/{batch_id}/status/transitions")
-async def get_batch_status_transitions(batch_id: int, db: Session = Depends(get_db)):
+async def get_batch_status_transitions(
+    batch_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Get the valid status transitions for a batch's current status.
 
     Returns a list of statuses that the batch can transition to.
     """
-    db_batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
+    db_batch = await db.get(models.Batches, batch_id)
     if not db_batch:
         raise HTTPException(status_code=404, detail="Batch not found")
 
@@ -670,63 +456,190 @@ def _get_inventory_model(item_type: str):
     return type_map[item_type]
 
 
-def _get_inventory_stock(inventory_item) -> float:
-    """Get current stock level from inventory item"""
-    # Try to get numeric inventory value
-    if hasattr(inventory_item, "inventory"):
-        inventory_val = inventory_item.inventory
-        if isinstance(inventory_val, (int, float)):
-            return float(inventory_val)
-        elif isinstance(inventory_val, str):
-            try:
-                return float(parse_numeric_value(inventory_val))
-            except (ValueError, TypeError):
-                pass
-    # Fallback to amount field
-    if hasattr(inventory_item, "amount") and inventory_item.amount is not None:
-        return float(inventory_item.amount)
-    return None
-
-
-def _set_inventory_stock(inventory_item, new_stock: float):
-    """Update stock level on inventory item"""
-    if hasattr(inventory_item, "inventory"):
-        inventory_item.inventory = new_stock
-    elif hasattr(inventory_item, "amount"):
-        inventory_item.amount = new_stock
-
-
-def _get_total_inventory_for_item(item_type: str, item_name: str) -> float:
-    """Get total available inventory for an item by name"""
-    # This is a simplified version - in production you'd query actual inventory
-    # For now, return 0 as we don't have a separate inventory tracking yet
-    return 0.0
-
-
-def _create_availability_response(
-    item_id: int,
-    item_type: str,
-    name: str,
-    available_qty: float,
-    required_qty: float,
-    unit: str,
-) -> schemas.InventoryAvailability:
-    """Create an inventory availability response"""
-    is_available = available_qty >= required_qty
-    warning_level = None
-
-    if not is_available:
-        warning_level = "out_of_stock"
-    elif available_qty < required_qty * 1.5:  # Less than 1.5x required
-        warning_level = "low_stock"
-
-    return schemas.InventoryAvailability(
-        inventory_item_id=item_id,
-        inventory_item_type=item_type,
-        name=name,
-        available_quantity=available_qty,
-        required_quantity=required_qty,
-        unit=unit,
-        is_available=is_available,
-        warning_level=warning_level,
+def _consume_inventory(
+    db: Session, batch_id: int, batch_name: str, ingredients
+) -> Optional[Tuple[Dict[Tuple[str, int], dict], Dict[Tuple[str, int], float], int, int]]:
+    """
+    Lock the referenced inventory rows and write a batch's consumption.
+
+    Nothing is committed.
+
+    Returns:
+        Tuple of (locked items, new stock per item, consumed records,
+        transactions), or None if any row changed since it was locked
+    """
+    items = _lock_inventory_items(db, ingredients)
+    now = datetime.now()
+    stock = {}
+    consumed_rows = []
+    transaction_rows = []
+
+    for ingredient in ingredients:
+        key = (ingredient.inventory_item_type, ingredient.inventory_item_id)
+        item = items.get(key)
+        if item is None:
+            raise HTTPException(
+                status_code=404,
+                detail=(
+                    f"Inventory item {ingredient.inventory_item_id} "
+                    f"of type {ingredient.inventory_item_type} not found"
+                ),
+            )
+
+        # Items listed more than once draw on the stock left by earlier lines
+        current_stock = stock.get(key, item["stock"])
+        if current_stock is not None and current_stock < ingredient.quantity_used:
+            raise HTTPException(
+                status_code=400,
+                detail=(
+                    f"Insufficient stock for {item['name'] or 'item'}. "
+                    f"Available: {current_stock}, Required: {ingredient.quantity_used}"
+                ),
+            )
+
+        consumed_rows.append(
+            {
+                "batch_id": batch_id,
+                "inventory_item_id": ingredient.inventory_item_id,
+                "inventory_item_type": ingredient.inventory_item_type,
+                "quantity_used": ingredient.quantity_used,
+                "unit": ingredient.unit,
+                "created_at": now,
+            }
+        )
+
+        if current_stock is not None:
+            new_stock = current_stock - ingredient.quantity_used
+            stock[key] = new_stock
+            transaction_rows.append(
+                {
+                    "inventory_item_id": ingredient.inventory_item_id,
+                    "inventory_item_type": ingredient.inventory_item_type,
+                    "transaction_type": "consumption",
+                    "quantity_change": -ingredient.quantity_used,
+                    "quantity_before": current_stock,
+                    "quantity_after": new_stock,
+                    "unit": ingredient.unit,
+                    "reference_type": "batch",
+                    "reference_id": batch_id,
+                    "notes": f"Consumed for batch {batch_name}",
+                    "created_at": now,
+                }
+            )
+
+    if not _write_inventory_stock(db, items, stock):
+        return None
+    if consumed_rows:
+        db.execute(insert(models.BatchIngredient), consumed_rows)
+    if transaction_rows:
+        db.execute(insert(models.InventoryTransaction), transaction_rows)
+    return items, stock, len(consumed_rows), len(transaction_rows)
+
+
+def _lock_inventory_items(db: Session, ingredients) -> Dict[Tuple[str, int], dict]:
+    """
+    Load and lock the inventory rows referenced by a consumption request.
+
+    Returns:
+        Mapping of (item type, item id) to the row's name, numeric stock
+        (derived when not stored yet), version, stored stock, normalized name
+        and whether it is unallocated
+    """
+    ids_by_type: Dict[str, set] = {}
+    for ingredient in ingredients:
+        ids_by_type.setdefault(ingredient.inventory_item_type, set()).add(
+            ingredient.inventory_item_id
+        )
+
+    items = {}
+    # Lock in a fixed order so concurrent requests cannot deadlock
+    for item_type in sorted(ids_by_type):
+        model = _get_inventory_model(item_type)
+        columns = [
+            model.id,
+            model.name,
+            model.name_normalized,
+            model.batch_id,
+            model.stock,
+            model.version,
+            model.amount,
+        ]
+        if hasattr(model, "inventory"):
+            columns.append(model.inventory)
+        rows = db.execute(
+            select(*columns)
+            .where(model.id.in_(ids_by_type[item_type]))
+            .order_by(model.id)
+            .with_for_update()
+        ).mappings()
+        for row in rows:
+            item_stock = row["stock"]
+            if item_stock is None:
+                # Rows written outside the ORM before stock was tracked
+                item_stock = inventory_stock(row.get("inventory"), row["amount"])
+            items[(item_type, row["id"])] = {
+                "name": row["name"],
+                "stock": item_stock,
+                "version": row["version"],
+                "stored_stock": row["stock"],
+                "name_normalized": row["name_normalized"],
+                "unallocated": row["batch_id"] is None,
+            }
+    return items
+
+
+def _report_stock_writes(items, stock: Dict[Tuple[str, int], float]) -> None:
+    """Apply committed stock writes to the cached feasibility inventory"""
+    feasibility_cache.apply_stock_writes(
+        (
+            key[0],
+            items[key]["name_normalized"],
+            items[key]["unallocated"],
+            value - (items[key]["stored_stock"] or 0.0),
+        )
+        for key, value in stock.items()
     )
+
+
+def _write_inventory_stock(db: Session, items, stock: Dict[Tuple[str, int], float]) -> bool:
+    """
+    Store new stock levels with one executemany per item type.
+
+    The inventory value is updated along with the numeric stock, or amount
+    for tables without one.
+
+    Returns:
+        False if any row's version changed since it was loaded
+    """
+    supports_rowcount = db.get_bind().dialect.supports_sane_multi_rowcount
+    for item_type in sorted({key[0] for key in stock}):
+        model = _get_inventory_model(item_type)
+        table = model.__table__
+        mirror = "inventory" if "inventory" in table.c else "amount"
+        rows = [
+            {
+                "item_id": item_id,
+                "item_version": items[(key_type, item_id)]["version"],
+                "new_stock": value,
+            }
+            for (key_type, item_id), value in stock.items()
+            if key_type == item_type
+        ]
+        result = db.execute(
+            update(table)
+            .where(
+                table.c.id == bindparam("item_id"),
+                table.c.version == bindparam("item_version"),
+            )
+            .values(
+                {
+                    "stock": bindparam("new_stock"),
+                    mirror: bindparam("new_stock"),
+                    "version": table.c.version + 1,
+                }
+            ),
+            rows,
+        )
+        if supports_rowcount and result.rowcount != len(rows):
+            return False
+    return True
@@ -1,13 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_
 from database import get_db
 import Database.Models as models
 import Database.Schemas as schemas
+from api.response_cache import response_cache
+from modules.style_matching import style_index_cache
+from modules.style_search import apply_style_search
 from typing import List, Optional
 
 router = APIRouter()
 
+# Response cache tags; beer styles embed their source and category
+SOURCE_TAG = models.StyleGuidelineSource.__tablename__
+CATEGORY_TAG = models.StyleCategory.__tablename__
+BEER_STYLE_TAG = models.BeerStyle.__tablename__
+
 
 # ============================================================================
 # Style Guideline Sources Endpoints
@@ -21,13 +29,19 @@ router = APIRouter()
     response_description="A list of style guideline sources (BJCP, BA, etc.)",
 )
 async def get_style_guideline_sources(
-    is_active: Optional[bool] = None, db: Session = Depends(get_db)
+    request: Request, is_active: Optional[bool] = None, db: Session = Depends(get_db)
 ):
     """Get all style guideline sources, optionally filtered by active status."""
-    query = db.query(models.StyleGuidelineSource)
-    if is_active is not None:
-        query = query.filter(models.StyleGuidelineSource.is_active == is_active)
-    return query.all()
+
+    def _load():
+        query = db.query(models.StyleGuidelineSource)
+        if is_active is not None:
+            query = query.filter(models.StyleGuidelineSource.is_active == is_active)
+        return query.all()
+
+    return response_cache.respond(
+        request, (SOURCE_TAG,), _load, List[schemas.StyleGuidelineSource]
+    )
 
 
 @router.get(
@@ -60,6 +74,7 @@ async def create_style_guideline_source(
         db_source = models.StyleGuidelineSource(**source.model_dump())
         db.add(db_source)
         db.commit()
+        response_cache.invalidate(SOURCE_TAG)
         db.refresh(db_source)
         return db_source
     except Exception as e:
@@ -94,6 +109,7 @@ async def update_style_guideline_source(
 
     try:
         db.commit()
+        response_cache.invalidate(SOURCE_TAG)
         db.refresh(db_source)
         return db_source
     except Exception as e:
@@ -117,6 +133,7 @@ async def delete_style_guideline_source(source_id: int, db: Session = Depends(ge
     try:
         db.delete(db_source)
         db.commit()
+        response_cache.invalidate(SOURCE_TAG)
         return {"message": "Style guideline source deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -134,21 +151,28 @@ async def delete_style_guideline_source(source_id: int, db: Session = Depends(ge
     summary="List all style categories",
 )
 async def get_style_categories(
+    request: Request,
     guideline_source_id: Optional[int] = None,
     parent_category_id: Optional[int] = None,
     db: Session = Depends(get_db),
 ):
     """Get all style categories, optionally filtered by guideline source or parent category."""
-    query = db.query(models.StyleCategory)
-    if guideline_source_id is not None:
-        query = query.filter(
-            models.StyleCategory.guideline_source_id == guideline_source_id
-        )
-    if parent_category_id is not None:
-        query = query.filter(
-            models.StyleCategory.parent_category_id == parent_category_id
-        )
-    return query.all()
+
+    def _load():
+        query = db.query(models.StyleCategory)
+        if guideline_source_id is not None:
+            query = query.filter(
+                models.StyleCategory.guideline_source_id == guideline_source_id
+            )
+        if parent_category_id is not None:
+            query = query.filter(
+                models.StyleCategory.parent_category_id == parent_category_id
+            )
+        return query.all()
+
+    return response_cache.respond(
+        request, (CATEGORY_TAG,), _load, List[schemas.StyleCategory]
+    )
 
 
 @router.get(
@@ -181,6 +205,7 @@ async def create_style_category(
         db_category = models.StyleCategory(**category.model_dump())
         db.add(db_category)
         db.commit()
+        response_cache.invalidate(CATEGORY_TAG)
         db.refresh(db_category)
         return db_category
     except Exception as e:
@@ -215,6 +240,7 @@ async def update_style_category(
 
     try:
         db.commit()
+        response_cache.invalidate(CATEGORY_TAG)
         db.refresh(db_category)
         return db_category
     except Exception as e:
@@ -236,6 +262,7 @@ async def delete_style_category(category_id: int, db: Session = Depends(get_db))
     try:
         db.delete(db_category)
         db.commit()
+        response_cache.invalidate(CATEGORY_TAG)
         return {"message": "Style category deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -254,6 +281,7 @@ async def delete_style_category(category_id: int, db: Session = Depends(get_db))
     response_description="A collection of beer styles with optional filters",
 )
 async def get_beer_styles(
+    request: Request,
     guideline_source_id: Optional[int] = Query(
         None, description="Filter by guideline source"
     ),
@@ -266,21 +294,30 @@ async def get_beer_styles(
     db: Session = Depends(get_db),
 ):
     """Get all beer styles with optional filtering."""
-    query = db.query(models.BeerStyle).options(
-        joinedload(models.BeerStyle.guideline_source),
-        joinedload(models.BeerStyle.category),
-    )
 
-    if guideline_source_id is not None:
-        query = query.filter(
-            models.BeerStyle.guideline_source_id == guideline_source_id
+    def _load():
+        query = db.query(models.BeerStyle).options(
+            joinedload(models.BeerStyle.guideline_source),
+            joinedload(models.BeerStyle.category),
         )
-    if category_id is not None:
-        query = query.filter(models.BeerStyle.category_id == category_id)
-    if is_custom is not None:
-        query = query.filter(models.BeerStyle.is_custom == is_custom)
 
-    return query.offset(offset).limit(limit).all()
+        if guideline_source_id is not None:
+            query = query.filter(
+                models.BeerStyle.guideline_source_id == guideline_source_id
+            )
+        if category_id is not None:
+            query = query.filter(models.BeerStyle.category_id == category_id)
+        if is_custom is not None:
+            query = query.filter(models.BeerStyle.is_custom == is_custom)
+
+        return query.offset(offset).limit(limit).all()
+
+    return response_cache.respond(
+        request,
+        (BEER_STYLE_TAG, SOURCE_TAG, CATEGORY_TAG),
+        _load,
+        List[schemas.BeerStyle],
+    )
 
 
 @router.get(
@@ -291,7 +328,7 @@ async def get_beer_styles(
 )
 async def search_beer_styles(
     query: Optional[str] = Query(
-        None, description="Search in name, description, or examples"
+        None, description="Search in name, style code, examples, or description"
     ),
     guideline_source_id: Optional[int] = Query(
         None, description="Filter by guideline source"
@@ -310,21 +347,20 @@ async def search_beer_styles(
     offset: int = Query(0, ge=0, description="Number of results to skip"),
     db: Session = Depends(get_db),
 ):
-    """Search beer styles by various criteria."""
+    """
+    Search beer styles by various criteria.
+
+    Text matches come from the full-text search index and are ordered by
+    relevance; each word of ``query`` is matched as a prefix.
+    """
     db_query = db.query(models.BeerStyle).options(
-        joinedload(models.BeerStyle.guideline_source),
-        joinedload(models.BeerStyle.category),
+        selectinload(models.BeerStyle.guideline_source),
+        selectinload(models.BeerStyle.category),
     )
 
     # Text search
     if query:
-        search_filter = or_(
-            models.BeerStyle.name.ilike(f"%{query}%"),
-            models.BeerStyle.description.ilike(f"%{query}%"),
-            models.BeerStyle.examples.ilike(f"%{query}%"),
-            models.BeerStyle.style_code.ilike(f"%{query}%"),
-        )
-        db_query = db_query.filter(search_filter)
+        db_query = apply_style_search(db_query, db.get_bind().dialect.name, query)
 
     # Guideline source filter
     if guideline_source_id is not None:
@@ -424,6 +460,8 @@ async def create_beer_style(
         db_style = models.BeerStyle(**style_data)
         db.add(db_style)
         db.commit()
+        response_cache.invalidate(BEER_STYLE_TAG)
+        style_index_cache.invalidate()
         db.refresh(db_style)
         return db_style
     except Exception as e:
@@ -462,6 +500,8 @@ async def update_beer_style(
 
     try:
         db.commit()
+        response_cache.invalidate(BEER_STYLE_TAG)
+        style_index_cache.invalidate()
         db.refresh(db_style)
         return db_style
     except Exception as e:
@@ -488,6 +528,8 @@ async def delete_beer_style(style_id: int, db: Session = Depends(get_db)):
     try:
         db.delete(db_style)
         db.commit()
+        response_cache.invalidate(BEER_STYLE_TAG)
+        style_index_cache.invalidate()
         return {"message": "Beer style deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -1,11 +1,17 @@
 # api/endpoints/devices.py
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
 from database import get_db
 import Database.Models as models
 import Database.Schemas as schemas
 from typing import List
+from api.endpoints.fermentation_readings import (
+    bulk_readings_openapi,
+    parse_bulk_readings_request,
+    publish_readings,
+)
+from modules.fermentation_ingest import insert_readings, prepare_reading_rows
 
 router = APIRouter()
 
@@ -92,3 +98,66 @@ async def delete_device(device_id: int, db: Session = Depends(get_db)):
     db.delete(device)
     db.commit()
     return device
+
+
+@router.post(
+    "/devices/{device_id}/readings",
+    response_model=schemas.FermentationReadingBulkResult,
+    status_code=201,
+    openapi_extra=bulk_readings_openapi(schemas.DeviceReadingCreate),
+)
+async def ingest_device_readings(
+    device_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    Store readings reported by a device.
+
+    Accepts a single JSON reading, a JSON array or NDJSON. The device's
+    calibration is applied before the readings are stored. Readings
+    without a ``batch_id`` go to the batch set as ``batch_id`` in the
+    device configuration.
+    """
+    device = db.query(models.Device).filter(models.Device.id == device_id).first()
+    if not device:
+        raise HTTPException(status_code=404, detail="Device not found")
+    if not device.is_active:
+        raise HTTPException(status_code=409, detail="Device is not active")
+
+    readings = await parse_bulk_readings_request(request, schemas.DeviceReadingCreate)
+
+    default_batch_id = (device.configuration or {}).get("batch_id")
+    batch_ids = [reading.batch_id or default_batch_id for reading in readings]
+    if any(batch_id is None for batch_id in batch_ids):
+        raise HTTPException(
+            status_code=422,
+            detail="Readings need a batch_id when the device has no configured batch",
+        )
+    wanted = set(batch_ids)
+    found = {
+        batch_id
+        for (batch_id,) in db.query(models.Batches.id).filter(models.Batches.id.in_(wanted))
+    }
+    missing = sorted(wanted - found)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Batch not found: {missing}")
+
+    rows = prepare_reading_rows(
+        readings,
+        batch_ids=batch_ids,
+        device_ids=[device_id] * len(readings),
+        calibrations={device_id: device.calibration_data},
+    )
+    inserted = insert_readings(db, rows)
+    db.commit()
+
+    readings_by_batch = {}
+    for row in rows:
+        readings_by_batch.setdefault(row["batch_id"], []).append(row)
+    for batch_id, batch_rows in readings_by_batch.items():
+        publish_readings(batch_id, batch_rows)
+
+    return schemas.FermentationReadingBulkResult(
+        inserted_count=inserted, batch_ids=sorted(wanted)
+    )
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Annotated
 from database import get_db
 import Database.Models as models
 import Database.Schemas.fermentation_profiles as schemas
+from api.response_cache import response_cache
 
 db_dependency = Annotated[Session, Depends(get_db)]
 router = APIRouter()
 
+# Profiles are listed with their steps, so both tables tag every list
+PROFILE_TAGS = (
+    models.FermentationProfiles.__tablename__,
+    models.FermentationSteps.__tablename__,
+)
+
 
 def _with_steps(query):
     """Apply joinedload to include steps in the query."""
@@ -21,11 +28,15 @@ def _with_steps(query):
     response_description="A collection of fermentation profiles defined in the system.",
 )
 async def get_all_fermentation_profiles(
-    db: db_dependency,
+    request: Request, db: db_dependency
 ) -> List[schemas.FermentationProfile]:
     """Return all fermentation profiles with their steps."""
-    profiles = _with_steps(db.query(models.FermentationProfiles)).all()
-    return profiles
+    return response_cache.respond(
+        request,
+        PROFILE_TAGS,
+        lambda: _with_steps(db.query(models.FermentationProfiles)).all(),
+        List[schemas.FermentationProfile],
+    )
 
 
 @router.get(
@@ -86,6 +97,7 @@ async def create_fermentation_profile(
             db.add(db_step)
 
     db.commit()
+    response_cache.invalidate(*PROFILE_TAGS)
     db.refresh(db_profile)
 
     # Fetch with relationships loaded
@@ -122,6 +134,7 @@ async def update_fermentation_profile(
         setattr(db_profile, field, value)
 
     db.commit()
+    response_cache.invalidate(*PROFILE_TAGS)
     db.refresh(db_profile)
 
     # Fetch with relationships loaded
@@ -152,6 +165,7 @@ async def delete_fermentation_profile(profile_id: int, db: db_dependency):
 
     db.delete(db_profile)
     db.commit()
+    response_cache.invalidate(*PROFILE_TAGS)
     return
 
 
@@ -162,26 +176,31 @@ async def delete_fermentation_profile(profile_id: int, db: db_dependency):
     response_description="A list of fermentation steps for the profile.",
 )
 async def get_fermentation_steps(
-    profile_id: int, db: db_dependency
+    profile_id: int, request: Request, db: db_dependency
 ) -> List[schemas.FermentationStep]:
     """Return all steps for a specific fermentation profile."""
-    # Verify profile exists
-    profile = (
-        db.query(models.FermentationProfiles)
-        .filter(models.FermentationProfiles.id == profile_id)
-        .first()
-    )
 
-    if not profile:
-        raise HTTPException(status_code=404, detail="Fermentation profile not found")
-
-    steps = (
-        db.query(models.FermentationSteps)
-        .filter(models.FermentationSteps.fermentation_profile_id == profile_id)
-        .order_by(models.FermentationSteps.step_order)
-        .all()
+    def _load():
+        # Verify profile exists
+        profile = (
+            db.query(models.FermentationProfiles)
+            .filter(models.FermentationProfiles.id == profile_id)
+            .first()
+        )
+
+        if not profile:
+            raise HTTPException(status_code=404, detail="Fermentation profile not found")
+
+        return (
+            db.query(models.FermentationSteps)
+            .filter(models.FermentationSteps.fermentation_profile_id == profile_id)
+            .order_by(models.FermentationSteps.step_order)
+            .all()
+        )
+
+    return response_cache.respond(
+        request, PROFILE_TAGS, _load, List[schemas.FermentationStep]
     )
-    return steps
 
 
 @router.post(
@@ -218,6 +237,7 @@ async def add_fermentation_step(
     )
     db.add(db_step)
     db.commit()
+    response_cache.invalidate(*PROFILE_TAGS)
     db.refresh(db_step)
     return db_step
 
@@ -247,6 +267,7 @@ async def update_fermentation_step(
         setattr(db_step, field, value)
 
     db.commit()
+    response_cache.invalidate(*PROFILE_TAGS)
     db.refresh(db_step)
     return db_step
 
@@ -270,4 +291,5 @@ async def delete_fermentation_step(step_id: int, db: db_dependency):
 
     db.delete(db_step)
     db.commit()
+    response_cache.invalidate(*PROFILE_TAGS)
     return
@@ -1,12 +1,41 @@
 # api/endpoints/fermentation_readings.py
 
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from database import get_db
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, WebSocket
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from starlette.websockets import WebSocketDisconnect
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 import Database.Models as models
 import Database.Schemas as schemas
-from typing import List
-from modules.brewing_calculations import calculate_abv, calculate_attenuation
+from api.events import batch_topic, event_broker
+from config import settings
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Literal, Mapping, Optional, Type
+import numpy as np
+from modules.fermentation_charts import (
+    DEFAULT_MAX_POINTS,
+    MAX_CHART_POINTS,
+    downsample_indices,
+    gravity_progress,
+)
+from modules.fermentation_forecast import forecast_cache
+from modules.fermentation_rollups import (
+    apply_readings,
+    choose_resolution,
+    load_rollup_series,
+    rebuild_rollups,
+)
+from modules.fermentation_ingest import (
+    MAX_BULK_READINGS,
+    ReadingPayloadError,
+    insert_readings,
+    parse_reading_payload,
+    prepare_reading_rows,
+)
 import logging
 
 router = APIRouter()
@@ -26,7 +55,7 @@ logger = logging.getLogger(__name__)
 async def create_fermentation_reading(
     batch_id: int,
     reading: schemas.FermentationReadingCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Add a new fermentation reading to a batch.
@@ -35,8 +64,7 @@ async def create_fermentation_reading(
     to track the progress of fermentation over time.
     """
     # Verify batch exists
-    batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
-    if not batch:
+    if not await _batch_exists(db, batch_id):
         raise HTTPException(status_code=404, detail="Batch not found")
 
     # Create the reading
@@ -50,12 +78,139 @@ async def create_fermentation_reading(
     )
 
     db.add(db_reading)
-    db.commit()
-    db.refresh(db_reading)
+    await db.run_sync(apply_readings, [{"batch_id": batch_id, **reading.model_dump()}])
+    await db.commit()
+    await db.refresh(db_reading)
+
+    publish_readings(batch_id, [schemas.FermentationReading.model_validate(db_reading).model_dump()])
 
     return db_reading
 
 
+async def _batch_exists(db: AsyncSession, batch_id: int) -> bool:
+    return await db.scalar(select(models.Batches.id).where(models.Batches.id == batch_id)) is not None
+
+
+READING_EVENT_FIELDS = ("id", "timestamp", "gravity", "temperature", "ph", "notes")
+
+# Tells EventSource clients how long to wait before reconnecting
+STREAM_RETRY_MILLISECONDS = 3000
+
+
+def publish_readings(batch_id: int, readings: Iterable[Mapping[str, Any]]) -> None:
+    """Announce newly stored readings to the batch's live subscribers."""
+    event_broker.publish(
+        batch_topic(batch_id),
+        "readings",
+        {
+            "batch_id": batch_id,
+            "readings": [
+                {field: reading[field] for field in READING_EVENT_FIELDS if field in reading}
+                for reading in readings
+            ],
+        },
+    )
+
+
+def bulk_readings_openapi(reading_model: Type[Any]) -> Dict[str, Any]:
+    """OpenAPI request body for endpoints that read readings from the raw body."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": reading_model.model_json_schema()}
+                },
+                "application/x-ndjson": {
+                    "schema": {"type": "string", "description": "One JSON reading per line"}
+                },
+            },
+        }
+    }
+
+
+async def parse_bulk_readings_request(request: Request, reading_model: Type[Any]) -> List[Any]:
+    """
+    Read and validate every reading in a bulk upload.
+
+    The body may be a JSON array, a single JSON object or NDJSON
+    (``Content-Type: application/x-ndjson``). All readings are validated
+    before anything is written; errors are reported with the index of the
+    offending reading.
+    """
+    try:
+        items = parse_reading_payload(await request.body(), request.headers.get("content-type"))
+    except ReadingPayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not items:
+        raise HTTPException(status_code=400, detail="No readings provided")
+    if len(items) > MAX_BULK_READINGS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many readings; at most {MAX_BULK_READINGS} per request",
+        )
+    try:
+        return TypeAdapter(List[reading_model]).validate_python(items)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+
+@router.post(
+    "/batches/{batch_id}/fermentation/readings:bulk",
+    response_model=schemas.FermentationReadingBulkResult,
+    status_code=201,
+    tags=["fermentation"],
+    summary="Add fermentation readings in bulk",
+    response_description="Number of readings stored",
+    openapi_extra=bulk_readings_openapi(schemas.FermentationReadingBulkCreate),
+)
+async def create_fermentation_readings_bulk(
+    batch_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Add many fermentation readings to a batch in one request.
+
+    Accepts a JSON array or NDJSON. Readings that name a ``device_id`` get
+    that device's calibration applied, and a raw ``angle`` is converted to
+    gravity with the device polynomial. Either every reading is stored or
+    none is.
+    """
+    if not await _batch_exists(db, batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    readings = await parse_bulk_readings_request(request, schemas.FermentationReadingBulkCreate)
+
+    device_ids = {reading.device_id for reading in readings if reading.device_id is not None}
+    calibrations = {}
+    if device_ids:
+        calibrations = dict(
+            (
+                await db.execute(
+                    select(models.Device.id, models.Device.calibration_data)
+                    .where(models.Device.id.in_(device_ids))
+                )
+            ).all()
+        )
+        missing = sorted(device_ids - calibrations.keys())
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Device not found: {missing}")
+
+    rows = prepare_reading_rows(
+        readings,
+        batch_ids=[batch_id] * len(readings),
+        device_ids=[reading.device_id for reading in readings],
+        calibrations=calibrations,
+    )
+    inserted = await db.run_sync(insert_readings, rows)
+    await db.commit()
+    logger.info("Stored %d bulk fermentation readings for batch %d", inserted, batch_id)
+    publish_readings(batch_id, rows)
+
+    return schemas.FermentationReadingBulkResult(inserted_count=inserted, batch_ids=[batch_id])
+
+
 @router.get(
     "/batches/{batch_id}/fermentation/readings",
     response_model=List[schemas.FermentationReading],
@@ -63,26 +218,26 @@ async def create_fermentation_reading(
     summary="Get all fermentation readings for a batch",
     response_description="List of fermentation readings ordered by timestamp",
 )
-async def get_fermentation_readings(batch_id: int, db: Session = Depends(get_db)):
+async def get_fermentation_readings(
+    batch_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Retrieve all fermentation readings for a specific batch.
 
     Returns readings in chronological order (oldest to newest).
     """
     # Verify batch exists
-    batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
-    if not batch:
+    if not await _batch_exists(db, batch_id):
         raise HTTPException(status_code=404, detail="Batch not found")
 
     # Get readings ordered by timestamp
-    readings = (
-        db.query(models.FermentationReadings)
-        .filter(models.FermentationReadings.batch_id == batch_id)
+    readings = await db.scalars(
+        select(models.FermentationReadings)
+        .where(models.FermentationReadings.batch_id == batch_id)
         .order_by(models.FermentationReadings.timestamp)
-        .all()
     )
 
-    return readings
+    return readings.all()
 
 
 @router.put(
@@ -95,28 +250,37 @@ async def get_fermentation_readings(batch_id: int, db: Session = Depends(get_db)
 async def update_fermentation_reading(
     reading_id: int,
     reading: schemas.FermentationReadingUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Update an existing fermentation reading.
 
     Allows modifying any field of a previously recorded reading.
     """
-    db_reading = (
-        db.query(models.FermentationReadings)
-        .filter(models.FermentationReadings.id == reading_id)
-        .first()
-    )
+    db_reading = await db.get(models.FermentationReadings, reading_id)
 
     if not db_reading:
         raise HTTPException(status_code=404, detail="Fermentation reading not found")
 
+    previous_timestamp = db_reading.timestamp
+
     # Update fields
     for key, value in reading.model_dump(exclude_unset=True).items():
         setattr(db_reading, key, value)
 
-    db.commit()
-    db.refresh(db_reading)
+    await db.flush()
+    await db.run_sync(
+        rebuild_rollups, [db_reading.batch_id], days=[previous_timestamp, db_reading.timestamp]
+    )
+    await db.commit()
+    await db.refresh(db_reading)
+
+    forecast_cache.invalidate(db_reading.batch_id)
+    event_broker.publish(
+        batch_topic(db_reading.batch_id),
+        "reading_updated",
+        schemas.FermentationReading.model_validate(db_reading).model_dump(),
+    )
 
     return db_reading
 
@@ -127,27 +291,162 @@ async def update_fermentation_reading(
     summary="Delete fermentation reading",
     response_description="Confirmation message",
 )
-async def delete_fermentation_reading(reading_id: int, db: Session = Depends(get_db)):
+async def delete_fermentation_reading(
+    reading_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Delete a fermentation reading.
 
     Permanently removes the reading from the database.
     """
-    db_reading = (
-        db.query(models.FermentationReadings)
-        .filter(models.FermentationReadings.id == reading_id)
-        .first()
-    )
+    db_reading = await db.get(models.FermentationReadings, reading_id)
 
     if not db_reading:
         raise HTTPException(status_code=404, detail="Fermentation reading not found")
 
-    db.delete(db_reading)
-    db.commit()
+    await db.delete(db_reading)
+    await db.flush()
+    await db.run_sync(rebuild_rollups, [db_reading.batch_id], days=[db_reading.timestamp])
+    await db.commit()
+
+    event_broker.publish(
+        batch_topic(db_reading.batch_id),
+        "reading_deleted",
+        {"batch_id": db_reading.batch_id, "id": reading_id},
+    )
 
     return {"message": "Fermentation reading deleted successfully"}
 
 
+@router.get(
+    "/batches/{batch_id}/fermentation/forecast",
+    response_model=schemas.FermentationForecast,
+    tags=["fermentation"],
+    summary="Forecast final gravity and finish time",
+    response_description="Predicted final gravity, time to terminal gravity and stuck flag",
+)
+async def get_fermentation_forecast(
+    batch_id: int, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Predict when a batch will finish fermenting.
+
+    Fits an exponential or logistic curve to the batch's gravity readings
+    and reports the predicted final gravity, when gravity will be within
+    0.001 of it, and whether fermentation looks stuck (stalled for two
+    days while short of the recipe FG, or of 60% attenuation without one).
+    The fit is cached per batch and only redone after new readings.
+    """
+    batch = (
+        await db.execute(
+            select(models.Batches.id, models.Recipes.og, models.Recipes.fg)
+            .outerjoin(models.Recipes, models.Batches.recipe_id == models.Recipes.id)
+            .where(models.Batches.id == batch_id)
+        )
+    ).first()
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return await db.run_sync(
+        forecast_cache.get, batch_id, original_gravity=batch.og, target_fg=batch.fg
+    )
+
+
+async def _release_batch_check(db: AsyncSession, batch_id: int) -> bool:
+    """Check a batch exists, then return the connection before a long-lived stream."""
+    exists = await _batch_exists(db, batch_id)
+    await db.close()
+    return exists
+
+
+@router.get(
+    "/batches/{batch_id}/fermentation/stream",
+    tags=["fermentation"],
+    summary="Stream live fermentation updates (Server-Sent Events)",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_fermentation_events(
+    batch_id: int,
+    last_event_id: Optional[int] = Query(
+        None, description="Resume after this event id (EventSource sends Last-Event-ID)"
+    ),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Push new readings and status changes for a batch as they happen.
+
+    Events are ``readings`` (newly stored readings), ``reading_updated``,
+    ``reading_deleted`` and ``status``. A client reconnecting with the id
+    of the last event it received gets only the events it missed, or a
+    ``reset`` event if they are no longer retained, after which it should
+    reload the full reading list. Streams are closed periodically; browsers
+    reconnect and resume automatically.
+    """
+    if last_event_id_header:
+        try:
+            last_event_id = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID header")
+    if not await _release_batch_check(db, batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    subscription = event_broker.subscribe(batch_topic(batch_id), last_event_id)
+
+    async def event_stream():
+        with subscription:
+            yield f"retry: {STREAM_RETRY_MILLISECONDS}\n\n"
+            async for event in subscription.events(
+                settings.EVENT_STREAM_KEEPALIVE_SECONDS, settings.EVENT_STREAM_MAX_SECONDS
+            ):
+                yield ": keepalive\n\n" if event is None else event.to_sse()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/batches/{batch_id}/fermentation/ws")
+async def fermentation_events_websocket(
+    websocket: WebSocket,
+    batch_id: int,
+    last_event_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    WebSocket variant of the fermentation stream.
+
+    Sends ``{"id", "event", "data"}`` messages with the same events as the
+    SSE stream, and ``{"event": "ping"}`` while idle. Pass
+    ``last_event_id`` to resume.
+    """
+    if not await _release_batch_check(db, batch_id):
+        await websocket.close(code=4404, reason="Batch not found")
+        return
+
+    await websocket.accept()
+    with event_broker.subscribe(batch_topic(batch_id), last_event_id) as subscription:
+
+        async def close_on_disconnect():
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+            subscription.close()
+
+        receiver = asyncio.create_task(close_on_disconnect())
+        try:
+            async for event in subscription.events(settings.EVENT_STREAM_KEEPALIVE_SECONDS):
+                await websocket.send_json({"event": "ping"} if event is None else event.to_message())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            receiver.cancel()
+        if subscription.overflowed:
+            await websocket.close(code=1013, reason="Client is too slow; resume with last_event_id")
+
+
 @router.get(
     "/batches/{batch_id}/fermentation/chart-data",
     response_model=schemas.FermentationChartData,
@@ -155,68 +454,136 @@ async def delete_fermentation_reading(reading_id: int, db: Session = Depends(get
     summary="Get formatted chart data for fermentation readings",
     response_description="Formatted data ready for charting libraries",
 )
-async def get_fermentation_chart_data(batch_id: int, db: Session = Depends(get_db)):
+async def get_fermentation_chart_data(
+    batch_id: int,
+    start: Optional[datetime] = Query(
+        None, alias="from", description="Only readings taken at or after this time"
+    ),
+    end: Optional[datetime] = Query(
+        None, alias="to", description="Only readings taken at or before this time"
+    ),
+    max_points: int = Query(
+        DEFAULT_MAX_POINTS,
+        ge=3,
+        le=MAX_CHART_POINTS,
+        description="Downsample to at most this many points",
+    ),
+    method: Literal["lttb", "minmax"] = Query(
+        "lttb", description="Downsampling method: lttb (shape) or minmax (bucket extremes)"
+    ),
+    resolution: Literal["auto", "raw", "hour", "day"] = Query(
+        "auto",
+        description="Read raw readings or an hourly/daily rollup; auto picks the "
+        "coarsest rollup that still fills max_points",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Get fermentation readings formatted for charting.
 
     Returns parallel arrays of timestamps, gravity, temperature, pH,
     and calculated metrics (ABV, attenuation) suitable for use with
     Chart.js, D3.js, or other visualization libraries.
+
+    Long windows are read from the hourly or daily rollups (bucket means)
+    and dense telemetry is downsampled to ``max_points`` readings, so the
+    response size stays bounded however often a device reports.
     """
+    # Stored timestamps are naive
+    start = start.replace(tzinfo=None) if start else None
+    end = end.replace(tzinfo=None) if end else None
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
     # Verify batch exists and get original gravity
-    batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
+    batch = (
+        await db.execute(
+            select(models.Batches.id, models.Recipes.og)
+            .outerjoin(models.Recipes, models.Batches.recipe_id == models.Recipes.id)
+            .where(models.Batches.id == batch_id)
+        )
+    ).first()
 
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
 
-    # Get the batch's recipe to access original gravity
-    recipe = batch.recipe
-    original_gravity = recipe.og if recipe and recipe.og else None
+    reading = models.FermentationReadings
+    rollup_resolution = None if resolution == "raw" else resolution
+    if resolution == "auto":
+        first, last = (
+            await db.execute(
+                select(func.min(reading.timestamp), func.max(reading.timestamp))
+                .where(reading.batch_id == batch_id)
+            )
+        ).one()
+        rollup_resolution = None
+        if first is not None:
+            span = min(end or last, last) - max(start or first, first)
+            rollup_resolution = choose_resolution(span, max_points)
+
+    if rollup_resolution:
+        timestamps, series, total_points = await db.run_sync(
+            load_rollup_series, batch_id, rollup_resolution, start, end
+        )
+        gravity, temperature, ph = series["gravity"], series["temperature"], series["ph"]
+    else:
+        query = select(
+            reading.timestamp, reading.gravity, reading.temperature, reading.ph
+        ).where(reading.batch_id == batch_id)
+        if start:
+            query = query.where(reading.timestamp >= start)
+        if end:
+            query = query.where(reading.timestamp <= end)
+        rows = (await db.execute(query.order_by(reading.timestamp, reading.id))).all()
+
+        timestamps = [row.timestamp for row in rows]
+        gravity = np.array([row.gravity for row in rows], dtype=float)
+        temperature = np.array([row.temperature for row in rows], dtype=float)
+        ph = np.array([row.ph for row in rows], dtype=float)
+        total_points = len(rows)
+
+    x = np.array([timestamp.timestamp() for timestamp in timestamps], dtype=float)
+    keep = downsample_indices(x, gravity, temperature, max_points, method)
+    gravity = gravity[keep]
+    abv, attenuation = gravity_progress(batch.og, gravity)
 
-    # Get readings ordered by timestamp
-    readings = (
-        db.query(models.FermentationReadings)
-        .filter(models.FermentationReadings.batch_id == batch_id)
-        .order_by(models.FermentationReadings.timestamp)
-        .all()
+    return schemas.FermentationChartData(
+        timestamps=[timestamps[i].isoformat() for i in keep],
+        gravity=_nan_to_none(gravity),
+        temperature=_nan_to_none(temperature[keep]),
+        ph=_nan_to_none(ph[keep]),
+        abv=abv.tolist(),
+        attenuation=attenuation.tolist(),
+        total_points=total_points,
+        resolution=rollup_resolution or "raw",
     )
 
-    # Build parallel arrays for charting
-    timestamps = []
-    gravity = []
-    temperature = []
-    ph = []
-    abv = []
-    attenuation = []
-
-    for reading in readings:
-        timestamps.append(reading.timestamp.isoformat())
-        gravity.append(reading.gravity)
-        temperature.append(reading.temperature)
-        ph.append(reading.ph)
-
-        # Calculate ABV and attenuation if we have both OG and current gravity
-        if original_gravity and reading.gravity:
-            try:
-                calculated_abv = calculate_abv(original_gravity, reading.gravity)
-                calculated_attenuation = calculate_attenuation(
-                    original_gravity, reading.gravity
-                )
-                abv.append(round(calculated_abv, 2))
-                attenuation.append(round(calculated_attenuation, 1))
-            except ValueError:
-                # If gravity hasn't dropped yet or invalid values
-                abv.append(0.0)
-                attenuation.append(0.0)
-        else:
-            abv.append(0.0)
-            attenuation.append(0.0)
 
-    return schemas.FermentationChartData(
-        timestamps=timestamps,
-        gravity=gravity,
-        temperature=temperature,
-        ph=ph,
-        abv=abv,
-        attenuation=attenuation,
-    )
+def _nan_to_none(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+@router.post(
+    "/fermentation/rollups:rebuild",
+    tags=["fermentation"],
+    summary="Rebuild fermentation rollups",
+    response_description="Number of rollup buckets written",
+)
+async def rebuild_fermentation_rollups(
+    batch_id: Optional[int] = Query(None, description="Only rebuild this batch"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Recompute the hourly and daily fermentation rollups from raw readings.
+
+    Needed only after readings were written outside the API, e.g. by a
+    direct database import.
+    """
+    if batch_id is not None and not await _batch_exists(db, batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    rollup_count = await db.run_sync(rebuild_rollups, None if batch_id is None else [batch_id])
+    await db.commit()
+    logger.info("Rebuilt %d fermentation rollup buckets", rollup_count)
+
+    return {"message": "Fermentation rollups rebuilt", "rollup_count": rollup_count}
@@ -1,6 +1,9 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, ConfigDict
 
+from database_pool import render_prometheus
+
 router = APIRouter()
 
 
@@ -30,3 +33,23 @@ async def health_check():
         status="ok",
         detail="Database, cache, and background workers are healthy.",
     )
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Database pool metrics",
+    response_description="Prometheus text exposition of connection pool statistics.",
+)
+async def pool_metrics():
+    """
+    Connection pool statistics for scraping by Prometheus.
+
+    Reports, per engine (``sync`` and ``async``), the pool size, connections
+    checked out, idle and in overflow, checkout timeouts, and a histogram of
+    the time spent waiting for a connection. Engines appear once they have
+    been initialized.
+    """
+    return PlainTextResponse(
+        render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
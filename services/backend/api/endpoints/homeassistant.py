@@ -7,12 +7,17 @@ This module provides REST API endpoints for HomeAssistant integration,
 enabling monitoring of brewing batches through HomeAssistant's REST sensor platform.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session, joinedload
-from database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database import get_async_db
 import Database.Models as models
+from Database.enums import BatchStatus
+from api.response_cache import etag_response
+from config import settings
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -20,6 +25,23 @@ router = APIRouter()
 # Constants
 UNKNOWN_RECIPE_NAME = "Unknown"
 
+BATCH_STATES = ("brewing", "fermenting", "conditioning", "ready")
+
+# Statuses reported as-is, and statuses past fermentation reported as "ready"
+WORKFLOW_STATES = (
+    BatchStatus.BREWING.value,
+    BatchStatus.FERMENTING.value,
+    BatchStatus.CONDITIONING.value,
+)
+READY_STATUSES = (
+    BatchStatus.PACKAGING.value,
+    BatchStatus.COMPLETE.value,
+    BatchStatus.ARCHIVED.value,
+)
+
+# Left out of the sensor list and the summary's state counts
+INACTIVE_STATUSES = (BatchStatus.COMPLETE.value, BatchStatus.ARCHIVED.value)
+
 
 class HomeAssistantBatchSensor(BaseModel):
     """Batch sensor data formatted for HomeAssistant"""
@@ -44,29 +66,212 @@ class HomeAssistantDiscoveryConfig(BaseModel):
     icon: str = "mdi:beer"
 
 
-def calculate_batch_age(created_at: datetime) -> int:
-    """Calculate batch age in days"""
-    return (datetime.now() - created_at).days
-
+def _batch_state(now: datetime):
+    """
+    SQL expression for a batch's HomeAssistant state.
 
-def determine_batch_state(batch_age_days: int) -> str:
+    Batches moved through the workflow report their status (packaged,
+    complete and archived batches are "ready"); batches still in planning
+    fall back to their age: under a day "brewing", under 14 days
+    "fermenting", under 28 days "conditioning", otherwise "ready".
     """
-    Determine batch state based on age in days.
+    batch = models.Batches
+    return case(
+        (batch.status.in_(WORKFLOW_STATES), batch.status),
+        (batch.status.in_(READY_STATUSES), "ready"),
+        (batch.created_at > now - timedelta(days=1), "brewing"),
+        (batch.created_at > now - timedelta(days=14), "fermenting"),
+        (batch.created_at > now - timedelta(days=28), "conditioning"),
+        else_="ready",
+    )
+
+
+def active_batches_filter():
+    return models.Batches.status.notin_(INACTIVE_STATUSES)
+
 
-    Args:
-        batch_age_days: Age of the batch in days
+def batch_sensor_query(now: datetime, *criteria):
+    """
+    One row per batch matching ``criteria`` with its state, recipe name,
+    latest log entry and latest fermentation reading.
 
-    Returns:
-        State string: "brewing", "fermenting", "conditioning", or "ready"
+    The latest log entry and reading are each picked with ROW_NUMBER() over
+    the rows of the selected batches only, served by the batch_id and
+    (batch_id, timestamp) indexes, so a batch never yields more than one row
+    even where the database does not enforce one log row per batch.
     """
-    if batch_age_days < 1:
-        return "brewing"
-    elif batch_age_days < 14:
-        return "fermenting"
-    elif batch_age_days < 28:
-        return "conditioning"
-    else:
-        return "ready"
+    batch = models.Batches
+    log = models.BatchLogs
+    reading = models.FermentationReadings
+    selected = select(batch.id).where(*criteria)
+    last_log = (
+        select(
+            log.batch_id,
+            log.activity,
+            log.timestamp,
+            log.notes,
+            func.row_number()
+            .over(partition_by=log.batch_id, order_by=(log.timestamp.desc(), log.id.desc()))
+            .label("position"),
+        )
+        .where(log.batch_id.in_(selected))
+        .subquery()
+    )
+    latest = (
+        select(
+            reading.batch_id,
+            reading.timestamp,
+            reading.gravity,
+            reading.temperature,
+            reading.ph,
+            func.row_number()
+            .over(
+                partition_by=reading.batch_id,
+                order_by=(reading.timestamp.desc(), reading.id.desc()),
+            )
+            .label("position"),
+        )
+        .where(reading.batch_id.in_(selected))
+        .subquery()
+    )
+    return (
+        select(
+            batch.id,
+            batch.batch_name,
+            batch.batch_number,
+            batch.batch_size,
+            batch.status,
+            batch.brewer,
+            batch.brew_date,
+            batch.created_at,
+            batch.updated_at,
+            batch.recipe_id,
+            models.Recipes.name.label("recipe_name"),
+            last_log.c.activity.label("log_activity"),
+            last_log.c.timestamp.label("log_timestamp"),
+            last_log.c.notes.label("log_notes"),
+            latest.c.timestamp.label("reading_timestamp"),
+            latest.c.gravity.label("reading_gravity"),
+            latest.c.temperature.label("reading_temperature"),
+            latest.c.ph.label("reading_ph"),
+            _batch_state(now).label("state"),
+        )
+        .outerjoin(models.Recipes, models.Recipes.id == batch.recipe_id)
+        .outerjoin(last_log, and_(last_log.c.batch_id == batch.id, last_log.c.position == 1))
+        .outerjoin(latest, and_(latest.c.batch_id == batch.id, latest.c.position == 1))
+        .where(*criteria)
+    )
+
+
+def build_batch_sensor(row, now: datetime) -> HomeAssistantBatchSensor:
+    attributes = {
+        "batch_id": row.id,
+        "batch_number": row.batch_number,
+        "batch_name": row.batch_name,
+        "batch_size": row.batch_size,
+        "batch_size_unit": "L",
+        "status": row.status,
+        "brewer": row.brewer,
+        "brew_date": row.brew_date.isoformat(),
+        "created_at": row.created_at.isoformat(),
+        "updated_at": row.updated_at.isoformat(),
+        "age_days": (now - row.created_at).days,
+        "recipe_id": row.recipe_id,
+        "recipe_name": row.recipe_name or UNKNOWN_RECIPE_NAME,
+    }
+
+    # Add latest log activity if available
+    if row.log_activity is not None:
+        attributes["last_activity"] = row.log_activity
+        attributes["last_activity_time"] = row.log_timestamp.isoformat()
+        attributes["notes"] = row.log_notes
+
+    # Add latest fermentation reading if available
+    if row.reading_timestamp is not None:
+        attributes["gravity"] = row.reading_gravity
+        attributes["temperature"] = row.reading_temperature
+        attributes["ph"] = row.reading_ph
+        attributes["last_reading_time"] = row.reading_timestamp.isoformat()
+
+    return HomeAssistantBatchSensor(
+        entity_id=f"sensor.hoppybrew_batch_{row.id}",
+        name=f"HoppyBrew - {row.batch_name}",
+        state=row.state,
+        attributes=attributes,
+        icon="mdi:beer" if row.state == "ready" else "mdi:flask",
+    )
+
+
+def brewery_summary_query():
+    """Batch counts per state and active flag, as one GROUP BY over the state expression."""
+    state = _batch_state(datetime.now()).label("state")
+    active = case((active_batches_filter(), 1), else_=0).label("active")
+    return select(state, active, func.count().label("batches")).group_by(state, active)
+
+
+def summarize_batch_states(rows) -> Dict[str, Any]:
+    """Brewery summary from the rows of ``brewery_summary_query``."""
+    counts = {name: 0 for name in BATCH_STATES}
+    total_batches = 0
+    for row in rows:
+        total_batches += row.batches
+        if row.active:
+            counts[row.state] += row.batches
+    active_batches = sum(counts.values())
+
+    return {
+        "active_batches": active_batches,
+        "total_batches": total_batches,
+        "brewing_batches": counts["brewing"],
+        "fermenting_batches": counts["fermenting"],
+        "conditioning_batches": counts["conditioning"],
+        "ready_batches": counts["ready"],
+        "state": "active" if active_batches > 0 else "idle",
+        "icon": "mdi:brewery" if active_batches > 0 else "mdi:beer-outline",
+    }
+
+
+def brewery_summary(db: Session) -> Dict[str, Any]:
+    """Batch counts per state, from one GROUP BY over the state expression."""
+    return summarize_batch_states(db.execute(brewery_summary_query()).all())
+
+
+def batch_topics(batch_id: int) -> Dict[str, str]:
+    """MQTT topics of a batch sensor: discovery config, state and attributes."""
+    prefix = settings.MQTT_TOPIC_PREFIX
+    return {
+        "config": f"{settings.MQTT_DISCOVERY_PREFIX}/sensor/hoppybrew_batch_{batch_id}/config",
+        "state": f"{prefix}/batch/{batch_id}/state",
+        "attributes": f"{prefix}/batch/{batch_id}/attributes",
+    }
+
+
+def batch_discovery_config(
+    batch_id: int,
+    batch_name: str,
+    batch_number: int,
+    availability_topic: Optional[str] = None,
+) -> Dict[str, Any]:
+    """HomeAssistant MQTT discovery payload for a batch sensor."""
+    topics = batch_topics(batch_id)
+    config = {
+        "name": f"HoppyBrew Batch {batch_name}",
+        "state_topic": topics["state"],
+        "json_attributes_topic": topics["attributes"],
+        "unique_id": f"hoppybrew_batch_{batch_id}",
+        "device": {
+            "identifiers": [f"hoppybrew_batch_{batch_id}"],
+            "name": f"HoppyBrew Batch {batch_number}",
+            "model": "HoppyBrew Batch",
+            "manufacturer": "HoppyBrew",
+            "sw_version": "1.0.0",
+        },
+        "icon": "mdi:beer",
+        "device_class": None,
+    }
+    if availability_topic:
+        config["availability_topic"] = availability_topic
+    return config
 
 
 @router.get(
@@ -76,10 +281,17 @@ def determine_batch_state(batch_age_days: int) -> str:
     response_description="List of batches formatted for HomeAssistant REST sensors",
     tags=["homeassistant"],
 )
-async def get_batches_for_homeassistant(db: Session = Depends(get_db)):
+async def get_batches_for_homeassistant(
+    request: Request, db: AsyncSession = Depends(get_async_db)
+):
     """
     Returns all active batches in a format optimized for HomeAssistant REST sensors.
 
+    Completed and archived batches are left out. Each sensor carries the
+    batch's latest fermentation reading when it has one. Responses carry an
+    ETag; pollers sending it back in If-None-Match get a 304 while nothing
+    changed.
+
     This endpoint can be used with HomeAssistant's RESTful sensor platform:
 
     ```yaml
@@ -95,52 +307,16 @@ async def get_batches_for_homeassistant(db: Session = Depends(get_db)):
           - attributes
     ```
     """
-    batches = (
-        db.query(models.Batches)
-        .options(
-            joinedload(models.Batches.recipe),
-            joinedload(models.Batches.batch_log),
-        )
-        .all()
-    )
 
-    sensors = []
-    for batch in batches:
-        # Calculate batch age and state
-        batch_age_days = calculate_batch_age(batch.created_at)
-        state = determine_batch_state(batch_age_days)
-
-        # Build attributes
-        attributes = {
-            "batch_id": batch.id,
-            "batch_number": batch.batch_number,
-            "batch_size": batch.batch_size,
-            "batch_size_unit": "L",
-            "brewer": batch.brewer,
-            "brew_date": batch.brew_date.isoformat(),
-            "created_at": batch.created_at.isoformat(),
-            "updated_at": batch.updated_at.isoformat(),
-            "age_days": batch_age_days,
-            "recipe_id": batch.recipe_id,
-            "recipe_name": batch.recipe.name if batch.recipe else UNKNOWN_RECIPE_NAME,
-        }
-
-        # Add latest log activity if available
-        if batch.batch_log:
-            attributes["last_activity"] = batch.batch_log.activity
-            attributes["last_activity_time"] = batch.batch_log.timestamp.isoformat()
-            attributes["notes"] = batch.batch_log.notes
-
-        sensor = HomeAssistantBatchSensor(
-            entity_id=f"sensor.hoppybrew_batch_{batch.id}",
-            name=f"HoppyBrew - {batch.batch_name}",
-            state=state,
-            attributes=attributes,
-            icon="mdi:beer" if state == "ready" else "mdi:flask",
-        )
-        sensors.append(sensor)
+    now = datetime.now()
+    query = batch_sensor_query(now, active_batches_filter()).order_by(models.Batches.id)
+    rows = (await db.execute(query)).all()
 
-    return sensors
+    return etag_response(
+        request,
+        [build_batch_sensor(row, now) for row in rows],
+        response_model=List[HomeAssistantBatchSensor],
+    )
 
 
 @router.get(
@@ -150,7 +326,9 @@ async def get_batches_for_homeassistant(db: Session = Depends(get_db)):
     response_description="Single batch formatted for HomeAssistant",
     tags=["homeassistant"],
 )
-async def get_batch_for_homeassistant(batch_id: int, db: Session = Depends(get_db)):
+async def get_batch_for_homeassistant(
+    batch_id: int, request: Request, db: AsyncSession = Depends(get_async_db)
+):
     """
     Returns a specific batch in HomeAssistant sensor format.
 
@@ -169,48 +347,16 @@ async def get_batch_for_homeassistant(batch_id: int, db: Session = Depends(get_d
           - batch_size
     ```
     """
-    batch = (
-        db.query(models.Batches)
-        .options(
-            joinedload(models.Batches.recipe),
-            joinedload(models.Batches.batch_log),
-        )
-        .filter(models.Batches.id == batch_id)
-        .first()
-    )
+    now = datetime.now()
+    row = (
+        await db.execute(batch_sensor_query(now, models.Batches.id == batch_id))
+    ).first()
 
-    if not batch:
+    if not row:
         raise HTTPException(status_code=404, detail="Batch not found")
 
-    batch_age_days = calculate_batch_age(batch.created_at)
-    state = determine_batch_state(batch_age_days)
-
-    attributes = {
-        "batch_id": batch.id,
-        "batch_number": batch.batch_number,
-        "batch_name": batch.batch_name,
-        "batch_size": batch.batch_size,
-        "batch_size_unit": "L",
-        "brewer": batch.brewer,
-        "brew_date": batch.brew_date.isoformat(),
-        "created_at": batch.created_at.isoformat(),
-        "updated_at": batch.updated_at.isoformat(),
-        "age_days": batch_age_days,
-        "recipe_id": batch.recipe_id,
-        "recipe_name": batch.recipe.name if batch.recipe else UNKNOWN_RECIPE_NAME,
-    }
-
-    if batch.batch_log:
-        attributes["last_activity"] = batch.batch_log.activity
-        attributes["last_activity_time"] = batch.batch_log.timestamp.isoformat()
-        attributes["notes"] = batch.batch_log.notes
-
-    return HomeAssistantBatchSensor(
-        entity_id=f"sensor.hoppybrew_batch_{batch.id}",
-        name=f"HoppyBrew - {batch.batch_name}",
-        state=state,
-        attributes=attributes,
-        icon="mdi:beer" if state == "ready" else "mdi:flask",
+    return etag_response(
+        request, build_batch_sensor(row, now), response_model=HomeAssistantBatchSensor
     )
 
 
@@ -220,10 +366,13 @@ async def get_batch_for_homeassistant(batch_id: int, db: Session = Depends(get_d
     response_description="Overall brewery status",
     tags=["homeassistant"],
 )
-async def get_brewery_summary(db: Session = Depends(get_db)):
+async def get_brewery_summary(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Returns a summary of the brewery status for HomeAssistant dashboard.
 
+    State counts cover active batches; completed and archived batches only
+    count towards ``total_batches``.
+
     Example configuration:
     ```yaml
     sensor:
@@ -238,37 +387,10 @@ async def get_brewery_summary(db: Session = Depends(get_db)):
           - ready_batches
     ```
     """
-    batches = db.query(models.Batches).all()
-
-    total_batches = len(batches)
-    brewing_count = 0
-    fermenting_count = 0
-    conditioning_count = 0
-    ready_count = 0
-
-    for batch in batches:
-        batch_age_days = calculate_batch_age(batch.created_at)
-        state = determine_batch_state(batch_age_days)
-
-        if state == "brewing":
-            brewing_count += 1
-        elif state == "fermenting":
-            fermenting_count += 1
-        elif state == "conditioning":
-            conditioning_count += 1
-        else:
-            ready_count += 1
 
-    return {
-        "active_batches": total_batches,
-        "total_batches": total_batches,
-        "brewing_batches": brewing_count,
-        "fermenting_batches": fermenting_count,
-        "conditioning_batches": conditioning_count,
-        "ready_batches": ready_count,
-        "state": "active" if total_batches > 0 else "idle",
-        "icon": "mdi:brewery" if total_batches > 0 else "mdi:beer-outline",
-    }
+    rows = (await db.execute(brewery_summary_query())).all()
+    # States depend on the clock, so responses are revalidated, never cached
+    return etag_response(request, summarize_batch_states(rows))
 
 
 @router.get(
@@ -277,34 +399,24 @@ async def get_brewery_summary(db: Session = Depends(get_db)):
     response_description="MQTT discovery JSON for HomeAssistant",
     tags=["homeassistant"],
 )
-async def get_batch_mqtt_discovery(batch_id: int, db: Session = Depends(get_db)):
+async def get_batch_mqtt_discovery(
+    batch_id: int, db: AsyncSession = Depends(get_async_db)
+):
     """
     Returns MQTT discovery configuration for automatic sensor setup.
 
-    This endpoint generates the configuration that would be published to:
+    This endpoint generates the configuration published to:
     `homeassistant/sensor/hoppybrew_batch_{batch_id}/config`
 
-    For manual MQTT setup, publish this JSON to the topic above.
+    When MQTT_ENABLED is set the API publishes it itself, together with
+    retained state and attributes; for manual MQTT setup, publish this JSON
+    to the topic above.
     """
-    batch = db.query(models.Batches).filter(models.Batches.id == batch_id).first()
+    batch = await db.get(models.Batches, batch_id)
 
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
 
-    discovery_config = {
-        "name": f"HoppyBrew Batch {batch.batch_name}",
-        "state_topic": f"hoppybrew/batch/{batch_id}/state",
-        "json_attributes_topic": f"hoppybrew/batch/{batch_id}/attributes",
-        "unique_id": f"hoppybrew_batch_{batch_id}",
-        "device": {
-            "identifiers": [f"hoppybrew_batch_{batch_id}"],
-            "name": f"HoppyBrew Batch {batch.batch_number}",
-            "model": "HoppyBrew Batch",
-            "manufacturer": "HoppyBrew",
-            "sw_version": "1.0.0",
-        },
-        "icon": "mdi:beer",
-        "device_class": None,
-    }
+    discovery_config = batch_discovery_config(batch.id, batch.batch_name, batch.batch_number)
 
     return discovery_config
@@ -0,0 +1,64 @@
+# api/endpoints/jobs.py
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy.orm import Session
+
+from api.import_jobs import ImportJobRunner, get_import_job_runner
+from database import get_db
+from Database.enums import ImportJobType
+import Database.Models as models
+import Database.Schemas as schemas
+
+router = APIRouter()
+
+
+@router.post(
+    "/jobs/imports/beerxml",
+    response_model=schemas.ImportJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue a BeerXML recipe import",
+    response_description="The queued job; poll GET /jobs/{job_id} for progress.",
+)
+async def submit_beerxml_import_job(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    runner: ImportJobRunner = Depends(get_import_job_runner),
+):
+    """
+    Queue a BeerXML file for import by the background job runner.
+
+    Use this instead of ``POST /recipes/import/beerxml`` for large exports so
+    the request returns immediately.
+    """
+    return runner.create_job(db, ImportJobType.BEERXML, file.file, file.filename)
+
+
+@router.post(
+    "/jobs/imports/references",
+    response_model=schemas.ImportJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Queue a references XML import",
+    response_description="The queued job; poll GET /jobs/{job_id} for progress.",
+)
+async def submit_references_import_job(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    runner: ImportJobRunner = Depends(get_import_job_runner),
+):
+    """
+    Queue a references XML file for import by the background job runner.
+    """
+    return runner.create_job(db, ImportJobType.REFERENCES, file.file, file.filename)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=schemas.ImportJob,
+    summary="Get import job status",
+    response_description="Status and parsed/inserted/failed counts of the job.",
+)
+async def get_import_job(job_id: int, db: Session = Depends(get_db)):
+    job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
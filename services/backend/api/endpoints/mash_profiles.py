@@ -1,10 +1,11 @@
 # api/endpoints/mash_profiles.py
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
 from database import get_db
 import Database.Models as models
 import Database.Schemas as schemas
+from api.response_cache import response_cache
 from typing import List, Dict, Any
 
 router = APIRouter()
@@ -210,12 +211,15 @@ MASH_TEMPLATES = [
 # ============================================================================
 
 @router.get("/mash/templates", response_model=List[Dict[str, Any]])
-async def get_mash_templates():
+async def get_mash_templates(request: Request):
     """
     Get all available mash profile templates.
     Returns pre-configured mash profiles with common brewing schedules.
     """
-    return MASH_TEMPLATES
+    # Templates are static, so the cached body only ever expires by TTL
+    return response_cache.respond(
+        request, (), lambda: MASH_TEMPLATES, List[Dict[str, Any]]
+    )
 
 
 @router.post("/mash/from-template/{template_id}", response_model=dict, status_code=201)
@@ -1,23 +1,28 @@
 # api/endpoints/recipes.py
 
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from database import get_db
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Query, Response
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Literal, Optional, Union
+from database import get_async_db, get_db
 import Database.Models as models
 import Database.Schemas as schemas
-from modules.brewing_calculations import (
-    calculate_abv,
-    calculate_ibu_tinseth,
-    calculate_srm_morey,
+from modules.recipe_metrics import (
+    RecipeMetricsEngine,
+    apply_ingredient_change,
+    ingredient_contribution,
+    rebuild_recipe_metrics,
 )
+from modules.recipe_feasibility import feasibility_cache
+from modules.style_matching import load_recipe_metrics, style_index_cache
 
 router = APIRouter()
 
-OUNCE_TO_GRAM = 28.3495
-KILOGRAM_TO_POUND = 2.20462
-LITER_TO_GALLON = 0.264172
-BOIL_UTILIZATION_USES = {"boil", "first wort", "aroma", "whirlpool"}
+EXPORT_CHUNK_SIZE = 200
+
+# Page size of GET /recipes when a cursor is given without a limit
+DEFAULT_RECIPE_PAGE_SIZE = 100
 
 
 def _with_relationships(query):
@@ -32,14 +37,73 @@ def _with_relationships(query):
     )
 
 
-def _fetch_recipe(db: Session, recipe_id: int):
+def _with_list_relationships(query):
+    """
+    Load ingredient collections with one SELECT ... IN per relationship.
+
+    Joined eager loading multiplies hops x fermentables x yeasts x miscs rows
+    for every recipe, which is fine for a single recipe but not for a page.
+    """
+    return query.options(
+        selectinload(models.Recipes.hops),
+        selectinload(models.Recipes.fermentables),
+        selectinload(models.Recipes.yeasts),
+        selectinload(models.Recipes.miscs),
+    )
+
+
+def _ingredient_count(ingredient_model, label: str):
+    """Correlated COUNT(*) of an ingredient table for the outer recipe row."""
     return (
-        _with_relationships(db.query(models.Recipes))
-        .filter(models.Recipes.id == recipe_id)
-        .first()
+        select(func.count(ingredient_model.id))
+        .where(ingredient_model.recipe_id == models.Recipes.id)
+        .correlate(models.Recipes)
+        .scalar_subquery()
+        .label(label)
     )
 
 
+RECIPE_SUMMARY_COLUMNS = [
+    getattr(models.Recipes, field)
+    for field in schemas.RecipeSummary.model_fields
+    if not field.endswith("_count")
+]
+
+
+async def _fetch_recipe(db: AsyncSession, recipe_id: int):
+    """
+    Load a recipe with its ingredients, overwriting any stale copy in the
+    session (metrics are written with UPDATE statements).
+    """
+    recipe = await db.scalars(
+        _with_relationships(select(models.Recipes))
+        .where(models.Recipes.id == recipe_id)
+        .execution_options(populate_existing=True)
+    )
+    return recipe.unique().first()
+
+
+def _iter_export_recipes(db: Session, recipe_ids: List[int]):
+    """
+    Yield recipes in ``recipe_ids`` order, loading EXPORT_CHUNK_SIZE at a time.
+
+    Each chunk is one ``IN (...)`` query plus one selectinload query per
+    ingredient table; the chunk is expunged once serialized so the session
+    does not accumulate the whole catalog.
+    """
+    for start in range(0, len(recipe_ids), EXPORT_CHUNK_SIZE):
+        chunk_ids = recipe_ids[start:start + EXPORT_CHUNK_SIZE]
+        recipes = {
+            recipe.id: recipe
+            for recipe in _with_list_relationships(db.query(models.Recipes))
+            .filter(models.Recipes.id.in_(chunk_ids))
+        }
+        for recipe_id in chunk_ids:
+            if recipe_id in recipes:
+                yield recipes[recipe_id]
+        db.expunge_all()
+
+
 def _scale_value(value: Optional[float], scale_factor: float) -> Optional[float]:
     if value is None:
         return None
@@ -54,97 +118,298 @@ def _calculate_recipe_metrics(
     target_batch_size: float,
     boil_volume: Optional[float],
 ) -> schemas.RecipeMetrics:
-    metrics = schemas.RecipeMetrics()
-
-    if recipe.og is not None and recipe.fg is not None:
-        try:
-            metrics.abv = calculate_abv(recipe.og, recipe.fg)
-        except ValueError:
-            pass
-
-    ibu_total = 0.0
-    ibu_contributions = 0
-    if recipe.og is not None and boil_volume:
-        try:
-            boil_volume_l = float(boil_volume)
-        except (TypeError, ValueError):
-            boil_volume_l = None
-        if boil_volume_l and boil_volume_l > 0:
-            for hop in recipe.hops:
-                alpha = getattr(hop, "alpha", None)
-                amount = getattr(hop, "amount", None)
-                boil_time = getattr(hop, "time", None) or 0
-                use = (getattr(hop, "use", "") or "").lower()
-                if (
-                    alpha is None
-                    or amount is None
-                    or boil_time <= 0
-                    or use not in BOIL_UTILIZATION_USES
-                ):
-                    continue
-                try:
-                    ibu = calculate_ibu_tinseth(
-                        original_gravity=recipe.og,
-                        boil_volume_liters=boil_volume_l,
-                        hop_alpha_acid=float(alpha),
-                        hop_mass_grams=float(amount) * OUNCE_TO_GRAM,
-                        boil_time_minutes=float(boil_time),
-                    )
-                except (TypeError, ValueError):
-                    continue
-                ibu_total += ibu
-                ibu_contributions += 1
-            if ibu_contributions:
-                metrics.ibu = ibu_total
-
-    try:
-        batch_volume_l = float(target_batch_size)
-    except (TypeError, ValueError):
-        batch_volume_l = None
-    if batch_volume_l and batch_volume_l > 0:
-        grain_bill = []
-        for fermentable in recipe.fermentables:
-            amount = getattr(fermentable, "amount", None)
-            color = getattr(fermentable, "color", None)
-            if amount is None or color is None:
-                continue
-            try:
-                grain_bill.append((float(amount) * KILOGRAM_TO_POUND, float(color)))
-            except (TypeError, ValueError):
-                continue
-        if grain_bill:
-            volume_gal = batch_volume_l * LITER_TO_GALLON
-            try:
-                metrics.srm = calculate_srm_morey(grain_bill, volume_gal)
-            except ValueError:
-                pass
-
-    return metrics
+    engine = RecipeMetricsEngine.from_recipes(
+        [recipe.model_copy(update={"batch_size": target_batch_size, "boil_size": boil_volume})]
+    )
+    values = engine.compute()
+    return schemas.RecipeMetrics(
+        abv=values["abv"][0],
+        ibu=values["ibu"][0],
+        srm=values["srm"][0],
+    )
 
 
 # Get all recipes
 
 
-@router.get("/recipes", response_model=List[schemas.Recipe])
-async def get_all_recipes(db: Session = Depends(get_db)):
+@router.get(
+    "/recipes",
+    response_model=Union[List[schemas.Recipe], List[schemas.RecipeSummary]],
+)
+async def get_all_recipes(
+    response: Response,
+    cursor: Optional[int] = Query(
+        None, ge=0, description="Return recipes with an id greater than this cursor"
+    ),
+    limit: Optional[int] = Query(
+        None,
+        ge=1,
+        le=1000,
+        description="Maximum number of results (defaults to 100 when a cursor is given)",
+    ),
+    type: Optional[str] = Query(None, description="Filter by recipe type"),
+    brewer: Optional[str] = Query(None, description="Filter by brewer"),
+    is_batch: Optional[bool] = Query(
+        None, description="Filter recipes or batch copies of recipes"
+    ),
+    name_prefix: Optional[str] = Query(
+        None, min_length=1, description="Filter by recipe name prefix"
+    ),
+    fields: Literal["full", "summary"] = Query(
+        "full",
+        description="'summary' returns recipe columns and ingredient counts only",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    This endpoint returns recipes ordered by id, one page at a time.
+
+    Pagination is keyset based: pass the value of the ``X-Next-Cursor``
+    response header as ``cursor`` to fetch the following page. The header is
+    omitted once the last page has been returned. Without ``cursor`` or
+    ``limit`` every matching recipe is returned, for existing unpaginated
+    clients.
+    """
+    if limit is None and cursor is not None:
+        limit = DEFAULT_RECIPE_PAGE_SIZE
+
+    if fields == "summary":
+        query = select(
+            *RECIPE_SUMMARY_COLUMNS,
+            _ingredient_count(models.RecipeHop, "hop_count"),
+            _ingredient_count(models.RecipeFermentable, "fermentable_count"),
+            _ingredient_count(models.RecipeYeast, "yeast_count"),
+            _ingredient_count(models.RecipeMisc, "misc_count"),
+        )
+    else:
+        query = _with_list_relationships(select(models.Recipes))
+
+    if cursor is not None:
+        query = query.where(models.Recipes.id > cursor)
+    if type is not None:
+        query = query.where(models.Recipes.type == type)
+    if brewer is not None:
+        query = query.where(models.Recipes.brewer == brewer)
+    if is_batch is not None:
+        if is_batch:
+            query = query.where(models.Recipes.is_batch.is_(True))
+        else:
+            query = query.where(
+                (models.Recipes.is_batch.is_(False)) | (models.Recipes.is_batch.is_(None))
+            )
+    if name_prefix is not None:
+        query = query.where(models.Recipes.name.startswith(name_prefix, autoescape=True))
+
+    query = query.order_by(models.Recipes.id)
+    if limit is not None:
+        # Fetch one extra row to know whether another page exists
+        query = query.limit(limit + 1)
+    if fields == "summary":
+        rows = (await db.execute(query)).all()
+    else:
+        rows = (await db.scalars(query)).all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = str(rows[-1].id)
+
+    if fields == "summary":
+        return [schemas.RecipeSummary.model_validate(row) for row in rows]
+    return [schemas.Recipe.model_validate(recipe) for recipe in rows]
+
+
+# Calculate metrics for many recipes
+
+
+@router.post(
+    "/recipes/metrics:batch",
+    response_model=schemas.RecipeMetricsBatchResponse,
+    summary="Calculate metrics for many recipes",
+    response_description="Estimated OG/FG, ABV, IBU and SRM per recipe.",
+)
+async def calculate_recipe_metrics_batch(
+    payload: schemas.RecipeMetricsBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Calculate estimated gravity, ABV, bitterness and color for many recipes.
+
+    Ingredients are loaded with one column-only query per table and evaluated
+    with the vectorized RecipeMetricsEngine, so this scales to dashboards
+    showing hundreds of recipes. Measured OG/FG take precedence over the
+    estimates for ABV and IBU.
+    """
+    engine = await db.run_sync(RecipeMetricsEngine.from_database, payload.recipe_ids)
+    values = engine.compute(ibu_method=payload.ibu_method)
+
+    results = [
+        schemas.RecipeMetricsBatchItem(
+            recipe_id=recipe_id,
+            **{name: column[index] for name, column in values.items()},
+        )
+        for index, recipe_id in enumerate(engine.recipe_ids)
+    ]
+    found_ids = set(engine.recipe_ids)
+    missing_ids = [
+        recipe_id
+        for recipe_id in dict.fromkeys(payload.recipe_ids)
+        if recipe_id not in found_ids
+    ]
+    return schemas.RecipeMetricsBatchResponse(results=results, missing_ids=missing_ids)
+
+
+async def _style_match_results(db: AsyncSession, recipe_ids, names, values, **options):
+    index = await db.run_sync(style_index_cache.get)
+    matches = index.match(values, **options)
+    return [
+        schemas.RecipeStyleMatches(
+            recipe_id=recipe_id,
+            recipe_name=names[recipe_id],
+            matches=[schemas.StyleMatch.model_validate(match) for match in recipe_matches],
+        )
+        for recipe_id, recipe_matches in zip(recipe_ids, matches)
+    ]
+
+
+@router.get(
+    "/recipes/style-matches",
+    response_model=List[schemas.RecipeStyleMatches],
+    summary="Classify every recipe against the beer styles",
+    response_description="Best matching styles per recipe, ordered by recipe id.",
+)
+async def get_all_recipe_style_matches(
+    top: int = Query(1, ge=1, le=50, description="Styles returned per recipe"),
+    guideline_source_id: Optional[int] = Query(
+        None, description="Only match styles from this guideline source"
+    ),
+    in_range_only: bool = Query(
+        False, description="Only return styles the recipe fits on every metric"
+    ),
+    is_batch: Optional[bool] = Query(
+        None, description="Filter recipes or batch copies of recipes"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Score the stored OG, FG, ABV, IBU and SRM estimates of every recipe
+    against all beer style ranges in one vectorized pass.
+    """
+    recipe_ids, names, values = await db.run_sync(load_recipe_metrics, is_batch=is_batch)
+    return await _style_match_results(
+        db,
+        recipe_ids,
+        names,
+        values,
+        top=top,
+        guideline_source_id=guideline_source_id,
+        in_range_only=in_range_only,
+    )
+
+
+@router.get(
+    "/recipes/brewable",
+    response_model=List[schemas.RecipeBrewability],
+    summary="Find the recipes the current inventory can brew",
+    response_description="Recipes by inventory coverage, best covered first.",
+)
+async def get_brewable_recipes(
+    min_coverage: float = Query(
+        1.0,
+        ge=0.0,
+        le=1.0,
+        description=(
+            "Lowest coverage returned; below 1.0 partially covered recipes are "
+            "ranked too"
+        ),
+    ),
+    is_batch: Optional[bool] = Query(
+        False, description="Filter recipes or batch copies of recipes"
+    ),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of recipes"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    This endpoint returns all the recipes stored in the database.
+    Check every recipe's ingredients against the unallocated inventory in one
+    vectorized pass over a cached requirement matrix. Coverage is the mean
+    fraction of each ingredient's requirement in stock; ``missing`` lists the
+    ingredients short of their requirement.
+    """
+    query = select(models.Recipes.id, models.Recipes.name)
+    if is_batch is not None:
+        if is_batch:
+            query = query.where(models.Recipes.is_batch.is_(True))
+        else:
+            query = query.where(
+                models.Recipes.is_batch.is_(False) | models.Recipes.is_batch.is_(None)
+            )
+    names = dict((await db.execute(query)).all())
 
+    index, stock = await db.run_sync(feasibility_cache.get)
+    results = index.feasibility(
+        stock, recipe_ids=names, min_coverage=min_coverage, limit=limit
+    )
+    return [
+        schemas.RecipeBrewability(
+            recipe_id=result.recipe_id,
+            recipe_name=names.get(result.recipe_id),
+            brewable=result.brewable,
+            coverage=result.coverage,
+            ingredient_count=result.ingredient_count,
+            missing=[
+                schemas.MissingIngredient(inventory_item_type=item_type, name=name)
+                for item_type, name in result.missing
+            ],
+        )
+        for result in results
+    ]
+
+
+@router.get(
+    "/recipes/{recipe_id}/style-matches",
+    response_model=schemas.RecipeStyleMatches,
+    summary="Find the beer styles a recipe fits",
+    response_description="Best matching styles, best first.",
+)
+async def get_recipe_style_matches(
+    recipe_id: int,
+    top: int = Query(5, ge=1, le=50, description="Maximum number of styles"),
+    guideline_source_id: Optional[int] = Query(
+        None, description="Only match styles from this guideline source"
+    ),
+    in_range_only: bool = Query(
+        False, description="Only return styles the recipe fits on every metric"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Rank beer styles by how well the recipe's estimated OG, FG, ABV, IBU and
+    SRM fall within their ranges. Styles the recipe fits on every metric come
+    first; ``out_of_range`` lists the metrics that miss for partial fits.
     """
-    recipes = _with_relationships(db.query(models.Recipes)).all()
-    return recipes
+    recipe_ids, names, values = await db.run_sync(load_recipe_metrics, recipe_ids=[recipe_id])
+    if not recipe_ids:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    results = await _style_match_results(
+        db,
+        recipe_ids,
+        names,
+        values,
+        top=top,
+        guideline_source_id=guideline_source_id,
+        in_range_only=in_range_only,
+    )
+    return results[0]
 
 
 # Get a recipe by ID
 
 
 @router.get("/recipes/{recipe_id}", response_model=schemas.Recipe)
-async def get_recipe_by_id(recipe_id: int, db: Session = Depends(get_db)):
+async def get_recipe_by_id(recipe_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     This endpoint returns a recipe by its ID.
 
     """
-    recipe = _fetch_recipe(db, recipe_id)
+    recipe = await _fetch_recipe(db, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     return recipe
@@ -154,15 +419,15 @@ async def get_recipe_by_id(recipe_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/recipes", response_model=schemas.Recipe)
-async def create_recipe(recipe: schemas.RecipeBase, db: Session = Depends(get_db)):
+async def create_recipe(recipe: schemas.RecipeBase, db: AsyncSession = Depends(get_async_db)):
     """
     This endpoint creates a new recipe in the database.
 
     """
     # Check if the recipe already exists
 
-    existing_recipe = (
-        db.query(models.Recipes).filter(models.Recipes.name == recipe.name).first()
+    existing_recipe = await db.scalar(
+        select(models.Recipes.id).where(models.Recipes.name == recipe.name).limit(1)
     )
     if existing_recipe:
         raise HTTPException(
@@ -173,8 +438,7 @@ async def create_recipe(recipe: schemas.RecipeBase, db: Session = Depends(get_db
         **recipe.model_dump(exclude={"hops", "fermentables", "yeasts", "miscs"})
     )
     db.add(db_recipe)
-    db.commit()
-    db.refresh(db_recipe)
+    await db.commit()
     # Add hops to the recipe
 
     for hop_data in recipe.hops:
@@ -197,8 +461,10 @@ async def create_recipe(recipe: schemas.RecipeBase, db: Session = Depends(get_db
     for yeast_data in recipe.yeasts:
         db_yeast = models.RecipeYeast(**yeast_data.model_dump(), recipe_id=db_recipe.id)
         db.add(db_yeast)
-    db.commit()
-    return _fetch_recipe(db, db_recipe.id)
+    await db.flush()
+    await db.run_sync(rebuild_recipe_metrics, [db_recipe.id])
+    await db.commit()
+    return await _fetch_recipe(db, db_recipe.id)
 
 
 # Update a recipe by ID
@@ -206,13 +472,13 @@ async def create_recipe(recipe: schemas.RecipeBase, db: Session = Depends(get_db
 
 @router.put("/recipes/{recipe_id}", response_model=schemas.Recipe)
 async def update_recipe(
-    recipe_id: int, recipe: schemas.RecipeBase, db: Session = Depends(get_db)
+    recipe_id: int, recipe: schemas.RecipeBase, db: AsyncSession = Depends(get_async_db)
 ):
     """
     This endpoint updates a recipe by its ID.
 
     """
-    db_recipe = db.query(models.Recipes).filter(models.Recipes.id == recipe_id).first()
+    db_recipe = await db.get(models.Recipes, recipe_id)
     if not db_recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     # Update the recipe
@@ -223,15 +489,15 @@ async def update_recipe(
         setattr(db_recipe, key, value)
     # Update hops
 
-    db.query(models.RecipeHop).filter(models.RecipeHop.recipe_id == recipe_id).delete()
+    await db.execute(delete(models.RecipeHop).where(models.RecipeHop.recipe_id == recipe_id))
     for hop_data in recipe.hops:
         db_hop = models.RecipeHop(**hop_data.model_dump(), recipe_id=recipe_id)
         db.add(db_hop)
     # Update fermentables
 
-    db.query(models.RecipeFermentable).filter(
-        models.RecipeFermentable.recipe_id == recipe_id
-    ).delete()
+    await db.execute(
+        delete(models.RecipeFermentable).where(models.RecipeFermentable.recipe_id == recipe_id)
+    )
     for fermentable_data in recipe.fermentables:
         db_fermentable = models.RecipeFermentable(
             **fermentable_data.model_dump(), recipe_id=recipe_id
@@ -239,48 +505,45 @@ async def update_recipe(
         db.add(db_fermentable)
     # Update miscs
 
-    db.query(models.RecipeMisc).filter(
-        models.RecipeMisc.recipe_id == recipe_id
-    ).delete()
+    await db.execute(delete(models.RecipeMisc).where(models.RecipeMisc.recipe_id == recipe_id))
     for misc_data in recipe.miscs:
         db_misc = models.RecipeMisc(**misc_data.model_dump(), recipe_id=recipe_id)
         db.add(db_misc)
     # Update yeasts
 
-    db.query(models.RecipeYeast).filter(
-        models.RecipeYeast.recipe_id == recipe_id
-    ).delete()
+    await db.execute(delete(models.RecipeYeast).where(models.RecipeYeast.recipe_id == recipe_id))
     for yeast_data in recipe.yeasts:
         db_yeast = models.RecipeYeast(**yeast_data.model_dump(), recipe_id=recipe_id)
         db.add(db_yeast)
-    db.commit()
-    return _fetch_recipe(db, recipe_id)
+    await db.flush()
+    await db.run_sync(rebuild_recipe_metrics, [recipe_id])
+    await db.commit()
+    return await _fetch_recipe(db, recipe_id)
 
 
 # Delete a recipe by ID
 
 
 @router.delete("/recipes/{recipe_id}")
-async def delete_recipe(recipe_id: int, db: Session = Depends(get_db)):
+async def delete_recipe(recipe_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     This endpoint deletes a recipe by its ID.
 
     """
-    db_recipe = db.query(models.Recipes).filter(models.Recipes.id == recipe_id).first()
+    db_recipe = await db.get(models.Recipes, recipe_id)
     if not db_recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    db.query(models.RecipeHop).filter(models.RecipeHop.recipe_id == recipe_id).delete()
-    db.query(models.RecipeFermentable).filter(
-        models.RecipeFermentable.recipe_id == recipe_id
-    ).delete()
-    db.query(models.RecipeMisc).filter(
-        models.RecipeMisc.recipe_id == recipe_id
-    ).delete()
-    db.query(models.RecipeYeast).filter(
-        models.RecipeYeast.recipe_id == recipe_id
-    ).delete()
-    db.delete(db_recipe)
-    db.commit()
+    for ingredient_model in (
+        models.RecipeHop,
+        models.RecipeFermentable,
+        models.RecipeMisc,
+        models.RecipeYeast,
+    ):
+        await db.execute(
+            delete(ingredient_model).where(ingredient_model.recipe_id == recipe_id)
+        )
+    await db.delete(db_recipe)
+    await db.commit()
     return {"message": "Recipe deleted successfully"}
 
 
@@ -288,9 +551,9 @@ async def delete_recipe(recipe_id: int, db: Session = Depends(get_db)):
 async def scale_recipe(
     recipe_id: int,
     payload: schemas.RecipeScaleRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    recipe = _fetch_recipe(db, recipe_id)
+    recipe = await _fetch_recipe(db, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -388,7 +651,7 @@ async def scale_recipe(
 async def scale_recipe_to_equipment(
     recipe_id: int,
     equipment_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Scale a recipe to match an equipment profile's batch size and boil size.
@@ -397,16 +660,12 @@ async def scale_recipe_to_equipment(
     allowing brewers to adapt recipes to their specific brewing equipment.
     """
     # Fetch the recipe
-    recipe = _fetch_recipe(db, recipe_id)
+    recipe = await _fetch_recipe(db, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     # Fetch the equipment profile
-    equipment = (
-        db.query(models.EquipmentProfiles)
-        .filter(models.EquipmentProfiles.id == equipment_id)
-        .first()
-    )
+    equipment = await db.get(models.EquipmentProfiles, equipment_id)
     if not equipment:
         raise HTTPException(status_code=404, detail="Equipment profile not found")
 
@@ -514,21 +773,31 @@ async def scale_recipe_to_equipment(
 # Individual ingredient CRUD endpoints
 
 
+async def _get_ingredient(db: AsyncSession, ingredient_model, recipe_id: int, ingredient_id: int):
+    return await db.scalar(
+        select(ingredient_model).where(
+            ingredient_model.id == ingredient_id,
+            ingredient_model.recipe_id == recipe_id,
+        )
+    )
+
+
 @router.post("/recipes/{recipe_id}/ingredients/hops")
 async def add_hop_to_recipe(
     recipe_id: int,
     hop: schemas.RecipeHopBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Add a hop ingredient to a recipe"""
-    recipe = db.query(models.Recipes).filter(models.Recipes.id == recipe_id).first()
+    recipe = await db.get(models.Recipes, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     db_hop = models.RecipeHop(**hop.model_dump(), recipe_id=recipe_id)
     db.add(db_hop)
-    db.commit()
-    db.refresh(db_hop)
+    await db.run_sync(apply_ingredient_change, recipe, new=ingredient_contribution(db_hop))
+    await db.commit()
+    await db.refresh(db_hop)
     return db_hop
 
 
@@ -537,25 +806,25 @@ async def update_hop_in_recipe(
     recipe_id: int,
     ingredient_id: int,
     hop: schemas.RecipeHopBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update a hop ingredient in a recipe"""
-    db_hop = (
-        db.query(models.RecipeHop)
-        .filter(
-            models.RecipeHop.id == ingredient_id,
-            models.RecipeHop.recipe_id == recipe_id,
-        )
-        .first()
-    )
+    db_hop = await _get_ingredient(db, models.RecipeHop, recipe_id, ingredient_id)
     if not db_hop:
         raise HTTPException(status_code=404, detail="Hop ingredient not found")
 
+    old_contribution = ingredient_contribution(db_hop)
     for key, value in hop.model_dump().items():
         setattr(db_hop, key, value)
+    await db.run_sync(
+        apply_ingredient_change,
+        await db.get(models.Recipes, recipe_id),
+        old=old_contribution,
+        new=ingredient_contribution(db_hop),
+    )
 
-    db.commit()
-    db.refresh(db_hop)
+    await db.commit()
+    await db.refresh(db_hop)
     return db_hop
 
 
@@ -563,22 +832,20 @@ async def update_hop_in_recipe(
 async def delete_hop_from_recipe(
     recipe_id: int,
     ingredient_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete a hop ingredient from a recipe"""
-    db_hop = (
-        db.query(models.RecipeHop)
-        .filter(
-            models.RecipeHop.id == ingredient_id,
-            models.RecipeHop.recipe_id == recipe_id,
-        )
-        .first()
-    )
+    db_hop = await _get_ingredient(db, models.RecipeHop, recipe_id, ingredient_id)
     if not db_hop:
         raise HTTPException(status_code=404, detail="Hop ingredient not found")
 
-    db.delete(db_hop)
-    db.commit()
+    await db.run_sync(
+        apply_ingredient_change,
+        await db.get(models.Recipes, recipe_id),
+        old=ingredient_contribution(db_hop),
+    )
+    await db.delete(db_hop)
+    await db.commit()
     return {"message": "Hop ingredient deleted successfully"}
 
 
@@ -586,10 +853,10 @@ async def delete_hop_from_recipe(
 async def add_fermentable_to_recipe(
     recipe_id: int,
     fermentable: schemas.RecipeFermentableBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Add a fermentable ingredient to a recipe"""
-    recipe = db.query(models.Recipes).filter(models.Recipes.id == recipe_id).first()
+    recipe = await db.get(models.Recipes, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -597,8 +864,9 @@ async def add_fermentable_to_recipe(
         **fermentable.model_dump(), recipe_id=recipe_id
     )
     db.add(db_fermentable)
-    db.commit()
-    db.refresh(db_fermentable)
+    await db.run_sync(apply_ingredient_change, recipe, new=ingredient_contribution(db_fermentable))
+    await db.commit()
+    await db.refresh(db_fermentable)
     return db_fermentable
 
 
@@ -607,25 +875,25 @@ async def update_fermentable_in_recipe(
     recipe_id: int,
     ingredient_id: int,
     fermentable: schemas.RecipeFermentableBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update a fermentable ingredient in a recipe"""
-    db_fermentable = (
-        db.query(models.RecipeFermentable)
-        .filter(
-            models.RecipeFermentable.id == ingredient_id,
-            models.RecipeFermentable.recipe_id == recipe_id,
-        )
-        .first()
-    )
+    db_fermentable = await _get_ingredient(db, models.RecipeFermentable, recipe_id, ingredient_id)
     if not db_fermentable:
         raise HTTPException(status_code=404, detail="Fermentable ingredient not found")
 
+    old_contribution = ingredient_contribution(db_fermentable)
     for key, value in fermentable.model_dump().items():
         setattr(db_fermentable, key, value)
+    await db.run_sync(
+        apply_ingredient_change,
+        await db.get(models.Recipes, recipe_id),
+        old=old_contribution,
+        new=ingredient_contribution(db_fermentable),
+    )
 
-    db.commit()
-    db.refresh(db_fermentable)
+    await db.commit()
+    await db.refresh(db_fermentable)
     return db_fermentable
 
 
@@ -633,22 +901,20 @@ async def update_fermentable_in_recipe(
 async def delete_fermentable_from_recipe(
     recipe_id: int,
     ingredient_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete a fermentable ingredient from a recipe"""
-    db_fermentable = (
-        db.query(models.RecipeFermentable)
-        .filter(
-            models.RecipeFermentable.id == ingredient_id,
-            models.RecipeFermentable.recipe_id == recipe_id,
-        )
-        .first()
-    )
+    db_fermentable = await _get_ingredient(db, models.RecipeFermentable, recipe_id, ingredient_id)
     if not db_fermentable:
         raise HTTPException(status_code=404, detail="Fermentable ingredient not found")
 
-    db.delete(db_fermentable)
-    db.commit()
+    await db.run_sync(
+        apply_ingredient_change,
+        await db.get(models.Recipes, recipe_id),
+        old=ingredient_contribution(db_fermentable),
+    )
+    await db.delete(db_fermentable)
+    await db.commit()
     return {"message": "Fermentable ingredient deleted successfully"}
 
 
@@ -656,17 +922,18 @@ async def delete_fermentable_from_recipe(
 async def add_yeast_to_recipe(
     recipe_id: int,
     yeast: schemas.RecipeYeastBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Add a yeast ingredient to a recipe"""
-    recipe = db.query(models.Recipes).filter(models.Recipes.id == recipe_id).first()
+    recipe = await db.get(models.Recipes, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     db_yeast = models.RecipeYeast(**yeast.model_dump(), recipe_id=recipe_id)
     db.add(db_yeast)
-    db.commit()
-    db.refresh(db_yeast)
+    await db.run_sync(apply_ingredient_change, recipe, new=ingredient_contribution(db_yeast))
+    await db.commit()
+    await db.refresh(db_yeast)
     return db_yeast
 
 
@@ -675,25 +942,25 @@ async def update_yeast_in_recipe(
     recipe_id: int,
     ingredient_id: int,
     yeast: schemas.RecipeYeastBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update a yeast ingredient in a recipe"""
-    db_yeast = (
-        db.query(models.RecipeYeast)
-        .filter(
-            models.RecipeYeast.id == ingredient_id,
-            models.RecipeYeast.recipe_id == recipe_id,
-        )
-        .first()
-    )
+    db_yeast = await _get_ingredient(db, models.RecipeYeast, recipe_id, ingredient_id)
     if not db_yeast:
         raise HTTPException(status_code=404, detail="Yeast ingredient not found")
 
+    old_contribution = ingredient_contribution(db_yeast)
     for key, value in yeast.model_dump().items():
         setattr(db_yeast, key, value)
+    await db.run_sync(
+        apply_ingredient_change,
+        await db.get(models.Recipes, recipe_id),
+        old=old_contribution,
+        new=ingredient_contribution(db_yeast),
+    )
 
-    db.commit()
-    db.refresh(db_yeast)
+    await db.commit()
+    await db.refresh(db_yeast)
     return db_yeast
 
 
@@ -701,22 +968,20 @@ async def update_yeast_in_recipe(
 async def delete_yeast_from_recipe(
     recipe_id: int,
     ingredient_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete a yeast ingredient from a recipe"""
-    db_yeast = (
-        db.query(models.RecipeYeast)
-        .filter(
-            models.RecipeYeast.id == ingredient_id,
-            models.RecipeYeast.recipe_id == recipe_id,
-        )
-        .first()
-    )
+    db_yeast = await _get_ingredient(db, models.RecipeYeast, recipe_id, ingredient_id)
     if not db_yeast:
         raise HTTPException(status_code=404, detail="Yeast ingredient not found")
 
-    db.delete(db_yeast)
-    db.commit()
+    await db.run_sync(
+        apply_ingredient_change,
+        await db.get(models.Recipes, recipe_id),
+        old=ingredient_contribution(db_yeast),
+    )
+    await db.delete(db_yeast)
+    await db.commit()
     return {"message": "Yeast ingredient deleted successfully"}
 
 
@@ -724,17 +989,17 @@ async def delete_yeast_from_recipe(
 async def add_misc_to_recipe(
     recipe_id: int,
     misc: schemas.RecipeMiscBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Add a misc ingredient to a recipe"""
-    recipe = db.query(models.Recipes).filter(models.Recipes.id == recipe_id).first()
+    recipe = await db.get(models.Recipes, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     db_misc = models.RecipeMisc(**misc.model_dump(), recipe_id=recipe_id)
     db.add(db_misc)
-    db.commit()
-    db.refresh(db_misc)
+    await db.commit()
+    await db.refresh(db_misc)
     return db_misc
 
 
@@ -743,25 +1008,18 @@ async def update_misc_in_recipe(
     recipe_id: int,
     ingredient_id: int,
     misc: schemas.RecipeMiscBase,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update a misc ingredient in a recipe"""
-    db_misc = (
-        db.query(models.RecipeMisc)
-        .filter(
-            models.RecipeMisc.id == ingredient_id,
-            models.RecipeMisc.recipe_id == recipe_id,
-        )
-        .first()
-    )
+    db_misc = await _get_ingredient(db, models.RecipeMisc, recipe_id, ingredient_id)
     if not db_misc:
         raise HTTPException(status_code=404, detail="Misc ingredient not found")
 
     for key, value in misc.model_dump().items():
         setattr(db_misc, key, value)
 
-    db.commit()
-    db.refresh(db_misc)
+    await db.commit()
+    await db.refresh(db_misc)
     return db_misc
 
 
@@ -769,22 +1027,15 @@ async def update_misc_in_recipe(
 async def delete_misc_from_recipe(
     recipe_id: int,
     ingredient_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Delete a misc ingredient from a recipe"""
-    db_misc = (
-        db.query(models.RecipeMisc)
-        .filter(
-            models.RecipeMisc.id == ingredient_id,
-            models.RecipeMisc.recipe_id == recipe_id,
-        )
-        .first()
-    )
+    db_misc = await _get_ingredient(db, models.RecipeMisc, recipe_id, ingredient_id)
     if not db_misc:
         raise HTTPException(status_code=404, detail="Misc ingredient not found")
 
-    db.delete(db_misc)
-    db.commit()
+    await db.delete(db_misc)
+    await db.commit()
     return {"message": "Misc ingredient deleted successfully"}
 
 
@@ -795,23 +1046,21 @@ async def delete_misc_from_recipe(
 async def create_recipe_version(
     recipe_id: int,
     version_data: schemas.RecipeVersionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Create a new version snapshot of a recipe"""
     import json
 
-    recipe = _fetch_recipe(db, recipe_id)
+    recipe = await _fetch_recipe(db, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
     # Get the current highest version number for this recipe
-    max_version = (
-        db.query(models.RecipeVersion.version_number)
-        .filter(models.RecipeVersion.recipe_id == recipe_id)
-        .order_by(models.RecipeVersion.version_number.desc())
-        .first()
+    max_version = await db.scalar(
+        select(func.max(models.RecipeVersion.version_number))
+        .where(models.RecipeVersion.recipe_id == recipe_id)
     )
-    next_version = (max_version[0] + 1) if max_version else 1
+    next_version = (max_version + 1) if max_version is not None else 1
 
     # Create a snapshot of the current recipe state
     recipe_dict = schemas.Recipe.model_validate(recipe).model_dump(mode="json")
@@ -826,8 +1075,8 @@ async def create_recipe_version(
         recipe_snapshot=recipe_snapshot,
     )
     db.add(db_version)
-    db.commit()
-    db.refresh(db_version)
+    await db.commit()
+    await db.refresh(db_version)
 
     return db_version
 
@@ -835,21 +1084,20 @@ async def create_recipe_version(
 @router.get("/recipes/{recipe_id}/versions", response_model=List[schemas.RecipeVersion])
 async def get_recipe_versions(
     recipe_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Get all version history for a recipe"""
-    recipe = db.query(models.Recipes).filter(models.Recipes.id == recipe_id).first()
+    recipe = await db.get(models.Recipes, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
-    versions = (
-        db.query(models.RecipeVersion)
-        .filter(models.RecipeVersion.recipe_id == recipe_id)
+    versions = await db.scalars(
+        select(models.RecipeVersion)
+        .where(models.RecipeVersion.recipe_id == recipe_id)
         .order_by(models.RecipeVersion.version_number.desc())
-        .all()
     )
 
-    return versions
+    return versions.all()
 
 
 # BeerXML Import/Export Endpoints
@@ -858,233 +1106,33 @@ async def get_recipe_versions(
 @router.post("/recipes/import/beerxml")
 async def import_beerxml_recipes(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Import recipes from BeerXML format.
 
     This endpoint accepts a BeerXML file and imports all recipes found within it.
-    The import process validates the XML structure and creates new recipe records
-    with all associated ingredients.
+    The upload is parsed incrementally and recipes are written in bulk batches,
+    each inside its own SAVEPOINT so a failing recipe is skipped on its own.
 
     Returns a summary of the import operation including success count and any errors.
     """
-    from modules.beerxml_parser import parse_beerxml, BeerXMLParseError, validate_beerxml
-    from pydantic import BaseModel
-
-    class BeerXMLImportResponse(BaseModel):
-        message: str
-        imported_count: int
-        skipped_count: int
-        errors: List[str]
-        recipe_ids: List[int]
-
-    # Read file content
-    try:
-        content = await file.read()
-    except Exception as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Failed to read uploaded file: {str(e)}"
-        )
-
-    # Validate XML first
-    validation = validate_beerxml(content)
-    if not validation["valid"]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid BeerXML: {', '.join(validation['errors'])}"
-        )
+    from modules.beerxml_parser import BeerXMLParseError
+    from modules.beerxml_importer import import_beerxml_stream
 
-    # Parse recipes
     try:
-        beerxml_recipes = parse_beerxml(content)
+        return await db.run_sync(import_beerxml_stream, file.file)
     except BeerXMLParseError as e:
         raise HTTPException(
             status_code=400,
-            detail=f"Failed to parse BeerXML: {str(e)}"
+            detail=f"Invalid BeerXML: {str(e)}"
         )
 
-    imported_count = 0
-    skipped_count = 0
-    errors = []
-    recipe_ids = []
-
-    for beerxml_recipe in beerxml_recipes:
-        try:
-            # Create recipe record
-            db_recipe = models.Recipes(
-                name=beerxml_recipe.name,
-                version=beerxml_recipe.version or 1,
-                type=beerxml_recipe.type,
-                brewer=beerxml_recipe.brewer,
-                asst_brewer=beerxml_recipe.asst_brewer,
-                batch_size=beerxml_recipe.batch_size,
-                boil_size=beerxml_recipe.boil_size,
-                boil_time=beerxml_recipe.boil_time,
-                efficiency=beerxml_recipe.efficiency,
-                notes=beerxml_recipe.notes,
-                taste_notes=beerxml_recipe.taste_notes,
-                taste_rating=beerxml_recipe.taste_rating,
-                og=beerxml_recipe.og,
-                fg=beerxml_recipe.fg,
-                fermentation_stages=beerxml_recipe.fermentation_stages,
-                primary_age=beerxml_recipe.primary_age,
-                primary_temp=beerxml_recipe.primary_temp,
-                secondary_age=beerxml_recipe.secondary_age,
-                secondary_temp=beerxml_recipe.secondary_temp,
-                tertiary_age=beerxml_recipe.tertiary_age,
-                age=beerxml_recipe.age,
-                age_temp=beerxml_recipe.age_temp,
-                carbonation_used=beerxml_recipe.carbonation_used,
-                est_og=beerxml_recipe.est_og,
-                est_fg=beerxml_recipe.est_fg,
-                est_color=beerxml_recipe.est_color,
-                ibu=beerxml_recipe.ibu,
-                ibu_method=beerxml_recipe.ibu_method,
-                est_abv=beerxml_recipe.est_abv,
-                abv=beerxml_recipe.abv,
-                actual_efficiency=beerxml_recipe.actual_efficiency,
-                calories=beerxml_recipe.calories,
-                display_batch_size=beerxml_recipe.display_batch_size,
-                display_boil_size=beerxml_recipe.display_boil_size,
-                display_og=beerxml_recipe.display_og,
-                display_fg=beerxml_recipe.display_fg,
-                display_primary_temp=beerxml_recipe.display_primary_temp,
-                display_secondary_temp=beerxml_recipe.display_secondary_temp,
-                display_tertiary_temp=beerxml_recipe.display_tertiary_temp,
-                display_age_temp=beerxml_recipe.display_age_temp,
-            )
-
-            db.add(db_recipe)
-            db.flush()  # Get the recipe ID
-
-            # Add hops
-            for hop in beerxml_recipe.hops:
-                db_hop = models.RecipeHop(
-                    recipe_id=db_recipe.id,
-                    name=hop.name,
-                    version=hop.version,
-                    alpha=hop.alpha,
-                    amount=hop.amount,
-                    use=hop.use,
-                    time=hop.time,
-                    notes=hop.notes,
-                    type=hop.type,
-                    form=hop.form,
-                    beta=hop.beta,
-                    hsi=hop.hsi,
-                    origin=hop.origin,
-                    substitutes=hop.substitutes,
-                    humulene=hop.humulene,
-                    caryophyllene=hop.caryophyllene,
-                    cohumulone=hop.cohumulone,
-                    myrcene=hop.myrcene,
-                    display_amount=hop.display_amount,
-                    inventory=hop.inventory,
-                    display_time=hop.display_time,
-                )
-                db.add(db_hop)
-
-            # Add fermentables
-            for ferm in beerxml_recipe.fermentables:
-                db_ferm = models.RecipeFermentable(
-                    recipe_id=db_recipe.id,
-                    name=ferm.name,
-                    version=ferm.version,
-                    type=ferm.type,
-                    amount=ferm.amount,
-                    yield_=ferm.yield_,
-                    color=ferm.color,
-                    add_after_boil=ferm.add_after_boil,
-                    origin=ferm.origin,
-                    supplier=ferm.supplier,
-                    notes=ferm.notes,
-                    coarse_fine_diff=ferm.coarse_fine_diff,
-                    moisture=ferm.moisture,
-                    diastatic_power=ferm.diastatic_power,
-                    protein=ferm.protein,
-                    max_in_batch=ferm.max_in_batch,
-                    recommend_mash=ferm.recommend_mash,
-                    ibu_gal_per_lb=ferm.ibu_gal_per_lb,
-                    display_amount=ferm.display_amount,
-                    potential=ferm.potential,
-                    inventory=ferm.inventory,
-                    display_color=ferm.display_color,
-                )
-                db.add(db_ferm)
-
-            # Add yeasts
-            for yeast in beerxml_recipe.yeasts:
-                db_yeast = models.RecipeYeast(
-                    recipe_id=db_recipe.id,
-                    name=yeast.name,
-                    version=yeast.version,
-                    type=yeast.type,
-                    form=yeast.form,
-                    amount=yeast.amount,
-                    amount_is_weight=yeast.amount_is_weight,
-                    laboratory=yeast.laboratory,
-                    product_id=yeast.product_id,
-                    min_temperature=yeast.min_temperature,
-                    max_temperature=yeast.max_temperature,
-                    flocculation=yeast.flocculation,
-                    attenuation=yeast.attenuation,
-                    notes=yeast.notes,
-                    best_for=yeast.best_for,
-                    max_reuse=yeast.max_reuse,
-                    times_cultured=yeast.times_cultured,
-                    add_to_secondary=yeast.add_to_secondary,
-                    display_amount=yeast.display_amount,
-                    disp_min_temp=yeast.disp_min_temp,
-                    disp_max_temp=yeast.disp_max_temp,
-                    inventory=yeast.inventory,
-                    culture_date=yeast.culture_date,
-                )
-                db.add(db_yeast)
-
-            # Add miscs
-            for misc in beerxml_recipe.miscs:
-                db_misc = models.RecipeMisc(
-                    recipe_id=db_recipe.id,
-                    name=misc.name,
-                    version=misc.version,
-                    type=misc.type,
-                    use=misc.use,
-                    amount=misc.amount,
-                    time=misc.time,
-                    amount_is_weight=misc.amount_is_weight,
-                    use_for=misc.use_for,
-                    notes=misc.notes,
-                    display_amount=misc.display_amount,
-                    inventory=misc.inventory,
-                    display_time=misc.display_time,
-                    batch_size=misc.batch_size,
-                )
-                db.add(db_misc)
-
-            db.commit()
-            recipe_ids.append(db_recipe.id)
-            imported_count += 1
-
-        except Exception as e:
-            db.rollback()
-            skipped_count += 1
-            errors.append(f"Failed to import recipe '{beerxml_recipe.name}': {str(e)}")
-
-    return BeerXMLImportResponse(
-        message=f"Import completed: {imported_count} recipes imported, {skipped_count} skipped",
-        imported_count=imported_count,
-        skipped_count=skipped_count,
-        errors=errors,
-        recipe_ids=recipe_ids,
-    )
-
 
 @router.get("/recipes/{recipe_id}/export/beerxml")
 async def export_recipe_beerxml(
     recipe_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Export a single recipe to BeerXML format.
@@ -1095,7 +1143,7 @@ async def export_recipe_beerxml(
     from fastapi.responses import Response
 
     # Fetch recipe with all relationships
-    recipe = _fetch_recipe(db, recipe_id)
+    recipe = await _fetch_recipe(db, recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -1113,7 +1161,7 @@ async def export_recipe_beerxml(
 
     return Response(
         content=xml_content.encode('utf-8'),
-        media_type="application/xml",
+        media_type="application/xml; charset=utf-8",
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
         }
@@ -1121,7 +1169,7 @@ async def export_recipe_beerxml(
 
 
 @router.post("/recipes/export/beerxml")
-async def export_multiple_recipes_beerxml(
+def export_multiple_recipes_beerxml(
     recipe_ids: List[int],
     db: Session = Depends(get_db),
 ):
@@ -1129,9 +1177,12 @@ async def export_multiple_recipes_beerxml(
     Export multiple recipes to a single BeerXML file.
 
     Accepts a list of recipe IDs and returns them in a single BeerXML file.
+    The export streams from a synchronous session through a synchronous
+    iterator, so this handler and the response body both run in the
+    threadpool rather than on the event loop.
     """
-    from modules.beerxml_exporter import export_to_beerxml, BeerXMLExportError
-    from fastapi.responses import Response
+    from modules.beerxml_exporter import iter_beerxml_export
+    from fastapi.responses import StreamingResponse
 
     if not recipe_ids:
         raise HTTPException(
@@ -1139,30 +1190,24 @@ async def export_multiple_recipes_beerxml(
             detail="No recipe IDs provided"
         )
 
-    # Fetch all recipes
-    recipes = []
-    for recipe_id in recipe_ids:
-        recipe = _fetch_recipe(db, recipe_id)
-        if recipe:
-            recipes.append(recipe)
+    # Resolve which of the requested recipes exist with a single id-only query
+    requested_ids = list(dict.fromkeys(recipe_ids))
+    found_ids = set(
+        db.scalars(
+            select(models.Recipes.id).where(models.Recipes.id.in_(requested_ids))
+        )
+    )
+    export_ids = [recipe_id for recipe_id in requested_ids if recipe_id in found_ids]
 
-    if not recipes:
+    if not export_ids:
         raise HTTPException(
             status_code=404,
             detail="No recipes found with the provided IDs"
         )
 
-    try:
-        xml_content = export_to_beerxml(recipes, pretty_print=True)
-    except BeerXMLExportError as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to export recipes: {str(e)}"
-        )
-
-    return Response(
-        content=xml_content.encode('utf-8'),
-        media_type="application/xml",
+    return StreamingResponse(
+        iter_beerxml_export(_iter_export_recipes(db, export_ids), pretty_print=True),
+        media_type="application/xml; charset=utf-8",
         headers={
             "Content-Disposition": "attachment; filename=recipes_export.xml"
         }
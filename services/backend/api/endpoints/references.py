@@ -5,11 +5,12 @@ try:
 except ImportError:  # pragma: no cover - fallback when bs4 is unavailable
     BeautifulSoup = None
 from urllib.parse import urlparse, urljoin
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, Request, UploadFile, File
 from sqlalchemy.orm import Session
 from database import get_db
 import Database.Models as models
 import Database.Schemas as schemas
+from api.response_cache import response_cache
 from typing import List
 import xml.etree.ElementTree as ET
 from fastapi.responses import StreamingResponse
@@ -23,6 +24,8 @@ except ImportError:  # pragma: no cover - fallback when requests is unavailable
 
 router = APIRouter()
 
+REFERENCE_TAG = models.References.__tablename__
+
 # References Endpoints
 
 
@@ -49,6 +52,54 @@ class ReferenceImportResponse(BaseModel):
     )
 
 
+def import_reference_stream(db: Session, source, on_progress=None):
+    """
+    Incrementally parse a references XML document and stage its records.
+
+    Records are added to the session but not committed, so the caller decides
+    whether a partially read document is kept.
+
+    Args:
+        db: SQLAlchemy session
+        source: Binary file-like object or path of the XML document
+        on_progress: Optional callback invoked as ``on_progress(imported, skipped)``
+            after each reference element
+
+    Returns:
+        Tuple of (imported_count, skipped_count)
+
+    Raises:
+        ET.ParseError: If the document is not well-formed XML
+    """
+    imported_count = 0
+    skipped_count = 0
+    for _, ref_element in ET.iterparse(source):
+        if ref_element.tag != "reference":
+            continue
+        name = _element_text(ref_element, "name")
+        url = _element_text(ref_element, "url")
+        if not name or not url:
+            # Skip malformed records rather than failing the whole import
+            skipped_count += 1
+        else:
+            description = _element_text(ref_element, "description", "")
+            category = _element_text(ref_element, "category", "")
+            favicon_url = fetch_favicon(url)
+            reference = models.References(
+                name=name,
+                url=url,
+                description=description,
+                category=category,
+                favicon_url=favicon_url,
+            )
+            db.add(reference)
+            imported_count += 1
+        ref_element.clear()
+        if on_progress is not None:
+            on_progress(imported_count, skipped_count)
+    return imported_count, skipped_count
+
+
 @router.post(
     "/references/import",
     response_model=ReferenceImportResponse,
@@ -58,37 +109,16 @@ class ReferenceImportResponse(BaseModel):
 async def import_references(
     db: Session = Depends(get_db), file: UploadFile = File(...)
 ):
-    contents = await file.read()
     try:
-        tree = ET.ElementTree(ET.fromstring(contents))
+        imported_count, skipped_count = import_reference_stream(db, file.file)
     except ET.ParseError as parse_error:
+        db.rollback()
         raise HTTPException(
             status_code=400,
             detail=f"Provided file is not valid XML: {parse_error}",
         ) from parse_error
-    root = tree.getroot()
-    imported_count = 0
-    skipped_count = 0
-    for ref_element in root.findall("reference"):
-        name = _element_text(ref_element, "name")
-        url = _element_text(ref_element, "url")
-        if not name or not url:
-            # Skip malformed records rather than failing the whole import
-            skipped_count += 1
-            continue
-        description = _element_text(ref_element, "description", "")
-        category = _element_text(ref_element, "category", "")
-        favicon_url = fetch_favicon(url)
-        reference = models.References(
-            name=name,
-            url=url,
-            description=description,
-            category=category,
-            favicon_url=favicon_url,
-        )
-        db.add(reference)
-        imported_count += 1
     db.commit()
+    response_cache.invalidate(REFERENCE_TAG)
     return ReferenceImportResponse(
         message="References imported successfully",
         imported_records=imported_count,
@@ -124,9 +154,13 @@ async def export_references(db: Session = Depends(get_db)):
 
 
 @router.get("/references", response_model=List[schemas.Reference])
-async def get_all_references(db: Session = Depends(get_db)):
-    references = db.query(models.References).all()
-    return references
+async def get_all_references(request: Request, db: Session = Depends(get_db)):
+    return response_cache.respond(
+        request,
+        (REFERENCE_TAG,),
+        lambda: db.query(models.References).all(),
+        List[schemas.Reference],
+    )
 
 
 @router.get("/references/{reference_id}", response_model=schemas.Reference)
@@ -149,6 +183,7 @@ async def create_reference(
     db_reference = models.References(**reference_data)
     db.add(db_reference)
     db.commit()
+    response_cache.invalidate(REFERENCE_TAG)
     db.refresh(db_reference)
     return db_reference
 
@@ -162,6 +197,7 @@ async def delete_reference(reference_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Reference not found")
     db.delete(reference)
     db.commit()
+    response_cache.invalidate(REFERENCE_TAG)
     return reference
 
 
@@ -179,6 +215,7 @@ async def update_reference(
     for key, value in reference.model_dump().items():
         setattr(db_reference, key, value)
     db.commit()
+    response_cache.invalidate(REFERENCE_TAG)
     db.refresh(db_reference)
     return db_reference
 
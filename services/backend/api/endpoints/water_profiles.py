@@ -1,18 +1,22 @@
 # api/endpoints/water_profiles.py
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from sqlalchemy.orm import Session
 from database import get_db
 import Database.Models as models
 import Database.Schemas as schemas
+from api.response_cache import response_cache
 from typing import List, Optional
 from datetime import datetime, timezone
 
 router = APIRouter()
 
+WATER_PROFILE_TAG = models.WaterProfiles.__tablename__
+
 
 @router.get("/water-profiles", response_model=List[schemas.WaterProfile])
 async def get_water_profiles(
+    request: Request,
     profile_type: Optional[str] = Query(None, pattern="^(source|target)$"),
     style_category: Optional[str] = None,
     is_default: Optional[bool] = None,
@@ -25,19 +29,24 @@ async def get_water_profiles(
     - **style_category**: Filter by beer style category
     - **is_default**: Filter by default profiles (True) or custom profiles (False)
     """
-    query = db.query(models.WaterProfiles)
 
-    if profile_type:
-        query = query.filter(models.WaterProfiles.profile_type == profile_type)
+    def _load():
+        query = db.query(models.WaterProfiles)
+
+        if profile_type:
+            query = query.filter(models.WaterProfiles.profile_type == profile_type)
 
-    if style_category:
-        query = query.filter(models.WaterProfiles.style_category == style_category)
+        if style_category:
+            query = query.filter(models.WaterProfiles.style_category == style_category)
 
-    if is_default is not None:
-        query = query.filter(models.WaterProfiles.is_default == is_default)
+        if is_default is not None:
+            query = query.filter(models.WaterProfiles.is_default == is_default)
 
-    profiles = query.order_by(models.WaterProfiles.name).all()
-    return profiles
+        return query.order_by(models.WaterProfiles.name).all()
+
+    return response_cache.respond(
+        request, (WATER_PROFILE_TAG,), _load, List[schemas.WaterProfile]
+    )
 
 
 @router.post("/water-profiles", response_model=schemas.WaterProfile, status_code=201)
@@ -70,6 +79,7 @@ async def create_water_profile(
     db_profile = models.WaterProfiles(**profile.model_dump())
     db.add(db_profile)
     db.commit()
+    response_cache.invalidate(WATER_PROFILE_TAG)
     db.refresh(db_profile)
     return db_profile
 
@@ -144,6 +154,7 @@ async def update_water_profile(
     profile.updated_at = datetime.now(timezone.utc)
 
     db.commit()
+    response_cache.invalidate(WATER_PROFILE_TAG)
     db.refresh(profile)
     return profile
 
@@ -169,6 +180,7 @@ async def delete_water_profile(profile_id: int, db: Session = Depends(get_db)):
 
     db.delete(profile)
     db.commit()
+    response_cache.invalidate(WATER_PROFILE_TAG)
     return profile
 
 
@@ -242,5 +254,6 @@ async def duplicate_water_profile(
     duplicate = models.WaterProfiles(**duplicate_data)
     db.add(duplicate)
     db.commit()
+    response_cache.invalidate(WATER_PROFILE_TAG)
     db.refresh(duplicate)
     return duplicate
@@ -7,12 +7,19 @@ API endpoints for yeast management features:
 """
 from fastapi import APIRouter, HTTPException, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 from database import get_db
 import Database.Models as models
 import Database.Schemas as schemas
+from modules.yeast_genealogy import (
+    MAX_LINEAGE_DEPTH,
+    ancestors,
+    descendant_tree,
+    descendants,
+)
+from modules.yeast_viability_report import viability_report
 from utils.yeast_viability import YeastViabilityCalculator
 
 router = APIRouter()
@@ -218,51 +225,74 @@ async def delete_yeast_harvest(harvest_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(exc))
 
 
-@router.get("/yeast-harvests/{harvest_id}/genealogy")
-async def get_harvest_genealogy(harvest_id: int, db: Session = Depends(get_db)):
-    """Get the genealogy tree for a yeast harvest"""
+def _get_harvest_or_404(db: Session, harvest_id: int) -> models.YeastHarvest:
     harvest = db.query(models.YeastHarvest).filter(models.YeastHarvest.id == harvest_id).first()
     if not harvest:
         raise HTTPException(status_code=404, detail="Yeast harvest not found")
+    return harvest
+
+
+def _relatives(rows) -> List[schemas.YeastHarvestRelative]:
+    return [
+        schemas.YeastHarvestRelative(
+            **schemas.YeastHarvest.model_validate(harvest).model_dump(), depth=depth
+        )
+        for harvest, depth in rows
+    ]
 
-    # Build genealogy tree
-    genealogy = {
+
+@router.get("/yeast-harvests/{harvest_id}/genealogy")
+async def get_harvest_genealogy(
+    harvest_id: int,
+    max_depth: Optional[int] = Query(
+        None, ge=1, le=MAX_LINEAGE_DEPTH, description="Generations followed up and down"
+    ),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the genealogy tree for a yeast harvest.
+
+    Ancestors (nearest first) and the nested descendants are each read with
+    one lookup in the lineage closure table.
+    """
+    harvest = _get_harvest_or_404(db, harvest_id)
+    return {
         "current": harvest,
-        "ancestors": [],
-        "descendants": []
+        "ancestors": [parent for parent, _ in ancestors(db, harvest_id, max_depth=max_depth)],
+        "descendants": descendant_tree(db, harvest_id, max_depth=max_depth),
     }
 
-    # Get ancestors
-    current = harvest
-    while current.parent_harvest_id:
-        parent = db.query(models.YeastHarvest).filter(
-            models.YeastHarvest.id == current.parent_harvest_id
-        ).first()
-        if parent:
-            genealogy["ancestors"].append(parent)
-            current = parent
-        else:
-            break
-
-    # Get descendants (recursive function would be better for deep trees)
-    def get_children(parent_id):
-        return db.query(models.YeastHarvest).filter(
-            models.YeastHarvest.parent_harvest_id == parent_id
-        ).all()
-
-    def build_descendants(parent_id):
-        children = get_children(parent_id)
-        result = []
-        for child in children:
-            result.append({
-                "harvest": child,
-                "children": build_descendants(child.id)
-            })
-        return result
 
-    genealogy["descendants"] = build_descendants(harvest_id)
+@router.get(
+    "/yeast-harvests/{harvest_id}/ancestors",
+    response_model=List[schemas.YeastHarvestRelative],
+)
+async def get_harvest_ancestors(
+    harvest_id: int,
+    max_depth: Optional[int] = Query(None, ge=1, le=MAX_LINEAGE_DEPTH),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Get the ancestors of a yeast harvest, nearest first"""
+    _get_harvest_or_404(db, harvest_id)
+    return _relatives(ancestors(db, harvest_id, max_depth=max_depth, skip=skip, limit=limit))
+
 
-    return genealogy
+@router.get(
+    "/yeast-harvests/{harvest_id}/descendants",
+    response_model=List[schemas.YeastHarvestRelative],
+)
+async def get_harvest_descendants(
+    harvest_id: int,
+    max_depth: Optional[int] = Query(None, ge=1, le=MAX_LINEAGE_DEPTH),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Get every descendant of a yeast harvest, by generation"""
+    _get_harvest_or_404(db, harvest_id)
+    return _relatives(descendants(db, harvest_id, max_depth=max_depth, skip=skip, limit=limit))
 
 
 # ========== Viability Calculator Endpoint ==========
@@ -290,6 +320,41 @@ async def calculate_yeast_viability(request: schemas.ViabilityCalculationRequest
         raise HTTPException(status_code=400, detail=str(exc))
 
 
+@router.get(
+    "/yeasts/inventory/viability",
+    response_model=List[schemas.YeastViabilityReportItem],
+)
+async def get_yeast_viability_report(
+    source: Optional[Literal["inventory", "harvest"]] = None,
+    status: Optional[Literal["excellent", "good", "fair", "poor", "expired"]] = None,
+    expires_before: Optional[datetime] = None,
+    sort: Literal["predicted_expiry", "viability", "name"] = "predicted_expiry",
+    target_cells: float = Query(200.0, gt=0, description="Pitch size in billions of cells"),
+    include_unavailable: bool = False,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Calculate current viability for every yeast in the inventory and every harvest.
+
+    Viability, status, starter size and predicted expiry are computed for
+    the whole fleet at once; stored viabilities are not updated. By default
+    only unallocated inventory yeasts and active harvests are reported,
+    soonest predicted expiry first.
+    """
+    report = viability_report(
+        db,
+        source=source,
+        status=status,
+        expires_before=expires_before,
+        sort=sort,
+        target_cells=target_cells,
+        include_unavailable=include_unavailable,
+    )
+    return report[skip:skip + limit]
+
+
 @router.get("/yeasts/inventory/{inventory_id}/viability")
 async def get_inventory_yeast_viability(
     inventory_id: int,
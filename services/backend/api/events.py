@@ -0,0 +1,238 @@
+"""
+In-process publish/subscribe for live batch updates.
+
+Endpoints that write fermentation readings or change a batch's status
+publish an Event on the batch's topic after committing; the SSE and
+WebSocket endpoints subscribe and forward events to clients as they
+arrive. Every event gets an increasing id, and the most recent
+``settings.EVENT_HISTORY_SIZE`` events of each topic are kept so a client
+that reconnects with the last id it saw receives only what it missed.
+
+The broker lives in the API process. With several workers each one has
+its own broker, so every worker must receive the writes its clients care
+about (e.g. by routing a batch's devices and dashboards to one worker).
+"""
+
+import asyncio
+import json
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from config import settings
+from logger_config import get_logger
+
+logger = get_logger("events")
+
+# Sent instead of a replay when the requested events are no longer retained;
+# clients should re-fetch the full state
+RESET_EVENT = "reset"
+
+# Events buffered for a subscriber that is not keeping up before it is dropped
+MAX_PENDING_EVENTS = 1000
+
+
+def batch_topic(batch_id: int) -> str:
+    return f"batches/{batch_id}"
+
+
+def topic_batch_id(topic: str) -> Optional[int]:
+    """Batch id of a ``batch_topic``, or None for other topics."""
+    prefix, _, batch_id = topic.partition("/")
+    if prefix != "batches" or not batch_id.isdigit():
+        return None
+    return int(batch_id)
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    topic: str
+    type: str
+    data: Any
+
+    def to_sse(self) -> str:
+        """Server-Sent Events frame"""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+    def to_message(self) -> Dict[str, Any]:
+        """WebSocket JSON message"""
+        return {"id": self.id, "event": self.type, "data": self.data}
+
+
+class Subscription:
+    """
+    A client's view of one topic.
+
+    Events are queued on the subscriber's event loop; ``events`` yields them
+    until the subscription is closed, falls too far behind, or the optional
+    time limit is reached.
+    """
+
+    def __init__(self, broker: "EventBroker", topic: str, loop: asyncio.AbstractEventLoop):
+        self.broker = broker
+        self.topic = topic
+        self.loop = loop
+        self.overflowed = False
+        self._queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _deliver(self, event: Optional[Event]) -> None:
+        if self.overflowed:
+            return
+        if event is not None and self._queue.qsize() >= MAX_PENDING_EVENTS:
+            # Wake the consumer so it ends the stream; the client resumes by id
+            self.overflowed = True
+            event = None
+        self._queue.put_nowait(event)
+
+    def close(self) -> None:
+        """Unsubscribe and end ``events``; must be called on the subscriber's loop."""
+        self.broker.unsubscribe(self)
+        self._queue.put_nowait(None)
+
+    async def events(
+        self, keepalive: float, max_seconds: Optional[float] = None
+    ) -> AsyncIterator[Optional[Event]]:
+        """
+        Yield events as they arrive, and None every ``keepalive`` seconds
+        without one so the caller can keep the connection alive.
+        """
+        deadline = None if not max_seconds else self.loop.time() + max_seconds
+        while True:
+            timeout = keepalive
+            if deadline is not None:
+                remaining = deadline - self.loop.time()
+                if remaining <= 0:
+                    return
+                timeout = min(timeout, remaining)
+            try:
+                event = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                if deadline is not None and self.loop.time() >= deadline:
+                    return
+                yield None
+                continue
+            if event is None:
+                return
+            yield event
+
+
+class EventBroker:
+    """
+    Fan-out of published events to subscriptions, with per-topic history.
+
+    ``publish`` may be called from any thread; subscribing happens on the
+    event loop of the connection being served. Listeners added with
+    ``add_listener`` are called synchronously, on the publishing thread,
+    with every event of every topic.
+    """
+
+    def __init__(self, history_size: int = 500):
+        self.history_size = history_size
+        self._lock = Lock()
+        self._last_id = 0
+        self._history: Dict[str, Deque[Event]] = {}
+        # Highest event id dropped from each topic's history
+        self._evicted: Dict[str, int] = {}
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._listeners: List[Callable[[Event], None]] = []
+
+    @property
+    def last_event_id(self) -> int:
+        return self._last_id
+
+    def publish(self, topic: str, event_type: str, data: Any) -> Event:
+        """Record an event and deliver it to the topic's subscribers."""
+        data = jsonable_encoder(data)
+        with self._lock:
+            self._last_id += 1
+            event = Event(id=self._last_id, topic=topic, type=event_type, data=data)
+            history = self._history.setdefault(topic, deque(maxlen=self.history_size))
+            if len(history) == history.maxlen:
+                self._evicted[topic] = history[0].id
+            history.append(event)
+            subscriptions = list(self._subscriptions.get(topic, ()))
+            listeners = list(self._listeners)
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Event listener failed for {topic}: {e}")
+        return event
+
+    def add_listener(self, listener: Callable[[Event], None]) -> None:
+        """Call ``listener`` with every published event; it must not block."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Event], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def subscribe(self, topic: str, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Subscribe the running event loop to ``topic``.
+
+        Args:
+            topic: Topic to follow, e.g. ``batch_topic(batch_id)``
+            last_event_id: Last event id the client received; retained events
+                after it are queued first. If some of them are no longer
+                retained, or the id is from before a restart, a ``reset``
+                event is queued instead.
+        """
+        subscription = Subscription(self, topic, asyncio.get_running_loop())
+        with self._lock:
+            if last_event_id is not None:
+                if last_event_id > self._last_id or last_event_id < self._evicted.get(topic, 0):
+                    subscription._deliver(
+                        Event(
+                            id=self._last_id,
+                            topic=topic,
+                            type=RESET_EVENT,
+                            data={"reason": "events since last_event_id are not available"},
+                        )
+                    )
+                else:
+                    for event in self._history.get(topic, ()):
+                        if event.id > last_event_id:
+                            subscription._deliver(event)
+            self._subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.topic)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.topic]
+
+    def subscriber_count(self, topic: str) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(topic, ()))
+
+    def clear(self) -> None:
+        """Drop retained history (subscriptions are kept)."""
+        with self._lock:
+            self._history.clear()
+            self._evicted.clear()
+
+
+event_broker = EventBroker(history_size=settings.EVENT_HISTORY_SIZE)
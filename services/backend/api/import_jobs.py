@@ -0,0 +1,371 @@
+"""
+Background runner for BeerXML and reference imports.
+
+Uploads are spooled to ``settings.UPLOAD_DIR`` and recorded as ImportJob
+rows; a thread pool then parses and inserts them outside the request so a
+large file does not tie up an API worker. Job progress is written to the
+database with short-lived sessions, so it can be polled while the import is
+running and survives restarts.
+
+Every API worker runs its own ImportJobRunner against the shared table.
+Jobs are owned by the worker that created them, which renews a lease on
+them from a heartbeat thread while they are queued or running. A job is
+claimed with one conditional UPDATE, so it runs at most once, and another
+worker only recovers jobs whose lease has expired.
+"""
+
+import os
+import shutil
+import socket
+import uuid
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from threading import Event, RLock, Thread
+from typing import BinaryIO, Callable, Dict, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session, sessionmaker
+
+import Database.Models as models
+from Database.enums import ImportJobStatus, ImportJobType
+from api.response_cache import response_cache
+from config import settings
+from database import get_session_local
+from logger_config import get_logger
+
+logger = get_logger("import_jobs")
+
+# Persist progress at most this often for per-record importers
+PROGRESS_INTERVAL = 50
+
+
+def _run_beerxml_import(db: Session, job: models.ImportJob, update: Callable) -> dict:
+    from modules.beerxml_importer import import_beerxml_stream
+
+    def _progress(result, parsed_count):
+        update(
+            parsed_count=parsed_count,
+            inserted_count=result.imported_count,
+            failed_count=result.skipped_count,
+        )
+
+    with open(job.file_path, "rb") as source:
+        result = import_beerxml_stream(db, source, on_progress=_progress)
+
+    return {
+        "inserted_count": result.imported_count,
+        "failed_count": result.skipped_count,
+        "parsed_count": result.imported_count + result.skipped_count,
+        "errors": result.errors,
+        "result": {"recipe_ids": result.recipe_ids},
+    }
+
+
+def _run_reference_import(db: Session, job: models.ImportJob, update: Callable) -> dict:
+    from api.endpoints.references import import_reference_stream
+
+    def _progress(imported_count, skipped_count):
+        parsed_count = imported_count + skipped_count
+        if parsed_count % PROGRESS_INTERVAL == 0:
+            update(parsed_count=parsed_count, failed_count=skipped_count)
+
+    with open(job.file_path, "rb") as source:
+        imported_count, skipped_count = import_reference_stream(
+            db, source, on_progress=_progress
+        )
+    db.commit()
+    response_cache.invalidate(models.References.__tablename__)
+
+    return {
+        "inserted_count": imported_count,
+        "failed_count": skipped_count,
+        "parsed_count": imported_count + skipped_count,
+    }
+
+
+JOB_HANDLERS = {
+    ImportJobType.BEERXML.value: _run_beerxml_import,
+    ImportJobType.REFERENCES.value: _run_reference_import,
+}
+
+
+class ImportJobRunner:
+    """
+    Thread pool that executes queued ImportJob rows.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[sessionmaker] = None,
+        max_workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self._session_factory = session_factory
+        self._max_workers = max_workers or settings.IMPORT_JOB_WORKERS
+        self._executor: Optional[Executor] = executor
+        self._futures: Dict[int, Future] = {}
+        self._lock = RLock()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._heartbeat: Optional[Thread] = None
+        self._stopping = Event()
+
+    @property
+    def session_factory(self) -> sessionmaker:
+        if self._session_factory is None:
+            self._session_factory = get_session_local()
+        return self._session_factory
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="import-job",
+                )
+            return self._executor
+
+    def _lease_expiry(self) -> datetime:
+        return datetime.now() + timedelta(seconds=settings.IMPORT_JOB_LEASE_SECONDS)
+
+    def _start_heartbeat(self) -> None:
+        with self._lock:
+            if self._heartbeat is not None:
+                return
+            self._stopping.clear()
+            self._heartbeat = Thread(
+                target=self._renew_leases, name="import-job-heartbeat", daemon=True
+            )
+            self._heartbeat.start()
+
+    def _renew_leases(self) -> None:
+        """Extend the lease of this worker's pending jobs until shutdown."""
+        while not self._stopping.wait(settings.IMPORT_JOB_LEASE_SECONDS / 3):
+            with self._lock:
+                job_ids = list(self._futures)
+            if not job_ids:
+                continue
+            db = self.session_factory()
+            try:
+                db.execute(
+                    update(models.ImportJob)
+                    .where(
+                        models.ImportJob.id.in_(job_ids),
+                        models.ImportJob.owner_id == self.worker_id,
+                    )
+                    .values(lease_expires_at=self._lease_expiry())
+                )
+                db.commit()
+            except Exception as e:
+                logger.error(f"Renewing import job leases failed: {e}")
+            finally:
+                db.close()
+
+    def create_job(
+        self,
+        db: Session,
+        job_type: ImportJobType,
+        upload: BinaryIO,
+        filename: Optional[str] = None,
+    ) -> models.ImportJob:
+        """
+        Spool an upload to disk, record a queued job and schedule it.
+
+        Args:
+            db: Session used to create the job row
+            job_type: Kind of import to run
+            upload: Binary file-like object with the uploaded document
+            filename: Original filename, kept for display only
+
+        Returns:
+            The persisted ImportJob
+        """
+        job_dir = Path(settings.UPLOAD_DIR) / "import_jobs"
+        job_dir.mkdir(parents=True, exist_ok=True)
+        file_path = job_dir / f"{uuid.uuid4().hex}.xml"
+        with open(file_path, "wb") as target:
+            shutil.copyfileobj(upload, target)
+
+        job = models.ImportJob(
+            job_type=job_type.value,
+            status=ImportJobStatus.QUEUED.value,
+            filename=filename,
+            file_path=str(file_path),
+            errors=[],
+            owner_id=self.worker_id,
+            lease_expires_at=self._lease_expiry(),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self.submit(job.id)
+        return job
+
+    def submit(self, job_id: int) -> Future:
+        with self._lock:
+            future = self._get_executor().submit(self._run, job_id)
+            if not future.done():
+                self._futures[job_id] = future
+                self._start_heartbeat()
+        return future
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> None:
+        """Block until the given job has finished running in this process."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout=timeout)
+
+    def _update_job(self, job_id: int, **fields) -> None:
+        db = self.session_factory()
+        try:
+            db.query(models.ImportJob).filter(models.ImportJob.id == job_id).update(
+                fields, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _claim(self, job_id: int) -> bool:
+        """Move one of this worker's queued jobs to running, if still queued."""
+        db = self.session_factory()
+        try:
+            claimed = db.execute(
+                update(models.ImportJob)
+                .where(
+                    models.ImportJob.id == job_id,
+                    models.ImportJob.status == ImportJobStatus.QUEUED.value,
+                    models.ImportJob.owner_id == self.worker_id,
+                )
+                .values(
+                    status=ImportJobStatus.RUNNING.value,
+                    started_at=datetime.now(),
+                    lease_expires_at=self._lease_expiry(),
+                )
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        return claimed == 1
+
+    def _run(self, job_id: int) -> None:
+        db = self.session_factory()
+        try:
+            if not self._claim(job_id):
+                return
+            job = db.get(models.ImportJob, job_id)
+            handler = JOB_HANDLERS[job.job_type]
+
+            try:
+                outcome = handler(
+                    db, job, lambda **fields: self._update_job(job_id, **fields)
+                )
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Import job {job_id} failed: {e}")
+                self._update_job(
+                    job_id,
+                    status=ImportJobStatus.FAILED.value,
+                    errors=[str(e)],
+                    finished_at=datetime.now(),
+                )
+            else:
+                self._update_job(
+                    job_id,
+                    status=ImportJobStatus.COMPLETED.value,
+                    finished_at=datetime.now(),
+                    **outcome,
+                )
+            Path(job.file_path).unlink(missing_ok=True)
+        finally:
+            db.close()
+            with self._lock:
+                self._futures.pop(job_id, None)
+
+    def recover(self) -> None:
+        """
+        Resume work left behind by workers that stopped.
+
+        Only jobs whose lease has expired are touched; jobs of workers that
+        are still alive keep being renewed by them. Expired running jobs are
+        marked failed, since their inserts may have been partially
+        committed; expired queued jobs are taken over and scheduled here.
+        """
+        now = datetime.now()
+        expired = or_(
+            models.ImportJob.lease_expires_at.is_(None),
+            models.ImportJob.lease_expires_at < now,
+        )
+        db = self.session_factory()
+        try:
+            interrupted = (
+                db.query(models.ImportJob)
+                .filter(models.ImportJob.status == ImportJobStatus.RUNNING.value, expired)
+                .all()
+            )
+            failed = 0
+            for job in interrupted:
+                # Still conditional on the lease, in case its owner renewed it since
+                failed += db.execute(
+                    update(models.ImportJob)
+                    .where(
+                        models.ImportJob.id == job.id,
+                        models.ImportJob.status == ImportJobStatus.RUNNING.value,
+                        expired,
+                    )
+                    .values(
+                        status=ImportJobStatus.FAILED.value,
+                        errors=(job.errors or []) + ["Interrupted by server restart"],
+                        finished_at=now,
+                    )
+                ).rowcount
+
+            queued_ids = [
+                job_id
+                for (job_id,) in db.query(models.ImportJob.id)
+                .filter(models.ImportJob.status == ImportJobStatus.QUEUED.value, expired)
+                .order_by(models.ImportJob.id)
+            ]
+            taken_over = []
+            for job_id in queued_ids:
+                if db.execute(
+                    update(models.ImportJob)
+                    .where(
+                        models.ImportJob.id == job_id,
+                        models.ImportJob.status == ImportJobStatus.QUEUED.value,
+                        expired,
+                    )
+                    .values(owner_id=self.worker_id, lease_expires_at=self._lease_expiry())
+                ).rowcount:
+                    taken_over.append(job_id)
+            db.commit()
+        finally:
+            db.close()
+
+        for job_id in taken_over:
+            self.submit(job_id)
+        if failed or taken_over:
+            logger.info(
+                f"Recovered import jobs: {len(taken_over)} requeued, "
+                f"{failed} marked failed"
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            heartbeat, self._heartbeat = self._heartbeat, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        self._stopping.set()
+        if heartbeat is not None:
+            heartbeat.join()
+
+
+# Process-wide runner used by the API
+import_job_runner = ImportJobRunner()
+
+
+def get_import_job_runner() -> ImportJobRunner:
+    """Dependency injection function returning the shared job runner."""
+    return import_job_runner
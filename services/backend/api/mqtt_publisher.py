@@ -0,0 +1,372 @@
+"""
+HomeAssistant MQTT publisher.
+
+Publishes a discovery config plus retained state and attributes for every
+active batch, and a brewery summary sensor, so HomeAssistant receives
+updates instead of polling the REST sensors.
+
+The publisher listens to the event broker: batch, status and reading
+events mark their batch dirty, and a background thread republishes dirty
+batches together once ``settings.MQTT_COALESCE_SECONDS`` has passed, so a
+burst of readings becomes one message per topic. Payloads identical to the
+last one sent on a topic are skipped. Deleted batches get their retained
+topics cleared, which removes the entity from HomeAssistant.
+
+The client is pluggable: PahoMqttClient talks to a broker through the
+optional paho-mqtt package, MemoryMqttClient keeps messages in memory for
+tests, and anything else implementing MqttClient can be passed in.
+"""
+
+import json
+import os
+import socket
+from abc import ABC, abstractmethod
+from datetime import datetime
+from threading import Condition, RLock, Thread
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+import Database.Models as models
+from api.endpoints.homeassistant import (
+    active_batches_filter,
+    batch_discovery_config,
+    batch_sensor_query,
+    batch_topics,
+    brewery_summary,
+    build_batch_sensor,
+)
+from api.events import Event, EventBroker, event_broker, topic_batch_id
+from config import settings
+from database import get_session_local
+from logger_config import get_logger
+
+try:
+    import paho.mqtt.client as paho_mqtt
+except ImportError:  # pragma: no cover - paho-mqtt is only needed with MQTT_ENABLED
+    paho_mqtt = None
+
+logger = get_logger("mqtt_publisher")
+
+
+def worker_client_id(base: str) -> str:
+    """
+    Client id unique to this worker process.
+
+    A broker drops the existing connection when another client connects
+    with the same id, so workers sharing ``MQTT_CLIENT_ID`` would keep
+    disconnecting each other.
+    """
+    return f"{base}-{socket.gethostname()}-{os.getpid()}"
+
+
+class MqttClient(ABC):
+    """Connection to an MQTT broker."""
+
+    @abstractmethod
+    def connect(self, will_topic: Optional[str] = None, will_payload: str = "") -> None:
+        """Connect, registering a retained last-will message if a topic is given."""
+
+    @abstractmethod
+    def publish(self, topic: str, payload: str, retain: bool = False) -> None:
+        """Publish a payload, retained by the broker when ``retain`` is set."""
+
+    @abstractmethod
+    def disconnect(self) -> None:
+        """Close the connection."""
+
+
+class MemoryMqttClient(MqttClient):
+    """
+    In-memory client recording published messages and retained payloads.
+    """
+
+    def __init__(self):
+        self.connected = False
+        self.will: Optional[Tuple[str, str]] = None
+        self.messages: List[Tuple[str, str, bool]] = []
+        self.retained: Dict[str, str] = {}
+
+    def connect(self, will_topic: Optional[str] = None, will_payload: str = "") -> None:
+        self.connected = True
+        self.will = (will_topic, will_payload) if will_topic else None
+
+    def publish(self, topic: str, payload: str, retain: bool = False) -> None:
+        self.messages.append((topic, payload, retain))
+        if retain:
+            # An empty retained message clears the topic, as on a real broker
+            if payload:
+                self.retained[topic] = payload
+            else:
+                self.retained.pop(topic, None)
+
+    def disconnect(self) -> None:
+        self.connected = False
+
+
+class PahoMqttClient(MqttClient):
+    """
+    Client backed by paho-mqtt, publishing with QoS 1 from paho's network
+    thread and reconnecting automatically.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 1883,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        client_id: str = "hoppybrew",
+    ):
+        if paho_mqtt is None:
+            raise RuntimeError("MQTT_ENABLED requires the 'paho-mqtt' package")
+        self.host = host
+        self.port = port
+        self._client = paho_mqtt.Client(
+            paho_mqtt.CallbackAPIVersion.VERSION2, client_id=client_id
+        )
+        if username:
+            self._client.username_pw_set(username, password)
+
+    @classmethod
+    def from_settings(cls) -> "PahoMqttClient":
+        return cls(
+            settings.MQTT_HOST,
+            settings.MQTT_PORT,
+            settings.MQTT_USERNAME,
+            settings.MQTT_PASSWORD,
+            worker_client_id(settings.MQTT_CLIENT_ID),
+        )
+
+    def connect(self, will_topic: Optional[str] = None, will_payload: str = "") -> None:
+        if will_topic:
+            self._client.will_set(will_topic, will_payload, qos=1, retain=True)
+        self._client.connect(self.host, self.port)
+        self._client.loop_start()
+
+    def publish(self, topic: str, payload: str, retain: bool = False) -> None:
+        self._client.publish(topic, payload, qos=1, retain=retain)
+
+    def disconnect(self) -> None:
+        self._client.disconnect()
+        self._client.loop_stop()
+
+
+class MqttPublisher:
+    """
+    Mirrors batch sensors and the brewery summary to MQTT.
+    """
+
+    def __init__(
+        self,
+        client: Optional[MqttClient] = None,
+        session_factory: Optional[sessionmaker] = None,
+        broker: EventBroker = event_broker,
+        coalesce_seconds: Optional[float] = None,
+    ):
+        self._client = client
+        self._session_factory = session_factory
+        self.broker = broker
+        self.coalesce_seconds = (
+            coalesce_seconds
+            if coalesce_seconds is not None
+            else settings.MQTT_COALESCE_SECONDS
+        )
+        self._condition = Condition()
+        self._dirty: Set[int] = set()
+        self._running = False
+        self._thread: Optional[Thread] = None
+        # Last payload sent per topic, to skip unchanged republishes
+        self._published: Dict[str, str] = {}
+        self._publish_lock = RLock()
+
+    @property
+    def client(self) -> MqttClient:
+        if self._client is None:
+            self._client = PahoMqttClient.from_settings()
+        return self._client
+
+    @property
+    def session_factory(self) -> sessionmaker:
+        if self._session_factory is None:
+            self._session_factory = get_session_local()
+        return self._session_factory
+
+    @property
+    def availability_topic(self) -> str:
+        return f"{settings.MQTT_TOPIC_PREFIX}/status"
+
+    @property
+    def summary_topics(self) -> Dict[str, str]:
+        prefix = settings.MQTT_TOPIC_PREFIX
+        return {
+            "config": f"{settings.MQTT_DISCOVERY_PREFIX}/sensor/hoppybrew_summary/config",
+            "state": f"{prefix}/summary/state",
+            "attributes": f"{prefix}/summary/attributes",
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self) -> None:
+        """Connect, publish every active batch, then follow batch events."""
+        if self._running:
+            return
+        self.client.connect(self.availability_topic, "offline")
+        self._publish(self.availability_topic, "online")
+        self.publish_all()
+
+        self.broker.add_listener(self._on_event)
+        self._running = True
+        self._thread = Thread(target=self._run, name="mqtt-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Publish pending changes, mark the integration offline and disconnect."""
+        if not self._running:
+            return
+        self.broker.remove_listener(self._on_event)
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+        self._thread = None
+
+        self.flush()
+        self._publish(self.availability_topic, "offline")
+        self.client.disconnect()
+        self._published.clear()
+
+    def notify(self, batch_id: int) -> None:
+        """Schedule a batch to be republished with the next flush."""
+        with self._condition:
+            self._dirty.add(batch_id)
+            self._condition.notify_all()
+
+    def _on_event(self, event: Event) -> None:
+        batch_id = topic_batch_id(event.topic)
+        if batch_id is not None:
+            self.notify(batch_id)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._running and not self._dirty:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                # Let the rest of a burst arrive before publishing
+                self._condition.wait_for(lambda: not self._running, self.coalesce_seconds)
+                if not self._running:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"MQTT publish failed: {e}", exc_info=True)
+
+    def _publish(self, topic: str, payload: str) -> None:
+        with self._publish_lock:
+            if self._published.get(topic) == payload:
+                return
+            self.client.publish(topic, payload, retain=True)
+            if payload:
+                self._published[topic] = payload
+            else:
+                self._published.pop(topic, None)
+
+    def _publish_sensor(self, row, now: datetime) -> None:
+        sensor = build_batch_sensor(row, now)
+        topics = batch_topics(row.id)
+        config = batch_discovery_config(
+            row.id, row.batch_name, row.batch_number, self.availability_topic
+        )
+        self._publish(topics["config"], json.dumps(config))
+        self._publish(topics["state"], sensor.state)
+        self._publish(topics["attributes"], json.dumps(sensor.attributes))
+
+    def _remove_sensor(self, batch_id: int) -> None:
+        topics = batch_topics(batch_id)
+        for name in ("config", "state", "attributes"):
+            self._publish(topics[name], "")
+
+    def _publish_summary(self, db: Session) -> None:
+        summary = brewery_summary(db)
+        topics = self.summary_topics
+        config = {
+            "name": "HoppyBrew Active Batches",
+            "state_topic": topics["state"],
+            "json_attributes_topic": topics["attributes"],
+            "unique_id": "hoppybrew_summary",
+            "unit_of_measurement": "batches",
+            "availability_topic": self.availability_topic,
+            "device": {
+                "identifiers": ["hoppybrew"],
+                "name": "HoppyBrew",
+                "model": "HoppyBrew",
+                "manufacturer": "HoppyBrew",
+                "sw_version": "1.0.0",
+            },
+            "icon": "mdi:brewery",
+        }
+        self._publish(topics["config"], json.dumps(config))
+        self._publish(topics["state"], str(summary["active_batches"]))
+        self._publish(topics["attributes"], json.dumps(summary))
+
+    def publish_all(self) -> int:
+        """
+        Publish discovery, state and attributes of every active batch and
+        the summary sensor.
+
+        Returns:
+            Number of batches published
+        """
+        now = datetime.now()
+        db = self.session_factory()
+        try:
+            rows = db.execute(batch_sensor_query(now, active_batches_filter())).all()
+            for row in rows:
+                self._publish_sensor(row, now)
+            self._publish_summary(db)
+        finally:
+            db.close()
+        return len(rows)
+
+    def flush(self) -> int:
+        """
+        Republish every batch marked dirty since the last flush.
+
+        Batches that no longer exist have their topics cleared; batches that
+        were completed or archived keep publishing their final state.
+
+        Returns:
+            Number of batches published or cleared
+        """
+        with self._condition:
+            batch_ids, self._dirty = self._dirty, set()
+        if not batch_ids:
+            return 0
+
+        now = datetime.now()
+        db = self.session_factory()
+        try:
+            rows = {
+                row.id: row
+                for row in db.execute(
+                    batch_sensor_query(now, models.Batches.id.in_(batch_ids))
+                )
+            }
+            for batch_id in sorted(batch_ids):
+                row = rows.get(batch_id)
+                if row is None:
+                    self._remove_sensor(batch_id)
+                else:
+                    self._publish_sensor(row, now)
+            self._publish_summary(db)
+        finally:
+            db.close()
+        return len(batch_ids)
+
+
+# Process-wide publisher, started by the application when MQTT_ENABLED is set
+mqtt_publisher = MqttPublisher()
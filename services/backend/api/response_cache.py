@@ -0,0 +1,329 @@
+"""
+Response cache for read-heavy reference endpoints.
+
+Serialized JSON bodies are stored under a key built from the route and its
+query parameters, together with an ETag derived from the body. Each entry is
+tagged with the tables it was built from so write endpoints can drop every
+cached response that depends on the rows they changed.
+
+Entries live in an in-process LRU with a TTL by default. Setting
+``RESPONSE_CACHE_BACKEND=redis`` shares them between workers through
+``settings.REDIS_URL`` instead.
+"""
+
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from threading import RLock
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Set
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from config import settings
+from logger_config import get_logger
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is only needed for the shared backend
+    redis = None
+
+logger = get_logger("response_cache")
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class CacheBackend(ABC):
+    """Storage for cached responses and the tag index used to invalidate them."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Stored response for ``key``, or None when missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str], ttl: int) -> None:
+        """Store a response for ``ttl`` seconds under ``key`` and each of ``tags``."""
+
+    @abstractmethod
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        """Drop every response stored under any of ``tags``."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every stored response."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Process-local LRU cache with per-entry expiry.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = RLock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, expires_at, _ = item
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str], ttl: int) -> None:
+        tags = frozenset(tags)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (entry, time.monotonic() + ttl, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, set()):
+                    self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _discard(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared cache stored in Redis.
+
+    Each response is a string value holding the ETag and body separated by a
+    newline; each tag is a set of the keys that depend on it. Any client with
+    the redis-py ``get``/``set``/``sadd``/``smembers``/``delete``/``pipeline``
+    interface can be passed in, which lets tests use an in-memory fake.
+    """
+
+    def __init__(self, client, prefix: str = "hoppybrew:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        if redis is None:
+            raise RuntimeError(
+                "RESPONSE_CACHE_BACKEND=redis requires the 'redis' package"
+            )
+        return cls(redis.Redis.from_url(url))
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}response:{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        value = self.client.get(self._key(key))
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return CachedResponse(body=body, etag=etag.decode())
+
+    def set(self, key: str, entry: CachedResponse, tags: Iterable[str], ttl: int) -> None:
+        redis_key = self._key(key)
+        pipe = self.client.pipeline()
+        pipe.set(redis_key, entry.etag.encode() + b"\n" + entry.body, ex=ttl)
+        for tag in tags:
+            pipe.sadd(self._tag(tag), redis_key)
+        pipe.execute()
+
+    def invalidate_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            tag_key = self._tag(tag)
+            keys = self.client.smembers(tag_key)
+            self.client.delete(tag_key, *keys)
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def _serialize(content: Any, response_model=None) -> bytes:
+    if response_model is None:
+        return _type_adapter(Any).dump_json(jsonable_encoder(content))
+    adapter = _type_adapter(response_model)
+    return adapter.dump_json(
+        adapter.validate_python(content, from_attributes=True), by_alias=True
+    )
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (value.strip() for value in if_none_match.split(","))
+    return etag in (value[2:] if value.startswith("W/") else value for value in candidates)
+
+
+def _entry_for(body: bytes) -> CachedResponse:
+    return CachedResponse(
+        body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    )
+
+
+def _conditional_response(
+    request: Request, entry: CachedResponse, headers: Dict[str, str]
+) -> Response:
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def etag_response(request: Request, content: Any, response_model=None) -> Response:
+    """
+    JSON response with an ETag derived from its body, for responses that
+    cannot be cached but can still be revalidated.
+
+    Returns:
+        The serialized content, or an empty 304 when If-None-Match already
+        names its ETag
+    """
+    entry = _entry_for(_serialize(content, response_model))
+    return _conditional_response(
+        request, entry, {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    )
+
+
+class ResponseCache:
+    """
+    Serves JSON responses from a CacheBackend with ETag revalidation.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self._backend = backend
+        self.ttl = ttl if ttl is not None else settings.RESPONSE_CACHE_TTL_SECONDS
+        self.enabled = (
+            enabled if enabled is not None else settings.RESPONSE_CACHE_ENABLED
+        )
+        # Bumped on every invalidation so a response built concurrently with a
+        # write is not stored after its tags were dropped
+        self._generation = 0
+        self._lock = RLock()
+
+    @property
+    def backend(self) -> CacheBackend:
+        with self._lock:
+            if self._backend is None:
+                if settings.RESPONSE_CACHE_BACKEND == "redis":
+                    self._backend = RedisCacheBackend.from_url(settings.REDIS_URL)
+                else:
+                    self._backend = MemoryCacheBackend(
+                        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES
+                    )
+            return self._backend
+
+    @staticmethod
+    def key_for(request: Request) -> str:
+        """Cache key from the route path and its sorted query parameters."""
+        params = "&".join(
+            f"{name}={value}" for name, value in sorted(request.query_params.multi_items())
+        )
+        return f"{request.url.path}?{params}"
+
+    def respond(
+        self,
+        request: Request,
+        tags: Iterable[str],
+        build: Callable[[], Any],
+        response_model=None,
+    ) -> Response:
+        """
+        Return the cached response for this request, building it on a miss.
+
+        Args:
+            request: Incoming request, used for the cache key and If-None-Match
+            tags: Table names the response is built from
+            build: Callable producing the response content on a cache miss
+            response_model: Type used to validate and serialize the content,
+                normally the route's response_model
+
+        Returns:
+            A JSON response carrying an ETag, or an empty 304 when the client
+            already holds the current representation
+        """
+        key = self.key_for(request)
+        entry = None
+        if self.enabled:
+            try:
+                entry = self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"Response cache lookup failed for {key}: {e}")
+        cache_status = "HIT" if entry is not None else "MISS"
+
+        if entry is None:
+            generation = self._generation
+            entry = _entry_for(_serialize(build(), response_model))
+            if self.enabled and generation == self._generation:
+                try:
+                    self.backend.set(key, entry, tags, self.ttl)
+                except Exception as e:
+                    logger.warning(f"Response cache store failed for {key}: {e}")
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "X-Cache": cache_status}
+        return _conditional_response(request, entry, headers)
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every cached response tagged with any of the given tables."""
+        with self._lock:
+            self._generation += 1
+        if not self.enabled:
+            return
+        try:
+            self.backend.invalidate_tags(tags)
+        except Exception as e:
+            logger.warning(f"Response cache invalidation failed for {tags}: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+        self.backend.clear()
+
+
+# Process-wide cache used by the API
+response_cache = ResponseCache()
@@ -26,6 +26,7 @@ from .endpoints import (
     devices,
     calculators,
     yeast_management,
+    jobs,
 )
 
 # create the router and include all the routers from the endpoints folder
@@ -72,3 +73,7 @@ router.include_router(calculators.router, tags=["calculators"])
 # Include the yeast management router
 
 router.include_router(yeast_management.router, tags=["yeast_management"])
+
+# Include the background import jobs router
+
+router.include_router(jobs.router, tags=["jobs"])
@@ -33,6 +33,34 @@ class Settings:
         self.DATABASE_PORT: int = int(os.getenv("DATABASE_PORT", "5432"))
         self.DATABASE_NAME: str = os.getenv("DATABASE_NAME", "hoppybrew_db")
 
+        # Connection pool (applies to the sync and async engines separately)
+        self.DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", "5"))
+        self.DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+        self.DATABASE_POOL_TIMEOUT: float = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+        # Seconds after which a connection is replaced on checkout; -1 never
+        self.DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", "-1"))
+        # "pessimistic" pings every connection on checkout, "optimistic" does not
+        self.DATABASE_POOL_DISCONNECT_STRATEGY: str = os.getenv(
+            "DATABASE_POOL_DISCONNECT_STRATEGY", "pessimistic"
+        ).lower()
+        # Connecting through PgBouncer in transaction pooling mode
+        self.DATABASE_PGBOUNCER: bool = (
+            os.getenv("DATABASE_PGBOUNCER", "false").lower() == "true"
+        )
+
+        # SQLite production profile (WAL and pragmas on every connection)
+        self.SQLITE_TUNING: bool = os.getenv("SQLITE_TUNING", "false").lower() == "true"
+        self.SQLITE_BUSY_TIMEOUT: int = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms
+        self.SQLITE_MMAP_SIZE: int = int(
+            os.getenv("SQLITE_MMAP_SIZE", "67108864")
+        )  # 64MB
+        # Pages when positive, KiB when negative
+        self.SQLITE_CACHE_SIZE: int = int(os.getenv("SQLITE_CACHE_SIZE", "-16000"))
+        # Seconds between WAL checkpoints and PRAGMA optimize; 0 disables
+        self.SQLITE_MAINTENANCE_INTERVAL: float = float(
+            os.getenv("SQLITE_MAINTENANCE_INTERVAL", "600")
+        )
+
         # Test Database
         self.TEST_DATABASE_URL: str = os.getenv(
             "TEST_DATABASE_URL", "sqlite:///:memory:"
@@ -63,6 +91,14 @@ class Settings:
         )  # 10MB
         self.UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./uploads")
 
+        # Background Import Jobs
+        self.IMPORT_JOB_WORKERS: int = int(os.getenv("IMPORT_JOB_WORKERS", "2"))
+        # A worker's queued and running jobs are taken over by other workers
+        # once it has not renewed their lease for this long
+        self.IMPORT_JOB_LEASE_SECONDS: float = float(
+            os.getenv("IMPORT_JOB_LEASE_SECONDS", "60")
+        )
+
         # External APIs
         self.HOMEBREWING_API_KEY: Optional[str] = os.getenv("HOMEBREWING_API_KEY")
         self.WEATHER_API_KEY: Optional[str] = os.getenv("WEATHER_API_KEY")
@@ -84,6 +120,45 @@ class Settings:
         # Redis Configuration
         self.REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+        # Response Cache for reference endpoints ("memory" or "redis")
+        self.RESPONSE_CACHE_ENABLED: bool = (
+            os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+        )
+        self.RESPONSE_CACHE_BACKEND: str = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+        self.RESPONSE_CACHE_TTL_SECONDS: int = int(
+            os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300")
+        )
+        self.RESPONSE_CACHE_MAX_ENTRIES: int = int(
+            os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512")
+        )
+        # Batches whose fermentation forecast is kept in memory per worker
+        self.FORECAST_CACHE_MAX_ENTRIES: int = int(
+            os.getenv("FORECAST_CACHE_MAX_ENTRIES", "256")
+        )
+
+        # Live fermentation event streams (SSE / WebSocket)
+        self.EVENT_HISTORY_SIZE: int = int(os.getenv("EVENT_HISTORY_SIZE", "500"))
+        self.EVENT_STREAM_KEEPALIVE_SECONDS: float = float(
+            os.getenv("EVENT_STREAM_KEEPALIVE_SECONDS", "15")
+        )
+        # Streams are closed after this long; clients reconnect with Last-Event-ID
+        self.EVENT_STREAM_MAX_SECONDS: float = float(
+            os.getenv("EVENT_STREAM_MAX_SECONDS", "300")
+        )
+
+        # HomeAssistant MQTT publisher (requires the paho-mqtt package)
+        self.MQTT_ENABLED: bool = os.getenv("MQTT_ENABLED", "false").lower() == "true"
+        self.MQTT_HOST: str = os.getenv("MQTT_HOST", "localhost")
+        self.MQTT_PORT: int = int(os.getenv("MQTT_PORT", "1883"))
+        self.MQTT_USERNAME: Optional[str] = os.getenv("MQTT_USERNAME")
+        self.MQTT_PASSWORD: Optional[str] = os.getenv("MQTT_PASSWORD")
+        # Each worker connects as "<MQTT_CLIENT_ID>-<hostname>-<pid>"
+        self.MQTT_CLIENT_ID: str = os.getenv("MQTT_CLIENT_ID", "hoppybrew")
+        self.MQTT_TOPIC_PREFIX: str = os.getenv("MQTT_TOPIC_PREFIX", "hoppybrew")
+        self.MQTT_DISCOVERY_PREFIX: str = os.getenv("MQTT_DISCOVERY_PREFIX", "homeassistant")
+        # Changes arriving within this window are published together
+        self.MQTT_COALESCE_SECONDS: float = float(os.getenv("MQTT_COALESCE_SECONDS", "2"))
+
         # Backup Configuration
         self.BACKUP_ENABLED: bool = (
             os.getenv("BACKUP_ENABLED", "false").lower() == "true"
@@ -107,6 +182,10 @@ class Settings:
             raise ValueError("SECRET_KEY must be changed in production")
         if len(self.SECRET_KEY) < 32:
             raise ValueError("SECRET_KEY must be at least 32 characters long")
+        if self.DATABASE_POOL_DISCONNECT_STRATEGY not in ("pessimistic", "optimistic"):
+            raise ValueError(
+                "DATABASE_POOL_DISCONNECT_STRATEGY must be 'pessimistic' or 'optimistic'"
+            )
 
     @property
     def DATABASE_URL(self) -> str:
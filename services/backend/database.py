@@ -6,14 +6,63 @@ connection pooling and lazy initialization. The database engine is only
 created when first accessed, avoiding repeated initialization on module import.
 """
 
+from fastapi import Request
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 import os
 import time
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional, Union
 from logger_config import get_logger
 from config import settings
+from database_pool import engine_options, register_engine, unregister_engine
+from database_sqlite import apply_sqlite_pragmas, use_immediate_transactions
+
+
+# Drivers used for the async engine, by database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+psycopg",
+}
+
+
+def async_database_url(database_url: Union[str, URL]) -> URL:
+    """
+    Convert a database URL to the equivalent URL for an asyncio driver.
+
+    Args:
+        database_url: URL of the synchronous engine
+
+    Returns:
+        URL: Same database, with aiosqlite for SQLite and psycopg's async
+        mode for PostgreSQL
+    """
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for database backend '{url.get_backend_name()}'")
+    return url.set(drivername=driver)
+
+
+# Request methods served by sessions that never write
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
+
+
+def read_only_engine(engine: Union[Engine, AsyncEngine]) -> Union[Engine, AsyncEngine]:
+    """
+    The engine, sharing its pool, with deferred SQLite transactions.
+
+    SQLite engines with ``SQLITE_TUNING`` start transactions with ``BEGIN
+    IMMEDIATE`` (see ``database_sqlite``); deferred ones read alongside a
+    writer instead of waiting for it. Other engines ignore the option.
+    """
+    return engine.execution_options(sqlite_begin="DEFERRED")
 
 
 class _DatabaseManager:
@@ -24,7 +73,11 @@ class _DatabaseManager:
     def __init__(self):
         self._engine: Optional[Engine] = None
         self._SessionLocal: Optional[sessionmaker] = None
+        self._ReadSessionLocal: Optional[sessionmaker] = None
         self._initialized: bool = False
+        self._async_engine: Optional[AsyncEngine] = None
+        self._AsyncSessionLocal: Optional[async_sessionmaker] = None
+        self._AsyncReadSessionLocal: Optional[async_sessionmaker] = None
 
     def _wait_for_postgresql(self, max_retries: int = 30, retry_delay: int = 1) -> None:
         """
@@ -42,6 +95,8 @@ class _DatabaseManager:
         logger = get_logger("database")
         logger.info("Waiting for PostgreSQL to be available")
 
+        # PgBouncer only serves the databases it is configured for
+        dbname = settings.DATABASE_NAME if settings.DATABASE_PGBOUNCER else "postgres"
         for i in range(max_retries):
             try:
                 conn = psycopg.connect(
@@ -49,7 +104,7 @@ class _DatabaseManager:
                     port=settings.DATABASE_PORT,
                     user=settings.DATABASE_USER,
                     password=settings.DATABASE_PASSWORD,
-                    dbname="postgres",  # Connect to default database first
+                    dbname=dbname,
                 )
                 conn.close()
                 logger.info("PostgreSQL is available")
@@ -112,37 +167,91 @@ class _DatabaseManager:
             # Check if using SQLite or PostgreSQL
             if database_url.startswith('sqlite'):
                 logger.info("Using SQLite database")
-                # For SQLite, enable foreign keys and WAL mode for better performance
                 self._engine = create_engine(
                     database_url,
                     echo=False,
                     connect_args={"check_same_thread": False},
-                    pool_pre_ping=True,
+                    **engine_options(database_url),
                 )
+                # WAL mode, foreign keys and cache sizing on every connection;
+                # writers take the lock at BEGIN so they queue on busy_timeout
+                if settings.SQLITE_TUNING:
+                    apply_sqlite_pragmas(self._engine)
+                    use_immediate_transactions(self._engine)
             else:
                 logger.info("Using PostgreSQL database")
                 # Wait for PostgreSQL to be ready
                 self._wait_for_postgresql()
 
-                # Create the engine with connection pooling
+                # Create the engine with connection pooling from settings
                 self._engine = create_engine(
                     database_url,
                     echo=False,  # Disable SQLAlchemy echo to reduce log noise
-                    pool_pre_ping=True,  # Verify connections before using
-                    pool_size=5,  # Connection pool size
-                    max_overflow=10,  # Maximum overflow connections
+                    **engine_options(database_url),
                 )
 
-                # Create database if it doesn't exist
-                self._create_database_if_not_exists(self._engine)
+                # Behind PgBouncer the database is provisioned with the pooler
+                if not settings.DATABASE_PGBOUNCER:
+                    self._create_database_if_not_exists(self._engine)
+            register_engine("sync", self._engine)
         # Create session factory
         self._SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self._engine)
+        self._ReadSessionLocal = sessionmaker(
+            autocommit=False, autoflush=False, bind=read_only_engine(self._engine)
+        )
 
         self._initialized = True
         logger.info("Database initialized successfully")
 
         return self._engine
 
+    def initialize_async(self) -> AsyncEngine:
+        """
+        Initialize the async engine and session factory.
+
+        The async engine connects to the same database as the synchronous
+        one, through the asyncio driver for its backend, with its own pool
+        configured from the same settings. Sessions keep loaded attributes
+        after commit, since expired attributes cannot be lazily reloaded
+        outside an await.
+
+        Returns:
+            AsyncEngine: SQLAlchemy async engine instance
+        """
+        if self._async_engine is not None:
+            return self._async_engine
+
+        # The synchronous setup waits for PostgreSQL and creates the database
+        engine = self.engine
+        logger = get_logger("database")
+
+        url = async_database_url(engine.url)
+        self._async_engine = create_async_engine(
+            url, echo=False, **engine_options(url, is_async=True)
+        )
+        if engine.dialect.name == "sqlite" and settings.SQLITE_TUNING:
+            apply_sqlite_pragmas(self._async_engine)
+            use_immediate_transactions(self._async_engine)
+        register_engine("async", self._async_engine)
+        self._AsyncSessionLocal = async_sessionmaker(
+            bind=self._async_engine, autoflush=False, expire_on_commit=False
+        )
+        self._AsyncReadSessionLocal = async_sessionmaker(
+            bind=read_only_engine(self._async_engine), autoflush=False, expire_on_commit=False
+        )
+        logger.info("Async database engine initialized")
+
+        return self._async_engine
+
+    async def dispose_async(self) -> None:
+        """Close the async engine's pooled connections, if it was created."""
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            unregister_engine("async")
+            self._async_engine = None
+            self._AsyncSessionLocal = None
+            self._AsyncReadSessionLocal = None
+
     @property
     def engine(self) -> Engine:
         """Get the database engine, initializing if necessary."""
@@ -157,6 +266,30 @@ class _DatabaseManager:
             self.initialize()
         return self._SessionLocal
 
+    @property
+    def ReadSessionLocal(self) -> sessionmaker:
+        """Get the session factory for read-only requests, initializing if necessary."""
+        if not self._initialized:
+            self.initialize()
+        return self._ReadSessionLocal
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        """Get the async engine, initializing if necessary."""
+        return self.initialize_async()
+
+    @property
+    def AsyncSessionLocal(self) -> async_sessionmaker:
+        """Get the async session factory, initializing if necessary."""
+        self.initialize_async()
+        return self._AsyncSessionLocal
+
+    @property
+    def AsyncReadSessionLocal(self) -> async_sessionmaker:
+        """Get the async session factory for read-only requests, initializing if necessary."""
+        self.initialize_async()
+        return self._AsyncReadSessionLocal
+
 
 # Create singleton instance
 _db_manager = _DatabaseManager()
@@ -175,6 +308,10 @@ def __getattr__(name):
         return _db_manager.engine
     elif name == "SessionLocal":
         return _db_manager.SessionLocal
+    elif name == "async_engine":
+        return _db_manager.async_engine
+    elif name == "AsyncSessionLocal":
+        return _db_manager.AsyncSessionLocal
     raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 
@@ -209,17 +346,58 @@ def get_session_local() -> sessionmaker:
     return _db_manager.SessionLocal
 
 
-def get_db() -> Generator[Session, None, None]:
+def get_db(request: Request) -> Generator[Session, None, None]:
     """
     Dependency injection function for FastAPI endpoints.
     Provides a database session and ensures it's closed after use.
+    Read-only requests (GET, HEAD) get a session whose transactions do not
+    take the SQLite write lock.
 
     Yields:
         Session: SQLAlchemy database session
     """
-    session_factory = get_session_local()
+    if request.method in READ_ONLY_METHODS:
+        session_factory = _db_manager.ReadSessionLocal
+    else:
+        session_factory = get_session_local()
     db = session_factory()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_async_session_local() -> async_sessionmaker:
+    """
+    Get the async session factory, initializing the database if necessary.
+
+    Returns:
+        async_sessionmaker: SQLAlchemy async session factory
+    """
+    return _db_manager.AsyncSessionLocal
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's connections; called on application shutdown."""
+    await _db_manager.dispose_async()
+
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async dependency injection function for FastAPI endpoints.
+
+    Queries awaited on this session release the event loop while the
+    database works, so one slow request does not stall the others in the
+    worker. Synchronous helpers taking a ``Session`` run through
+    ``await db.run_sync(helper, ...)``. Read-only requests get a session
+    whose transactions do not take the SQLite write lock, as in ``get_db``.
+
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+    """
+    if request.method in READ_ONLY_METHODS:
+        session_factory = _db_manager.AsyncReadSessionLocal
+    else:
+        session_factory = get_async_session_local()
+    async with session_factory() as db:
+        yield db
@@ -0,0 +1,290 @@
+"""
+Connection pool configuration and instrumentation.
+
+Pool sizing, recycling, checkout timeout and the disconnect handling
+strategy come from ``config.Settings``. ``engine_options`` turns them into
+``create_engine`` keyword arguments for the synchronous and async engines.
+
+The pools it selects record every checkout in a ``PoolMetrics``: the time
+spent waiting for a connection (including the pre-ping round trip when the
+pessimistic strategy is used), checkouts that timed out on an exhausted
+pool, and the number of connections in use. ``render_prometheus`` exports
+them, together with the live size and overflow of each registered engine's
+pool, in the Prometheus text format served by ``GET /metrics``.
+
+With ``DATABASE_PGBOUNCER=true`` connections go through a transaction
+pooler: SQLAlchemy keeps no pool of its own (``NullPool``) and psycopg is
+told never to prepare statements server side, since consecutive
+transactions may run on different server connections.
+"""
+
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import exc
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from config import settings
+
+__all__ = [
+    "DISCONNECT_STRATEGIES",
+    "PoolMetrics",
+    "engine_options",
+    "pool_statistics",
+    "register_engine",
+    "render_prometheus",
+    "unregister_engine",
+]
+
+# "pessimistic" tests each connection with a round trip on checkout;
+# "optimistic" skips it and relies on pool_recycle and on SQLAlchemy
+# invalidating the whole pool when a statement fails with a disconnect
+DISCONNECT_STRATEGIES = ("pessimistic", "optimistic")
+
+# Upper bounds in seconds of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+    """
+    Checkout counters of one engine's pool.
+
+    Kept outside the pool so they survive ``engine.dispose()``, which
+    replaces the pool with a fresh one.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_seconds_sum = 0.0
+            self.wait_seconds_max = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+            self.in_use = 0
+
+    def record_checkout(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_sum += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self.wait_buckets[bisect_left(WAIT_BUCKETS, wait)] += 1
+
+    def connection_opened(self) -> None:
+        with self._lock:
+            self.in_use += 1
+
+    def connection_closed(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+
+class _InstrumentedPool:
+    """Times ``Pool.connect`` and hands its metrics to recreated pools."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_InstrumentedPool, NullPool):
+    """NullPool counting its open connections, which it does not track itself."""
+
+    def _do_get(self):
+        record = super()._do_get()
+        if self.metrics is not None:
+            self.metrics.connection_opened()
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        try:
+            super()._do_return_conn(record)
+        finally:
+            if self.metrics is not None:
+                self.metrics.connection_closed()
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    if url.get_backend_name() != "sqlite":
+        return False
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def engine_options(database_url: Union[str, URL], is_async: bool = False) -> Dict:
+    """
+    Pool keyword arguments for ``create_engine``/``create_async_engine``.
+
+    In-memory SQLite databases keep the dialect's default pool, since each
+    new connection would be a different, empty database.
+
+    Args:
+        database_url: URL the engine connects to
+        is_async: Options for the async engine
+
+    Returns:
+        Dict: ``poolclass`` and the pool and connection arguments it takes
+    """
+    url = make_url(database_url)
+    if _is_memory_sqlite(url):
+        return {"pool_pre_ping": True}
+
+    pessimistic = settings.DATABASE_POOL_DISCONNECT_STRATEGY == "pessimistic"
+    if settings.DATABASE_PGBOUNCER and url.get_backend_name() == "postgresql":
+        # Every checkout opens a fresh connection, so there is nothing to ping
+        return {
+            "poolclass": InstrumentedNullPool,
+            "connect_args": {"prepare_threshold": None},
+        }
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": pessimistic,
+    }
+
+
+# Engines exported by render_prometheus, by name
+_engines: Dict[str, Tuple[Union[Engine, AsyncEngine], PoolMetrics]] = {}
+
+
+def register_engine(name: str, engine: Union[Engine, AsyncEngine]) -> PoolMetrics:
+    """
+    Attach metrics to an engine's pool and export them under ``name``.
+
+    Pools that are not instrumented (in-memory SQLite) are still exported
+    with their size, without checkout timings.
+    """
+    metrics = PoolMetrics()
+    pool = engine.pool
+    if isinstance(pool, _InstrumentedPool):
+        pool.metrics = metrics
+    _engines[name] = (engine, metrics)
+    return metrics
+
+
+def unregister_engine(name: str) -> None:
+    _engines.pop(name, None)
+
+
+def _pool_state(pool: Pool, metrics: PoolMetrics) -> Dict[str, int]:
+    if isinstance(pool, QueuePool):
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            # Negative while fewer than pool_size connections have been opened
+            "overflow": max(pool.overflow(), 0),
+        }
+    return {"size": 0, "checked_out": metrics.in_use, "checked_in": 0, "overflow": 0}
+
+
+def pool_statistics() -> List[Dict]:
+    """Current state and checkout counters of every registered engine's pool."""
+    statistics = []
+    for name, (engine, metrics) in sorted(_engines.items()):
+        with metrics._lock:
+            entry = {
+                "engine": name,
+                "pool": type(engine.pool).__name__,
+                **_pool_state(engine.pool, metrics),
+                "checkouts": metrics.checkouts,
+                "timeouts": metrics.timeouts,
+                "wait_seconds_sum": metrics.wait_seconds_sum,
+                "wait_seconds_max": metrics.wait_seconds_max,
+                "wait_buckets": list(metrics.wait_buckets),
+            }
+        statistics.append(entry)
+    return statistics
+
+
+_GAUGES = (
+    ("size", "Connections the pool keeps open"),
+    ("checked_out", "Connections currently checked out of the pool"),
+    ("checked_in", "Idle connections held by the pool"),
+    ("overflow", "Connections open beyond the pool size"),
+)
+
+
+def render_prometheus() -> str:
+    """Pool statistics in the Prometheus text exposition format."""
+    statistics = pool_statistics()
+    lines: List[str] = []
+
+    def family(name: str, kind: str, description: str) -> None:
+        lines.append(f"# HELP hoppybrew_db_pool_{name} {description}")
+        lines.append(f"# TYPE hoppybrew_db_pool_{name} {kind}")
+
+    for key, description in _GAUGES:
+        family(key, "gauge", description)
+        for entry in statistics:
+            lines.append(f'hoppybrew_db_pool_{key}{{engine="{entry["engine"]}"}} {entry[key]}')
+
+    family("checkout_timeouts_total", "counter", "Checkouts that timed out on an exhausted pool")
+    for entry in statistics:
+        lines.append(
+            f'hoppybrew_db_pool_checkout_timeouts_total{{engine="{entry["engine"]}"}} '
+            f'{entry["timeouts"]}'
+        )
+
+    family("checkout_wait_seconds_max", "gauge", "Longest checkout wait since startup")
+    for entry in statistics:
+        lines.append(
+            f'hoppybrew_db_pool_checkout_wait_seconds_max{{engine="{entry["engine"]}"}} '
+            f'{entry["wait_seconds_max"]:.6f}'
+        )
+
+    family("checkout_wait_seconds", "histogram", "Time spent obtaining a connection")
+    for entry in statistics:
+        engine = entry["engine"]
+        cumulative = 0
+        for bound, count in zip(WAIT_BUCKETS + (float("inf"),), entry["wait_buckets"]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(
+                f'hoppybrew_db_pool_checkout_wait_seconds_bucket{{engine="{engine}",le="{le}"}} '
+                f"{cumulative}"
+            )
+        lines.append(
+            f'hoppybrew_db_pool_checkout_wait_seconds_sum{{engine="{engine}"}} '
+            f'{entry["wait_seconds_sum"]:.6f}'
+        )
+        lines.append(
+            f'hoppybrew_db_pool_checkout_wait_seconds_count{{engine="{engine}"}} '
+            f'{entry["checkouts"] + entry["timeouts"]}'
+        )
+    return "\n".join(lines) + "\n"
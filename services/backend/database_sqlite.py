@@ -0,0 +1,187 @@
+"""
+SQLite production profile.
+
+With ``SQLITE_TUNING=true`` every connection to a SQLite database file is
+set up for a small server (a Raspberry Pi running the brewery) rather than
+for a throwaway test database:
+
+- ``journal_mode=WAL`` lets readers keep reading while one writer commits,
+  so device ingestion no longer blocks the dashboards and vice versa;
+- ``synchronous=NORMAL`` syncs the WAL at checkpoints instead of at every
+  commit, which is durable against application crashes in WAL mode;
+- ``foreign_keys=ON`` enforces the foreign keys the models declare;
+- ``busy_timeout`` makes a second writer wait for the lock instead of
+  failing immediately with "database is locked";
+- ``mmap_size`` and ``cache_size`` size the memory-mapped I/O and page
+  cache from settings.
+
+SQLite allows one writer at a time and any number of readers in WAL mode,
+but the busy timeout alone does not queue writers: pysqlite and aiosqlite
+open deferred transactions, and a transaction that read before another
+connection committed cannot upgrade to a write lock, so it fails with
+"database is locked" at once however long the timeout is.
+``use_immediate_transactions`` therefore takes transaction control from
+the driver and starts every transaction with ``BEGIN IMMEDIATE``, which
+takes the write lock up front and waits the busy timeout for it. Read-only
+work opts back into deferred transactions, which read concurrently, with
+the ``sqlite_begin="DEFERRED"`` execution option (see ``database.get_db``).
+
+``SqliteMaintenance`` runs a passive WAL checkpoint and ``PRAGMA optimize``
+every ``SQLITE_MAINTENANCE_INTERVAL`` seconds, and once more on shutdown, so
+the WAL file does not grow without bound between automatic checkpoints
+and the query planner statistics stay current.
+"""
+
+from threading import Condition, Thread
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import settings
+from logger_config import get_logger
+
+__all__ = [
+    "SqliteMaintenance",
+    "apply_sqlite_pragmas",
+    "sqlite_maintenance",
+    "sqlite_pragmas",
+    "use_immediate_transactions",
+]
+
+logger = get_logger("database_sqlite")
+
+
+def sqlite_pragmas() -> List[Tuple[str, Union[str, int]]]:
+    """Pragmas run on every new connection, in order, from settings."""
+    return [
+        # busy_timeout first, so switching to WAL waits for other writers too
+        ("busy_timeout", settings.SQLITE_BUSY_TIMEOUT),
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("foreign_keys", "ON"),
+        ("mmap_size", settings.SQLITE_MMAP_SIZE),
+        ("cache_size", settings.SQLITE_CACHE_SIZE),
+    ]
+
+
+def apply_sqlite_pragmas(engine: Union[Engine, AsyncEngine]) -> None:
+    """Run ``sqlite_pragmas`` on each connection the engine opens."""
+    if isinstance(engine, AsyncEngine):
+        engine = engine.sync_engine
+    pragmas = sqlite_pragmas()
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def use_immediate_transactions(engine: Union[Engine, AsyncEngine]) -> None:
+    """
+    Start the engine's transactions with ``BEGIN IMMEDIATE``.
+
+    Connections with the ``sqlite_begin`` execution option use that mode
+    instead: ``"DEFERRED"`` for read-only work, or ``None`` to run each
+    statement in its own transaction. (The ``AUTOCOMMIT`` isolation level
+    would hand transaction control back to the driver when the connection
+    returns to the pool.)
+    """
+    if isinstance(engine, AsyncEngine):
+        engine = engine.sync_engine
+
+    @event.listens_for(engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        # Stops the driver from emitting its own deferred BEGIN
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        mode = connection.get_execution_options().get("sqlite_begin", "IMMEDIATE")
+        if mode is not None:
+            connection.exec_driver_sql(f"BEGIN {mode}")
+
+
+class SqliteMaintenance:
+    """
+    Background checkpoint and planner statistics upkeep for a SQLite engine.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = (
+            interval if interval is not None else settings.SQLITE_MAINTENANCE_INTERVAL
+        )
+        self._engine: Optional[Engine] = None
+        self._condition = Condition()
+        self._running = False
+        self._thread: Optional[Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def run_once(self, engine: Optional[Engine] = None) -> Tuple[int, int, int]:
+        """
+        Checkpoint the WAL and refresh planner statistics.
+
+        The checkpoint is PASSIVE: it copies what it can without waiting for
+        readers or writers, and the rest is copied by a later run.
+
+        Returns:
+            Tuple of (busy, WAL frames, frames checkpointed) as reported by
+            ``PRAGMA wal_checkpoint``
+        """
+        engine = engine or self._engine
+        # Outside a transaction, so the checkpoint does not hold a snapshot
+        with engine.connect().execution_options(sqlite_begin=None) as connection:
+            busy, frames, checkpointed = connection.exec_driver_sql(
+                "PRAGMA wal_checkpoint(PASSIVE)"
+            ).one()
+            connection.exec_driver_sql("PRAGMA optimize")
+        logger.debug(
+            f"SQLite checkpoint: {checkpointed}/{frames} WAL frames copied"
+            + (" (busy)" if busy else "")
+        )
+        return busy, frames, checkpointed
+
+    def start(self, engine: Engine) -> None:
+        """Run maintenance every ``interval`` seconds until ``stop``."""
+        if self._running or self.interval <= 0:
+            return
+        self._engine = engine
+        self._running = True
+        self._thread = Thread(target=self._run, name="sqlite-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and run a last checkpoint before the engine closes."""
+        if not self._running:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+        self._thread = None
+        try:
+            self.run_once()
+        except Exception as e:
+            logger.error(f"SQLite maintenance failed: {e}")
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: not self._running, self.interval)
+                if not self._running:
+                    return
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"SQLite maintenance failed: {e}", exc_info=True)
+
+
+sqlite_maintenance = SqliteMaintenance()
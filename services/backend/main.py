@@ -3,7 +3,11 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, ConfigDict
+from sqlalchemy.orm.exc import StaleDataError
 from api.router import router
+from api.import_jobs import import_job_runner
+from api.mqtt_publisher import mqtt_publisher
+from database_sqlite import sqlite_maintenance
 from fastapi.middleware.cors import CORSMiddleware
 from logger_config import get_logger
 from config import settings
@@ -93,6 +97,10 @@ tags_metadata = [
         "name": "calculators",
         "description": "Brewing calculation utilities for strike water, ABV, priming sugar, yeast starters, and more.",
     },
+    {
+        "name": "jobs",
+        "description": "Background import jobs for large BeerXML and reference files, with progress polling.",
+    },
 ]
 
 # Get logger instance
@@ -118,6 +126,18 @@ async def lifespan(app: FastAPI):
         logger.info("Creating database tables")
         Base.metadata.create_all(bind=engine, checkfirst=True)
         logger.info("Database tables ready")
+
+        import_job_runner.recover()
+
+        if engine.dialect.name == "sqlite" and settings.SQLITE_TUNING:
+            sqlite_maintenance.start(engine)
+
+        if settings.MQTT_ENABLED:
+            try:
+                mqtt_publisher.start()
+                logger.info("MQTT publisher connected")
+            except Exception as e:
+                logger.error(f"MQTT publisher failed to start: {e}")
     else:
         logger.info("Testing mode detected - skipping automatic table creation")
 
@@ -127,6 +147,12 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down HoppyBrew API")
+    import_job_runner.shutdown(wait=False)
+    mqtt_publisher.stop()
+    sqlite_maintenance.stop()
+    from database import dispose_async_engine
+
+    await dispose_async_engine()
 
 
 # Create the FastAPI app with lifespan management
@@ -170,6 +196,19 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(StaleDataError)
+async def stale_data_exception_handler(request: Request, exc: StaleDataError):
+    """
+    A versioned row (inventory items) changed between being loaded and
+    written by this request; report a conflict instead of a server error.
+    """
+    logger.warning(f"Concurrent update rejected on {request.method} {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "This item was changed by another request, please reload and retry"},
+    )
+
+
 # Add exception handler for all unhandled exceptions to ensure CORS headers are present
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
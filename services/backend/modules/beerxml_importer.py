@@ -0,0 +1,183 @@
+"""
+BeerXML Importer Module
+
+Writes recipes produced by modules.beerxml_parser.iter_beerxml to the
+database in chunks. Each chunk is inserted with one executemany per table
+inside a SAVEPOINT; if any recipe in the chunk fails, the chunk is rolled
+back to its savepoint and replayed one recipe per SAVEPOINT so a single bad
+recipe only skips itself.
+"""
+
+from typing import BinaryIO, Callable, Dict, List, Optional, Union
+
+from pydantic import BaseModel, Field
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+from modules.beerxml_parser import BeerXMLParseError, BeerXMLRecipe, iter_beerxml
+from modules.recipe_metrics import rebuild_recipe_metrics
+
+DEFAULT_CHUNK_SIZE = 200
+
+INGREDIENT_TABLES = (
+    ("hops", models.RecipeHop),
+    ("fermentables", models.RecipeFermentable),
+    ("yeasts", models.RecipeYeast),
+    ("miscs", models.RecipeMisc),
+)
+
+
+class BeerXMLImportResult(BaseModel):
+    """Summary of a BeerXML import run"""
+    message: str = ""
+    imported_count: int = 0
+    skipped_count: int = 0
+    errors: List[str] = Field(default_factory=list)
+    recipe_ids: List[int] = Field(default_factory=list)
+
+
+def _column_types(model) -> Dict[str, type]:
+    """Map each column name of a model to its Python type."""
+    return {
+        column.key: column.type.python_type for column in model.__table__.columns
+    }
+
+
+def _to_mapping(item: BaseModel, columns: Dict[str, type], **extra) -> dict:
+    """
+    Dump a parsed BeerXML object, keeping only columns the table defines.
+
+    BeerXML carries some values as decimals (e.g. fermentable COLOR) that the
+    schema stores as integers, so those are rounded to match the column.
+    """
+    mapping = {}
+    for key, value in item.model_dump(by_alias=False).items():
+        if key not in columns:
+            continue
+        if isinstance(value, float) and columns[key] is int:
+            value = int(round(value))
+        mapping[key] = value
+    mapping.update(extra)
+    return mapping
+
+
+def _insert_recipes(db: Session, recipes: List[BeerXMLRecipe]) -> List[int]:
+    """
+    Insert recipes and all their ingredients with one statement per table,
+    then fill in their stored metrics.
+
+    Returns:
+        The new recipe ids, in the same order as ``recipes``
+    """
+    recipe_columns = _column_types(models.Recipes)
+    recipe_rows = [
+        _to_mapping(
+            recipe,
+            recipe_columns,
+            version=recipe.version or 1,
+        )
+        for recipe in recipes
+    ]
+    recipe_ids = list(
+        db.scalars(
+            insert(models.Recipes).returning(
+                models.Recipes.id, sort_by_parameter_order=True
+            ),
+            recipe_rows,
+        )
+    )
+
+    for attribute, ingredient_model in INGREDIENT_TABLES:
+        columns = _column_types(ingredient_model)
+        rows = [
+            _to_mapping(ingredient, columns, recipe_id=recipe_id)
+            for recipe, recipe_id in zip(recipes, recipe_ids)
+            for ingredient in getattr(recipe, attribute)
+        ]
+        if rows:
+            db.execute(insert(ingredient_model), rows)
+
+    rebuild_recipe_metrics(db, recipe_ids)
+    return recipe_ids
+
+
+def _write_chunk(
+    db: Session, chunk: List[BeerXMLRecipe], result: BeerXMLImportResult
+) -> None:
+    """Write one chunk of recipes and commit, isolating failures per recipe."""
+    try:
+        with db.begin_nested():
+            result.recipe_ids.extend(_insert_recipes(db, chunk))
+        result.imported_count += len(chunk)
+    except SQLAlchemyError:
+        # Replay the chunk one recipe per SAVEPOINT to skip only the bad ones
+        for recipe in chunk:
+            try:
+                with db.begin_nested():
+                    result.recipe_ids.extend(_insert_recipes(db, [recipe]))
+                result.imported_count += 1
+            except SQLAlchemyError as e:
+                result.skipped_count += 1
+                result.errors.append(
+                    f"Failed to import recipe '{recipe.name}': {str(e)}"
+                )
+    db.commit()
+
+
+def import_beerxml_stream(
+    db: Session,
+    source: Union[bytes, BinaryIO],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[BeerXMLImportResult, int], None]] = None,
+) -> BeerXMLImportResult:
+    """
+    Parse and import a BeerXML document incrementally.
+
+    Recipes are pulled from iter_beerxml and written in chunks of
+    ``chunk_size``, committing after each chunk. If the document turns out
+    to be malformed part-way through, recipes parsed up to that point are
+    kept and the parse error is reported in ``errors``.
+
+    Args:
+        db: SQLAlchemy session
+        source: Raw XML content as bytes, or a binary file-like object
+        chunk_size: Number of recipes written per executemany batch
+        on_progress: Optional callback invoked with the running result and
+            the number of recipes parsed so far after each committed chunk
+
+    Returns:
+        BeerXMLImportResult describing imported and skipped recipes
+
+    Raises:
+        BeerXMLParseError: If the XML is invalid before any recipe was parsed
+    """
+    result = BeerXMLImportResult()
+    chunk: List[BeerXMLRecipe] = []
+    parsed_count = 0
+
+    def _flush() -> None:
+        if chunk:
+            _write_chunk(db, chunk, result)
+            chunk.clear()
+            if on_progress is not None:
+                on_progress(result, parsed_count)
+
+    try:
+        for recipe in iter_beerxml(source):
+            parsed_count += 1
+            chunk.append(recipe)
+            if len(chunk) >= chunk_size:
+                _flush()
+    except BeerXMLParseError as e:
+        if parsed_count == 0:
+            raise
+        result.errors.append(f"Import stopped early: {str(e)}")
+    _flush()
+
+    result.message = (
+        f"Import completed: {result.imported_count} recipes imported, "
+        f"{result.skipped_count} skipped"
+    )
+    return result
@@ -8,9 +8,10 @@ BeerXML is an XML-based standard for exchanging brewing recipe data between
 different brewing software applications.
 """
 
+import io
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, Field, ValidationError
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 
 class BeerXMLParseError(Exception):
@@ -44,6 +45,8 @@ class BeerXMLHop(BaseModel):
 
 class BeerXMLFermentable(BaseModel):
     """Represents a fermentable in BeerXML format"""
+    model_config = ConfigDict(populate_by_name=True)
+
     name: str
     version: Optional[int] = 1
     type: Optional[str] = None
@@ -455,6 +458,76 @@ def parse_beerxml(xml_content: bytes) -> List[BeerXMLRecipe]:
     return recipes
 
 
+def iter_beerxml(source: Union[bytes, BinaryIO]) -> Iterator[BeerXMLRecipe]:
+    """
+    Incrementally parse BeerXML and yield recipes one at a time.
+
+    Unlike parse_beerxml, the document is never fully materialised: each
+    RECIPE element is discarded as soon as it has been converted, so memory
+    stays flat regardless of how many recipes the file contains.
+
+    Args:
+        source: Raw XML content as bytes, or a binary file-like object
+
+    Yields:
+        BeerXMLRecipe objects in document order
+
+    Raises:
+        BeerXMLParseError: If XML is malformed or contains no valid recipes.
+            Malformed XML may only be detected after earlier recipes have
+            been yielded.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+
+    root = None
+    valid_root = False
+    depth = 0
+    found_count = 0
+    yielded_count = 0
+
+    try:
+        for event, element in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if root is None:
+                    root = element
+                    valid_root = root.tag in ('RECIPES', 'RECIPE')
+                continue
+
+            depth -= 1
+            if not valid_root:
+                # Keep reading so malformed XML is still reported as such
+                element.clear()
+                continue
+            # Only top-level recipes: the root itself or direct RECIPES children
+            if element.tag != 'RECIPE' or depth > 1 or (depth == 1 and root.tag != 'RECIPES'):
+                continue
+
+            found_count += 1
+            try:
+                recipe = _parse_recipe(element)
+            except ValidationError:
+                # Skip recipes that fail validation
+                recipe = None
+            if element is not root:
+                root.remove(element)
+            if recipe is not None:
+                yielded_count += 1
+                yield recipe
+    except ET.ParseError as e:
+        raise BeerXMLParseError(f"Invalid XML format: {str(e)}")
+
+    if not valid_root:
+        raise BeerXMLParseError(
+            f"Invalid root element: expected RECIPES or RECIPE, got {root.tag}"
+        )
+    if found_count == 0:
+        raise BeerXMLParseError("No RECIPE elements found in XML")
+    if yielded_count == 0:
+        raise BeerXMLParseError("No valid recipes could be parsed from XML")
+
+
 def validate_beerxml(xml_content: bytes) -> Dict[str, Any]:
     """
     Validate BeerXML content without parsing into full objects.
@@ -0,0 +1,173 @@
+"""
+Fermentation Chart Module
+
+Array helpers behind the fermentation chart endpoint: picking a bounded
+number of representative readings out of dense telemetry and deriving the
+ABV and attenuation series from gravity in one vectorized pass.
+
+Two downsampling methods are available:
+
+- ``lttb``: Largest-Triangle-Three-Buckets, keeps the points that preserve
+  the visual shape of the curve
+- ``minmax``: keeps the lowest and highest reading of every bucket, so
+  short spikes (a temperature excursion, a stuck reading) are never lost
+"""
+
+from typing import Optional
+
+import numpy as np
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+# Points returned when the client does not ask for a specific resolution
+DEFAULT_MAX_POINTS = 1000
+MAX_CHART_POINTS = 10000
+
+
+def _bucket_edges(length: int, buckets: int) -> np.ndarray:
+    """Edges splitting positions 1..length-2 into ``buckets`` contiguous ranges."""
+    return np.linspace(1, length - 1, buckets + 1).astype(int)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of the readings kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are
+    split into ``max_points - 2`` buckets and from each bucket the point
+    forming the largest triangle with the previously kept point and the
+    average of the next bucket is kept.
+
+    Args:
+        x: Sorted x values (e.g. seconds since epoch)
+        y: y values without NaN
+        max_points: Number of points to keep, at least 3
+
+    Returns:
+        Sorted index array of length ``min(len(x), max_points)``
+    """
+    length = len(x)
+    if length <= max_points or max_points < 3:
+        return np.arange(length)
+
+    edges = _bucket_edges(length, max_points - 2)
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = length - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < max_points - 2:
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = length - 1, length
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of the lowest and highest reading of each bucket.
+
+    The first and last points are always kept; the rest are split into
+    ``(max_points - 2) // 2`` buckets contributing their extremes.
+
+    Returns:
+        Sorted, de-duplicated index array of at most ``max_points`` entries
+    """
+    length = len(y)
+    if length <= max_points or max_points < 4:
+        return np.arange(length)
+
+    edges = _bucket_edges(length, (max_points - 2) // 2)
+    picks = [0, length - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        window = y[start:end]
+        picks.append(start + int(np.argmin(window)))
+        picks.append(start + int(np.argmax(window)))
+    return np.unique(picks)
+
+
+def _fill_gaps(x: np.ndarray, y: np.ndarray) -> Optional[np.ndarray]:
+    """Linearly interpolate NaN gaps; None if the series has no values."""
+    known = ~np.isnan(y)
+    if not known.any():
+        return None
+    if known.all():
+        return y
+    return np.interp(x, x[known], y[known])
+
+
+def downsample_indices(
+    x: np.ndarray,
+    gravity: np.ndarray,
+    temperature: np.ndarray,
+    max_points: int,
+    method: str = "lttb",
+) -> np.ndarray:
+    """
+    Choose which readings to chart.
+
+    Gravity drives the selection; batches that only log temperature are
+    sampled on temperature instead, and readings with neither are sampled
+    evenly. Missing values are interpolated for selection only.
+
+    Args:
+        x: Sorted reading times as numbers
+        gravity: Gravity per reading, NaN where missing
+        temperature: Temperature per reading, NaN where missing
+        max_points: Maximum number of readings to keep
+        method: One of DOWNSAMPLE_METHODS
+
+    Returns:
+        Sorted index array into the input arrays
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}")
+    if len(x) <= max_points:
+        return np.arange(len(x))
+
+    y = _fill_gaps(x, gravity)
+    if y is None:
+        y = _fill_gaps(x, temperature)
+    if y is None:
+        y = np.zeros(len(x))
+
+    if method == "minmax":
+        return minmax_indices(y, max_points)
+    return lttb_indices(x, y, max_points)
+
+
+def gravity_progress(original_gravity: Optional[float], gravity: np.ndarray):
+    """
+    ABV and apparent attenuation at each reading.
+
+    Uses the same formulas as ``calculate_abv`` and ``calculate_attenuation``;
+    readings without gravity, or before gravity has dropped below the
+    original gravity, report 0.
+
+    Returns:
+        Tuple of (abv rounded to 2 decimals, attenuation rounded to 1 decimal)
+    """
+    gravity = np.asarray(gravity, dtype=float)
+    if not original_gravity or original_gravity <= 1.0:
+        zeros = np.zeros(len(gravity))
+        return zeros, zeros.copy()
+
+    og = float(original_gravity)
+    with np.errstate(invalid="ignore"):
+        fermented = (gravity > 0) & (gravity < og)
+    drop = np.where(fermented, og - gravity, 0.0)
+    abv = np.round(drop * 131.25, 2)
+    attenuation = np.round(drop / (og - 1.0) * 100.0, 1)
+    return abv, attenuation
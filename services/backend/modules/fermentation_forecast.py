@@ -0,0 +1,402 @@
+"""
+Fermentation forecasting.
+
+Fits a batch's gravity readings with an exponential decay
+
+    G(t) = FG + A * exp(-k * t)
+
+and a logistic curve (which also captures the lag phase)
+
+    G(t) = FG + D / (1 + exp(k * (t - t_mid)))
+
+and keeps the one with the better AIC. Both are linear in their
+amplitude and asymptote once the rate (and midpoint) are fixed, so the
+fit is a vectorized grid search over the nonlinear parameters with a
+closed-form least-squares solve per grid point, followed by a finer grid
+around the best point. Refits for a batch start from the previous
+parameters and only search around them.
+
+ForecastCache keeps the latest forecast for the most recently used batches
+and refits only when the batch's readings change.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from threading import RLock
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+from config import settings
+from modules.fermentation_rollups import load_rollup_series
+
+__all__ = [
+    "FermentationForecastResult",
+    "ForecastCache",
+    "fit_gravity_curve",
+    "forecast_cache",
+    "forecast_fermentation",
+]
+
+MIN_FIT_READINGS = 5
+MIN_FIT_SPAN_DAYS = 0.5
+# Above this many readings the hourly rollup means are fitted instead
+MAX_FIT_POINTS = 600
+
+# Gravity within this of the predicted FG counts as finished
+TERMINAL_TOLERANCE = 0.001
+LOWEST_FINAL_GRAVITY = 0.990
+
+# A batch is stuck when gravity dropped less than STUCK_MAX_DROP over the
+# last STUCK_WINDOW_DAYS while still short of its expected finish
+STUCK_WINDOW_DAYS = 2.0
+STUCK_MAX_DROP = 0.001
+STUCK_MARGIN = 0.004
+STUCK_MIN_ATTENUATION = 60.0
+
+# Rates per day searched by the coarse grid
+RATE_GRID = np.logspace(-2, 1.5, 120)
+LOGISTIC_RATE_GRID = np.logspace(-1, 1.5, 40)
+MIDPOINT_STEPS = 40
+REFINE_STEPS = 25
+
+MODEL_PARAMETER_COUNTS = {"exponential": 3, "logistic": 4}
+
+
+@dataclass
+class CurveFit:
+    """Fitted gravity curve; ``t`` is days since the first reading."""
+
+    model: str
+    final_gravity: float
+    amplitude: float
+    rate: float
+    midpoint: float = 0.0
+    sse: float = float("inf")
+    point_count: int = 0
+
+    def predict(self, t) -> np.ndarray:
+        t = np.asarray(t, dtype=float)
+        with np.errstate(over="ignore"):
+            if self.model == "exponential":
+                return self.final_gravity + self.amplitude * np.exp(-self.rate * t)
+            return self.final_gravity + self.amplitude / (1.0 + np.exp(self.rate * (t - self.midpoint)))
+
+    def time_to_reach(self, gravity: float) -> Optional[float]:
+        """Days since the first reading at which the curve falls to ``gravity``."""
+        share = (gravity - self.final_gravity) / self.amplitude if self.amplitude > 0 else np.nan
+        if not 0 < share < 1:
+            return None
+        if self.model == "exponential":
+            return float(-np.log(share) / self.rate)
+        return float(self.midpoint + np.log(1.0 / share - 1.0) / self.rate)
+
+    @property
+    def aic(self) -> float:
+        n = max(self.point_count, 1)
+        return n * np.log(max(self.sse, 1e-18) / n) + 2 * MODEL_PARAMETER_COUNTS[self.model]
+
+    @property
+    def rmse(self) -> float:
+        return float(np.sqrt(self.sse / max(self.point_count, 1)))
+
+
+def _solve_linear(basis: np.ndarray, g: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Least-squares ``g ~ c + a * basis`` for every row of ``basis`` at once.
+
+    Returns:
+        Tuple of (offset c, amplitude a, SSE), one entry per row; rows whose
+        amplitude is not positive get an infinite SSE
+    """
+    x_mean = basis.mean(axis=1, keepdims=True)
+    g_mean = g.mean()
+    dx = basis - x_mean
+    variance = (dx * dx).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        amplitude = (dx * (g - g_mean)).sum(axis=1) / variance
+    offset = g_mean - amplitude * x_mean[:, 0]
+    residual = g - offset[:, None] - amplitude[:, None] * basis
+    sse = (residual * residual).sum(axis=1)
+    sse = np.where((amplitude > 0) & (variance > 0) & np.isfinite(sse), sse, np.inf)
+    return offset, amplitude, sse
+
+
+def _fit_exponential(t: np.ndarray, g: np.ndarray, rates: np.ndarray) -> CurveFit:
+    with np.errstate(over="ignore"):
+        basis = np.exp(-rates[:, None] * t[None, :])
+    offset, amplitude, sse = _solve_linear(basis, g)
+    best = int(np.argmin(sse))
+    return CurveFit(
+        "exponential", float(offset[best]), float(amplitude[best]), float(rates[best]),
+        0.0, float(sse[best]), len(t),
+    )
+
+
+def _fit_logistic(t: np.ndarray, g: np.ndarray, rates: np.ndarray, midpoints: np.ndarray) -> CurveFit:
+    rate_grid, midpoint_grid = (axis.ravel() for axis in np.meshgrid(rates, midpoints))
+    with np.errstate(over="ignore"):
+        basis = 1.0 / (1.0 + np.exp(rate_grid[:, None] * (t[None, :] - midpoint_grid[:, None])))
+    offset, amplitude, sse = _solve_linear(basis, g)
+    best = int(np.argmin(sse))
+    return CurveFit(
+        "logistic", float(offset[best]), float(amplitude[best]), float(rate_grid[best]),
+        float(midpoint_grid[best]), float(sse[best]), len(t),
+    )
+
+
+def _refine(t: np.ndarray, g: np.ndarray, fit: CurveFit, width: float) -> CurveFit:
+    """Search a finer grid around ``fit``; ``width`` scales the search range."""
+    rates = fit.rate * np.exp(np.linspace(-width, width, REFINE_STEPS))
+    if fit.model == "exponential":
+        refined = _fit_exponential(t, g, rates)
+    else:
+        half_range = width * max(t[-1] - t[0], 1.0) / 2
+        midpoints = fit.midpoint + np.linspace(-half_range, half_range, REFINE_STEPS)
+        refined = _fit_logistic(t, g, rates, midpoints)
+    return refined if refined.sse <= fit.sse else fit
+
+
+def fit_gravity_curve(
+    t, gravity, previous: Optional[Dict[str, CurveFit]] = None
+) -> Optional[Tuple[CurveFit, Dict[str, CurveFit]]]:
+    """
+    Fit both models to a gravity series and pick the better one.
+
+    Args:
+        t: Days since the first reading, ascending
+        gravity: Gravity at each time
+        previous: Fits from an earlier call for the same batch; when given,
+            only the neighbourhood of those parameters is searched
+
+    Returns:
+        Tuple of (best fit, fits by model name), or None if neither model
+        fits a falling curve
+    """
+    t = np.asarray(t, dtype=float)
+    g = np.asarray(gravity, dtype=float)
+    span = max(t[-1] - t[0], 1e-6)
+
+    fits = {}
+    if previous:
+        for model, fit in previous.items():
+            start = CurveFit(model, fit.final_gravity, fit.amplitude, fit.rate, fit.midpoint)
+            start.sse = float(((g - start.predict(t)) ** 2).sum())
+            start.point_count = len(t)
+            fits[model] = _refine(t, g, start, width=1.0)
+    else:
+        fits["exponential"] = _fit_exponential(t, g, RATE_GRID)
+        midpoints = np.linspace(t[0] - span * 0.25, t[-1] + span, MIDPOINT_STEPS)
+        fits["logistic"] = _fit_logistic(t, g, LOGISTIC_RATE_GRID, midpoints)
+    fits = {model: _refine(t, g, fit, width=0.3) for model, fit in fits.items()}
+
+    candidates = [fit for fit in fits.values() if np.isfinite(fit.sse)]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda fit: fit.aic), fits
+
+
+@dataclass
+class FermentationForecastResult:
+    batch_id: int
+    status: str  # "ok" or "insufficient_data"
+    reading_count: int
+    current_gravity: Optional[float] = None
+    last_reading_at: Optional[datetime] = None
+    model: Optional[str] = None
+    predicted_fg: Optional[float] = None
+    terminal_at: Optional[datetime] = None
+    hours_to_terminal: Optional[float] = None
+    is_terminal: bool = False
+    is_stuck: bool = False
+    rmse: Optional[float] = None
+    fitted_at: datetime = field(default_factory=datetime.now)
+
+
+def _is_stalled(t: np.ndarray, g: np.ndarray) -> bool:
+    """Whether the trend over the last STUCK_WINDOW_DAYS dropped less than STUCK_MAX_DROP."""
+    if t[-1] - t[0] < STUCK_WINDOW_DAYS:
+        return False
+    window = t >= t[-1] - STUCK_WINDOW_DAYS
+    if window.sum() < 2:
+        return False
+    slope = np.polyfit(t[window], g[window], 1)[0]
+    return bool(-slope * STUCK_WINDOW_DAYS < STUCK_MAX_DROP)
+
+
+def _short_of_target(
+    current: float, original_gravity: Optional[float], target_fg: Optional[float]
+) -> bool:
+    if target_fg:
+        return bool(current - target_fg > STUCK_MARGIN)
+    if original_gravity and original_gravity > 1.0:
+        attenuation = (original_gravity - current) / (original_gravity - 1.0) * 100.0
+        return bool(attenuation < STUCK_MIN_ATTENUATION)
+    return False
+
+
+def _load_gravity_series(db: Session, batch_id: int) -> Tuple[list, np.ndarray]:
+    reading = models.FermentationReadings
+    count = db.execute(
+        select(func.count(reading.id)).where(
+            reading.batch_id == batch_id, reading.gravity.isnot(None)
+        )
+    ).scalar()
+    if count > MAX_FIT_POINTS:
+        timestamps, series, _ = load_rollup_series(db, batch_id, "hour")
+        gravity = series["gravity"]
+        keep = ~np.isnan(gravity)
+        if keep.sum() >= MIN_FIT_READINGS:
+            return [ts for ts, k in zip(timestamps, keep) if k], gravity[keep]
+
+    rows = db.execute(
+        select(reading.timestamp, reading.gravity)
+        .where(reading.batch_id == batch_id, reading.gravity.isnot(None))
+        .order_by(reading.timestamp, reading.id)
+    ).all()
+    return [row.timestamp for row in rows], np.array([row.gravity for row in rows], dtype=float)
+
+
+def forecast_fermentation(
+    db: Session,
+    batch_id: int,
+    original_gravity: Optional[float] = None,
+    target_fg: Optional[float] = None,
+    previous: Optional[Dict[str, CurveFit]] = None,
+) -> Tuple[FermentationForecastResult, Optional[Dict[str, CurveFit]]]:
+    """
+    Forecast a batch's final gravity and finish time from its readings.
+
+    Args:
+        db: SQLAlchemy session
+        batch_id: Batch to forecast
+        original_gravity: Recipe OG, used for the stuck check without a target
+        target_fg: Expected final gravity from the recipe, if known
+        previous: Earlier fits for warm-starting the search
+
+    Returns:
+        Tuple of (forecast, fits to pass as ``previous`` next time)
+    """
+    timestamps, gravity = _load_gravity_series(db, batch_id)
+    result = FermentationForecastResult(
+        batch_id=batch_id, status="insufficient_data", reading_count=len(timestamps)
+    )
+    if not timestamps:
+        return result, None
+
+    result.current_gravity = float(gravity[-1])
+    result.last_reading_at = timestamps[-1]
+    origin = timestamps[0]
+    t = np.array([(ts - origin).total_seconds() / 86400.0 for ts in timestamps])
+    if len(t) < MIN_FIT_READINGS or t[-1] - t[0] < MIN_FIT_SPAN_DAYS:
+        return result, None
+
+    fitted = fit_gravity_curve(t, gravity, previous)
+    stalled = _is_stalled(t, gravity)
+    result.is_stuck = stalled and _short_of_target(result.current_gravity, original_gravity, target_fg)
+    if fitted is None:
+        return result, None
+    best, fits = fitted
+
+    predicted_fg = float(np.clip(best.final_gravity, LOWEST_FINAL_GRAVITY, result.current_gravity))
+    if result.current_gravity - predicted_fg <= TERMINAL_TOLERANCE:
+        terminal_day = t[-1]
+    else:
+        terminal_day = best.time_to_reach(predicted_fg + TERMINAL_TOLERANCE)
+
+    result.status = "ok"
+    result.model = best.model
+    result.predicted_fg = round(predicted_fg, 4)
+    result.rmse = round(best.rmse, 5)
+    if terminal_day is not None:
+        last_day = float(t[-1])
+        terminal_day = max(float(terminal_day), last_day)
+        result.terminal_at = origin + timedelta(days=terminal_day)
+        result.hours_to_terminal = round((terminal_day - last_day) * 24.0, 1)
+        result.is_terminal = result.hours_to_terminal == 0.0
+    return result, fits
+
+
+class ForecastCache:
+    """
+    Latest forecast per batch, for the ``max_entries`` most recently used
+    batches.
+
+    A forecast is reused while the batch's reading count, highest reading
+    id, latest timestamp and summed reading versions are unchanged and the
+    recipe gravities match. The fingerprint is read from the database on
+    every lookup, so inserts, deletes and edits made through any worker are
+    picked up; ``invalidate`` only speeds this up in the current process.
+    Refits reuse the previous parameters as the starting point.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = (
+            max_entries if max_entries is not None else settings.FORECAST_CACHE_MAX_ENTRIES
+        )
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = RLock()
+
+    @staticmethod
+    def _fingerprint(db: Session, batch_id: int):
+        reading = models.FermentationReadings
+        return tuple(
+            db.execute(
+                select(
+                    func.count(reading.id),
+                    func.max(reading.id),
+                    func.max(reading.timestamp),
+                    func.sum(reading.version),
+                ).where(reading.batch_id == batch_id)
+            ).one()
+        )
+
+    def get(
+        self,
+        db: Session,
+        batch_id: int,
+        original_gravity: Optional[float] = None,
+        target_fg: Optional[float] = None,
+    ) -> FermentationForecastResult:
+        key = (self._fingerprint(db, batch_id), original_gravity, target_fg)
+        with self._lock:
+            entry = self._entries.get(batch_id)
+            if entry is not None:
+                self._entries.move_to_end(batch_id)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        previous = entry[2] if entry is not None else None
+        result, fits = forecast_fermentation(db, batch_id, original_gravity, target_fg, previous)
+        with self._lock:
+            self._entries[batch_id] = (key, result, fits)
+            self._entries.move_to_end(batch_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self, batch_id: Optional[int] = None) -> None:
+        """Force the next lookup to refit (keeping the warm-start parameters)."""
+        with self._lock:
+            if batch_id is None:
+                for key, (_, result, fits) in self._entries.items():
+                    self._entries[key] = (None, result, fits)
+            elif batch_id in self._entries:
+                _, result, fits = self._entries[batch_id]
+                self._entries[batch_id] = (None, result, fits)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+forecast_cache = ForecastCache()
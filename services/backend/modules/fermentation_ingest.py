@@ -0,0 +1,174 @@
+"""
+Fermentation Reading Ingestion Module
+
+Bulk intake for hydrometer telemetry (iSpindel, Tilt, ...). Uploads arrive
+as a JSON array, a single JSON object or NDJSON; device calibration is
+applied to whole columns with NumPy, and the readings are written with a
+single executemany INSERT that also updates the fermentation rollups.
+
+Calibration is read from ``Device.calibration_data``:
+
+- ``polynomial``: coefficients, highest power first as in the iSpindel
+  formula, converting a reported tilt ``angle`` to specific gravity
+- ``gravity_offset``: added to every gravity value
+- ``temperature_offset``: added to every temperature value
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+from modules.fermentation_rollups import apply_readings
+
+# Upper bound on readings accepted in one upload
+MAX_BULK_READINGS = 10000
+
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+# Gravity is stored to the precision hydrometers report
+GRAVITY_DECIMALS = 4
+
+
+class ReadingPayloadError(ValueError):
+    """Raised when an upload body cannot be decoded into readings"""
+
+
+def parse_reading_payload(body: bytes, content_type: Optional[str]) -> List[Any]:
+    """
+    Decode an upload into a list of raw reading objects.
+
+    Args:
+        body: Raw request body
+        content_type: Request Content-Type; NDJSON media types are read line
+            by line, anything else as JSON
+
+    Returns:
+        List of decoded items, not yet validated
+
+    Raises:
+        ReadingPayloadError: If the body is not valid JSON/NDJSON or is not
+            an object or array
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_MEDIA_TYPES:
+        items = []
+        for line_number, line in enumerate(body.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ReadingPayloadError(f"Invalid JSON on line {line_number}: {e.msg}") from e
+        return items
+
+    try:
+        payload = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise ReadingPayloadError(f"Invalid JSON body: {e.msg}") from e
+    # Devices posting one reading at a time send a bare object
+    if isinstance(payload, dict):
+        return [payload]
+    if not isinstance(payload, list):
+        raise ReadingPayloadError("Expected a JSON array of readings")
+    return payload
+
+
+def _column(readings: Sequence[Any], name: str) -> np.ndarray:
+    return np.array(
+        [np.nan if getattr(r, name, None) is None else getattr(r, name) for r in readings],
+        dtype=float,
+    )
+
+
+def calibrate_gravity(
+    calibration_data: Optional[Dict[str, Any]], gravity: np.ndarray, angle: np.ndarray
+) -> np.ndarray:
+    """
+    Apply a device's gravity calibration to arrays of readings.
+
+    Readings that report a tilt angle get their gravity from the calibration
+    polynomial; the gravity offset then applies to every reading. NaN marks
+    missing values in both inputs and the result.
+    """
+    calibration = calibration_data or {}
+    gravity = np.array(gravity, dtype=float)
+    coefficients = calibration.get("polynomial")
+    if coefficients:
+        has_angle = ~np.isnan(angle)
+        gravity[has_angle] = np.polyval(np.asarray(coefficients, dtype=float), angle[has_angle])
+    offset = calibration.get("gravity_offset")
+    if offset:
+        gravity = gravity + float(offset)
+    return gravity
+
+
+def prepare_reading_rows(
+    readings: Sequence[Any],
+    batch_ids: Sequence[int],
+    device_ids: Sequence[Optional[int]],
+    calibrations: Dict[int, Optional[Dict[str, Any]]],
+    received_at: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Turn validated readings into FermentationReadings insert rows.
+
+    Calibration runs once per device over all of that device's readings.
+
+    Args:
+        readings: Validated reading objects with gravity, angle, temperature,
+            ph, notes and timestamp attributes
+        batch_ids: Batch of each reading
+        device_ids: Device of each reading, None when it has no device
+        calibrations: Device id to ``calibration_data`` mapping
+        received_at: Stored as created_at, and as the timestamp of readings
+            that did not send one; defaults to now
+
+    Returns:
+        One column mapping per reading, in input order
+    """
+    received_at = received_at or datetime.now()
+    gravity = _column(readings, "gravity")
+    temperature = _column(readings, "temperature")
+    angle = _column(readings, "angle")
+
+    devices = np.array([-1 if device_id is None else device_id for device_id in device_ids])
+    for device_id, calibration in calibrations.items():
+        if not calibration:
+            continue
+        mask = devices == device_id
+        if not mask.any():
+            continue
+        gravity[mask] = calibrate_gravity(calibration, gravity[mask], angle[mask])
+        temperature_offset = calibration.get("temperature_offset")
+        if temperature_offset:
+            temperature[mask] += float(temperature_offset)
+
+    gravity = np.round(gravity, GRAVITY_DECIMALS)
+    return [
+        {
+            "batch_id": batch_id,
+            "timestamp": reading.timestamp or received_at,
+            "gravity": None if np.isnan(g) else float(g),
+            "temperature": None if np.isnan(t) else float(t),
+            "ph": reading.ph,
+            "notes": reading.notes,
+            "created_at": received_at,
+        }
+        for reading, batch_id, g, t in zip(readings, batch_ids, gravity, temperature)
+    ]
+
+
+def insert_readings(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insert reading rows with one executemany statement and fold them into
+    the hourly/daily rollups; the caller commits.
+    """
+    if rows:
+        db.execute(insert(models.FermentationReadings), rows)
+        apply_readings(db, rows)
+    return len(rows)
@@ -0,0 +1,306 @@
+"""
+Fermentation Rollup Module
+
+Maintains FermentationReadingRollup rows: per batch, per hour and per day
+count/sum/min/max/last of gravity, temperature and pH.
+
+- ``apply_readings`` folds newly inserted readings into their buckets with
+  an upsert and is called on every ingest path
+- ``rebuild_rollups`` recomputes buckets from raw readings, for whole
+  batches, for the days touched by an edit or delete, or for everything
+- ``choose_resolution`` and ``load_rollup_series`` serve reads, picking the
+  coarsest rollup that still resolves the requested window
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+
+ROLLUP_METRICS = ("gravity", "temperature", "ph")
+
+# Finest first
+ROLLUP_RESOLUTIONS = ("hour", "day")
+BUCKET_WIDTHS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+REBUILD_CHUNK_SIZE = 5000
+
+# Decimals kept when reporting bucket means
+MEAN_DECIMALS = {"gravity": 4, "temperature": 2, "ph": 2}
+
+RollupKey = Tuple[int, str, datetime]
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """Start of the hour or day bucket containing ``timestamp``."""
+    # Stored timestamps are naive; drop any offset the same way storage does
+    timestamp = timestamp.replace(tzinfo=None)
+    if resolution == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if resolution == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup resolution: {resolution}")
+
+
+def _empty_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = {"reading_count": 0}
+    for metric in ROLLUP_METRICS:
+        stats.update(
+            {
+                f"{metric}_count": 0,
+                f"{metric}_sum": None,
+                f"{metric}_min": None,
+                f"{metric}_max": None,
+                f"{metric}_last": None,
+                f"{metric}_last_at": None,
+            }
+        )
+    return stats
+
+
+def _add_value(stats: Dict[str, Any], metric: str, value: float, at: datetime) -> None:
+    """Fold one value into stats."""
+    if stats[f"{metric}_count"]:
+        stats[f"{metric}_sum"] += value
+        stats[f"{metric}_min"] = min(stats[f"{metric}_min"], value)
+        stats[f"{metric}_max"] = max(stats[f"{metric}_max"], value)
+    else:
+        stats[f"{metric}_sum"] = value
+        stats[f"{metric}_min"] = value
+        stats[f"{metric}_max"] = value
+    stats[f"{metric}_count"] += 1
+    last_at = stats[f"{metric}_last_at"]
+    if last_at is None or at >= last_at:
+        stats[f"{metric}_last"] = value
+        stats[f"{metric}_last_at"] = at
+
+
+def aggregate_readings(rows: Iterable[Mapping[str, Any]]) -> Dict[RollupKey, Dict[str, Any]]:
+    """
+    Aggregate readings into hour and day buckets.
+
+    Args:
+        rows: Mappings with batch_id, timestamp, gravity, temperature and ph
+
+    Returns:
+        Mapping of (batch_id, resolution, bucket_start) to rollup column values
+    """
+    aggregates: Dict[RollupKey, Dict[str, Any]] = {}
+    for row in rows:
+        timestamp = row["timestamp"].replace(tzinfo=None)
+        for resolution in ROLLUP_RESOLUTIONS:
+            key = (row["batch_id"], resolution, bucket_start(timestamp, resolution))
+            stats = aggregates.get(key)
+            if stats is None:
+                stats = aggregates[key] = _empty_stats()
+            stats["reading_count"] += 1
+            for metric in ROLLUP_METRICS:
+                value = row.get(metric)
+                if value is not None:
+                    _add_value(stats, metric, value, timestamp)
+    return aggregates
+
+
+def _insert_rollups(db: Session, aggregates: Dict[RollupKey, Dict[str, Any]]) -> None:
+    rows = [
+        {"batch_id": batch_id, "resolution": resolution, "bucket_start": start, **stats}
+        for (batch_id, resolution, start), stats in aggregates.items()
+    ]
+    for offset in range(0, len(rows), REBUILD_CHUNK_SIZE):
+        db.execute(
+            insert(models.FermentationReadingRollup), rows[offset:offset + REBUILD_CHUNK_SIZE]
+        )
+
+
+def _merge_columns(rollup, excluded) -> Dict[str, Any]:
+    """
+    ON CONFLICT assignments folding ``excluded`` (the new aggregate) into
+    the stored bucket. Both PostgreSQL and SQLite evaluate every right-hand
+    side against the row as it was before the update.
+    """
+    values: Dict[str, Any] = {"reading_count": rollup.reading_count + excluded.reading_count}
+    for metric in ROLLUP_METRICS:
+        count, new_count = getattr(rollup, f"{metric}_count"), getattr(excluded, f"{metric}_count")
+        total, new_total = getattr(rollup, f"{metric}_sum"), getattr(excluded, f"{metric}_sum")
+        low, new_low = getattr(rollup, f"{metric}_min"), getattr(excluded, f"{metric}_min")
+        high, new_high = getattr(rollup, f"{metric}_max"), getattr(excluded, f"{metric}_max")
+        last_at = getattr(rollup, f"{metric}_last_at")
+        new_last_at = getattr(excluded, f"{metric}_last_at")
+        # Sums, minima and maxima are NULL while a bucket has no values
+        newer = and_(new_last_at.is_not(None), or_(last_at.is_(None), new_last_at >= last_at))
+        values.update(
+            {
+                f"{metric}_count": count + new_count,
+                f"{metric}_sum": case(
+                    (new_count == 0, total), else_=func.coalesce(total, 0) + new_total
+                ),
+                f"{metric}_min": case(
+                    (or_(low.is_(None), new_low < low), new_low), else_=low
+                ),
+                f"{metric}_max": case(
+                    (or_(high.is_(None), new_high > high), new_high), else_=high
+                ),
+                f"{metric}_last": case(
+                    (newer, getattr(excluded, f"{metric}_last")),
+                    else_=getattr(rollup, f"{metric}_last"),
+                ),
+                f"{metric}_last_at": case((newer, new_last_at), else_=last_at),
+            }
+        )
+    return values
+
+
+def apply_readings(db: Session, rows: Sequence[Mapping[str, Any]]) -> int:
+    """
+    Fold newly inserted readings into their rollup buckets.
+
+    Readings are aggregated per bucket in Python and written with a single
+    ``INSERT ... ON CONFLICT DO UPDATE``, which merges counts, sums, minima,
+    maxima and last values into existing buckets inside the database, so
+    concurrent ingests never lose an update or collide on a new bucket. The
+    caller commits.
+
+    Returns:
+        Number of buckets touched
+    """
+    aggregates = aggregate_readings(rows)
+    if not aggregates:
+        return 0
+
+    rollup = models.FermentationReadingRollup.__table__
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        upsert = postgresql_insert(rollup)
+    elif dialect_name == "sqlite":
+        upsert = sqlite_insert(rollup)
+    else:
+        raise NotImplementedError(f"Rollup upsert is not supported on {dialect_name}")
+
+    upsert = upsert.on_conflict_do_update(
+        index_elements=["batch_id", "resolution", "bucket_start"],
+        set_=_merge_columns(rollup.c, upsert.excluded),
+    )
+    rows = [
+        {"batch_id": batch_id, "resolution": resolution, "bucket_start": start, **stats}
+        for (batch_id, resolution, start), stats in sorted(aggregates.items())
+    ]
+    db.execute(upsert, rows)
+    return len(aggregates)
+
+
+def rebuild_rollups(
+    db: Session,
+    batch_ids: Optional[Iterable[int]] = None,
+    days: Optional[Iterable[datetime]] = None,
+) -> int:
+    """
+    Recompute rollups from raw readings.
+
+    Args:
+        db: SQLAlchemy session; the caller commits
+        batch_ids: Batches to rebuild; every batch when None
+        days: Only rebuild the buckets of these days (any time within the
+            day), e.g. after a reading was edited or deleted
+
+    Returns:
+        Number of rollup rows written
+    """
+    rollup = models.FermentationReadingRollup
+    reading = models.FermentationReadings
+
+    rollup_filters = []
+    reading_filters = []
+    if batch_ids is not None:
+        batch_ids = list(batch_ids)
+        rollup_filters.append(rollup.batch_id.in_(batch_ids))
+        reading_filters.append(reading.batch_id.in_(batch_ids))
+    if days is not None:
+        day_starts = sorted({bucket_start(day, "day") for day in days})
+        if not day_starts:
+            return 0
+        width = BUCKET_WIDTHS["day"]
+        rollup_filters.append(
+            or_(*(
+                and_(rollup.bucket_start >= day, rollup.bucket_start < day + width)
+                for day in day_starts
+            ))
+        )
+        reading_filters.append(
+            or_(*(
+                and_(reading.timestamp >= day, reading.timestamp < day + width)
+                for day in day_starts
+            ))
+        )
+
+    db.execute(delete(rollup).where(*rollup_filters))
+
+    query = select(
+        reading.batch_id, reading.timestamp, reading.gravity, reading.temperature, reading.ph
+    ).where(*reading_filters)
+    result = db.execute(query.execution_options(yield_per=REBUILD_CHUNK_SIZE))
+    aggregates = aggregate_readings(row._mapping for row in result)
+
+    _insert_rollups(db, aggregates)
+    db.flush()
+    return len(aggregates)
+
+
+def choose_resolution(span: timedelta, max_points: int) -> Optional[str]:
+    """
+    Coarsest rollup that still yields ``max_points`` buckets over ``span``.
+
+    Returns:
+        "day", "hour", or None when the window needs raw readings
+    """
+    for resolution in reversed(ROLLUP_RESOLUTIONS):
+        if span / BUCKET_WIDTHS[resolution] >= max_points:
+            return resolution
+    return None
+
+
+def load_rollup_series(
+    db: Session,
+    batch_id: int,
+    resolution: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Tuple[List[datetime], Dict[str, np.ndarray], int]:
+    """
+    Mean gravity, temperature and pH per bucket for a batch.
+
+    Buckets overlapping ``start`` are included.
+
+    Returns:
+        Tuple of (bucket starts, metric name to array of means with NaN for
+        empty buckets, number of raw readings covered)
+    """
+    rollup = models.FermentationReadingRollup
+    columns = [rollup.bucket_start, rollup.reading_count]
+    for metric in ROLLUP_METRICS:
+        columns += [getattr(rollup, f"{metric}_sum"), getattr(rollup, f"{metric}_count")]
+
+    query = select(*columns).where(
+        rollup.batch_id == batch_id, rollup.resolution == resolution
+    )
+    if start is not None:
+        query = query.where(rollup.bucket_start >= bucket_start(start, resolution))
+    if end is not None:
+        query = query.where(rollup.bucket_start <= end.replace(tzinfo=None))
+    rows = db.execute(query.order_by(rollup.bucket_start)).all()
+
+    values = np.array([row[2:] for row in rows], dtype=float).reshape(len(rows), -1)
+    series = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for position, metric in enumerate(ROLLUP_METRICS):
+            sums = values[:, 2 * position]
+            counts = values[:, 2 * position + 1]
+            series[metric] = np.round(
+                np.where(counts > 0, sums / counts, np.nan), MEAN_DECIMALS[metric]
+            )
+    return [row.bucket_start for row in rows], series, sum(row.reading_count for row in rows)
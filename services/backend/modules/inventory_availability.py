@@ -0,0 +1,144 @@
+"""
+Inventory Availability Module
+
+Checks recipe ingredients against the stock on hand. Inventory rows are
+matched to recipe ingredients by normalized name (``name_normalized``, see
+``utils.inventory_stock.normalize_ingredient_name``) and their numeric stock
+is summed per name.
+
+Only rows not attached to a batch count as available; rows copied into a
+batch when it was created belong to that batch.
+
+Work is set-based: one query per recipe ingredient table for the recipes
+checked and one grouped query per inventory table, regardless of how many
+recipes or ingredients are involved.
+"""
+
+from typing import Dict, Iterable, List, Set
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+import Database.Schemas as schemas
+from utils.inventory_stock import normalize_ingredient_name
+
+# Item type -> (recipe ingredient model, inventory model, unit)
+INGREDIENT_TYPES = {
+    "hop": (models.RecipeHop, models.InventoryHop, "kg"),
+    "fermentable": (models.RecipeFermentable, models.InventoryFermentable, "kg"),
+    "yeast": (models.RecipeYeast, models.InventoryYeast, "g"),
+    "misc": (models.RecipeMisc, models.InventoryMisc, "g"),
+}
+
+# Stock below this multiple of the requirement is reported as low
+LOW_STOCK_FACTOR = 1.5
+
+
+def available_stock(db: Session, item_type: str, names: Iterable[str]) -> Dict[str, float]:
+    """
+    Total unallocated stock per normalized name for one item type.
+
+    Args:
+        db: SQLAlchemy session
+        item_type: 'hop', 'fermentable', 'yeast' or 'misc'
+        names: Normalized names to look up
+
+    Returns:
+        Mapping of normalized name to summed stock; names without inventory
+        are left out
+    """
+    names = {name for name in names if name}
+    if not names:
+        return {}
+    model = INGREDIENT_TYPES[item_type][1]
+    rows = db.execute(
+        select(model.name_normalized, func.coalesce(func.sum(model.stock), 0.0))
+        .where(model.name_normalized.in_(names), model.batch_id.is_(None))
+        .group_by(model.name_normalized)
+    )
+    return {name: float(total) for name, total in rows}
+
+
+def availability_item(
+    item_id: int,
+    item_type: str,
+    name: str,
+    available_qty: float,
+    required_qty: float,
+    unit: str,
+) -> schemas.InventoryAvailability:
+    """Availability of one recipe ingredient, with a stock warning level"""
+    is_available = available_qty >= required_qty
+    warning_level = None
+
+    if not is_available:
+        warning_level = "out_of_stock"
+    elif available_qty < required_qty * LOW_STOCK_FACTOR:
+        warning_level = "low_stock"
+
+    return schemas.InventoryAvailability(
+        inventory_item_id=item_id,
+        inventory_item_type=item_type,
+        name=name,
+        available_quantity=available_qty,
+        required_quantity=required_qty,
+        unit=unit,
+        is_available=is_available,
+        warning_level=warning_level,
+    )
+
+
+def recipe_availability(
+    db: Session, recipe_ids: Iterable[int]
+) -> Dict[int, List[schemas.InventoryAvailability]]:
+    """
+    Availability of every ingredient of the given recipes.
+
+    Args:
+        db: SQLAlchemy session
+        recipe_ids: Recipes to check; ids that do not exist are skipped
+
+    Returns:
+        Mapping of existing recipe id, in the order given, to its ingredients'
+        availability: hops, fermentables, yeasts then miscs, each in the
+        order they were added
+    """
+    recipe_ids = list(dict.fromkeys(recipe_ids))
+    found: Set[int] = set(
+        db.execute(
+            select(models.Recipes.id).where(models.Recipes.id.in_(recipe_ids))
+        ).scalars()
+    )
+    results: Dict[int, List[schemas.InventoryAvailability]] = {
+        recipe_id: [] for recipe_id in recipe_ids if recipe_id in found
+    }
+    if not results:
+        return results
+
+    for item_type, (recipe_model, _, unit) in INGREDIENT_TYPES.items():
+        lines = db.execute(
+            select(
+                recipe_model.id,
+                recipe_model.recipe_id,
+                recipe_model.name,
+                recipe_model.amount,
+            )
+            .where(recipe_model.recipe_id.in_(list(results)))
+            .order_by(recipe_model.recipe_id, recipe_model.id)
+        ).all()
+        stock = available_stock(
+            db, item_type, (normalize_ingredient_name(line.name) for line in lines)
+        )
+        for line in lines:
+            results[line.recipe_id].append(
+                availability_item(
+                    line.id,
+                    item_type,
+                    line.name or "",
+                    stock.get(normalize_ingredient_name(line.name), 0.0),
+                    line.amount or 0,
+                    unit,
+                )
+            )
+    return results
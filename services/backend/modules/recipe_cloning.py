@@ -0,0 +1,162 @@
+"""
+Recipe Cloning Module
+
+Set-based copies of a recipe and its ingredients, used when a batch is
+created from a recipe:
+
+- ``clone_recipe`` copies the recipe row and its hops, fermentables, miscs
+  and yeasts with one INSERT ... SELECT per table
+- ``copy_recipe_to_inventory`` copies a recipe's ingredients into a batch's
+  inventory tables with one SELECT and one executemany per table
+
+Neither function commits, so a batch and everything it is built from can be
+created in a single transaction.
+"""
+
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+from utils.inventory_stock import (
+    inventory_stock,
+    normalize_ingredient_name,
+    parse_numeric_value,
+)
+
+# Recipe ingredient tables copied along with the recipe row
+RECIPE_INGREDIENT_MODELS = (
+    models.RecipeHop,
+    models.RecipeFermentable,
+    models.RecipeMisc,
+    models.RecipeYeast,
+)
+
+# Recipe ingredient model -> (inventory model, columns copied)
+INVENTORY_COPIES: Dict[type, Tuple[type, Tuple[str, ...]]] = {
+    models.RecipeHop: (
+        models.InventoryHop,
+        (
+            "name", "origin", "alpha", "type", "form", "beta", "hsi", "amount",
+            "use", "time", "notes", "display_amount", "inventory", "display_time",
+        ),
+    ),
+    models.RecipeFermentable: (
+        models.InventoryFermentable,
+        (
+            "name", "type", "yield_", "color", "origin", "supplier", "notes",
+            "potential", "amount", "cost_per_unit", "manufacturing_date",
+            "expiry_date", "lot_number", "exclude_from_total", "not_fermentable",
+            "description", "substitutes", "used_in",
+        ),
+    ),
+    models.RecipeMisc: (
+        models.InventoryMisc,
+        (
+            "name", "type", "use", "amount_is_weight", "use_for", "notes", "amount",
+            "time", "display_amount", "inventory", "display_time", "batch_size",
+        ),
+    ),
+    models.RecipeYeast: (
+        models.InventoryYeast,
+        (
+            "name", "type", "form", "laboratory", "product_id", "min_temperature",
+            "max_temperature", "flocculation", "attenuation", "notes", "best_for",
+            "max_reuse", "amount", "amount_is_weight",
+        ),
+    ),
+}
+
+
+def _inventory_row(values: Dict, batch_id: int) -> Dict:
+    """Normalize copied values the way batch inventory stores them."""
+    row = dict(values, batch_id=batch_id)
+    for column in ("display_amount", "display_time"):
+        if column in row:
+            row[column] = row[column] or ""
+    if "inventory" in row:
+        row["inventory"] = parse_numeric_value(row["inventory"]) if row["inventory"] else 0.0
+    row["stock"] = inventory_stock(row.get("inventory"), row.get("amount"))
+    row["name_normalized"] = normalize_ingredient_name(row.get("name"))
+    return row
+
+
+def clone_recipe(db: Session, recipe_id: int, is_batch: bool = True) -> Optional[int]:
+    """
+    Copy a recipe and its ingredients.
+
+    The copy records the source in ``origin_recipe_id``; every other column,
+    including the running metric totals, is copied as stored.
+
+    Args:
+        db: SQLAlchemy session; the caller commits
+        recipe_id: Recipe to copy
+        is_batch: Value of ``is_batch`` on the copy
+
+    Returns:
+        Id of the new recipe, or None if the source recipe does not exist
+    """
+    recipes = models.Recipes.__table__
+    overrides = {"is_batch": is_batch, "origin_recipe_id": recipe_id}
+    names = [column.name for column in recipes.columns if not column.primary_key]
+    source = select(
+        *(
+            literal(overrides[name], type_=recipes.c[name].type)
+            if name in overrides
+            else recipes.c[name]
+            for name in names
+        )
+    ).where(recipes.c.id == recipe_id)
+    clone_id = db.execute(
+        insert(recipes).from_select(names, source).returning(recipes.c.id)
+    ).scalar_one_or_none()
+    if clone_id is None:
+        return None
+
+    for model in RECIPE_INGREDIENT_MODELS:
+        table = model.__table__
+        names = [column.name for column in table.columns if not column.primary_key]
+        source = (
+            select(
+                *(
+                    literal(clone_id, type_=table.c.recipe_id.type)
+                    if name == "recipe_id"
+                    else table.c[name]
+                    for name in names
+                )
+            )
+            .where(table.c.recipe_id == recipe_id)
+            .order_by(table.c.id)
+        )
+        db.execute(insert(table).from_select(names, source))
+    return clone_id
+
+
+def copy_recipe_to_inventory(db: Session, recipe_id: int, batch_id: int) -> int:
+    """
+    Copy a recipe's ingredients into a batch's inventory tables.
+
+    Args:
+        db: SQLAlchemy session; the caller commits
+        recipe_id: Recipe whose ingredients are copied
+        batch_id: Batch owning the inventory rows
+
+    Returns:
+        Number of inventory rows created
+    """
+    created = 0
+    for source_model, (target_model, columns) in INVENTORY_COPIES.items():
+        source = source_model.__table__
+        rows = db.execute(
+            select(*(source.c[name] for name in columns))
+            .where(source.c.recipe_id == recipe_id)
+            .order_by(source.c.id)
+        ).mappings().all()
+        if rows:
+            db.execute(
+                insert(target_model.__table__),
+                [_inventory_row(row, batch_id) for row in rows],
+            )
+            created += len(rows)
+    return created
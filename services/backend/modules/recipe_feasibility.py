@@ -0,0 +1,280 @@
+"""
+Recipe feasibility against current inventory.
+
+FeasibilityIndex holds the ingredient requirements of every recipe as a
+sparse matrix in coordinate form: one (recipe, ingredient, amount) entry per
+distinct ingredient of a recipe, where an ingredient is an item type plus
+normalized name (see ``modules.inventory_availability``). Checking the whole
+catalog against an inventory vector, the unallocated stock per ingredient,
+is a gather and a few bincounts over those entries rather than one
+availability check per recipe.
+
+FeasibilityCache keeps the index and the inventory vector per process. The
+index is rebuilt when the recipe ingredient tables change. The inventory
+vector is reloaded when the inventory tables change, except for stock
+writes this process reports through ``apply_stock_writes`` (ingredient
+consumption), which are applied to the vector in place. Changes are
+detected through the table group counters of ``Database.Models.table_versions``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+from Database.Models.table_versions import table_versions
+from modules.inventory_availability import INGREDIENT_TYPES, available_stock
+from utils.inventory_stock import normalize_ingredient_name
+
+__all__ = [
+    "FeasibilityCache",
+    "FeasibilityIndex",
+    "RecipeFeasibility",
+    "feasibility_cache",
+]
+
+# (item type, normalized name); unnamed recipe ingredients use "" and never
+# match inventory
+IngredientKey = Tuple[str, str]
+
+
+@dataclass
+class RecipeFeasibility:
+    """Coverage of one recipe by the inventory."""
+
+    recipe_id: int
+    brewable: bool
+    coverage: float
+    ingredient_count: int
+    missing: List[IngredientKey] = field(default_factory=list)
+
+
+class FeasibilityIndex:
+    """
+    Sparse recipe x ingredient requirement matrix.
+
+    Args:
+        recipe_ids: Recipe ids, one per matrix row
+        ingredients: Ingredient keys, one per matrix column
+        recipe_index: Row of each entry
+        ingredient_index: Column of each entry
+        required: Amount of each entry; entries for the same row and column
+            are summed
+    """
+
+    def __init__(
+        self,
+        recipe_ids: Iterable[int],
+        ingredients: Iterable[IngredientKey],
+        recipe_index,
+        ingredient_index,
+        required,
+    ):
+        self.recipe_ids = np.asarray(list(recipe_ids), dtype=np.int64)
+        self.ingredients: List[IngredientKey] = list(ingredients)
+        self.ingredient_positions: Dict[IngredientKey, int] = {
+            key: position for position, key in enumerate(self.ingredients)
+        }
+
+        recipe_index = np.asarray(recipe_index, dtype=np.int64)
+        ingredient_index = np.asarray(ingredient_index, dtype=np.int64)
+        required = np.asarray(required, dtype=float)
+        # Merge repeated ingredients of a recipe into one entry
+        cell = recipe_index * max(len(self.ingredients), 1) + ingredient_index
+        cells, inverse = np.unique(cell, return_inverse=True)
+        self.required = np.bincount(inverse, weights=required, minlength=len(cells))
+        self.recipe_index = cells // max(len(self.ingredients), 1)
+        self.ingredient_index = cells % max(len(self.ingredients), 1)
+        self.ingredient_counts = np.bincount(
+            self.recipe_index, minlength=len(self.recipe_ids)
+        )
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    @classmethod
+    def from_database(cls, db: Session) -> "FeasibilityIndex":
+        """Load every recipe's ingredient amounts with one query per table."""
+        recipe_ids = db.execute(
+            select(models.Recipes.id).order_by(models.Recipes.id)
+        ).scalars().all()
+        rows_by_recipe = {recipe_id: row for row, recipe_id in enumerate(recipe_ids)}
+
+        ingredients: Dict[IngredientKey, int] = {}
+        recipe_index: List[int] = []
+        ingredient_index: List[int] = []
+        required: List[float] = []
+        for item_type, (recipe_model, _, _) in INGREDIENT_TYPES.items():
+            lines = db.execute(
+                select(recipe_model.recipe_id, recipe_model.name, recipe_model.amount)
+                .where(recipe_model.recipe_id.is_not(None))
+                .order_by(recipe_model.id)
+            )
+            for recipe_id, name, amount in lines:
+                row = rows_by_recipe.get(recipe_id)
+                if row is None:
+                    continue
+                key = (item_type, normalize_ingredient_name(name) or "")
+                recipe_index.append(row)
+                ingredient_index.append(ingredients.setdefault(key, len(ingredients)))
+                required.append(amount or 0.0)
+        return cls(recipe_ids, ingredients, recipe_index, ingredient_index, required)
+
+    def stock_vector(self, db: Session) -> np.ndarray:
+        """Unallocated stock of every ingredient, with one query per item type."""
+        stock = np.zeros(len(self.ingredients))
+        names_by_type: Dict[str, List[str]] = {}
+        for item_type, name in self.ingredients:
+            names_by_type.setdefault(item_type, []).append(name)
+        for item_type, names in names_by_type.items():
+            for name, total in available_stock(db, item_type, names).items():
+                stock[self.ingredient_positions[(item_type, name)]] = total
+        return stock
+
+    def evaluate(self, stock: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compare every recipe against an inventory vector.
+
+        Args:
+            stock: Available quantity per ingredient, in ``ingredients`` order
+
+        Returns:
+            Tuple of (coverage, satisfied): per recipe, the mean fraction of
+            each ingredient's requirement in stock (1.0 without ingredients),
+            and per matrix entry whether its requirement is met
+        """
+        available = stock[self.ingredient_index]
+        satisfied = available >= self.required
+        fraction = np.where(
+            self.required > 0,
+            np.minimum(available / np.where(self.required > 0, self.required, 1.0), 1.0),
+            1.0,
+        )
+        covered = np.bincount(self.recipe_index, weights=fraction, minlength=len(self))
+        coverage = np.where(
+            self.ingredient_counts > 0,
+            covered / np.maximum(self.ingredient_counts, 1),
+            1.0,
+        )
+        return coverage, satisfied
+
+    def feasibility(
+        self,
+        stock: np.ndarray,
+        recipe_ids: Optional[Iterable[int]] = None,
+        min_coverage: float = 1.0,
+        limit: Optional[int] = None,
+    ) -> List[RecipeFeasibility]:
+        """
+        Recipes covered by the inventory, best covered first.
+
+        Args:
+            stock: Available quantity per ingredient, in ``ingredients`` order
+            recipe_ids: Only consider these recipes; all when None
+            min_coverage: Lowest coverage returned; 1.0 keeps only recipes
+                whose every ingredient is in stock
+            limit: Maximum number of recipes returned
+
+        Returns:
+            Recipes ordered by coverage, then fewest missing ingredients,
+            then id
+        """
+        coverage, satisfied = self.evaluate(stock)
+        missing_counts = np.bincount(
+            self.recipe_index, weights=~satisfied, minlength=len(self)
+        ).astype(np.int64)
+
+        candidates = missing_counts == 0 if min_coverage >= 1.0 else coverage >= min_coverage
+        if recipe_ids is not None:
+            candidates &= np.isin(self.recipe_ids, np.fromiter(recipe_ids, dtype=np.int64))
+        rows = np.flatnonzero(candidates)
+        rows = rows[np.lexsort((self.recipe_ids[rows], missing_counts[rows], -coverage[rows]))]
+        if limit is not None:
+            rows = rows[:limit]
+
+        missing_entries = np.flatnonzero(~satisfied & np.isin(self.recipe_index, rows))
+        missing: Dict[int, List[IngredientKey]] = {}
+        for entry in missing_entries:
+            missing.setdefault(int(self.recipe_index[entry]), []).append(
+                self.ingredients[self.ingredient_index[entry]]
+            )
+        return [
+            RecipeFeasibility(
+                recipe_id=int(self.recipe_ids[row]),
+                brewable=bool(missing_counts[row] == 0),
+                coverage=float(coverage[row]),
+                ingredient_count=int(self.ingredient_counts[row]),
+                missing=missing.get(int(row), []),
+            )
+            for row in rows
+        ]
+
+
+class FeasibilityCache:
+    """
+    Process-wide FeasibilityIndex and inventory vector.
+
+    Every lookup reads the "recipe_ingredients" and "inventory" table group
+    counters, one primary key lookup, and compares them with the ones the
+    cached values were built from. Every committed session write to those
+    tables increments them, so writes from another worker or a seed script
+    are picked up.
+    """
+
+    def __init__(self):
+        self._index: Optional[FeasibilityIndex] = None
+        self._recipe_version: Optional[int] = None
+        self._stock: Optional[np.ndarray] = None
+        self._inventory_version: Optional[int] = None
+        self._lock = RLock()
+
+    def get(self, db: Session) -> Tuple[FeasibilityIndex, np.ndarray]:
+        """Current index and inventory vector, rebuilt if the tables changed."""
+        versions = table_versions(db, ("recipe_ingredients", "inventory"))
+        with self._lock:
+            if self._index is None or versions["recipe_ingredients"] != self._recipe_version:
+                self._index = FeasibilityIndex.from_database(db)
+                self._recipe_version = versions["recipe_ingredients"]
+                self._stock = None
+            if self._stock is None or versions["inventory"] != self._inventory_version:
+                self._stock = self._index.stock_vector(db)
+                self._inventory_version = versions["inventory"]
+            return self._index, self._stock.copy()
+
+    def apply_stock_writes(
+        self, writes: Iterable[Tuple[str, Optional[str], bool, float]]
+    ) -> None:
+        """
+        Apply the stock writes of one committed transaction to the cached
+        inventory vector.
+
+        Each write is one inventory row, given as (item type, normalized
+        name, whether the row is unallocated, change in stored stock); the
+        transaction incremented the inventory counter once. If the vector was
+        built from another state of the tables, the next lookup still sees a
+        counter mismatch and reloads it.
+        """
+        with self._lock:
+            if self._stock is None or self._inventory_version is None:
+                return
+            self._inventory_version += 1
+            for item_type, name, unallocated, delta in writes:
+                position = self._index.ingredient_positions.get((item_type, name or ""))
+                if unallocated and position is not None:
+                    self._stock[position] += delta
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+            self._recipe_version = None
+            self._stock = None
+            self._inventory_version = None
+
+
+feasibility_cache = FeasibilityCache()
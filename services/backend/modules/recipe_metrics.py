@@ -0,0 +1,650 @@
+"""
+Vectorized recipe metrics.
+
+RecipeMetricsEngine evaluates the estimates from modules.brewing_calculations
+(Tinseth/Rager IBU, Morey SRM, OG/FG and ABV) for many recipes at once.
+Ingredients are supplied as flat columns tagged with the index of the recipe
+they belong to, and per-recipe totals are taken with numpy.bincount, so the
+work is a fixed number of array passes however many hops and fermentables
+there are.
+
+Units follow the scalar calculators: volumes in US gallons, hop weights in
+ounces, fermentable weights in pounds, alpha acids and efficiency in percent.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+
+__all__ = [
+    "IBU_METHODS",
+    "METRIC_TOTAL_COLUMNS",
+    "RecipeMetricsEngine",
+    "apply_ingredient_change",
+    "derive_metrics",
+    "fermentable_ppg",
+    "ingredient_contribution",
+    "rebuild_recipe_metrics",
+    "refresh_derived_metrics",
+]
+
+IBU_METHODS = ("tinseth", "rager")
+
+LITER_TO_GALLON = 0.264172
+KILOGRAM_TO_POUND = 2.20462
+SUCROSE_PPG = 46.214
+DEFAULT_EFFICIENCY = 75.0
+DEFAULT_ATTENUATION = 75.0
+
+# Hop uses that see boil utilization; dry hops and mash hops add no IBU here
+BOIL_UTILIZATION_USES = {"boil", "first wort", "aroma", "whirlpool"}
+
+# Fermentables whose extract is not subject to mash efficiency
+NO_EFFICIENCY_TYPES = {"sugar", "extract", "dry extract"}
+
+# Running ingredient totals persisted on Recipes, see RecipeMetricsEngine.totals
+METRIC_TOTAL_COLUMNS = (
+    "extract_points_mash",
+    "extract_points_direct",
+    "color_units",
+    "hop_utilization_tinseth",
+    "hop_utilization_rager",
+    "attenuation_total",
+    "attenuation_samples",
+)
+
+# Recipes column -> derive_metrics key for the stored estimates
+DERIVED_METRIC_COLUMNS = {
+    "est_og": "est_og",
+    "est_fg": "est_fg",
+    "est_abv": "est_abv",
+    "est_color": "srm",
+    "ibu": "ibu",
+}
+
+
+def _float_column(values: Iterable[Optional[float]]) -> np.ndarray:
+    """Convert a sequence with possible None entries to a float array (None -> NaN)."""
+    return np.array(list(values), dtype=float)
+
+
+def _index_column(values: Iterable[int]) -> np.ndarray:
+    return np.array(list(values), dtype=np.intp)
+
+
+def _nan_to_none(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+def uses_rager(ibu_method: Optional[str]) -> bool:
+    """Whether a recipe's IBU method names Rager; anything else means Tinseth."""
+    return (ibu_method or "").strip().lower() == "rager"
+
+
+def hop_utilization(alpha, weight_oz, boil_time_min):
+    """
+    Alpha acid utilization units of hop additions for Tinseth and Rager.
+
+    This is ``alpha x weight x time utilization`` for each addition; the
+    gravity and volume terms are applied per recipe in ``derive_metrics``, so
+    the units of a recipe's hops can simply be summed. Additions with
+    missing values or no boil time contribute zero.
+
+    Returns:
+        Tuple of (tinseth, rager) arrays
+    """
+    alpha = np.asarray(alpha, dtype=float)
+    weight_oz = np.asarray(weight_oz, dtype=float)
+    boil_time = np.asarray(boil_time_min, dtype=float)
+
+    alpha_weight = alpha / 100.0 * weight_oz
+    tinseth = alpha_weight * (1.0 - np.exp(-0.04 * boil_time)) / 4.15
+    rager = alpha_weight * (18.11 + 13.86 * np.tanh((boil_time - 31.32) / 18.27)) / 100.0
+
+    valid = ~np.isnan(tinseth) & (boil_time > 0)
+    return (
+        np.where(valid, np.maximum(tinseth, 0.0), 0.0),
+        np.where(valid, np.maximum(rager, 0.0), 0.0),
+    )
+
+
+def fermentable_units(weight_lb, ppg, color, mashed):
+    """
+    Extract points and color units of fermentables.
+
+    Returns:
+        Tuple of (mash points, direct points, color units) arrays, where mash
+        points are later scaled by efficiency and color units are the Morey
+        ``weight x Lovibond`` numerator. Missing values contribute zero.
+    """
+    weight_lb = np.asarray(weight_lb, dtype=float)
+    points = weight_lb * np.asarray(ppg, dtype=float)
+    color_units = weight_lb * np.asarray(color, dtype=float)
+    mashed = np.asarray(mashed, dtype=bool)
+
+    points = np.where(np.isnan(points), 0.0, points)
+    return (
+        np.where(mashed, points, 0.0),
+        np.where(mashed, 0.0, points),
+        np.where(np.isnan(color_units), 0.0, color_units),
+    )
+
+
+def derive_metrics(
+    totals: Dict[str, np.ndarray],
+    batch_size_gal,
+    boil_size_gal,
+    efficiency,
+    og,
+    fg,
+    use_rager=False,
+) -> Dict[str, np.ndarray]:
+    """
+    Turn per-recipe ingredient totals into gravity, ABV, IBU and SRM.
+
+    All arguments are arrays with one entry per recipe (NaN for unknown).
+    Measured OG/FG take precedence over the estimates for ``abv`` and for the
+    wort gravity used by the IBU formulas; ``est_abv`` uses estimates only.
+    """
+    batch = np.asarray(batch_size_gal, dtype=float)
+    boil = np.asarray(boil_size_gal, dtype=float)
+    efficiency = np.asarray(efficiency, dtype=float)
+    og = np.asarray(og, dtype=float)
+    fg = np.asarray(fg, dtype=float)
+
+    efficiency = np.where(np.isnan(efficiency), DEFAULT_EFFICIENCY, efficiency)
+    points = totals["extract_points_mash"] * efficiency / 100.0 + totals["extract_points_direct"]
+    samples = totals["attenuation_samples"]
+    volume = np.where(np.isnan(boil), batch, boil)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        est_og = np.where((points > 0) & (batch > 0), 1.0 + points / batch / 1000.0, np.nan)
+        attenuation = np.where(samples > 0, totals["attenuation_total"] / samples, DEFAULT_ATTENUATION)
+        est_fg = est_og - (est_og - 1.0) * attenuation / 100.0
+
+        gravity = np.where(np.isnan(og), est_og, og)
+        final_gravity = np.where(np.isnan(fg), est_fg, fg)
+
+        tinseth = (
+            1.65 * np.power(0.000125, gravity - 1.0)
+            * totals["hop_utilization_tinseth"] * 7490 / volume
+        )
+        rager_adjustment = np.where(gravity > 1.050, (gravity - 1.050) / 0.2, 0.0)
+        rager = totals["hop_utilization_rager"] * 7490 / (volume * (1.0 + rager_adjustment))
+        units = np.where(use_rager, totals["hop_utilization_rager"], totals["hop_utilization_tinseth"])
+        ibu = np.where((units > 0) & (volume > 0), np.where(use_rager, rager, tinseth), np.nan)
+
+        color_units = totals["color_units"]
+        srm = np.where(
+            (color_units > 0) & (batch > 0),
+            1.4922 * np.power(color_units / batch, 0.6859),
+            np.nan,
+        )
+
+    return {
+        "est_og": est_og,
+        "est_fg": est_fg,
+        "est_abv": (est_og - est_fg) * 131.25,
+        "abv": np.where(gravity > final_gravity, (gravity - final_gravity) * 131.25, np.nan),
+        "ibu": ibu,
+        "srm": srm,
+    }
+
+
+class RecipeMetricsEngine:
+    """
+    Columnar metrics calculator for a set of recipes.
+
+    Create the engine with one entry per recipe, add ingredient columns with
+    ``add_hops``/``add_fermentables``/``add_yeasts`` (each row carrying the
+    position of its recipe), then call ``compute``.
+    """
+
+    def __init__(
+        self,
+        batch_size_gal: Sequence[Optional[float]],
+        boil_size_gal: Optional[Sequence[Optional[float]]] = None,
+        efficiency: Optional[Sequence[Optional[float]]] = None,
+        og: Optional[Sequence[Optional[float]]] = None,
+        fg: Optional[Sequence[Optional[float]]] = None,
+        recipe_ids: Optional[Sequence[int]] = None,
+        ibu_methods: Optional[Sequence[Optional[str]]] = None,
+    ):
+        self.batch_size_gal = _float_column(batch_size_gal)
+        self.size = len(self.batch_size_gal)
+        self.recipe_ids = list(recipe_ids) if recipe_ids is not None else list(range(self.size))
+        missing = [None] * self.size
+        self.boil_size_gal = _float_column(boil_size_gal or missing)
+        self.efficiency = _float_column(efficiency or missing)
+        self.og = _float_column(og or missing)
+        self.fg = _float_column(fg or missing)
+        self.use_rager = np.array([uses_rager(method) for method in ibu_methods or missing], dtype=bool)
+
+        self._hops: List[Dict[str, np.ndarray]] = []
+        self._fermentables: List[Dict[str, np.ndarray]] = []
+        self._yeasts: List[Dict[str, np.ndarray]] = []
+
+    def add_hops(
+        self,
+        recipe_index: Sequence[int],
+        alpha: Sequence[Optional[float]],
+        weight_oz: Sequence[Optional[float]],
+        boil_time_min: Sequence[Optional[float]],
+    ) -> None:
+        """Add boil hop additions; rows with missing values contribute nothing."""
+        self._hops.append({
+            "recipe_index": _index_column(recipe_index),
+            "alpha": _float_column(alpha),
+            "weight_oz": _float_column(weight_oz),
+            "boil_time_min": _float_column(boil_time_min),
+        })
+
+    def add_fermentables(
+        self,
+        recipe_index: Sequence[int],
+        weight_lb: Sequence[Optional[float]],
+        color: Sequence[Optional[float]],
+        ppg: Sequence[Optional[float]],
+        mashed: Sequence[bool],
+    ) -> None:
+        """
+        Add fermentables.
+
+        ``ppg`` is the extract potential in gravity points per pound per
+        gallon; ``mashed`` marks rows whose extract is scaled by efficiency.
+        """
+        self._fermentables.append({
+            "recipe_index": _index_column(recipe_index),
+            "weight_lb": _float_column(weight_lb),
+            "color": _float_column(color),
+            "ppg": _float_column(ppg),
+            "mashed": np.array(list(mashed), dtype=bool),
+        })
+
+    def add_yeasts(
+        self,
+        recipe_index: Sequence[int],
+        attenuation: Sequence[Optional[float]],
+    ) -> None:
+        """Add yeasts; a recipe's apparent attenuation is the mean of its yeasts."""
+        self._yeasts.append({
+            "recipe_index": _index_column(recipe_index),
+            "attenuation": _float_column(attenuation),
+        })
+
+    @staticmethod
+    def _concat(parts: List[Dict[str, np.ndarray]], keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        if not parts:
+            return {key: np.empty(0, dtype=np.intp if key == "recipe_index" else float) for key in keys}
+        return {key: np.concatenate([part[key] for part in parts]) for key in keys}
+
+    def _per_recipe(self, recipe_index: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        return np.bincount(recipe_index, weights=weights, minlength=self.size)
+
+    def totals(self) -> Dict[str, np.ndarray]:
+        """
+        Per-recipe ingredient totals, keyed by METRIC_TOTAL_COLUMNS.
+
+        These are the gravity- and volume-independent sums that
+        ``derive_metrics`` turns into OG/FG/IBU/SRM estimates.
+        """
+        hops = self._concat(self._hops, ("recipe_index", "alpha", "weight_oz", "boil_time_min"))
+        tinseth, rager = hop_utilization(hops["alpha"], hops["weight_oz"], hops["boil_time_min"])
+
+        fermentables = self._concat(
+            self._fermentables, ("recipe_index", "weight_lb", "color", "ppg", "mashed")
+        )
+        mash_points, direct_points, color_units = fermentable_units(
+            fermentables["weight_lb"],
+            fermentables["ppg"],
+            fermentables["color"],
+            fermentables["mashed"].astype(bool),
+        )
+
+        yeasts = self._concat(self._yeasts, ("recipe_index", "attenuation"))
+        has_attenuation = ~np.isnan(yeasts["attenuation"])
+
+        return {
+            "extract_points_mash": self._per_recipe(fermentables["recipe_index"], mash_points),
+            "extract_points_direct": self._per_recipe(fermentables["recipe_index"], direct_points),
+            "color_units": self._per_recipe(fermentables["recipe_index"], color_units),
+            "hop_utilization_tinseth": self._per_recipe(hops["recipe_index"], tinseth),
+            "hop_utilization_rager": self._per_recipe(hops["recipe_index"], rager),
+            "attenuation_total": self._per_recipe(
+                yeasts["recipe_index"], np.where(has_attenuation, yeasts["attenuation"], 0.0)
+            ),
+            "attenuation_samples": self._per_recipe(
+                yeasts["recipe_index"], has_attenuation.astype(float)
+            ),
+        }
+
+    def compute(self, ibu_method: Optional[str] = None) -> Dict[str, List[Optional[float]]]:
+        """
+        Calculate metrics for every recipe.
+
+        Measured OG/FG take precedence over the estimates for ABV and for the
+        wort gravity used by the IBU formula.
+
+        Args:
+            ibu_method: "tinseth" or "rager"; defaults to each recipe's own
+                ``ibu_methods`` entry, falling back to Tinseth
+
+        Returns:
+            Mapping of metric name (est_og, est_fg, est_abv, abv, ibu, srm) to a
+            list with one value per recipe, None where it cannot be calculated
+        """
+        if ibu_method is None:
+            use_rager = self.use_rager
+        elif ibu_method in IBU_METHODS:
+            use_rager = ibu_method == "rager"
+        else:
+            raise ValueError(f"ibu_method must be one of {', '.join(IBU_METHODS)}.")
+
+        metrics = derive_metrics(
+            self.totals(),
+            batch_size_gal=self.batch_size_gal,
+            boil_size_gal=self.boil_size_gal,
+            efficiency=self.efficiency,
+            og=self.og,
+            fg=self.fg,
+            use_rager=use_rager,
+        )
+        return {name: _nan_to_none(values) for name, values in metrics.items()}
+
+    def add_ingredient_rows(
+        self,
+        hops: Sequence[tuple] = (),
+        fermentables: Sequence[tuple] = (),
+        yeasts: Sequence[tuple] = (),
+    ) -> None:
+        """
+        Add ingredients given as ``(recipe_index, item)`` pairs.
+
+        Items are read by attribute, so ORM objects, schemas and result rows
+        all work. Stored hop amounts are ounces and fermentable amounts
+        kilograms, matching the recipe scaling endpoint.
+        """
+        hops = [
+            (index, hop) for index, hop in hops
+            if (getattr(hop, "use", None) or "").lower() in BOIL_UTILIZATION_USES
+        ]
+        self.add_hops(
+            recipe_index=[index for index, _ in hops],
+            alpha=[hop.alpha for _, hop in hops],
+            weight_oz=[hop.amount for _, hop in hops],
+            boil_time_min=[hop.time for _, hop in hops],
+        )
+        self.add_fermentables(
+            recipe_index=[index for index, _ in fermentables],
+            weight_lb=[
+                None if item.amount is None else item.amount * KILOGRAM_TO_POUND
+                for _, item in fermentables
+            ],
+            color=[item.color for _, item in fermentables],
+            ppg=[
+                fermentable_ppg(
+                    getattr(item, "yield_", None),
+                    getattr(item, "potential", None),
+                    getattr(item, "not_fermentable", None),
+                )
+                for _, item in fermentables
+            ],
+            mashed=[
+                (getattr(item, "type", None) or "").lower() not in NO_EFFICIENCY_TYPES
+                for _, item in fermentables
+            ],
+        )
+        self.add_yeasts(
+            recipe_index=[index for index, _ in yeasts],
+            attenuation=[getattr(item, "attenuation", None) for _, item in yeasts],
+        )
+
+    @classmethod
+    def from_recipes(cls, recipes: Sequence) -> "RecipeMetricsEngine":
+        """
+        Build an engine from loaded recipes (ORM objects or schemas).
+
+        Volumes are read in liters from ``batch_size``/``boil_size``.
+        """
+        engine = cls(
+            batch_size_gal=[_liters_to_gallons(recipe.batch_size) for recipe in recipes],
+            boil_size_gal=[_liters_to_gallons(recipe.boil_size) for recipe in recipes],
+            efficiency=[recipe.efficiency for recipe in recipes],
+            og=[recipe.og for recipe in recipes],
+            fg=[recipe.fg for recipe in recipes],
+            recipe_ids=[getattr(recipe, "id", None) for recipe in recipes],
+            ibu_methods=[getattr(recipe, "ibu_method", None) for recipe in recipes],
+        )
+        engine.add_ingredient_rows(
+            hops=[(index, hop) for index, recipe in enumerate(recipes) for hop in recipe.hops],
+            fermentables=[
+                (index, item) for index, recipe in enumerate(recipes) for item in recipe.fermentables
+            ],
+            yeasts=[(index, item) for index, recipe in enumerate(recipes) for item in recipe.yeasts],
+        )
+        return engine
+
+    @classmethod
+    def from_database(cls, db: Session, recipe_ids: Sequence[int]) -> "RecipeMetricsEngine":
+        """
+        Build an engine for stored recipes with one column-only query per table.
+
+        Recipes appear in the order of ``recipe_ids``; ids that do not exist are
+        left out, so check ``engine.recipe_ids`` for the ones that were found.
+        """
+        rows = {
+            row.id: row
+            for row in db.execute(
+                select(
+                    models.Recipes.id,
+                    models.Recipes.batch_size,
+                    models.Recipes.boil_size,
+                    models.Recipes.efficiency,
+                    models.Recipes.og,
+                    models.Recipes.fg,
+                    models.Recipes.ibu_method,
+                ).where(models.Recipes.id.in_(recipe_ids))
+            )
+        }
+        found_ids = [recipe_id for recipe_id in dict.fromkeys(recipe_ids) if recipe_id in rows]
+        position = {recipe_id: index for index, recipe_id in enumerate(found_ids)}
+
+        engine = cls(
+            batch_size_gal=[_liters_to_gallons(rows[i].batch_size) for i in found_ids],
+            boil_size_gal=[_liters_to_gallons(rows[i].boil_size) for i in found_ids],
+            efficiency=[rows[i].efficiency for i in found_ids],
+            og=[rows[i].og for i in found_ids],
+            fg=[rows[i].fg for i in found_ids],
+            recipe_ids=found_ids,
+            ibu_methods=[rows[i].ibu_method for i in found_ids],
+        )
+        if not found_ids:
+            return engine
+
+        def _rows(*columns):
+            recipe_id = columns[0].class_.recipe_id
+            query = select(recipe_id, *columns).where(recipe_id.in_(found_ids))
+            return [(position[row.recipe_id], row) for row in db.execute(query)]
+
+        engine.add_ingredient_rows(
+            hops=_rows(
+                models.RecipeHop.alpha,
+                models.RecipeHop.amount,
+                models.RecipeHop.time,
+                models.RecipeHop.use,
+            ),
+            fermentables=_rows(
+                models.RecipeFermentable.amount,
+                models.RecipeFermentable.color,
+                models.RecipeFermentable.yield_,
+                models.RecipeFermentable.potential,
+                models.RecipeFermentable.type,
+                models.RecipeFermentable.not_fermentable,
+            ),
+            yeasts=_rows(models.RecipeYeast.attenuation),
+        )
+        return engine
+
+
+def _liters_to_gallons(value: Optional[float]) -> Optional[float]:
+    return None if value is None else value * LITER_TO_GALLON
+
+
+def fermentable_ppg(
+    yield_percent: Optional[float],
+    potential: Optional[float] = None,
+    not_fermentable: Optional[bool] = None,
+) -> Optional[float]:
+    """
+    Extract potential in points per pound per gallon.
+
+    Uses the BeerXML yield (percent of sucrose) when present, otherwise a
+    potential given as specific gravity (e.g. 1.037).
+    """
+    if not_fermentable:
+        return 0.0
+    if yield_percent is not None:
+        return yield_percent / 100.0 * SUCROSE_PPG
+    if potential is not None and 1.0 < potential < 2.0:
+        return (potential - 1.0) * 1000.0
+    return None
+
+
+# Stored metric maintenance
+#
+# Recipes keep the METRIC_TOTAL_COLUMNS sums next to the derived est_og,
+# est_fg, est_color, ibu and est_abv columns. Ingredient endpoints apply the
+# contribution of the single row they change, and whole-recipe writes call
+# rebuild_recipe_metrics, so reads never have to recompute anything.
+
+
+def ingredient_contribution(item) -> Dict[str, float]:
+    """
+    Totals contributed by one stored hop, fermentable or yeast row.
+
+    Returns an empty mapping for ingredients that do not affect metrics.
+    """
+    if isinstance(item, models.RecipeHop):
+        if (item.use or "").lower() not in BOIL_UTILIZATION_USES:
+            return {}
+        tinseth, rager = hop_utilization(item.alpha, item.amount, item.time)
+        return {
+            "hop_utilization_tinseth": float(tinseth),
+            "hop_utilization_rager": float(rager),
+        }
+    if isinstance(item, models.RecipeFermentable):
+        mash_points, direct_points, color_units = fermentable_units(
+            None if item.amount is None else item.amount * KILOGRAM_TO_POUND,
+            fermentable_ppg(item.yield_, item.potential, item.not_fermentable),
+            item.color,
+            (item.type or "").lower() not in NO_EFFICIENCY_TYPES,
+        )
+        return {
+            "extract_points_mash": float(mash_points),
+            "extract_points_direct": float(direct_points),
+            "color_units": float(color_units),
+        }
+    if isinstance(item, models.RecipeYeast):
+        if item.attenuation is None:
+            return {}
+        return {"attenuation_total": float(item.attenuation), "attenuation_samples": 1.0}
+    return {}
+
+
+def refresh_derived_metrics(recipe: models.Recipes) -> None:
+    """Recalculate a recipe's derived metric columns from its stored totals."""
+    totals = {
+        column: np.array([getattr(recipe, column) or 0.0]) for column in METRIC_TOTAL_COLUMNS
+    }
+    metrics = derive_metrics(
+        totals,
+        batch_size_gal=[_liters_to_gallons(recipe.batch_size)],
+        boil_size_gal=[_liters_to_gallons(recipe.boil_size)],
+        efficiency=[recipe.efficiency],
+        og=[recipe.og],
+        fg=[recipe.fg],
+        use_rager=uses_rager(recipe.ibu_method),
+    )
+    for column, metric in DERIVED_METRIC_COLUMNS.items():
+        setattr(recipe, column, _nan_to_none(metrics[metric])[0])
+
+
+def apply_ingredient_change(
+    db: Session,
+    recipe: models.Recipes,
+    old: Optional[Dict[str, float]] = None,
+    new: Optional[Dict[str, float]] = None,
+) -> None:
+    """
+    Replace one ingredient's contribution in the recipe's stored totals.
+
+    The difference is applied as ``column = column + delta`` in SQL and
+    flushed, so concurrent edits to the same recipe serialize on its row lock
+    instead of overwriting each other; the derived columns are then
+    recalculated from the updated totals in the same transaction.
+
+    Args:
+        db: Session the ingredient change is being made in
+        recipe: Recipe owning the ingredient
+        old: ingredient_contribution of the row before the change (None on add)
+        new: ingredient_contribution of the row after the change (None on delete)
+    """
+    delta = dict.fromkeys(METRIC_TOTAL_COLUMNS, 0.0)
+    for column, value in (new or {}).items():
+        delta[column] += value
+    for column, value in (old or {}).items():
+        delta[column] -= value
+
+    changed = False
+    for column, value in delta.items():
+        if value:
+            setattr(recipe, column, getattr(models.Recipes, column) + value)
+            changed = True
+    if changed:
+        db.flush()
+    refresh_derived_metrics(recipe)
+
+
+def rebuild_recipe_metrics(db: Session, recipe_ids: Sequence[int]) -> int:
+    """
+    Recalculate stored totals and derived metrics for recipes from scratch.
+
+    Used after whole-recipe writes (create, replace, import) and to backfill.
+    Runs one column-only query per ingredient table and a single executemany
+    UPDATE; nothing is committed.
+
+    Returns:
+        Number of recipes updated
+    """
+    engine = RecipeMetricsEngine.from_database(db, recipe_ids)
+    if not engine.recipe_ids:
+        return 0
+
+    totals = engine.totals()
+    metrics = derive_metrics(
+        totals,
+        batch_size_gal=engine.batch_size_gal,
+        boil_size_gal=engine.boil_size_gal,
+        efficiency=engine.efficiency,
+        og=engine.og,
+        fg=engine.fg,
+        use_rager=engine.use_rager,
+    )
+    columns = {column: [float(value) for value in totals[column]] for column in METRIC_TOTAL_COLUMNS}
+    columns.update(
+        {column: _nan_to_none(metrics[metric]) for column, metric in DERIVED_METRIC_COLUMNS.items()}
+    )
+    db.execute(
+        update(models.Recipes),
+        [
+            {"id": recipe_id, **{column: values[index] for column, values in columns.items()}}
+            for index, recipe_id in enumerate(engine.recipe_ids)
+        ],
+    )
+    return len(engine.recipe_ids)
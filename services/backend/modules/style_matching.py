@@ -0,0 +1,336 @@
+"""
+Recipe-to-style matching.
+
+StyleIndex holds the OG/FG/ABV/IBU/SRM ranges of every BeerStyle as
+(n_styles, 5) arrays of lower and upper bounds. Scoring a block of recipes
+against it is a handful of broadcast operations over an
+(n_recipes, n_styles, 5) array, so classifying a whole catalog costs a few
+array passes per chunk of recipes rather than one range query per recipe.
+
+The index is cached per process by StyleIndexCache and rebuilt when beer
+styles are written, either through ``invalidate`` or when the cheap
+fingerprint of the beer_styles table changes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+
+__all__ = [
+    "MATCH_METRICS",
+    "RecipeStyleMatch",
+    "StyleIndex",
+    "StyleIndexCache",
+    "load_recipe_metrics",
+    "style_index_cache",
+]
+
+MATCH_METRICS = ("og", "fg", "abv", "ibu", "srm")
+
+# BeerStyle (min, max) columns per metric, in MATCH_METRICS order
+STYLE_RANGE_COLUMNS = (
+    ("og_min", "og_max"),
+    ("fg_min", "fg_max"),
+    ("abv_min", "abv_max"),
+    ("ibu_min", "ibu_max"),
+    ("color_min_srm", "color_max_srm"),
+)
+
+# Stored recipe estimates compared against each range, in MATCH_METRICS order
+RECIPE_METRIC_COLUMNS = ("est_og", "est_fg", "est_abv", "ibu", "est_color")
+
+# Narrowest range width used for scoring, so single-value ranges still give a
+# graded score instead of a hard in/out
+MIN_RANGE_WIDTH = np.array([0.004, 0.004, 0.5, 5.0, 2.0])
+
+# Recipes scored per broadcast block; bounds memory to CHUNK x n_styles x 5
+SCORE_CHUNK_SIZE = 512
+
+
+def _as_float(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+@dataclass
+class RecipeStyleMatch:
+    """One scored style for a recipe."""
+
+    style_id: int
+    name: str
+    style_code: Optional[str]
+    guideline_source_id: Optional[int]
+    score: float
+    in_range: bool
+    compared_metrics: int
+    out_of_range: List[str] = field(default_factory=list)
+
+
+class StyleIndex:
+    """
+    Array index of beer style ranges.
+
+    Args:
+        style_ids: BeerStyle ids, one per row of ``low``/``high``
+        names: Style names
+        style_codes: Style codes, None where unset
+        guideline_source_ids: Guideline source ids, None where unset
+        low: (n_styles, 5) lower bounds in MATCH_METRICS order, NaN if unset
+        high: (n_styles, 5) upper bounds, NaN if unset
+    """
+
+    def __init__(
+        self,
+        style_ids: Sequence[int],
+        names: Sequence[str],
+        style_codes: Sequence[Optional[str]],
+        guideline_source_ids: Sequence[Optional[int]],
+        low,
+        high,
+    ):
+        self.style_ids = list(style_ids)
+        self.names = list(names)
+        self.style_codes = list(style_codes)
+        self.guideline_source_ids = list(guideline_source_ids)
+        self.low = np.asarray(low, dtype=float).reshape(len(self.style_ids), len(MATCH_METRICS))
+        self.high = np.asarray(high, dtype=float).reshape(len(self.style_ids), len(MATCH_METRICS))
+
+        # A range missing one bound is open on that side
+        self._lower = np.where(np.isnan(self.low), -np.inf, self.low)
+        self._upper = np.where(np.isnan(self.high), np.inf, self.high)
+        self._has_range = ~(np.isnan(self.low) & np.isnan(self.high))
+        self._closed = ~np.isnan(self.low) & ~np.isnan(self.high)
+        self._center = np.where(self._closed, (self.low + self.high) / 2, 0.0)
+        self._width = np.maximum(np.where(self._closed, self.high - self.low, 0.0), MIN_RANGE_WIDTH)
+        self._source_ids = np.array(
+            [-1 if source_id is None else source_id for source_id in self.guideline_source_ids]
+        )
+
+    def __len__(self) -> int:
+        return len(self.style_ids)
+
+    @classmethod
+    def from_database(cls, db: Session) -> "StyleIndex":
+        """Load every beer style's ranges with one column-only query."""
+        style = models.BeerStyle
+        range_columns = [
+            getattr(style, column) for pair in STYLE_RANGE_COLUMNS for column in pair
+        ]
+        rows = db.execute(
+            select(
+                style.id, style.name, style.style_code, style.guideline_source_id, *range_columns
+            ).order_by(style.id)
+        ).all()
+
+        bounds = np.array([[_as_float(value) for value in row[4:]] for row in rows], dtype=float)
+        bounds = bounds.reshape(len(rows), len(MATCH_METRICS), 2)
+        return cls(
+            style_ids=[row.id for row in rows],
+            names=[row.name for row in rows],
+            style_codes=[row.style_code for row in rows],
+            guideline_source_ids=[row.guideline_source_id for row in rows],
+            low=bounds[:, :, 0],
+            high=bounds[:, :, 1],
+        )
+
+    def score(self, values) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score recipes against every style.
+
+        Each metric that both the recipe and the style define gets a fit of 1
+        at the centre of the range, 0.5 at its edges and 0 half a range width
+        outside it; a range with only one bound fits 1 anywhere inside it. A
+        recipe's score for a style is the sum of those fits divided by the
+        number of metrics the recipe defines, so styles with missing ranges
+        score lower than styles known to match on every metric.
+
+        Args:
+            values: (n_recipes, 5) recipe metrics in MATCH_METRICS order, NaN
+                where unknown
+
+        Returns:
+            Tuple of (score, in_range, compared, outside), where score is
+            (n_recipes, n_styles) in [0, 1], in_range is True where every
+            compared metric lies inside the style's range, compared counts the
+            metrics both sides define and outside is the (n_recipes, n_styles, 5)
+            mask of compared metrics that fall outside the range
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, len(MATCH_METRICS))
+        v = values[:, None, :]
+        known = ~np.isnan(v)
+        compared_mask = known & self._has_range[None, :, :]
+
+        with np.errstate(invalid="ignore"):
+            outside = compared_mask & ((v < self._lower) | (v > self._upper))
+            edge_distance = np.maximum(np.maximum(self._lower - v, v - self._upper), 0.0)
+            # Open-sided ranges fit fully anywhere inside their bound
+            inside_fit = np.where(self._closed, 1.0 - np.abs(v - self._center) / self._width, 1.0)
+            outside_fit = 0.5 - edge_distance / self._width
+            fit = np.where(
+                compared_mask, np.clip(np.where(outside, outside_fit, inside_fit), 0.0, 1.0), 0.0
+            )
+
+        compared = compared_mask.sum(axis=2)
+        recipe_metric_count = np.maximum(known.sum(axis=2), 1)
+        score = fit.sum(axis=2) / recipe_metric_count
+        in_range = (compared > 0) & ~outside.any(axis=2)
+        return score, in_range, compared, outside
+
+    def match(
+        self,
+        values,
+        top: int = 5,
+        guideline_source_id: Optional[int] = None,
+        in_range_only: bool = False,
+    ) -> List[List[RecipeStyleMatch]]:
+        """
+        Best matching styles for each recipe, best first.
+
+        Styles the recipe fits on every compared metric are listed before
+        partial fits; within each group styles are ordered by score. Styles
+        sharing no metric with the recipe are never returned.
+
+        Args:
+            values: (n_recipes, 5) recipe metrics in MATCH_METRICS order
+            top: Maximum number of styles per recipe
+            guideline_source_id: Only consider styles from this source
+            in_range_only: Only return styles the recipe fits on every metric
+
+        Returns:
+            One list of RecipeStyleMatch per recipe row
+        """
+        values = np.asarray(values, dtype=float).reshape(-1, len(MATCH_METRICS))
+        candidates = np.arange(len(self))
+        if guideline_source_id is not None:
+            candidates = candidates[self._source_ids == guideline_source_id]
+        if len(candidates) == 0 or len(values) == 0:
+            return [[] for _ in range(len(values))]
+
+        index = self._subset(candidates)
+        results: List[List[RecipeStyleMatch]] = []
+        for start in range(0, len(values), SCORE_CHUNK_SIZE):
+            score, in_range, compared, outside = index.score(values[start:start + SCORE_CHUNK_SIZE])
+            eligible = (compared > 0) & (in_range | (not in_range_only))
+            # in_range dominates, score breaks ties; ineligible styles sink
+            rank = np.where(eligible, in_range * 2.0 + score, -1.0)
+            order = np.argsort(-rank, axis=1, kind="stable")[:, :top]
+
+            for row, columns in enumerate(order):
+                matches = []
+                for column in columns:
+                    if not eligible[row, column]:
+                        break
+                    matches.append(
+                        RecipeStyleMatch(
+                            style_id=index.style_ids[column],
+                            name=index.names[column],
+                            style_code=index.style_codes[column],
+                            guideline_source_id=index.guideline_source_ids[column],
+                            score=round(float(score[row, column]), 4),
+                            in_range=bool(in_range[row, column]),
+                            compared_metrics=int(compared[row, column]),
+                            out_of_range=[
+                                metric
+                                for metric, flag in zip(MATCH_METRICS, outside[row, column])
+                                if flag
+                            ],
+                        )
+                    )
+                results.append(matches)
+        return results
+
+    def _subset(self, positions: np.ndarray) -> "StyleIndex":
+        if len(positions) == len(self):
+            return self
+        return StyleIndex(
+            style_ids=[self.style_ids[i] for i in positions],
+            names=[self.names[i] for i in positions],
+            style_codes=[self.style_codes[i] for i in positions],
+            guideline_source_ids=[self.guideline_source_ids[i] for i in positions],
+            low=self.low[positions],
+            high=self.high[positions],
+        )
+
+
+class StyleIndexCache:
+    """
+    Process-wide StyleIndex, rebuilt after beer style writes.
+
+    Besides explicit invalidation by the style endpoints, every lookup
+    compares the row count, highest id and latest updated_at of beer_styles
+    with the values the index was built from, so writes made by another
+    worker or a seed script are picked up too.
+    """
+
+    def __init__(self):
+        self._index: Optional[StyleIndex] = None
+        self._fingerprint = None
+        self._lock = RLock()
+
+    @staticmethod
+    def _table_fingerprint(db: Session):
+        style = models.BeerStyle
+        return tuple(
+            db.execute(
+                select(func.count(style.id), func.max(style.id), func.max(style.updated_at))
+            ).one()
+        )
+
+    def get(self, db: Session) -> StyleIndex:
+        fingerprint = self._table_fingerprint(db)
+        with self._lock:
+            if self._index is None or fingerprint != self._fingerprint:
+                self._index = StyleIndex.from_database(db)
+                self._fingerprint = fingerprint
+            return self._index
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._index = None
+            self._fingerprint = None
+
+
+style_index_cache = StyleIndexCache()
+
+
+def load_recipe_metrics(
+    db: Session, recipe_ids: Optional[Iterable[int]] = None, is_batch: Optional[bool] = None
+) -> Tuple[List[int], Dict[int, str], np.ndarray]:
+    """
+    Load the stored estimates used for style matching.
+
+    Args:
+        db: SQLAlchemy session
+        recipe_ids: Recipes to load; all recipes when None
+        is_batch: Optionally keep only batch copies (True) or only recipes (False)
+
+    Returns:
+        Tuple of (recipe ids ordered by id, id to name mapping, (n, 5) array of
+        metrics in MATCH_METRICS order with NaN for missing values)
+    """
+    recipe = models.Recipes
+    query = select(
+        recipe.id, recipe.name, *(getattr(recipe, column) for column in RECIPE_METRIC_COLUMNS)
+    ).order_by(recipe.id)
+    if recipe_ids is not None:
+        query = query.where(recipe.id.in_(list(recipe_ids)))
+    if is_batch is not None:
+        if is_batch:
+            query = query.where(recipe.is_batch.is_(True))
+        else:
+            query = query.where(recipe.is_batch.is_(False) | recipe.is_batch.is_(None))
+
+    rows = db.execute(query).all()
+    values = np.array([[_as_float(value) for value in row[2:]] for row in rows], dtype=float)
+    return (
+        [row.id for row in rows],
+        {row.id: row.name for row in rows},
+        values.reshape(len(rows), len(MATCH_METRICS)),
+    )
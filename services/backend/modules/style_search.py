@@ -0,0 +1,86 @@
+"""
+Beer Style Search Module
+
+Ranked full-text matching for beer styles, backed by the search index defined
+next to the BeerStyle model (a GIN-indexed tsvector column on PostgreSQL, an
+FTS5 table on SQLite). Every search term is matched as a prefix so the style
+picker can query on each keystroke.
+"""
+
+import re
+from typing import List
+
+from sqlalchemy import Float, Integer, func, literal_column, or_, text
+from sqlalchemy.orm import Query
+
+import Database.Models as models
+
+# Longer inputs are truncated; the first few words are plenty to rank styles
+MAX_SEARCH_TERMS = 8
+
+# bm25 column weights, in FTS5 column order: name, style_code, examples, description
+SQLITE_COLUMN_WEIGHTS = (10.0, 10.0, 4.0, 1.0)
+
+
+def search_terms(search: str) -> List[str]:
+    """Split user input into lowercase word tokens, dropping FTS operators and punctuation."""
+    return re.findall(r"\w+", search.lower())[:MAX_SEARCH_TERMS]
+
+
+def apply_style_search(query: Query, dialect_name: str, search: str) -> Query:
+    """
+    Restrict a BeerStyle query to styles matching ``search``, best match first.
+
+    Every term must match the start of a word in the style's name, code,
+    commercial examples or description. Name and code hits rank above examples,
+    which rank above the description; ties are ordered by name.
+
+    Args:
+        query: Query selecting models.BeerStyle
+        dialect_name: Name of the database dialect the query runs on
+        search: Raw search text
+
+    Returns:
+        The filtered and ordered query, or ``query`` unchanged if ``search``
+        contains no searchable words
+    """
+    terms = search_terms(search)
+    if not terms:
+        return query
+    style = models.BeerStyle
+
+    if dialect_name == "postgresql":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        vector = literal_column("beer_styles.search_vector")
+        return query.filter(vector.op("@@")(tsquery)).order_by(
+            func.ts_rank(vector, tsquery).desc(), style.name, style.id
+        )
+
+    if dialect_name == "sqlite":
+        weights = ", ".join(str(weight) for weight in SQLITE_COLUMN_WEIGHTS)
+        matches = (
+            text(
+                f"SELECT rowid AS style_id, bm25(beer_styles_fts, {weights}) AS rank "
+                "FROM beer_styles_fts WHERE beer_styles_fts MATCH :match"
+            )
+            .bindparams(match=" ".join(f'"{term}"*' for term in terms))
+            .columns(style_id=Integer, rank=Float)
+            .subquery("style_matches")
+        )
+        # bm25 scores are negative; lower is a better match
+        return query.join(matches, matches.c.style_id == style.id).order_by(
+            matches.c.rank, style.name, style.id
+        )
+
+    # Other databases have no search index; fall back to substring matching
+    for term in terms:
+        pattern = f"%{term}%"
+        query = query.filter(
+            or_(
+                style.name.ilike(pattern),
+                style.style_code.ilike(pattern),
+                style.examples.ilike(pattern),
+                style.description.ilike(pattern),
+            )
+        )
+    return query.order_by(style.name, style.id)
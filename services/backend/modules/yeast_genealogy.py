@@ -0,0 +1,160 @@
+"""
+Yeast harvest genealogy.
+
+Ancestors and descendants of a harvest are read from the
+yeast_harvest_lineage closure table (see ``YeastHarvestLineage``) with one
+indexed query each, whatever the depth of the tree. The closure rows are
+written as harvests are inserted; ``rebuild_lineage`` derives them from the
+parent links with a single recursive CTE, for backfills and repairs.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+
+__all__ = [
+    "MAX_LINEAGE_DEPTH",
+    "ancestors",
+    "descendant_tree",
+    "descendants",
+    "rebuild_lineage",
+]
+
+# Deepest lineage followed when rebuilding; also stops the recursion on
+# parent links that form a cycle
+MAX_LINEAGE_DEPTH = 1000
+
+
+def rebuild_lineage(db: Session) -> int:
+    """
+    Recompute every closure row from ``parent_harvest_id`` links.
+
+    Returns:
+        Number of closure rows written
+    """
+    harvests = models.YeastHarvest.__table__
+    lineage = models.YeastHarvestLineage.__table__
+
+    tree = select(
+        harvests.c.id.label("ancestor_id"),
+        harvests.c.id.label("descendant_id"),
+        literal(0, Integer).label("depth"),
+    ).cte("tree", recursive=True)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, harvests.c.id, tree.c.depth + 1)
+        .join(harvests, harvests.c.parent_harvest_id == tree.c.descendant_id)
+        .where(tree.c.depth < MAX_LINEAGE_DEPTH)
+    )
+
+    db.execute(delete(lineage))
+    db.execute(
+        insert(lineage).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth),
+        )
+    )
+    # rowcount is not reliable for INSERT ... SELECT across drivers
+    return db.execute(select(func.count()).select_from(lineage)).scalar_one()
+
+
+def _related(
+    db: Session,
+    harvest_id: int,
+    direction: str,
+    max_depth: Optional[int],
+    skip: int,
+    limit: Optional[int],
+) -> List[Tuple[models.YeastHarvest, int]]:
+    lineage = models.YeastHarvestLineage
+    harvest = models.YeastHarvest
+    if direction == "ancestors":
+        related, anchor = lineage.ancestor_id, lineage.descendant_id
+    else:
+        related, anchor = lineage.descendant_id, lineage.ancestor_id
+
+    query = (
+        select(harvest, lineage.depth)
+        .join(lineage, related == harvest.id)
+        .where(anchor == harvest_id, lineage.depth >= 1)
+        .order_by(lineage.depth, harvest.id)
+        .offset(skip)
+    )
+    if max_depth is not None:
+        query = query.where(lineage.depth <= max_depth)
+    if limit is not None:
+        query = query.limit(limit)
+    return [(row[0], row[1]) for row in db.execute(query)]
+
+
+def ancestors(
+    db: Session,
+    harvest_id: int,
+    max_depth: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+) -> List[Tuple[models.YeastHarvest, int]]:
+    """
+    Ancestors of a harvest, nearest first.
+
+    Args:
+        db: SQLAlchemy session
+        harvest_id: Harvest whose ancestors are returned
+        max_depth: Furthest generation back returned; unlimited when None
+        skip: Number of ancestors skipped
+        limit: Maximum number returned; unlimited when None
+
+    Returns:
+        List of (harvest, depth) with depth 1 for the parent
+    """
+    return _related(db, harvest_id, "ancestors", max_depth, skip, limit)
+
+
+def descendants(
+    db: Session,
+    harvest_id: int,
+    max_depth: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+) -> List[Tuple[models.YeastHarvest, int]]:
+    """
+    Descendants of a harvest, by generation then id.
+
+    Args:
+        db: SQLAlchemy session
+        harvest_id: Harvest whose descendants are returned
+        max_depth: Furthest generation down returned; unlimited when None
+        skip: Number of descendants skipped
+        limit: Maximum number returned; unlimited when None
+
+    Returns:
+        List of (harvest, depth) with depth 1 for the children
+    """
+    return _related(db, harvest_id, "descendants", max_depth, skip, limit)
+
+
+def descendant_tree(
+    db: Session, harvest_id: int, max_depth: Optional[int] = None
+) -> List[Dict]:
+    """
+    Descendants of a harvest nested as ``{"harvest", "children"}`` nodes.
+
+    Args:
+        db: SQLAlchemy session
+        harvest_id: Root of the tree, not included in it
+        max_depth: Deepest generation included; unlimited when None
+
+    Returns:
+        Nodes of the harvest's children, each with its own children
+    """
+    children: Dict[int, List[Dict]] = {harvest_id: []}
+    for harvest, _ in descendants(db, harvest_id, max_depth=max_depth):
+        node = {"harvest": harvest, "children": []}
+        children[harvest.id] = node["children"]
+        # Rows come ordered by depth, so the parent has been placed already
+        siblings = children.get(harvest.parent_harvest_id)
+        if siblings is not None:
+            siblings.append(node)
+    return children[harvest_id]
@@ -0,0 +1,215 @@
+"""
+Fleet-wide yeast viability report.
+
+Viability, status, starter size and predicted expiry of every yeast in the
+inventory and every harvest are computed in one pass of
+``YeastViabilityCalculator.calculate_viability_batch`` over their columns,
+loaded with one query per table.
+
+Inventory yeasts use the same inputs as the single-item viability endpoint:
+their stored viability (100% when unknown) aged from the manufacture date.
+Harvests age from the harvest date at their storage temperature, and the
+storage method stands in for the form (slants and cultures decay slower
+than slurry). A harvest with a measured viability starts from it and takes
+no further generation loss; otherwise it starts from 100% less the loss for
+its generation.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import Database.Models as models
+from utils.yeast_viability import YeastViabilityCalculator
+
+__all__ = [
+    "REPORT_SORTS",
+    "REPORT_SOURCES",
+    "viability_report",
+]
+
+REPORT_SOURCES = ("inventory", "harvest")
+REPORT_SORTS = ("predicted_expiry", "viability", "name")
+
+# Calculator inputs per row, plus what is reported about it; "aged_generations"
+# is the number of generations whose viability loss is applied
+_COLUMNS = (
+    "id", "name", "form", "generation", "manufacture_date", "expiry_date",
+    "initial_viability", "storage_temperature", "aged_generations",
+)
+
+
+def _empty_columns() -> Dict[str, list]:
+    return {key: [] for key in _COLUMNS}
+
+
+def _inventory_rows(db: Session, include_allocated: bool) -> Dict[str, list]:
+    yeast = models.InventoryYeast
+    query = select(
+        yeast.id,
+        yeast.name,
+        yeast.form,
+        yeast.manufacture_date,
+        yeast.expiry_date,
+        yeast.current_viability,
+        yeast.generation,
+    ).order_by(yeast.id)
+    if not include_allocated:
+        query = query.where(yeast.batch_id.is_(None))
+
+    columns = _empty_columns()
+    for row in db.execute(query):
+        columns["id"].append(row.id)
+        columns["name"].append(row.name)
+        columns["form"].append(row.form or "Liquid")
+        columns["manufacture_date"].append(row.manufacture_date)
+        columns["expiry_date"].append(row.expiry_date)
+        columns["initial_viability"].append(row.current_viability or 100.0)
+        columns["storage_temperature"].append(None)
+        columns["generation"].append(row.generation or 0)
+        columns["aged_generations"].append(row.generation or 0)
+    return columns
+
+
+def _harvest_rows(db: Session, include_inactive: bool) -> Dict[str, list]:
+    harvest = models.YeastHarvest
+    strain = models.YeastStrain
+    query = (
+        select(
+            harvest.id,
+            strain.name,
+            harvest.storage_method,
+            harvest.harvest_date,
+            harvest.viability_at_harvest,
+            harvest.storage_temperature,
+            harvest.generation,
+        )
+        .outerjoin(strain, strain.id == harvest.yeast_strain_id)
+        .order_by(harvest.id)
+    )
+    if not include_inactive:
+        query = query.where(harvest.status == "active")
+
+    columns = _empty_columns()
+    for row in db.execute(query):
+        measured = row.viability_at_harvest is not None
+        columns["id"].append(row.id)
+        columns["name"].append(row.name)
+        columns["form"].append(row.storage_method or "Liquid")
+        columns["manufacture_date"].append(row.harvest_date)
+        columns["expiry_date"].append(None)
+        columns["initial_viability"].append(row.viability_at_harvest if measured else 100.0)
+        columns["storage_temperature"].append(row.storage_temperature)
+        columns["generation"].append(row.generation or 0)
+        columns["aged_generations"].append(0 if measured else row.generation or 0)
+    return columns
+
+
+def _date(value) -> Optional[datetime]:
+    return None if np.isnat(value) else value.astype("datetime64[us]").item()
+
+
+def _number(value) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def _days(value) -> Optional[int]:
+    return None if np.isnan(value) else int(value)
+
+
+def viability_report(
+    db: Session,
+    current_date: Optional[datetime] = None,
+    source: Optional[str] = None,
+    status: Optional[str] = None,
+    expires_before: Optional[datetime] = None,
+    sort: str = "predicted_expiry",
+    target_cells: float = 200.0,
+    include_unavailable: bool = False,
+) -> List[Dict]:
+    """
+    Viability of every yeast in the inventory and every harvest.
+
+    Args:
+        db: SQLAlchemy session
+        current_date: Date to calculate viability for (default: now)
+        source: Only "inventory" or only "harvest" rows; both when None
+        status: Only rows with this viability status
+        expires_before: Only rows predicted to expire before this date
+        sort: "predicted_expiry" (soonest first, unknown last),
+            "viability" (lowest first) or "name"
+        target_cells: Pitch size in billions of cells for the starter size
+        include_unavailable: Also report inventory yeasts allocated to a
+            batch and harvests that are no longer active
+
+    Returns:
+        One dictionary per yeast, in the requested order
+    """
+    if current_date is None:
+        current_date = datetime.now()
+
+    columns = _empty_columns()
+    sources: List[str] = []
+    for name in [source] if source else REPORT_SOURCES:
+        if name == "inventory":
+            part = _inventory_rows(db, include_unavailable)
+        else:
+            part = _harvest_rows(db, include_unavailable)
+        for key, values in part.items():
+            columns[key].extend(values)
+        sources.extend([name] * len(part["id"]))
+
+    result = YeastViabilityCalculator.calculate_viability_batch(
+        yeast_forms=columns["form"],
+        manufacture_dates=columns["manufacture_date"],
+        expiry_dates=columns["expiry_date"],
+        initial_viabilities=columns["initial_viability"],
+        storage_temperatures=columns["storage_temperature"],
+        generations=columns["aged_generations"],
+        current_date=current_date,
+        target_cells=target_cells,
+    )
+
+    predicted = result["predicted_expiry_date"]
+    selected = np.ones(len(columns["id"]), dtype=bool)
+    if status:
+        selected &= result["viability_status"] == status
+    if expires_before is not None:
+        if expires_before.tzinfo is not None:
+            # Stored dates are naive local times
+            expires_before = expires_before.astimezone().replace(tzinfo=None)
+        selected &= predicted < np.datetime64(expires_before, "us")
+    rows = np.flatnonzero(selected)
+
+    ids = np.asarray(columns["id"], dtype=np.int64)[rows]
+    if sort == "viability":
+        order = np.lexsort((ids, result["current_viability"][rows]))
+    elif sort == "name":
+        names = [(columns["name"][row] or "").casefold() for row in rows]
+        order = sorted(range(len(rows)), key=lambda position: (names[position], ids[position]))
+    else:
+        # NaT sorts last, unknown expiries at the end
+        order = np.lexsort((ids, predicted[rows]))
+    rows = rows[np.asarray(order, dtype=np.int64)]
+
+    return [
+        {
+            "source": sources[row],
+            "id": columns["id"][row],
+            "name": columns["name"][row],
+            "form": columns["form"][row],
+            "generation": columns["generation"][row],
+            "current_viability": float(result["current_viability"][row]),
+            "viability_status": str(result["viability_status"][row]),
+            "recommendation": str(result["recommendation"][row]),
+            "days_since_manufacture": _days(result["days_since_manufacture"][row]),
+            "days_until_expiry": _days(result["days_until_expiry"][row]),
+            "predicted_expiry_date": _date(predicted[row]),
+            "starter_recommended": bool(result["starter_recommended"][row]),
+            "starter_size_liters": _number(result["starter_size_liters"][row]),
+        }
+        for row in rows
+    ]
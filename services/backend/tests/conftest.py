@@ -1,9 +1,12 @@
 import Database.Models
-from database import Base, get_db
+from database import Base, get_async_db, get_db
 from main import app
+from api.import_jobs import ImportJobRunner, get_import_job_runner
+from api.response_cache import response_cache
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
 from fastapi.testclient import TestClient
+from concurrent.futures import Executor, Future
 import pkgutil
 import importlib
 import logging
@@ -30,13 +33,19 @@ logger = logging.getLogger(__name__)
 
 logger.debug(f"Environment variable TESTING set to: {os.environ['TESTING']}")
 
-# Database setup for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Database setup for testing: a named in-memory database with a shared cache,
+# so the sync engine and the aiosqlite engine behind get_async_db see the same tables
+SQLALCHEMY_DATABASE_URL = "sqlite:///file:hoppybrew_test?mode=memory&cache=shared&uri=true"
+SQLALCHEMY_ASYNC_DATABASE_URL = (
+    "sqlite+aiosqlite:///file:hoppybrew_test?mode=memory&cache=shared&uri=true"
+)
 logger.debug(f"SQLALCHEMY_DATABASE_URL set to: {SQLALCHEMY_DATABASE_URL}")
 
-# For SQLite in-memory databases, we need to use a StaticPool to share
-# the same database connection across all threads/sessions
-from sqlalchemy.pool import StaticPool
+# The in-memory database lives as long as a connection to it is open: the
+# sync engine keeps one (StaticPool), the async engine opens its own per
+# session (NullPool), as each TestClient request runs on a new event loop
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -44,6 +53,10 @@ engine = create_engine(
     poolclass=StaticPool,  # Critical for SQLite :memory: to work with tests
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
 
 def override_get_db():
@@ -54,7 +67,32 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+
+class InlineExecutor(Executor):
+    """Runs submitted work immediately; the in-memory database has a single shared connection"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+# Background import jobs run against the in-memory test database
+test_import_job_runner = ImportJobRunner(
+    session_factory=TestingSessionLocal, executor=InlineExecutor()
+)
+app.dependency_overrides[get_import_job_runner] = lambda: test_import_job_runner
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -76,6 +114,31 @@ def setup_and_teardown():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Cached responses must not outlive the per-test database"""
+    response_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clear_forecast_cache():
+    """Batch ids are reused across tests, so cached forecasts must be dropped"""
+    from modules.fermentation_forecast import forecast_cache
+
+    forecast_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clear_feasibility_cache():
+    """Ids and amounts repeat across tests, so fingerprints alone cannot tell them apart"""
+    from modules.recipe_feasibility import feasibility_cache
+
+    feasibility_cache.invalidate()
+    yield
+
+
 @pytest.fixture(scope="module")
 def client():
     with TestClient(app) as c:
@@ -91,6 +154,15 @@ def db_session():
         session.close()
 
 
+@pytest.fixture()
+def import_job_runner(tmp_path, monkeypatch):
+    """Job runner used by the API, spooling uploads to a temporary directory"""
+    from config import settings
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return test_import_job_runner
+
+
 @pytest.fixture()
 def sample_batch(client, db_session):
     """Create a sample batch for testing"""
@@ -0,0 +1,71 @@
+"""
+Tests for the streaming BeerXML exporter
+"""
+
+import xml.etree.ElementTree as ET
+
+import Database.Models as models
+from modules.beerxml_exporter import export_to_beerxml, iter_beerxml_export
+from modules.beerxml_parser import parse_beerxml
+
+
+def _recipe(name, **fields):
+    return models.Recipes(
+        name=name,
+        version=1,
+        batch_size=20.0,
+        hops=[models.RecipeHop(name="Cascade", alpha=5.5, time=60)],
+        fermentables=[models.RecipeFermentable(name="Pale Malt", yield_=80.0, color=3)],
+        yeasts=[],
+        miscs=[],
+        **fields,
+    )
+
+
+def test_iter_beerxml_export_yields_one_chunk_per_recipe():
+    recipes = [_recipe("First"), _recipe("Second"), _recipe("Third")]
+
+    chunks = list(iter_beerxml_export(recipes))
+
+    # Header, one chunk per recipe, closing tag
+    assert len(chunks) == 5
+    assert chunks[0].startswith('<?xml version="1.0" encoding="utf-8"?>')
+    assert chunks[-1] == "</RECIPES>\n"
+    assert "<NAME>Second</NAME>" in chunks[2]
+
+    root = ET.fromstring("".join(chunks).encode("utf-8"))
+    assert [recipe.findtext("NAME") for recipe in root] == ["First", "Second", "Third"]
+
+
+def test_iter_beerxml_export_consumes_recipes_lazily():
+    consumed = []
+
+    def recipes():
+        for name in ("First", "Second"):
+            consumed.append(name)
+            yield _recipe(name)
+
+    stream = iter_beerxml_export(recipes())
+    next(stream)
+    assert consumed == []
+    next(stream)
+    assert consumed == ["First"]
+
+
+def test_export_pretty_print_indents_nested_elements():
+    xml = export_to_beerxml([_recipe("Indented", notes="Tasty")])
+
+    assert "\n  <RECIPE>\n    <NAME>Indented</NAME>" in xml
+    assert "\n    <HOPS>\n      <HOP>\n        <NAME>Cascade</NAME>" in xml
+    assert xml.endswith("  </RECIPE>\n</RECIPES>\n")
+
+
+def test_export_compact_round_trips_through_parser():
+    xml = export_to_beerxml([_recipe("Compact", primary_temp=19.5)], pretty_print=False)
+
+    assert "\n  <" not in xml
+    recipes = parse_beerxml(xml.encode("utf-8"))
+    assert recipes[0].name == "Compact"
+    assert recipes[0].primary_temp == 19.5
+    assert recipes[0].hops[0].name == "Cascade"
+    assert recipes[0].fermentables[0].yield_ == 80.0
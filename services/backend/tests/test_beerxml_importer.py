@@ -0,0 +1,69 @@
+"""
+Tests for the bulk BeerXML import pipeline
+"""
+
+import pytest
+
+import Database.Models as models
+from modules.beerxml_importer import import_beerxml_stream
+from modules.beerxml_parser import BeerXMLParseError
+
+
+def _recipes_xml(count, trailer=b"</RECIPES>"):
+    recipes = b"".join(
+        b"<RECIPE><NAME>Recipe %d</NAME>"
+        b"<HOPS><HOP><NAME>Cascade</NAME><ALPHA>5.5</ALPHA><TIME>60</TIME></HOP></HOPS>"
+        b"<FERMENTABLES><FERMENTABLE><NAME>Pale Malt</NAME><YIELD>80</YIELD>"
+        b"<COLOR>2.5</COLOR></FERMENTABLE></FERMENTABLES>"
+        b"</RECIPE>" % index
+        for index in range(count)
+    )
+    return b"<RECIPES>" + recipes + trailer
+
+
+def test_import_writes_recipes_and_ingredients_in_chunks(db_session):
+    progress = []
+
+    result = import_beerxml_stream(
+        db_session,
+        _recipes_xml(5),
+        chunk_size=2,
+        on_progress=lambda current, parsed: progress.append(
+            (current.imported_count, parsed)
+        ),
+    )
+
+    assert result.imported_count == 5
+    assert result.skipped_count == 0
+    assert progress == [(2, 2), (4, 4), (5, 5)]
+    assert db_session.query(models.Recipes).count() == 5
+    assert db_session.query(models.RecipeHop).count() == 5
+
+    fermentable = db_session.query(models.RecipeFermentable).first()
+    assert fermentable.yield_ == 80.0
+    assert fermentable.color == 2
+
+    names = [
+        recipe.name
+        for recipe in db_session.query(models.Recipes)
+        .filter(models.Recipes.id.in_(result.recipe_ids))
+        .order_by(models.Recipes.id)
+    ]
+    assert names == [f"Recipe {index}" for index in range(5)]
+
+
+def test_import_keeps_recipes_parsed_before_malformed_xml(db_session):
+    result = import_beerxml_stream(
+        db_session, _recipes_xml(3, trailer=b"<RECIPE><NAME>Broken"), chunk_size=2
+    )
+
+    assert result.imported_count == 3
+    assert len(result.errors) == 1
+    assert "Invalid XML format" in result.errors[0]
+
+
+def test_import_raises_when_nothing_parsed(db_session):
+    with pytest.raises(BeerXMLParseError):
+        import_beerxml_stream(db_session, b"<RECIPES><RECIPE>")
+
+    assert db_session.query(models.Recipes).count() == 0
@@ -3,7 +3,10 @@ Tests for BeerXML import/export functionality
 """
 
 import pytest
+import io
+
 from modules.beerxml_parser import (
+    iter_beerxml,
     parse_beerxml,
     validate_beerxml,
     BeerXMLParseError,
@@ -331,3 +334,35 @@ def test_parse_recipe_with_missing_ingredients():
     assert len(recipe.fermentables) == 0
     assert len(recipe.yeasts) == 0
     assert len(recipe.miscs) == 0
+
+
+def test_iter_beerxml_matches_parse_beerxml():
+    """Test the incremental parser yields the same recipes as parse_beerxml"""
+    streamed = list(iter_beerxml(io.BytesIO(VALID_BEERXML)))
+
+    assert [recipe.model_dump() for recipe in streamed] == [
+        recipe.model_dump() for recipe in parse_beerxml(VALID_BEERXML)
+    ]
+
+
+def test_iter_beerxml_is_lazy():
+    """Test recipes are yielded before malformed trailing XML is reached"""
+    truncated_xml = b"""<?xml version="1.0" encoding="utf-8"?>
+<RECIPES>
+<RECIPE><NAME>First</NAME></RECIPE>
+<RECIPE><NAME>Second</NAME>
+"""
+    recipes = iter_beerxml(truncated_xml)
+
+    assert next(recipes).name == "First"
+    with pytest.raises(BeerXMLParseError) as exc_info:
+        next(recipes)
+    assert "Invalid XML format" in str(exc_info.value)
+
+
+def test_iter_beerxml_invalid_root():
+    """Test the incremental parser rejects unexpected root elements"""
+    with pytest.raises(BeerXMLParseError) as exc_info:
+        list(iter_beerxml(b"<HOPS><HOP><NAME>Cascade</NAME></HOP></HOPS>"))
+
+    assert "Invalid root element" in str(exc_info.value)
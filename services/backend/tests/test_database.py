@@ -0,0 +1,297 @@
+"""
+Test the mapping of database URLs to async drivers, the connection pool
+configuration and metrics, and the SQLite production profile.
+"""
+
+import asyncio
+import time
+from threading import Thread
+
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config import settings
+from database import async_database_url
+from database_pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedNullPool,
+    InstrumentedQueuePool,
+    engine_options,
+    pool_statistics,
+    register_engine,
+    unregister_engine,
+)
+from database_sqlite import SqliteMaintenance, apply_sqlite_pragmas, use_immediate_transactions
+
+
+def test_async_database_url_for_sqlite():
+    """SQLite URLs keep their path and switch to aiosqlite"""
+    url = async_database_url("sqlite:///./data/hoppybrew.db")
+    assert url.drivername == "sqlite+aiosqlite"
+    assert url.database == "./data/hoppybrew.db"
+
+
+def test_async_database_url_for_postgresql():
+    """PostgreSQL URLs use psycopg whatever sync driver they named"""
+    url = async_database_url("postgresql+psycopg2://user:secret@db:5432/hoppybrew")
+    assert url.drivername == "postgresql+psycopg"
+    assert (url.username, url.password, url.host, url.port, url.database) == (
+        "user",
+        "secret",
+        "db",
+        5432,
+        "hoppybrew",
+    )
+
+
+def test_async_database_url_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        async_database_url("mysql://user@localhost/hoppybrew")
+
+
+def _file_engine(tmp_path, name, **options):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", **options)
+    register_engine(name, engine)
+    return engine
+
+
+def test_engine_options_follow_pool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_POOL_SIZE", 3)
+    monkeypatch.setattr(settings, "DATABASE_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DATABASE_POOL_RECYCLE", 600)
+    monkeypatch.setattr(settings, "DATABASE_POOL_DISCONNECT_STRATEGY", "optimistic")
+    options = engine_options("postgresql+psycopg://user@db/hoppybrew")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert (options["pool_size"], options["max_overflow"], options["pool_recycle"]) == (3, 0, 600)
+    assert options["pool_pre_ping"] is False
+
+    async_options = engine_options("postgresql+psycopg://user@db/hoppybrew", is_async=True)
+    assert async_options["poolclass"] is InstrumentedAsyncQueuePool
+
+
+def test_engine_options_for_pgbouncer(monkeypatch):
+    """Transaction pooling: no client-side pool and no prepared statements"""
+    monkeypatch.setattr(settings, "DATABASE_PGBOUNCER", True)
+    options = engine_options("postgresql+psycopg://user@pgbouncer:6432/hoppybrew")
+    assert options == {
+        "poolclass": InstrumentedNullPool,
+        "connect_args": {"prepare_threshold": None},
+    }
+
+
+def test_engine_options_keep_default_pool_for_memory_sqlite():
+    assert "poolclass" not in engine_options("sqlite:///:memory:")
+    assert "poolclass" not in engine_options(
+        "sqlite:///file:hoppybrew?mode=memory&cache=shared&uri=true"
+    )
+
+
+def test_pool_metrics_record_checkouts_and_timeouts(tmp_path):
+    engine = _file_engine(
+        tmp_path,
+        "test-queue",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    try:
+        with engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+            (entry,) = [s for s in pool_statistics() if s["engine"] == "test-queue"]
+            assert entry["checked_out"] == 1
+            assert entry["checkouts"] == 1
+            assert entry["timeouts"] == 1
+            assert entry["wait_seconds_max"] >= 0.01
+
+        # Metrics carry over to the pool that replaces a disposed one
+        engine.dispose()
+        with engine.connect():
+            pass
+        (entry,) = [s for s in pool_statistics() if s["engine"] == "test-queue"]
+        assert entry["checked_out"] == 0
+        assert entry["checkouts"] == 2
+        assert sum(entry["wait_buckets"]) == 3
+    finally:
+        unregister_engine("test-queue")
+        engine.dispose()
+
+
+def test_null_pool_counts_open_connections(tmp_path):
+    engine = _file_engine(tmp_path, "test-null", poolclass=InstrumentedNullPool)
+    try:
+        with engine.connect(), engine.connect():
+            (entry,) = [s for s in pool_statistics() if s["engine"] == "test-null"]
+            assert (entry["size"], entry["checked_out"]) == (0, 2)
+        (entry,) = [s for s in pool_statistics() if s["engine"] == "test-null"]
+        assert entry["checked_out"] == 0
+    finally:
+        unregister_engine("test-null")
+
+
+def test_metrics_endpoint(client, tmp_path):
+    engine = _file_engine(tmp_path, "test-endpoint", poolclass=InstrumentedQueuePool)
+    try:
+        with engine.connect():
+            pass
+        response = client.get("/metrics")
+    finally:
+        unregister_engine("test-endpoint")
+        engine.dispose()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    lines = response.text.splitlines()
+    assert "# TYPE hoppybrew_db_pool_checkout_wait_seconds histogram" in lines
+    assert 'hoppybrew_db_pool_checked_out{engine="test-endpoint"} 0' in lines
+    assert 'hoppybrew_db_pool_checkout_wait_seconds_count{engine="test-endpoint"} 1' in lines
+    assert (
+        'hoppybrew_db_pool_checkout_wait_seconds_bucket{engine="test-endpoint",le="+Inf"} 1'
+        in lines
+    )
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT", 2500)
+    monkeypatch.setattr(settings, "SQLITE_CACHE_SIZE", -8000)
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_pragmas(engine)
+    try:
+        with engine.connect() as connection:
+
+            def pragma(name):
+                return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("foreign_keys") == 1
+            assert pragma("busy_timeout") == 2500
+            assert pragma("cache_size") == -8000
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_pragmas_applied_to_async_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_pragmas(engine)
+
+    async def journal_mode():
+        try:
+            async with engine.connect() as connection:
+                return (await connection.exec_driver_sql("PRAGMA journal_mode")).scalar()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(journal_mode()) == "wal"
+
+
+def _counter_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_pragmas(engine)
+    use_immediate_transactions(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE counter (value INTEGER)")
+        connection.exec_driver_sql("INSERT INTO counter VALUES (0)")
+    return engine
+
+
+def _increment(connection):
+    value = connection.exec_driver_sql("SELECT value FROM counter").scalar()
+    connection.exec_driver_sql(f"UPDATE counter SET value = {value + 1}")
+
+
+def test_sqlite_deferred_transactions_fail_on_concurrent_write(tmp_path):
+    """A deferred read-then-write after another commit ignores busy_timeout"""
+    engine = _counter_engine(tmp_path).execution_options(sqlite_begin="DEFERRED")
+    try:
+        with engine.connect() as first, engine.connect() as second:
+            first.begin()
+            first.exec_driver_sql("SELECT value FROM counter").scalar()
+            with second.begin():
+                _increment(second)
+
+            started = time.monotonic()
+            with pytest.raises(exc.OperationalError, match="database is locked"):
+                first.exec_driver_sql("UPDATE counter SET value = 100")
+            assert time.monotonic() - started < settings.SQLITE_BUSY_TIMEOUT / 1000
+            first.rollback()
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_immediate_transactions_queue_writers(tmp_path):
+    """The second read-then-write waits for the first and sees its write"""
+    engine = _counter_engine(tmp_path)
+    errors = []
+
+    def increment_concurrently():
+        try:
+            with engine.begin() as connection:
+                _increment(connection)
+        except Exception as e:
+            errors.append(e)
+
+    try:
+        with engine.connect() as first:
+            first.begin()
+            _increment(first)
+            writer = Thread(target=increment_concurrently)
+            writer.start()
+            time.sleep(0.2)
+            # Still waiting for the lock held by the first transaction
+            assert writer.is_alive()
+
+            # Deferred readers are not blocked by the writer
+            with engine.execution_options(sqlite_begin="DEFERRED").connect() as reader:
+                assert reader.exec_driver_sql("SELECT value FROM counter").scalar() == 0
+            first.commit()
+            writer.join()
+
+        assert errors == []
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql("SELECT value FROM counter").scalar() == 2
+    finally:
+        engine.dispose()
+
+
+def test_sqlite_immediate_transactions_on_async_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_pragmas(engine)
+    use_immediate_transactions(engine)
+
+    async def write_and_read():
+        try:
+            async with engine.begin() as connection:
+                await connection.exec_driver_sql("CREATE TABLE counter (value INTEGER)")
+                await connection.exec_driver_sql("INSERT INTO counter VALUES (1)")
+            async with engine.connect() as connection:
+                return (await connection.exec_driver_sql("SELECT value FROM counter")).scalar()
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(write_and_read()) == 1
+
+
+def test_sqlite_maintenance_checkpoints_wal(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    apply_sqlite_pragmas(engine)
+    use_immediate_transactions(engine)
+    maintenance = SqliteMaintenance(interval=0.01)
+    try:
+        with engine.begin() as connection:
+            connection.exec_driver_sql("CREATE TABLE readings (gravity REAL)")
+            connection.exec_driver_sql("INSERT INTO readings VALUES (1.050)")
+
+        busy, frames, checkpointed = maintenance.run_once(engine)
+        assert busy == 0
+        assert frames > 0
+        assert checkpointed == frames
+
+        maintenance.start(engine)
+        assert maintenance.running
+        maintenance.stop()
+        assert not maintenance.running
+    finally:
+        engine.dispose()
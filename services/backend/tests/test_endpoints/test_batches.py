@@ -142,3 +142,35 @@ def test_get_all_batches_returns_list_with_inventory(client, db_session):
         assert isinstance(batch["inventory_fermentables"], list)
         assert isinstance(batch["inventory_miscs"], list)
         assert isinstance(batch["inventory_yeasts"], list)
+
+
+def test_create_batch_clones_recipe_ingredients(client, db_session):
+    recipe_id = create_base_recipe(client, db_session, name="Clone Recipe")
+
+    response = client.post("/batches", json=build_batch_payload(recipe_id))
+    assert response.status_code == 200, response.text
+
+    clone = db_session.get(models.Recipes, response.json()["recipe_id"])
+    assert clone.is_batch is True
+    assert clone.origin_recipe_id == recipe_id
+    assert [hop.name for hop in clone.hops] == ["Cascade"]
+    assert [item.name for item in clone.fermentables] == ["Pale Malt"]
+    assert [item.name for item in clone.yeasts] == ["Ale Yeast"]
+    assert [item.name for item in clone.miscs] == ["Irish Moss"]
+
+
+def test_create_batch_failure_leaves_nothing_behind(client, db_session, monkeypatch):
+    recipe_id = create_base_recipe(client, db_session, name="Rollback Recipe")
+    recipe_count = db_session.query(models.Recipes).count()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("inventory copy failed")
+
+    monkeypatch.setattr("api.endpoints.batches.copy_recipe_to_inventory", fail)
+    response = client.post("/batches", json=build_batch_payload(recipe_id))
+    assert response.status_code == 500
+
+    db_session.expire_all()
+    assert db_session.query(models.Recipes).count() == recipe_count
+    assert db_session.query(models.Batches).count() == 0
+    assert db_session.query(models.BatchWorkflowHistory).count() == 0
@@ -427,3 +427,79 @@ def test_filter_beer_styles_by_custom(client, db_session):
     data = response.json()
     assert len(data) == 1
     assert data[0]["name"] == "American IPA"
+
+
+def test_search_beer_styles_ranks_name_matches_first(client, db_session):
+    """Test that text search orders styles by relevance"""
+    db_session.add_all(
+        [
+            models.BeerStyle(
+                name="Munich Dunkel",
+                description="A malty lager, sometimes compared to a brown porter",
+            ),
+            models.BeerStyle(name="English Porter", style_code="13C"),
+            models.BeerStyle(name="Baltic Porter", examples="Sinebrychoff Porter"),
+        ]
+    )
+    db_session.commit()
+
+    response = client.get("/beer-styles/search?query=porter")
+    assert response.status_code == 200
+    names = [s["name"] for s in response.json()]
+    assert names[-1] == "Munich Dunkel"
+    assert set(names[:2]) == {"Baltic Porter", "English Porter"}
+
+
+def test_search_beer_styles_matches_prefixes_and_codes(client, db_session):
+    """Test typeahead-style prefix matching across words and style codes"""
+    db_session.add_all(
+        [
+            models.BeerStyle(name="American IPA", style_code="21A"),
+            models.BeerStyle(name="American Lager", style_code="1B"),
+        ]
+    )
+    db_session.commit()
+
+    response = client.get("/beer-styles/search?query=amer%20ip")
+    assert [s["name"] for s in response.json()] == ["American IPA"]
+
+    response = client.get("/beer-styles/search?query=21a")
+    assert [s["name"] for s in response.json()] == ["American IPA"]
+
+    # Punctuation carries no search terms and is not passed to the index
+    response = client.get('/beer-styles/search?query="*')
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_search_beer_styles_index_follows_updates(client, db_session):
+    """Test that the search index reflects updated and deleted styles"""
+    style = models.BeerStyle(name="Hazy Draft", is_custom=True)
+    db_session.add(style)
+    db_session.commit()
+    db_session.refresh(style)
+
+    response = client.put(f"/beer-styles/{style.id}", json={"name": "Juicy Pale"})
+    assert response.status_code == 200
+
+    assert client.get("/beer-styles/search?query=hazy").json() == []
+    assert [s["id"] for s in client.get("/beer-styles/search?query=juicy").json()] == [
+        style.id
+    ]
+
+    client.delete(f"/beer-styles/{style.id}")
+    assert client.get("/beer-styles/search?query=juicy").json() == []
+
+
+def test_search_beer_styles_combines_text_and_ranges(client, db_session):
+    """Test that numeric range filters apply on top of text search"""
+    db_session.add_all(
+        [
+            models.BeerStyle(name="Session IPA", abv_min=3.7, abv_max=5.0),
+            models.BeerStyle(name="Double IPA", abv_min=7.5, abv_max=10.0),
+        ]
+    )
+    db_session.commit()
+
+    response = client.get("/beer-styles/search?query=ipa&abv_min=8")
+    assert [s["name"] for s in response.json()] == ["Double IPA"]
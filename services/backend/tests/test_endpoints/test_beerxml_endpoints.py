@@ -72,7 +72,7 @@ def test_import_beerxml_success(client, db_session):
         "file": ("test_recipe.xml", io.BytesIO(SAMPLE_BEERXML), "application/xml")
     }
 
-    response = client.post("/api/recipes/import/beerxml", files=files)
+    response = client.post("/recipes/import/beerxml", files=files)
 
     assert response.status_code == 200
     data = response.json()
@@ -85,7 +85,7 @@ def test_import_beerxml_success(client, db_session):
 
     # Verify recipe was created in database
     recipe_id = data["recipe_ids"][0]
-    response = client.get(f"/api/recipes/{recipe_id}")
+    response = client.get(f"/recipes/{recipe_id}")
     assert response.status_code == 200
 
     recipe = response.json()
@@ -106,7 +106,7 @@ def test_import_beerxml_invalid_xml(client):
         "file": ("invalid.xml", io.BytesIO(invalid_xml), "application/xml")
     }
 
-    response = client.post("/api/recipes/import/beerxml", files=files)
+    response = client.post("/recipes/import/beerxml", files=files)
 
     assert response.status_code == 400
     assert "Invalid XML format" in response.json()["detail"]
@@ -122,7 +122,7 @@ def test_import_beerxml_empty_recipes(client):
         "file": ("empty.xml", io.BytesIO(empty_xml), "application/xml")
     }
 
-    response = client.post("/api/recipes/import/beerxml", files=files)
+    response = client.post("/recipes/import/beerxml", files=files)
 
     assert response.status_code == 400
     assert "Invalid BeerXML" in response.json()["detail"]
@@ -151,7 +151,7 @@ def test_import_beerxml_multiple_recipes(client, db_session):
         "file": ("multi.xml", io.BytesIO(multi_recipe_xml), "application/xml")
     }
 
-    response = client.post("/api/recipes/import/beerxml", files=files)
+    response = client.post("/recipes/import/beerxml", files=files)
 
     assert response.status_code == 200
     data = response.json()
@@ -164,7 +164,7 @@ def test_export_single_recipe_beerxml(client, db_session, sample_recipe):
     """Test exporting a single recipe to BeerXML"""
     recipe_id = sample_recipe["id"]
 
-    response = client.get(f"/api/recipes/{recipe_id}/export/beerxml")
+    response = client.get(f"/recipes/{recipe_id}/export/beerxml")
 
     assert response.status_code == 200
     assert response.headers["content-type"] == "application/xml; charset=utf-8"
@@ -180,7 +180,7 @@ def test_export_single_recipe_beerxml(client, db_session, sample_recipe):
 
 def test_export_nonexistent_recipe(client):
     """Test exporting non-existent recipe returns 404"""
-    response = client.get("/api/recipes/99999/export/beerxml")
+    response = client.get("/recipes/99999/export/beerxml")
 
     assert response.status_code == 404
     assert "Recipe not found" in response.json()["detail"]
@@ -200,13 +200,13 @@ def test_export_multiple_recipes_beerxml(client, db_session, sample_recipe):
         "miscs": [],
     }
 
-    create_response = client.post("/api/recipes", json=recipe_data)
+    create_response = client.post("/recipes", json=recipe_data)
     assert create_response.status_code == 200
     second_recipe_id = create_response.json()["id"]
 
     # Export both recipes
     recipe_ids = [sample_recipe["id"], second_recipe_id]
-    response = client.post("/api/recipes/export/beerxml", json=recipe_ids)
+    response = client.post("/recipes/export/beerxml", json=recipe_ids)
 
     assert response.status_code == 200
     assert response.headers["content-type"] == "application/xml; charset=utf-8"
@@ -216,11 +216,24 @@ def test_export_multiple_recipes_beerxml(client, db_session, sample_recipe):
     assert b"<RECIPES>" in xml_content
     assert sample_recipe["name"].encode() in xml_content
     assert b"Second Recipe" in xml_content
+    # Recipes are written in the order they were requested
+    assert xml_content.index(sample_recipe["name"].encode()) < xml_content.index(b"Second Recipe")
+
+
+def test_export_multiple_recipes_skips_missing_and_duplicate_ids(client, sample_recipe):
+    """Unknown ids are ignored and each recipe is exported once"""
+    recipe_id = sample_recipe["id"]
+    response = client.post(
+        "/recipes/export/beerxml", json=[recipe_id, 99999, recipe_id]
+    )
+
+    assert response.status_code == 200
+    assert response.content.count(b"<RECIPE>") == 1
 
 
 def test_export_multiple_recipes_empty_list(client):
     """Test exporting with empty recipe list returns error"""
-    response = client.post("/api/recipes/export/beerxml", json=[])
+    response = client.post("/recipes/export/beerxml", json=[])
 
     assert response.status_code == 400
     assert "No recipe IDs provided" in response.json()["detail"]
@@ -228,7 +241,7 @@ def test_export_multiple_recipes_empty_list(client):
 
 def test_export_multiple_recipes_invalid_ids(client):
     """Test exporting with all invalid IDs returns error"""
-    response = client.post("/api/recipes/export/beerxml", json=[99998, 99999])
+    response = client.post("/recipes/export/beerxml", json=[99998, 99999])
 
     assert response.status_code == 404
     assert "No recipes found" in response.json()["detail"]
@@ -241,13 +254,13 @@ def test_roundtrip_import_export(client, db_session):
         "file": ("test_recipe.xml", io.BytesIO(SAMPLE_BEERXML), "application/xml")
     }
 
-    import_response = client.post("/api/recipes/import/beerxml", files=files)
+    import_response = client.post("/recipes/import/beerxml", files=files)
     assert import_response.status_code == 200
 
     recipe_id = import_response.json()["recipe_ids"][0]
 
     # Export the same recipe
-    export_response = client.get(f"/api/recipes/{recipe_id}/export/beerxml")
+    export_response = client.get(f"/recipes/{recipe_id}/export/beerxml")
     assert export_response.status_code == 200
 
     exported_xml = export_response.content
@@ -257,7 +270,7 @@ def test_roundtrip_import_export(client, db_session):
         "file": ("reimport.xml", io.BytesIO(exported_xml), "application/xml")
     }
 
-    reimport_response = client.post("/api/recipes/import/beerxml", files=files2)
+    reimport_response = client.post("/recipes/import/beerxml", files=files2)
     assert reimport_response.status_code == 200
 
     reimport_data = reimport_response.json()
@@ -265,8 +278,8 @@ def test_roundtrip_import_export(client, db_session):
 
     # Verify the re-imported recipe has the same data
     new_recipe_id = reimport_data["recipe_ids"][0]
-    original_recipe = client.get(f"/api/recipes/{recipe_id}").json()
-    new_recipe = client.get(f"/api/recipes/{new_recipe_id}").json()
+    original_recipe = client.get(f"/recipes/{recipe_id}").json()
+    new_recipe = client.get(f"/recipes/{new_recipe_id}").json()
 
     # Compare key fields (excluding IDs and auto-generated fields)
     assert original_recipe["name"] == new_recipe["name"]
@@ -292,14 +305,14 @@ def test_import_beerxml_with_special_characters(client, db_session):
         "file": ("special.xml", io.BytesIO(special_chars_xml), "application/xml")
     }
 
-    response = client.post("/api/recipes/import/beerxml", files=files)
+    response = client.post("/recipes/import/beerxml", files=files)
 
     assert response.status_code == 200
     data = response.json()
     assert data["imported_count"] == 1
 
     recipe_id = data["recipe_ids"][0]
-    recipe = client.get(f"/api/recipes/{recipe_id}").json()
+    recipe = client.get(f"/recipes/{recipe_id}").json()
 
     assert "Special <Characters>" in recipe["name"]
     assert "quotes" in recipe["notes"]
@@ -333,7 +346,7 @@ def sample_recipe(client, db_session):
                 "type": "Grain",
                 "amount": 5.0,
                 "yield_": 78.0,
-                "color": 2.5,
+                "color": 3,
             }
         ],
         "yeasts": [
@@ -354,6 +367,6 @@ def sample_recipe(client, db_session):
         ],
     }
 
-    response = client.post("/api/recipes", json=recipe_data)
+    response = client.post("/recipes", json=recipe_data)
     assert response.status_code == 200
     return response.json()
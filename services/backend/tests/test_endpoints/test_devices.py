@@ -113,3 +113,57 @@ def test_delete_device_not_found_returns_404(client):
     response = client.delete("/devices/9999")
     assert response.status_code == 404
     assert response.json()["detail"] == "Device not found"
+
+
+def test_ingest_device_readings(client):
+    """Test a device posting readings to its configured batch"""
+    recipe = client.post(
+        "/recipes",
+        json={"name": "Device Ale", "version": 1, "type": "All Grain", "brewer": "Test",
+              "batch_size": 20.0, "boil_size": 25.0, "boil_time": 60},
+    ).json()
+    batch = client.post(
+        "/batches",
+        json={"recipe_id": recipe["id"], "batch_name": "Device Batch", "batch_number": 1,
+              "batch_size": 20.0, "brewer": "Test", "brew_date": "2024-03-21T12:00:00"},
+    ).json()
+    device = client.post(
+        "/devices",
+        json={
+            "name": "Posting iSpindel",
+            "device_type": "ispindel",
+            "calibration_data": {"polynomial": [0.0001, 0.0, 1.0]},
+            "configuration": {"batch_id": batch["id"]},
+        },
+    ).json()
+
+    # iSpindel HTTP mode posts one bare JSON object per reading
+    response = client.post(
+        f"/devices/{device['id']}/readings", json={"angle": 20.0, "temperature": 18.0}
+    )
+    assert response.status_code == 201, response.text
+    assert response.json() == {"inserted_count": 1, "batch_ids": [batch["id"]]}
+
+    readings = client.get(f"/batches/{batch['id']}/fermentation/readings").json()
+    assert readings[0]["gravity"] == 1.04
+    assert readings[0]["timestamp"] is not None
+
+
+def test_ingest_device_readings_errors(client):
+    """Test device ingestion rejects unknown, inactive and unassigned devices"""
+    assert client.post("/devices/99999/readings", json=[{"gravity": 1.0}]).status_code == 404
+
+    inactive = client.post(
+        "/devices", json={"name": "Off", "device_type": "tilt", "is_active": False}
+    ).json()
+    response = client.post(f"/devices/{inactive['id']}/readings", json=[{"gravity": 1.0}])
+    assert response.status_code == 409
+
+    unassigned = client.post("/devices", json={"name": "Loose", "device_type": "tilt"}).json()
+    response = client.post(f"/devices/{unassigned['id']}/readings", json=[{"gravity": 1.0}])
+    assert response.status_code == 422
+
+    response = client.post(
+        f"/devices/{unassigned['id']}/readings", json=[{"gravity": 1.0, "batch_id": 99999}]
+    )
+    assert response.status_code == 404
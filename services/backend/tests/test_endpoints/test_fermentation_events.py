@@ -0,0 +1,130 @@
+"""Tests for the live fermentation event broker, SSE stream and WebSocket."""
+
+import asyncio
+import json
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from api.events import EventBroker, RESET_EVENT, batch_topic, event_broker
+from config import settings
+from tests.test_endpoints.test_fermentation_readings import create_test_batch
+
+READING = {"timestamp": "2024-03-21T14:30:00", "gravity": 1.048, "temperature": 18.5}
+
+
+def _parse_sse(body):
+    events = []
+    for frame in body.split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in frame.splitlines() if line and not line.startswith(":")
+        )
+        if "event" in fields:
+            events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_broker_delivers_and_resumes():
+    broker = EventBroker(history_size=3)
+    first = broker.publish("t", "readings", {"n": 1})
+    broker.publish("other", "readings", {"n": 0})
+
+    with broker.subscribe("t", last_event_id=0) as subscription:
+        broker.publish("t", "readings", {"n": 2})
+        events = subscription.events(keepalive=0.05)
+        assert (await events.__anext__()).data == {"n": 1}
+        assert (await events.__anext__()).data == {"n": 2}
+        assert await events.__anext__() is None
+
+    with broker.subscribe("t", last_event_id=first.id) as subscription:
+        assert [e.data async for e in subscription.events(0.05, max_seconds=0.1) if e] == [{"n": 2}]
+    assert broker.subscriber_count("t") == 0
+
+
+@pytest.mark.asyncio
+async def test_broker_resets_when_history_is_gone():
+    broker = EventBroker(history_size=2)
+    for n in range(4):
+        broker.publish("t", "readings", {"n": n})
+
+    with broker.subscribe("t", last_event_id=1) as subscription:
+        event = await subscription.events(0.05).__anext__()
+        assert event.type == RESET_EVENT
+        assert event.id == broker.last_event_id
+
+    with broker.subscribe("t", last_event_id=broker.last_event_id + 10) as subscription:
+        assert (await subscription.events(0.05).__anext__()).type == RESET_EVENT
+
+
+@pytest.mark.asyncio
+async def test_broker_publish_from_another_thread():
+    broker = EventBroker()
+    with broker.subscribe("t") as subscription:
+        await asyncio.to_thread(broker.publish, "t", "status", {"to_status": "fermenting"})
+        event = await subscription.events(1.0).__anext__()
+        assert event.type == "status"
+
+
+def test_sse_stream_replays_missed_events(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "EVENT_STREAM_MAX_SECONDS", 0.2)
+    batch_id = create_test_batch(client, db_session)["id"]
+    resume_from = event_broker.last_event_id
+
+    client.post(f"/batches/{batch_id}/fermentation/readings", json=READING)
+    client.post(
+        f"/batches/{batch_id}/fermentation/readings:bulk",
+        json=[{**READING, "gravity": 1.040}, {**READING, "gravity": 1.030}],
+    )
+
+    response = client.get(
+        f"/batches/{batch_id}/fermentation/stream",
+        headers={"Last-Event-ID": str(resume_from)},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("retry: ")
+
+    events = _parse_sse(response.text)
+    assert [event for _, event, _ in events] == ["readings", "readings"]
+    assert events[0][2]["readings"][0]["gravity"] == 1.048
+    assert "id" in events[0][2]["readings"][0]
+    assert [r["gravity"] for r in events[1][2]["readings"]] == [1.04, 1.03]
+
+    # Resuming from the last id yields nothing new
+    response = client.get(
+        f"/batches/{batch_id}/fermentation/stream", params={"last_event_id": events[-1][0]}
+    )
+    assert _parse_sse(response.text) == []
+
+    assert client.get("/batches/99999/fermentation/stream").status_code == 404
+
+
+def test_websocket_pushes_readings_and_status(client, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "EVENT_STREAM_KEEPALIVE_SECONDS", 0.5)
+    batch_id = create_test_batch(client, db_session)["id"]
+
+    with client.websocket_connect(f"/batches/{batch_id}/fermentation/ws") as websocket:
+        client.post(f"/batches/{batch_id}/fermentation/readings", json=READING)
+        message = websocket.receive_json()
+        assert message["event"] == "readings"
+        assert message["data"]["batch_id"] == batch_id
+
+        client.put(f"/batches/{batch_id}/status", json={"status": "brewing"})
+        message = websocket.receive_json()
+        assert message["event"] == "status"
+        assert message["data"]["to_status"] == "brewing"
+        last_id = message["id"]
+
+    client.put(f"/batches/{batch_id}/status", json={"status": "fermenting"})
+    with client.websocket_connect(
+        f"/batches/{batch_id}/fermentation/ws?last_event_id={last_id}"
+    ) as websocket:
+        message = websocket.receive_json()
+        assert message["data"]["to_status"] == "fermenting"
+
+    assert event_broker.subscriber_count(batch_topic(batch_id)) == 0
+
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/batches/99999/fermentation/ws") as websocket:
+            websocket.receive_json()
@@ -323,3 +323,219 @@ def test_cascade_delete_fermentation_readings(client, db_session):
         db_session.query(models.FermentationReadings).filter_by(batch_id=batch_id).all()
     )
     assert len(readings) == 0
+
+
+def test_bulk_create_fermentation_readings(client, db_session):
+    """Test storing a JSON array of readings with device calibration"""
+    batch_id = create_test_batch(client, db_session)["id"]
+    device = client.post(
+        "/devices",
+        json={
+            "name": "Bulk iSpindel",
+            "device_type": "ispindel",
+            "calibration_data": {"polynomial": [0.001, 1.0], "temperature_offset": -0.5},
+        },
+    ).json()
+
+    start = datetime(2024, 3, 21, 14, 0, 0)
+    payload = [
+        {"timestamp": start.isoformat(), "gravity": 1.050, "temperature": 19.0},
+        {
+            "timestamp": (start + timedelta(hours=1)).isoformat(),
+            "angle": 45.0,
+            "temperature": 19.0,
+            "device_id": device["id"],
+        },
+    ]
+    response = client.post(
+        f"/batches/{batch_id}/fermentation/readings:bulk", json=payload
+    )
+    assert response.status_code == 201, response.text
+    assert response.json() == {"inserted_count": 2, "batch_ids": [batch_id]}
+
+    readings = client.get(f"/batches/{batch_id}/fermentation/readings").json()
+    assert [r["gravity"] for r in readings] == [1.05, 1.045]
+    assert [r["temperature"] for r in readings] == [19.0, 18.5]
+
+
+def test_bulk_create_accepts_ndjson(client, db_session):
+    """Test storing readings sent as newline-delimited JSON"""
+    batch_id = create_test_batch(client, db_session)["id"]
+    body = "\n".join(
+        f'{{"timestamp": "2024-03-2{day}T12:00:00", "gravity": 1.0{50 - day * 5}}}'
+        for day in range(1, 4)
+    )
+
+    response = client.post(
+        f"/batches/{batch_id}/fermentation/readings:bulk",
+        content=body + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 201, response.text
+    assert response.json()["inserted_count"] == 3
+
+    bad = client.post(
+        f"/batches/{batch_id}/fermentation/readings:bulk",
+        content='{"timestamp": "2024-03-21T12:00:00"}\n{oops',
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert bad.status_code == 400
+    assert "line 2" in bad.json()["detail"]
+
+
+def test_bulk_create_validates_every_reading(client, db_session):
+    """Test a single invalid reading rejects the whole upload"""
+    batch_id = create_test_batch(client, db_session)["id"]
+    payload = [
+        {"timestamp": "2024-03-21T12:00:00", "gravity": 1.050},
+        {"gravity": 1.040},
+    ]
+
+    response = client.post(
+        f"/batches/{batch_id}/fermentation/readings:bulk", json=payload
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][0] == 1
+    assert client.get(f"/batches/{batch_id}/fermentation/readings").json() == []
+
+    missing = client.post(
+        "/batches/99999/fermentation/readings:bulk", json=payload[:1]
+    )
+    assert missing.status_code == 404
+
+    unknown_device = client.post(
+        f"/batches/{batch_id}/fermentation/readings:bulk",
+        json=[{**payload[0], "device_id": 99999}],
+    )
+    assert unknown_device.status_code == 404
+
+
+def test_chart_data_time_window_and_downsampling(client, db_session):
+    """Test chart data honours from/to and downsamples dense telemetry"""
+    batch_id = create_test_batch(client, db_session)["id"]
+    start = datetime(2024, 3, 21, 12, 0, 0)
+    payload = [
+        {
+            "timestamp": (start + timedelta(minutes=15 * i)).isoformat(),
+            "gravity": round(1.048 - 0.00003 * i, 5),
+            "temperature": 18.0,
+        }
+        for i in range(1200)
+    ]
+    response = client.post(
+        f"/batches/{batch_id}/fermentation/readings:bulk", json=payload
+    )
+    assert response.status_code == 201, response.text
+
+    chart = client.get(
+        f"/batches/{batch_id}/fermentation/chart-data",
+        params={"max_points": 100, "resolution": "raw"},
+    ).json()
+    assert chart["total_points"] == 1200
+    assert len(chart["timestamps"]) == 100
+    assert len(chart["abv"]) == len(chart["attenuation"]) == 100
+    assert chart["timestamps"][0] == payload[0]["timestamp"]
+    assert chart["timestamps"][-1] == payload[-1]["timestamp"]
+    assert chart["abv"][-1] == pytest.approx((1.048 - chart["gravity"][-1]) * 131.25, abs=0.01)
+
+    window = client.get(
+        f"/batches/{batch_id}/fermentation/chart-data",
+        params={
+            "from": payload[100]["timestamp"],
+            "to": payload[199]["timestamp"],
+            "method": "minmax",
+        },
+    ).json()
+    assert window["total_points"] == 100
+    assert window["timestamps"][0] == payload[100]["timestamp"]
+
+    inverted = client.get(
+        f"/batches/{batch_id}/fermentation/chart-data",
+        params={"from": payload[10]["timestamp"], "to": payload[0]["timestamp"]},
+    )
+    assert inverted.status_code == 400
+
+
+def test_chart_data_reads_rollups_for_long_windows(client, db_session):
+    """Test chart data switches to rollups and they follow edits and deletes"""
+    batch_id = create_test_batch(client, db_session)["id"]
+    start = datetime(2024, 3, 1, 0, 0, 0)
+    payload = [
+        {
+            "timestamp": (start + timedelta(minutes=30 * i)).isoformat(),
+            "gravity": 1.048 if i % 2 == 0 else 1.046,
+            "temperature": 18.0,
+        }
+        for i in range(48 * 10)
+    ]
+    response = client.post(
+        f"/batches/{batch_id}/fermentation/readings:bulk", json=payload
+    )
+    assert response.status_code == 201, response.text
+    url = f"/batches/{batch_id}/fermentation/chart-data"
+
+    daily = client.get(url, params={"max_points": 5}).json()
+    assert daily["resolution"] == "day"
+    assert daily["total_points"] == 480
+    assert daily["gravity"][0] == 1.047
+
+    hourly = client.get(url, params={"max_points": 100}).json()
+    assert hourly["resolution"] == "hour"
+    assert len(hourly["timestamps"]) == 100
+
+    raw = client.get(url, params={"max_points": 1000}).json()
+    assert raw["resolution"] == "raw"
+    assert len(raw["timestamps"]) == 480
+
+    readings = client.get(f"/batches/{batch_id}/fermentation/readings").json()
+    first_day = [r for r in readings if r["timestamp"].startswith("2024-03-01")]
+    client.put(f"/fermentation/readings/{first_day[1]['id']}", json={"gravity": 1.048})
+    for reading in first_day[2:]:
+        client.delete(f"/fermentation/readings/{reading['id']}")
+
+    daily = client.get(url, params={"resolution": "day"}).json()
+    assert daily["total_points"] == 480 - 46
+    assert daily["gravity"][0] == 1.048
+
+    rebuilt = client.post("/fermentation/rollups:rebuild", params={"batch_id": batch_id})
+    assert rebuilt.status_code == 200
+    # One hour left on the first day, 24 on each other day, plus 10 days
+    assert rebuilt.json()["rollup_count"] == 1 + 9 * 24 + 10
+    assert client.get(url, params={"resolution": "day"}).json() == daily
+
+
+def test_fermentation_forecast(client, db_session):
+    """Test the forecast endpoint fits readings and caches the result"""
+    batch_id = create_test_batch(client, db_session)["id"]
+    url = f"/batches/{batch_id}/fermentation/forecast"
+
+    empty = client.get(url).json()
+    assert empty["status"] == "insufficient_data"
+    assert empty["reading_count"] == 0
+
+    start = datetime(2024, 3, 21, 12, 0, 0)
+    payload = [
+        {
+            "timestamp": (start + timedelta(hours=2 * i)).isoformat(),
+            "gravity": round(1.012 + 0.036 / (1 + 2.718281828 ** (0.08 * (2 * i - 40))), 4),
+        }
+        for i in range(36)
+    ]
+    client.post(f"/batches/{batch_id}/fermentation/readings:bulk", json=payload)
+
+    forecast = client.get(url).json()
+    assert forecast["status"] == "ok"
+    assert forecast["predicted_fg"] == pytest.approx(1.012, abs=0.001)
+    assert forecast["hours_to_terminal"] > 0
+    assert forecast["is_stuck"] is False
+    assert client.get(url).json()["fitted_at"] == forecast["fitted_at"]
+
+    client.post(
+        f"/batches/{batch_id}/fermentation/readings",
+        json={"timestamp": (start + timedelta(hours=72)).isoformat(), "gravity": 1.016},
+    )
+    refit = client.get(url).json()
+    assert refit["reading_count"] == 37
+    assert refit["fitted_at"] != forecast["fitted_at"]
+
+    assert client.get("/batches/99999/fermentation/forecast").status_code == 404
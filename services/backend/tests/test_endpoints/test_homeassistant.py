@@ -312,3 +312,152 @@ def test_homeassistant_summary_counts(client: TestClient, db_session: Session):
     assert data["total_batches"] >= 2
     assert data["brewing_batches"] >= 1
     assert data["fermenting_batches"] >= 1
+
+
+def _add_batch(db_session: Session, recipe_id: int, number: int, status: str, age_days: int = 0):
+    from Database.Models.batches import Batches
+
+    created = datetime.now() - timedelta(days=age_days)
+    batch = Batches(
+        recipe_id=recipe_id,
+        batch_name=f"Batch {number}",
+        batch_number=number,
+        batch_size=20.0,
+        brewer="Test",
+        status=status,
+        brew_date=created,
+        created_at=created,
+        updated_at=created,
+    )
+    db_session.add(batch)
+    db_session.commit()
+    db_session.refresh(batch)
+    return batch
+
+
+def test_homeassistant_state_follows_workflow_status(
+    client: TestClient, db_session: Session, sample_batch
+):
+    """Batches moved through the workflow report their status, not their age"""
+    recipe_id = sample_batch["recipe_id"]
+    conditioning = _add_batch(db_session, recipe_id, 101, "conditioning", age_days=0)
+    packaging = _add_batch(db_session, recipe_id, 102, "packaging", age_days=3)
+
+    assert client.get(f"/homeassistant/batches/{conditioning.id}").json()["state"] == "conditioning"
+    packaged = client.get(f"/homeassistant/batches/{packaging.id}").json()
+    assert packaged["state"] == "ready"
+    assert packaged["attributes"]["status"] == "packaging"
+
+
+def test_homeassistant_excludes_inactive_batches(
+    client: TestClient, db_session: Session, sample_batch
+):
+    """Complete and archived batches are left out of the sensors and state counts"""
+    recipe_id = sample_batch["recipe_id"]
+    complete = _add_batch(db_session, recipe_id, 201, "complete", age_days=40)
+    archived = _add_batch(db_session, recipe_id, 202, "archived", age_days=90)
+    fermenting = _add_batch(db_session, recipe_id, 203, "fermenting", age_days=5)
+
+    ids = {sensor["attributes"]["batch_id"] for sensor in client.get("/homeassistant/batches").json()}
+    assert fermenting.id in ids
+    assert complete.id not in ids
+    assert archived.id not in ids
+
+    summary = client.get("/homeassistant/summary").json()
+    assert summary["total_batches"] == summary["active_batches"] + 2
+    assert summary["active_batches"] == (
+        summary["brewing_batches"]
+        + summary["fermenting_batches"]
+        + summary["conditioning_batches"]
+        + summary["ready_batches"]
+    )
+    assert summary["fermenting_batches"] >= 1
+
+    # Still available individually
+    assert client.get(f"/homeassistant/batches/{archived.id}").json()["state"] == "ready"
+
+
+def test_homeassistant_sensor_includes_latest_reading(client: TestClient, sample_batch):
+    """The most recent fermentation reading is exposed as sensor attributes"""
+    batch_id = sample_batch["id"]
+    now = datetime.now().replace(microsecond=0)
+    for hours_ago, gravity in ((5, 1.050), (1, 1.020), (3, 1.035)):
+        response = client.post(
+            f"/batches/{batch_id}/fermentation/readings",
+            json={
+                "timestamp": (now - timedelta(hours=hours_ago)).isoformat(),
+                "gravity": gravity,
+                "temperature": 19.5,
+            },
+        )
+        assert response.status_code == 200
+
+    attrs = client.get(f"/homeassistant/batches/{batch_id}").json()["attributes"]
+    assert attrs["gravity"] == 1.020
+    assert attrs["temperature"] == 19.5
+    assert attrs["last_reading_time"] == (now - timedelta(hours=1)).isoformat()
+
+    sensors = client.get("/homeassistant/batches").json()
+    listed = next(s for s in sensors if s["attributes"]["batch_id"] == batch_id)
+    assert listed["attributes"]["gravity"] == 1.020
+
+
+def test_batch_sensor_query_uses_latest_log_entry():
+    """A batch with several log rows yields one sensor row with the newest entry"""
+    from sqlalchemy import create_engine
+
+    import Database.Models as models
+    from api.endpoints.homeassistant import batch_sensor_query
+    from database import Base
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # batch_logs without the unique constraint on batch_id
+        connection.exec_driver_sql("DROP TABLE batch_logs")
+        connection.exec_driver_sql(
+            "CREATE TABLE batch_logs (id INTEGER PRIMARY KEY, batch_id INTEGER NOT NULL, "
+            "timestamp DATETIME, activity VARCHAR NOT NULL, notes VARCHAR)"
+        )
+
+    now = datetime.now().replace(microsecond=0)
+    with Session(engine) as db:
+        recipe = models.Recipes(name="Test IPA")
+        db.add(recipe)
+        db.flush()
+        batch = _add_batch(db, recipe.id, 1, "fermenting", age_days=2)
+        db.execute(
+            models.BatchLogs.__table__.insert(),
+            [
+                {"batch_id": batch.id, "timestamp": now - timedelta(hours=5), "activity": "Brewed"},
+                {"batch_id": batch.id, "timestamp": now - timedelta(hours=1), "activity": "Dry hopped"},
+                {"batch_id": batch.id, "timestamp": now - timedelta(hours=3), "activity": "Pitched"},
+            ],
+        )
+
+        rows = db.execute(batch_sensor_query(now, models.Batches.id == batch.id)).all()
+    engine.dispose()
+
+    assert len(rows) == 1
+    assert rows[0].log_activity == "Dry hopped"
+    assert rows[0].log_timestamp == now - timedelta(hours=1)
+
+
+def test_homeassistant_etag_revalidation(client: TestClient, sample_batch):
+    """Unchanged responses revalidate with 304; new readings change the ETag"""
+    for path in ("/homeassistant/summary", "/homeassistant/batches"):
+        first = client.get(path)
+        etag = first.headers["ETag"]
+        repeat = client.get(path, headers={"If-None-Match": etag})
+        assert repeat.status_code == 304
+        assert repeat.content == b""
+
+    etag = client.get("/homeassistant/batches").headers["ETag"]
+    response = client.post(
+        f"/batches/{sample_batch['id']}/fermentation/readings",
+        json={"timestamp": datetime.now().isoformat(), "gravity": 1.040, "temperature": 18.0},
+    )
+    assert response.status_code == 200
+    changed = client.get("/homeassistant/batches", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
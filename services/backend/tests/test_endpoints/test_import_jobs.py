@@ -0,0 +1,140 @@
+import io
+import os
+from datetime import datetime, timedelta
+
+import Database.Models as models
+
+
+BEERXML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<RECIPES>
+    <RECIPE><NAME>Queued Pale Ale</NAME><VERSION>1</VERSION></RECIPE>
+    <RECIPE><NAME>Queued Stout</NAME><VERSION>1</VERSION></RECIPE>
+</RECIPES>
+"""
+
+
+def mock_favicon_url(url):
+    return "http://mock.local/favicon.ico"
+
+
+def _submit(client, path, content, filename="import.xml"):
+    files = {"file": (filename, io.BytesIO(content), "application/xml")}
+    response = client.post(path, files=files)
+    assert response.status_code == 202, response.text
+    return response.json()
+
+
+def test_beerxml_import_job_runs_in_background(client, import_job_runner):
+    job = _submit(client, "/jobs/imports/beerxml", BEERXML, "recipes.xml")
+    assert job["job_type"] == "beerxml"
+    assert job["status"] in ("queued", "running", "completed")
+
+    import_job_runner.wait(job["id"], timeout=10)
+
+    response = client.get(f"/jobs/{job['id']}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["filename"] == "recipes.xml"
+    assert data["parsed_count"] == 2
+    assert data["inserted_count"] == 2
+    assert data["failed_count"] == 0
+    assert len(data["result"]["recipe_ids"]) == 2
+    assert data["started_at"] is not None
+    assert data["finished_at"] is not None
+
+    recipes = client.get("/recipes").json()
+    assert {"Queued Pale Ale", "Queued Stout"} <= {r["name"] for r in recipes}
+
+
+def test_references_import_job(client, db_session, import_job_runner, monkeypatch):
+    monkeypatch.setattr("api.endpoints.references.fetch_favicon", mock_favicon_url)
+    xml_content = b"""
+        <references>
+            <reference><name>Queued Ref</name><url>http://queued.example</url></reference>
+            <reference><name>Missing URL</name></reference>
+        </references>
+    """
+
+    job = _submit(client, "/jobs/imports/references", xml_content)
+    import_job_runner.wait(job["id"], timeout=10)
+
+    data = client.get(f"/jobs/{job['id']}").json()
+    assert data["status"] == "completed"
+    assert data["inserted_count"] == 1
+    assert data["failed_count"] == 1
+
+    stored = db_session.query(models.References).all()
+    assert [ref.name for ref in stored] == ["Queued Ref"]
+
+
+def test_invalid_xml_marks_job_failed_and_removes_upload(client, db_session, import_job_runner):
+    job = _submit(client, "/jobs/imports/beerxml", b"<RECIPES><RECIPE>")
+    import_job_runner.wait(job["id"], timeout=10)
+
+    data = client.get(f"/jobs/{job['id']}").json()
+    assert data["status"] == "failed"
+    assert data["errors"]
+    assert data["inserted_count"] == 0
+
+    stored = db_session.get(models.ImportJob, job["id"])
+    assert not os.path.exists(stored.file_path)
+
+
+def test_get_import_job_not_found(client):
+    response = client.get("/jobs/99999")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Job not found"
+
+
+def _job(db_session, status, owner_id, lease_seconds):
+    job = models.ImportJob(
+        job_type="beerxml",
+        status=status,
+        file_path="/nonexistent/import.xml",
+        errors=[],
+        owner_id=owner_id,
+        lease_expires_at=datetime.now() + timedelta(seconds=lease_seconds),
+    )
+    db_session.add(job)
+    db_session.commit()
+    return job.id
+
+
+def test_job_is_claimed_only_once(db_session, import_job_runner):
+    job_id = _job(db_session, "queued", import_job_runner.worker_id, 60)
+
+    assert import_job_runner._claim(job_id) is True
+    assert import_job_runner._claim(job_id) is False
+
+    db_session.expire_all()
+    assert db_session.get(models.ImportJob, job_id).status == "running"
+
+
+def test_job_owned_by_another_worker_is_not_claimed(db_session, import_job_runner):
+    job_id = _job(db_session, "queued", "other-host:1:abc", 60)
+
+    assert import_job_runner._claim(job_id) is False
+
+
+def test_recover_only_touches_expired_leases(db_session, import_job_runner):
+    live_running = _job(db_session, "running", "other-host:1:abc", 60)
+    live_queued = _job(db_session, "queued", "other-host:1:abc", 60)
+    dead_running = _job(db_session, "running", "other-host:2:def", -60)
+    dead_queued = _job(db_session, "queued", "other-host:2:def", -60)
+
+    import_job_runner.recover()
+
+    db_session.expire_all()
+    jobs = {job.id: job for job in db_session.query(models.ImportJob)}
+    assert jobs[live_running].status == "running"
+    assert jobs[live_queued].status == "queued"
+    assert jobs[live_queued].owner_id == "other-host:1:abc"
+
+    assert jobs[dead_running].status == "failed"
+    assert "Interrupted by server restart" in jobs[dead_running].errors
+
+    # Taken over and run here; the missing upload makes the import itself fail
+    assert jobs[dead_queued].owner_id == import_job_runner.worker_id
+    assert jobs[dead_queued].status == "failed"
+    assert jobs[dead_queued].started_at is not None
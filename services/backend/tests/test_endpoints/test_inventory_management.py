@@ -1,5 +1,6 @@
 import pytest
 from datetime import datetime
+from sqlalchemy import event
 import Database.Models as models
 
 
@@ -173,6 +174,134 @@ def test_consume_ingredients_insufficient_stock(client, db_session):
     assert "Insufficient stock" in response.json()["detail"]
 
 
+def test_consume_ingredients_repeated_item_draws_remaining_stock(client, db_session):
+    """Test an item listed twice is checked against the stock left by the first line"""
+    batch_id, inventory_hops, _ = create_batch_with_inventory(client, db_session)
+    hop_id = inventory_hops[0].id
+
+    def line(quantity):
+        return {
+            "batch_id": batch_id,
+            "inventory_item_id": hop_id,
+            "inventory_item_type": "hop",
+            "quantity_used": quantity,
+            "unit": "kg",
+        }
+
+    response = client.post(
+        f"/batches/{batch_id}/consume-ingredients",
+        json={"ingredients": [line(6.0), line(6.0)]},
+    )
+    assert response.status_code == 400
+    assert "Available: 4.0" in response.json()["detail"]
+    assert db_session.query(models.BatchIngredient).count() == 0
+
+    response = client.post(
+        f"/batches/{batch_id}/consume-ingredients",
+        json={"ingredients": [line(6.0), line(3.0)]},
+    )
+    assert response.status_code == 200, response.text
+
+    db_session.refresh(inventory_hops[0])
+    assert inventory_hops[0].stock == pytest.approx(1.0)
+    assert float(inventory_hops[0].inventory) == pytest.approx(1.0)
+    assert inventory_hops[0].version == 3
+
+    transactions = (
+        db_session.query(models.InventoryTransaction)
+        .order_by(models.InventoryTransaction.id)
+        .all()
+    )
+    assert [(t.quantity_before, t.quantity_after) for t in transactions] == [
+        (10.0, 4.0),
+        (4.0, 1.0),
+    ]
+
+
+def test_consume_ingredients_conflicting_update_returns_409(client, db_session, monkeypatch):
+    """Test stock written by another request between load and update is not overwritten"""
+    from api.endpoints import batches
+
+    batch_id, inventory_hops, _ = create_batch_with_inventory(client, db_session)
+    hop_id = inventory_hops[0].id
+    lock_inventory_items = batches._lock_inventory_items
+
+    def lock_then_concurrent_update(db, ingredients):
+        items = lock_inventory_items(db, ingredients)
+        db.execute(
+            models.InventoryHop.__table__.update()
+            .where(models.InventoryHop.id == hop_id)
+            .values(stock=1.0, version=models.InventoryHop.version + 1)
+        )
+        return items
+
+    monkeypatch.setattr(batches, "_lock_inventory_items", lock_then_concurrent_update)
+    response = client.post(
+        f"/batches/{batch_id}/consume-ingredients",
+        json={
+            "ingredients": [
+                {
+                    "batch_id": batch_id,
+                    "inventory_item_id": hop_id,
+                    "inventory_item_type": "hop",
+                    "quantity_used": 0.5,
+                    "unit": "kg",
+                }
+            ]
+        },
+    )
+    assert response.status_code == 409
+    assert db_session.query(models.BatchIngredient).count() == 0
+    assert db_session.query(models.InventoryTransaction).count() == 0
+
+
+def test_update_inventory_item_conflicting_update_returns_409(client, db_session):
+    """Test a PUT racing another write to the same item is rejected, not a 500"""
+    hop = models.InventoryHop(name="Citra", amount=2.0, inventory="1.5")
+    db_session.add(hop)
+    db_session.commit()
+    hop_id = hop.id
+
+    def concurrent_update(mapper, connection, target):
+        connection.execute(
+            models.InventoryHop.__table__.update()
+            .where(models.InventoryHop.id == target.id)
+            .values(inventory="0.5", version=models.InventoryHop.version + 1)
+        )
+
+    event.listen(models.InventoryHop, "before_update", concurrent_update)
+    try:
+        response = client.put(
+            f"/inventory/hops/{hop_id}", json={"name": "Citra", "amount": 2.0, "inventory": "3.0"}
+        )
+    finally:
+        event.remove(models.InventoryHop, "before_update", concurrent_update)
+
+    assert response.status_code == 409
+    db_session.expire_all()
+    stored = db_session.get(models.InventoryHop, hop_id)
+    assert stored.inventory == "1.5"
+    assert stored.version == 1
+
+
+def test_inventory_stock_follows_inventory_and_amount(db_session):
+    """Test the numeric stock column is kept in sync on ORM writes"""
+    hop = models.InventoryHop(name="Citra", amount=2.0, inventory="1.5 kg")
+    yeast = models.InventoryYeast(name="US-05", amount=11.5)
+    db_session.add_all([hop, yeast])
+    db_session.commit()
+    assert hop.stock == pytest.approx(1.5)
+    assert yeast.stock == pytest.approx(11.5)
+    assert hop.version == 1
+
+    hop.inventory = "0.75"
+    yeast.amount = 3.0
+    db_session.commit()
+    assert hop.stock == pytest.approx(0.75)
+    assert yeast.stock == pytest.approx(3.0)
+    assert hop.version == 2
+
+
 def test_consume_ingredients_invalid_batch(client, db_session):
     """Test consumption fails for non-existent batch"""
     consume_request = {
@@ -274,6 +403,88 @@ def test_check_inventory_availability(client, db_session):
         assert "is_available" in item
 
 
+def test_check_inventory_availability_sums_stock_by_normalized_name(client, db_session):
+    """Test available quantity sums unallocated inventory matched by normalized name"""
+    recipe_id = create_recipe_with_ingredients(client, db_session)
+    db_session.add_all(
+        [
+            models.InventoryHop(name="  CASCADE ", inventory="0.25 kg"),
+            models.InventoryHop(name="cascade", inventory="0.4"),
+            models.InventoryFermentable(name="Pale  Malt", amount=6.0),
+            models.InventoryFermentable(name="Pale Malt", amount=100.0),
+        ]
+    )
+    db_session.commit()
+    # Batch inventory copies are allocated to the batch and not counted
+    batch_response = client.post(
+        "/batches",
+        json={
+            "recipe_id": recipe_id,
+            "batch_name": "Allocated",
+            "batch_number": 1,
+            "batch_size": 20.0,
+            "brewer": "Tester",
+            "brew_date": datetime(2024, 1, 1).isoformat(),
+        },
+    )
+    assert batch_response.status_code == 200
+
+    response = client.get(f"/batches/check-inventory-availability/{recipe_id}")
+    assert response.status_code == 200, response.text
+    by_type = {item["inventory_item_type"]: item for item in response.json()}
+
+    assert by_type["hop"]["available_quantity"] == pytest.approx(0.65)
+    assert by_type["hop"]["is_available"] is True
+    assert by_type["hop"]["warning_level"] == "low_stock"
+    assert by_type["fermentable"]["available_quantity"] == pytest.approx(106.0)
+    assert by_type["fermentable"]["warning_level"] is None
+    assert by_type["yeast"]["available_quantity"] == 0.0
+    assert by_type["yeast"]["warning_level"] == "out_of_stock"
+
+
+def test_check_inventory_availability_batch(client, db_session):
+    """Test availability for many recipes in one request"""
+    recipe_id = create_recipe_with_ingredients(client, db_session)
+    response = client.post(
+        "/recipes",
+        json={"name": "Hop Water", "hops": [{"name": "Citra", "amount": 0.1}]},
+    )
+    assert response.status_code == 200, response.text
+    hop_water_id = (
+        db_session.query(models.Recipes.id).filter(models.Recipes.name == "Hop Water").scalar()
+    )
+    db_session.add(models.InventoryHop(name="citra", inventory="1"))
+    db_session.commit()
+
+    response = client.post(
+        "/inventory/availability:batch",
+        json={"recipe_ids": [hop_water_id, 9999, recipe_id, hop_water_id]},
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+
+    assert [result["recipe_id"] for result in body["results"]] == [hop_water_id, recipe_id]
+    assert body["missing_ids"] == [9999]
+    hop_water, full_recipe = body["results"]
+    assert hop_water["can_brew"] is True
+    assert hop_water["missing_count"] == 0
+    assert hop_water["ingredients"][0]["available_quantity"] == 1.0
+    assert full_recipe["can_brew"] is False
+    assert full_recipe["missing_count"] == 4
+    assert [item["inventory_item_type"] for item in full_recipe["ingredients"]] == [
+        "hop",
+        "fermentable",
+        "yeast",
+        "misc",
+    ]
+
+
+def test_check_inventory_availability_batch_requires_recipe_ids(client):
+    """Test the batch availability request validates its recipe ids"""
+    response = client.post("/inventory/availability:batch", json={"recipe_ids": []})
+    assert response.status_code == 422
+
+
 def test_check_inventory_availability_invalid_recipe(client, db_session):
     """Test availability check fails for non-existent recipe"""
     response = client.get("/batches/check-inventory-availability/9999")
@@ -0,0 +1,145 @@
+"""
+Tests for the HomeAssistant MQTT publisher
+"""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from api.events import EventBroker, batch_topic, event_broker
+from api.mqtt_publisher import MemoryMqttClient, MqttClient, MqttPublisher, worker_client_id
+
+
+@pytest.fixture()
+def mqtt(db_session):
+    client = MemoryMqttClient()
+    publisher = MqttPublisher(
+        client=client,
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        coalesce_seconds=0,
+    )
+    yield publisher, client
+    event_broker.remove_listener(publisher._on_event)
+
+
+def _reading(client, batch_id, gravity):
+    response = client.post(
+        f"/batches/{batch_id}/fermentation/readings",
+        json={"timestamp": datetime.now().isoformat(), "gravity": gravity, "temperature": 19.0},
+    )
+    assert response.status_code == 200
+
+
+def test_publish_all_sends_retained_discovery_and_state(mqtt, sample_batch):
+    publisher, client = mqtt
+    batch_id = sample_batch["id"]
+
+    assert publisher.publish_all() == 1
+
+    config = json.loads(client.retained[f"homeassistant/sensor/hoppybrew_batch_{batch_id}/config"])
+    assert config["state_topic"] == f"hoppybrew/batch/{batch_id}/state"
+    assert config["json_attributes_topic"] == f"hoppybrew/batch/{batch_id}/attributes"
+    assert config["availability_topic"] == "hoppybrew/status"
+    assert client.retained[f"hoppybrew/batch/{batch_id}/state"] == "brewing"
+    attributes = json.loads(client.retained[f"hoppybrew/batch/{batch_id}/attributes"])
+    assert attributes["batch_name"] == sample_batch["batch_name"]
+    assert client.retained["hoppybrew/summary/state"] == "1"
+    assert all(retain for _, _, retain in client.messages)
+
+
+def test_discovery_endpoint_matches_published_config(client, mqtt, sample_batch):
+    publisher, mqtt_client = mqtt
+    batch_id = sample_batch["id"]
+    publisher.publish_all()
+
+    published = json.loads(
+        mqtt_client.retained[f"homeassistant/sensor/hoppybrew_batch_{batch_id}/config"]
+    )
+    published.pop("availability_topic")
+    assert client.get(f"/homeassistant/discovery/batch/{batch_id}").json() == published
+
+
+def test_reading_burst_is_coalesced(client, mqtt, sample_batch):
+    publisher, mqtt_client = mqtt
+    batch_id = sample_batch["id"]
+    publisher.publish_all()
+    event_broker.add_listener(publisher._on_event)
+    mqtt_client.messages.clear()
+
+    for gravity in (1.050, 1.045, 1.040):
+        _reading(client, batch_id, gravity)
+    assert mqtt_client.messages == []
+
+    assert publisher.flush() == 1
+    attribute_topic = f"hoppybrew/batch/{batch_id}/attributes"
+    updates = [payload for topic, payload, _ in mqtt_client.messages if topic == attribute_topic]
+    assert len(updates) == 1
+    assert json.loads(updates[0])["gravity"] == 1.040
+
+    # Unchanged state, config and summary are not sent again
+    topics = {topic for topic, _, _ in mqtt_client.messages}
+    assert f"hoppybrew/batch/{batch_id}/state" not in topics
+    assert "hoppybrew/summary/state" not in topics
+
+
+def test_status_change_and_delete_update_retained_topics(client, mqtt, sample_batch):
+    publisher, mqtt_client = mqtt
+    batch_id = sample_batch["id"]
+    publisher.publish_all()
+    event_broker.add_listener(publisher._on_event)
+
+    response = client.put(f"/batches/{batch_id}/status", json={"status": "brewing"})
+    assert response.status_code == 200
+    response = client.put(f"/batches/{batch_id}/status", json={"status": "fermenting"})
+    assert response.status_code == 200
+    publisher.flush()
+    assert mqtt_client.retained[f"hoppybrew/batch/{batch_id}/state"] == "fermenting"
+
+    assert client.delete(f"/batches/{batch_id}").status_code == 200
+    publisher.flush()
+    assert not any(f"hoppybrew_batch_{batch_id}" in topic for topic in mqtt_client.retained)
+    assert not any(f"/batch/{batch_id}/" in topic for topic in mqtt_client.retained)
+    assert mqtt_client.retained["hoppybrew/summary/state"] == "0"
+
+
+def test_start_and_stop_publish_availability(db_session, sample_batch):
+    client = MemoryMqttClient()
+    broker = EventBroker()
+    publisher = MqttPublisher(
+        client=client,
+        session_factory=sessionmaker(bind=db_session.get_bind()),
+        broker=broker,
+        coalesce_seconds=60,
+    )
+
+    publisher.start()
+    assert publisher.running
+    assert client.will == ("hoppybrew/status", "offline")
+    assert client.retained["hoppybrew/status"] == "online"
+
+    # Pending changes are published on shutdown without waiting out the window
+    broker.publish(batch_topic(sample_batch["id"]), "batch_updated", {"batch_id": sample_batch["id"]})
+    broker.publish("other", "ignored", {})
+    publisher.stop()
+
+    assert not publisher.running
+    assert not client.connected
+    assert client.retained["hoppybrew/status"] == "offline"
+
+
+def test_worker_client_ids_are_unique_per_process():
+    client_id = worker_client_id("hoppybrew")
+    assert client_id.startswith("hoppybrew-")
+    assert client_id.endswith(f"-{os.getpid()}")
+
+
+def test_mqtt_client_requires_every_method():
+    class PublishOnly(MqttClient):
+        def publish(self, topic, payload, retain=False):
+            pass
+
+    with pytest.raises(TypeError):
+        PublishOnly()
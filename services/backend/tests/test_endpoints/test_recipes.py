@@ -2,6 +2,7 @@ from copy import deepcopy
 
 import pytest
 import Database.Models as models
+from api.endpoints import recipes as recipes_endpoint
 
 
 BASE_RECIPE_PAYLOAD = {
@@ -75,6 +76,81 @@ def test_get_recipes_returns_empty_list(client):
     assert response.json() == []
 
 
+def test_get_recipes_paginates_with_cursor(client):
+    for index in range(3):
+        create_recipe(client, name=f"Paged Recipe {index}")
+
+    first_page = client.get("/recipes", params={"limit": 2})
+    assert first_page.status_code == 200
+    assert [recipe["name"] for recipe in first_page.json()] == [
+        "Paged Recipe 0",
+        "Paged Recipe 1",
+    ]
+    cursor = first_page.headers["X-Next-Cursor"]
+
+    second_page = client.get("/recipes", params={"limit": 2, "cursor": cursor})
+    assert second_page.status_code == 200
+    assert [recipe["name"] for recipe in second_page.json()] == ["Paged Recipe 2"]
+    assert "X-Next-Cursor" not in second_page.headers
+
+
+def test_get_recipes_without_limit_returns_everything(client, monkeypatch):
+    """Unpaginated callers are not cut off at the default page size"""
+    monkeypatch.setattr(recipes_endpoint, "DEFAULT_RECIPE_PAGE_SIZE", 2)
+    for index in range(3):
+        create_recipe(client, name=f"Unpaged Recipe {index}")
+
+    response = client.get("/recipes")
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert "X-Next-Cursor" not in response.headers
+
+    first_id = response.json()[0]["id"]
+    page = client.get("/recipes", params={"cursor": first_id - 1})
+    assert len(page.json()) == 2
+    assert page.headers["X-Next-Cursor"] == str(response.json()[1]["id"])
+
+
+def test_get_recipes_filters(client):
+    create_recipe(client, name="Alpha Ale", type="Ale", brewer="Ann")
+    create_recipe(client, name="Alpha Lager", type="Lager", brewer="Bob")
+    create_recipe(client, name="Beta Ale", type="Ale", brewer="Bob")
+
+    response = client.get("/recipes", params={"name_prefix": "Alpha"})
+    assert {recipe["name"] for recipe in response.json()} == {
+        "Alpha Ale",
+        "Alpha Lager",
+    }
+
+    response = client.get("/recipes", params={"type": "Ale", "brewer": "Bob"})
+    assert [recipe["name"] for recipe in response.json()] == ["Beta Ale"]
+
+    response = client.get("/recipes", params={"is_batch": True})
+    assert response.json() == []
+
+
+def test_get_recipes_summary_projection(client):
+    create_recipe(
+        client,
+        name="Summary Recipe",
+        hops=[
+            {"name": "Cascade", "use": "Boil", "time": 60, "amount": 1.0},
+            {"name": "Citra", "use": "Aroma", "time": 5, "amount": 1.0},
+        ],
+    )
+
+    response = client.get("/recipes", params={"fields": "summary"})
+    assert response.status_code == 200
+    summary = response.json()[0]
+
+    assert summary["name"] == "Summary Recipe"
+    assert summary["hop_count"] == 2
+    assert summary["fermentable_count"] == 1
+    assert summary["yeast_count"] == 1
+    assert summary["misc_count"] == 1
+    assert "hops" not in summary
+
+
 def test_create_recipe_persists_related_ingredients(client, db_session):
     created, payload = create_recipe(client)
     recipe_id = created["id"]
@@ -269,6 +345,292 @@ def test_scale_recipe_endpoint_returns_scaled_payload(client):
     )
 
 
+def test_scale_recipe_endpoint_returns_metrics(client):
+    created, _ = create_recipe(
+        client,
+        name="Bitter Recipe",
+        og=1.050,
+        fg=1.010,
+        hops=[{"name": "Magnum", "use": "Boil", "time": 60, "amount": 1.0, "alpha": 12.0}],
+        fermentables=[{"name": "Pale Malt", "amount": 5.0, "yield_": 78.0, "color": 3}],
+    )
+
+    response = client.post(
+        f"/recipes/{created['id']}/scale", json={"target_batch_size": 20.5}
+    )
+
+    assert response.status_code == 200, response.text
+    metrics = response.json()["metrics"]
+    assert metrics["abv"] == pytest.approx(5.25)
+    assert metrics["ibu"] > 0
+    assert metrics["srm"] > 0
+
+
+def test_recipe_metrics_batch(client):
+    first, _ = create_recipe(
+        client,
+        name="Metrics One",
+        hops=[{"name": "Magnum", "use": "Boil", "time": 60, "amount": 1.0, "alpha": 12.0}],
+        fermentables=[{"name": "Pale Malt", "amount": 5.0, "yield_": 78.0, "color": 3}],
+    )
+    second, _ = create_recipe(client, name="Metrics Two", hops=[], fermentables=[])
+
+    response = client.post(
+        "/recipes/metrics:batch",
+        json={"recipe_ids": [second["id"], first["id"], 99999]},
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert [item["recipe_id"] for item in data["results"]] == [second["id"], first["id"]]
+    assert data["missing_ids"] == [99999]
+
+    empty, metrics = data["results"]
+    assert empty["est_og"] is None and empty["ibu"] is None and empty["srm"] is None
+    assert metrics["est_og"] > 1.0
+    assert metrics["est_fg"] < metrics["est_og"]
+    assert metrics["abv"] > 0
+    assert metrics["ibu"] > 0
+    assert metrics["srm"] > 0
+
+    rager = client.post(
+        "/recipes/metrics:batch",
+        json={"recipe_ids": [first["id"]], "ibu_method": "rager"},
+    ).json()["results"][0]
+    assert rager["ibu"] != pytest.approx(metrics["ibu"])
+
+
+def test_ingredient_changes_keep_stored_metrics_current(client):
+    created, _ = create_recipe(
+        client,
+        name="Maintained Recipe",
+        hops=[],
+        fermentables=[{"name": "Pale Malt", "amount": 5.0, "yield_": 78.0, "color": 3}],
+    )
+    recipe_id = created["id"]
+    assert created["est_og"] > 1.0
+    assert created["est_color"] > 0
+    assert created["ibu"] is None
+
+    hop = client.post(
+        f"/recipes/{recipe_id}/ingredients/hops",
+        json={"name": "Magnum", "use": "Boil", "time": 60, "amount": 1.0, "alpha": 12.0},
+    ).json()
+    first_ibu = client.get(f"/recipes/{recipe_id}").json()["ibu"]
+    assert first_ibu > 0
+
+    client.put(
+        f"/recipes/{recipe_id}/ingredients/hops/{hop['id']}",
+        json={"name": "Magnum", "use": "Boil", "time": 60, "amount": 2.0, "alpha": 12.0},
+    )
+    assert client.get(f"/recipes/{recipe_id}").json()["ibu"] == pytest.approx(first_ibu * 2)
+
+    expected = client.post(
+        "/recipes/metrics:batch", json={"recipe_ids": [recipe_id]}
+    ).json()["results"][0]
+    stored = client.get(f"/recipes/{recipe_id}").json()
+    assert stored["ibu"] == pytest.approx(expected["ibu"])
+    assert stored["est_og"] == pytest.approx(expected["est_og"])
+    assert stored["est_fg"] == pytest.approx(expected["est_fg"])
+    assert stored["est_abv"] == pytest.approx(expected["est_abv"])
+    assert stored["est_color"] == pytest.approx(expected["srm"])
+
+    client.delete(f"/recipes/{recipe_id}/ingredients/hops/{hop['id']}")
+    assert client.get(f"/recipes/{recipe_id}").json()["ibu"] is None
+
+
+def test_recipe_metrics_batch_validates_payload(client):
+    assert client.post("/recipes/metrics:batch", json={"recipe_ids": []}).status_code == 422
+    response = client.post(
+        "/recipes/metrics:batch", json={"recipe_ids": [1], "ibu_method": "garetz"}
+    )
+    assert response.status_code == 422
+
+
+def _add_style_match_fixtures(db_session):
+    db_session.add_all(
+        [
+            models.BeerStyle(
+                name="American IPA", style_code="21A",
+                og_min=1.056, og_max=1.070, fg_min=1.008, fg_max=1.014,
+                abv_min=5.5, abv_max=7.5, ibu_min=40, ibu_max=70,
+                color_min_srm=6, color_max_srm=14,
+            ),
+            models.BeerStyle(
+                name="Irish Stout", style_code="15B",
+                og_min=1.036, og_max=1.044, fg_min=1.007, fg_max=1.011,
+                abv_min=4.0, abv_max=4.5, ibu_min=25, ibu_max=45,
+                color_min_srm=25, color_max_srm=40,
+            ),
+        ]
+    )
+    ipa = models.Recipes(
+        name="West Coast IPA", version=1, est_og=1.062, est_fg=1.011,
+        est_abv=6.7, ibu=60, est_color=8,
+    )
+    stout = models.Recipes(
+        name="Dry Stout", version=1, est_og=1.040, est_fg=1.009,
+        est_abv=4.1, ibu=35, est_color=35, is_batch=True,
+    )
+    db_session.add_all([ipa, stout])
+    db_session.commit()
+    return ipa.id, stout.id
+
+
+def test_recipe_style_matches(client, db_session):
+    ipa_id, _ = _add_style_match_fixtures(db_session)
+
+    response = client.get(f"/recipes/{ipa_id}/style-matches")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["recipe_name"] == "West Coast IPA"
+    best, other = data["matches"]
+    assert best["name"] == "American IPA"
+    assert best["in_range"] is True and best["out_of_range"] == []
+    assert best["compared_metrics"] == 5
+    assert other["in_range"] is False
+    assert other["out_of_range"] == ["og", "abv", "ibu", "srm"]
+    assert best["score"] > other["score"]
+
+    response = client.get(f"/recipes/{ipa_id}/style-matches?in_range_only=true")
+    assert [m["name"] for m in response.json()["matches"]] == ["American IPA"]
+
+    assert client.get("/recipes/99999/style-matches").status_code == 404
+
+
+def test_all_recipe_style_matches(client, db_session):
+    ipa_id, stout_id = _add_style_match_fixtures(db_session)
+
+    response = client.get("/recipes/style-matches")
+    assert response.status_code == 200, response.text
+    assert [
+        (item["recipe_id"], [m["name"] for m in item["matches"]])
+        for item in response.json()
+    ] == [(ipa_id, ["American IPA"]), (stout_id, ["Irish Stout"])]
+
+    response = client.get("/recipes/style-matches?is_batch=false&top=2")
+    (item,) = response.json()
+    assert item["recipe_id"] == ipa_id and len(item["matches"]) == 2
+
+
+def test_style_matches_follow_style_writes(client, db_session):
+    ipa_id, _ = _add_style_match_fixtures(db_session)
+    assert client.get(f"/recipes/{ipa_id}/style-matches?in_range_only=true").json()["matches"]
+
+    created = client.post(
+        "/beer-styles",
+        json={"name": "Hazy IPA", "abv_min": 6.0, "abv_max": 9.0, "ibu_min": 15, "ibu_max": 30},
+    ).json()
+    names = [m["name"] for m in client.get(f"/recipes/{ipa_id}/style-matches").json()["matches"]]
+    assert "Hazy IPA" in names
+
+    client.delete(f"/beer-styles/{created['id']}")
+    names = [m["name"] for m in client.get(f"/recipes/{ipa_id}/style-matches").json()["matches"]]
+    assert "Hazy IPA" not in names
+
+
+def _add_brewable_fixtures(client, db_session):
+    pale = client.post(
+        "/recipes",
+        json={
+            "name": "Pale",
+            "hops": [{"name": "Cascade", "amount": 0.1}],
+            "fermentables": [{"name": "Pale Malt", "amount": 5.0}],
+        },
+    ).json()
+    smash = client.post(
+        "/recipes",
+        json={
+            "name": "SMaSH",
+            "hops": [{"name": "Citra", "amount": 0.1}],
+            "fermentables": [{"name": "Pale Malt", "amount": 4.0}],
+        },
+    ).json()
+    db_session.add_all(
+        [
+            models.InventoryHop(name="cascade", inventory="0.2"),
+            models.InventoryFermentable(name="PALE MALT", amount=5.0),
+        ]
+    )
+    db_session.commit()
+    return pale["id"], smash["id"]
+
+
+def test_brewable_recipes(client, db_session):
+    pale_id, smash_id = _add_brewable_fixtures(client, db_session)
+
+    response = client.get("/recipes/brewable")
+    assert response.status_code == 200, response.text
+    assert response.json() == [
+        {
+            "recipe_id": pale_id,
+            "recipe_name": "Pale",
+            "brewable": True,
+            "coverage": 1.0,
+            "ingredient_count": 2,
+            "missing": [],
+        }
+    ]
+
+    response = client.get("/recipes/brewable", params={"min_coverage": 0.5})
+    assert [item["recipe_id"] for item in response.json()] == [pale_id, smash_id]
+    partial = response.json()[1]
+    assert partial["brewable"] is False
+    assert partial["coverage"] == pytest.approx(0.5)
+    assert partial["missing"] == [{"inventory_item_type": "hop", "name": "citra"}]
+
+    assert client.get("/recipes/brewable", params={"is_batch": True}).json() == []
+    assert client.get("/recipes/brewable", params={"min_coverage": 1.5}).status_code == 422
+
+
+def test_brewable_recipes_follow_consumption_and_renames(client, db_session):
+    pale_id, smash_id = _add_brewable_fixtures(client, db_session)
+    assert [item["recipe_id"] for item in client.get("/recipes/brewable").json()] == [pale_id]
+
+    batch = client.post(
+        "/batches",
+        json={
+            "recipe_id": smash_id,
+            "batch_name": "SMaSH #1",
+            "batch_number": 1,
+            "batch_size": 20.0,
+            "brewer": "Tester",
+            "brew_date": "2024-01-01T00:00:00",
+        },
+    ).json()
+    malt = (
+        db_session.query(models.InventoryFermentable)
+        .filter(models.InventoryFermentable.batch_id.is_(None))
+        .one()
+    )
+    response = client.post(
+        f"/batches/{batch['id']}/consume-ingredients",
+        json={
+            "ingredients": [
+                {
+                    "batch_id": batch["id"],
+                    "inventory_item_id": malt.id,
+                    "inventory_item_type": "fermentable",
+                    "quantity_used": 4.0,
+                    "unit": "kg",
+                }
+            ]
+        },
+    )
+    assert response.status_code == 200, response.text
+    assert client.get("/recipes/brewable").json() == []
+
+    hop = db_session.query(models.RecipeHop).filter(models.RecipeHop.recipe_id == pale_id).one()
+    response = client.put(
+        f"/recipes/{pale_id}/ingredients/hops/{hop.id}",
+        json={"name": "Citra", "amount": 0.1},
+    )
+    assert response.status_code == 200, response.text
+    ranked = client.get("/recipes/brewable", params={"min_coverage": 0}).json()
+    pale = next(item for item in ranked if item["recipe_id"] == pale_id)
+    assert {item["name"] for item in pale["missing"]} == {"citra", "pale malt"}
+
+
 def test_scale_recipe_to_equipment_endpoint(client, db_session):
     """Test scaling a recipe to match an equipment profile's batch size"""
     # Create a recipe
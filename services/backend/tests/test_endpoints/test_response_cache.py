@@ -0,0 +1,197 @@
+"""Tests for the response cache on reference endpoints."""
+
+import fnmatch
+import time
+
+import pytest
+
+from api.response_cache import (
+    CacheBackend,
+    CachedResponse,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    ResponseCache,
+    response_cache,
+)
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis-py used by the cache"""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+
+    def scan_iter(self, pattern):
+        return [key for key in [*self.values, *self.sets] if fnmatch.fnmatch(key, pattern)]
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+
+def _create_water_profile(client, name):
+    response = client.post(
+        "/water-profiles",
+        json={"name": name, "profile_type": "source", "calcium": 50},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_list_is_served_from_cache_until_invalidated(client):
+    _create_water_profile(client, "Cached Profile")
+
+    first = client.get("/water-profiles")
+    second = client.get("/water-profiles")
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+    assert [p["name"] for p in first.json()] == ["Cached Profile"]
+
+    _create_water_profile(client, "New Profile")
+
+    third = client.get("/water-profiles")
+    assert third.headers["X-Cache"] == "MISS"
+    assert [p["name"] for p in third.json()] == ["Cached Profile", "New Profile"]
+
+
+def test_cached_body_matches_uncached_serialization(client):
+    _create_water_profile(client, "Serialized Profile")
+    detail = client.get("/water-profiles").json()[0]
+    assert detail == client.get(f"/water-profiles/{detail['id']}").json()
+
+
+def test_query_params_are_part_of_the_key(client):
+    _create_water_profile(client, "Source Profile")
+
+    client.get("/water-profiles", params={"profile_type": "source"})
+    filtered = client.get("/water-profiles", params={"profile_type": "target"})
+    assert filtered.headers["X-Cache"] == "MISS"
+    assert filtered.json() == []
+
+
+def test_if_none_match_returns_not_modified(client):
+    first = client.get("/mash/templates")
+    etag = first.headers["ETag"]
+
+    revalidated = client.get("/mash/templates", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.content == b""
+
+    stale = client.get("/mash/templates", headers={"If-None-Match": '"other"'})
+    assert stale.status_code == 200
+    assert stale.json() == first.json()
+
+
+def test_etag_changes_after_write(client, monkeypatch):
+    monkeypatch.setattr(
+        "api.endpoints.references.fetch_favicon",
+        lambda url: "http://mock.local/favicon.ico",
+    )
+    etag = client.get("/references").headers["ETag"]
+
+    client.post("/references", json={"name": "Ref", "url": "http://example.com"})
+
+    response = client.get("/references", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert [r["name"] for r in response.json()] == ["Ref"]
+
+
+def test_step_write_invalidates_profile_list(client):
+    profile = client.post(
+        "/fermentation-profiles", json={"name": "Ale", "steps": []}
+    ).json()
+    assert client.get("/fermentation-profiles").json()[0]["steps"] == []
+
+    client.post(
+        f"/fermentation-profiles/{profile['id']}/steps",
+        json={"step_order": 1, "name": "Primary", "step_type": "primary",
+              "temperature": 19.0, "duration_days": 7},
+    )
+
+    steps = client.get("/fermentation-profiles").json()[0]["steps"]
+    assert [step["name"] for step in steps] == ["Primary"]
+
+
+def test_disabled_cache_still_sets_etag(client, monkeypatch):
+    monkeypatch.setattr(response_cache, "enabled", False)
+    first = client.get("/mash/templates")
+    second = client.get("/mash/templates")
+    assert second.headers["X-Cache"] == "MISS"
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    entry = CachedResponse(body=b"[]", etag='"a"')
+    backend.set("one", entry, ["t1"], ttl=60)
+    backend.set("two", entry, ["t2"], ttl=60)
+    backend.get("one")
+    backend.set("three", entry, ["t1"], ttl=60)
+
+    assert backend.get("two") is None
+    assert backend.get("one") == entry
+
+    backend.invalidate_tags(["t1"])
+    assert len(backend) == 0
+
+
+def test_memory_backend_expires_entries(monkeypatch):
+    backend = MemoryCacheBackend()
+    backend.set("key", CachedResponse(body=b"[]", etag='"a"'), [], ttl=10)
+
+    now = time.monotonic()
+    monkeypatch.setattr("api.response_cache.time.monotonic", lambda: now + 11)
+    assert backend.get("key") is None
+
+
+def test_cache_backend_requires_every_method():
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
+
+
+def test_redis_backend_round_trip_and_invalidation():
+    fake = FakeRedis()
+    backend = RedisCacheBackend(fake)
+    entry = CachedResponse(body=b'[{"id": 1}]', etag='"abc"')
+
+    backend.set("/references?", entry, ["references"], ttl=60)
+    assert backend.get("/references?") == entry
+
+    backend.invalidate_tags(["references"])
+    assert backend.get("/references?") is None
+    assert fake.values == {} and fake.sets == {}
+
+
+def test_response_cache_with_redis_backend(client, monkeypatch):
+    cache = ResponseCache(backend=RedisCacheBackend(FakeRedis()), ttl=60, enabled=True)
+    monkeypatch.setattr("api.endpoints.mash_profiles.response_cache", cache)
+
+    assert client.get("/mash/templates").headers["X-Cache"] == "MISS"
+    assert client.get("/mash/templates").headers["X-Cache"] == "HIT"
@@ -345,6 +345,108 @@ class TestViabilityCalculator:
         assert data["current_viability"] < 90.0
 
 
+class TestViabilityReport:
+    """Test the fleet-wide viability report endpoint"""
+
+    def test_report_matches_single_item_viability(self, db_session):
+        """Test inventory rows match the per-item endpoint"""
+        yeast = models.InventoryYeast(
+            name="Report Liquid",
+            form="Liquid",
+            manufacture_date=datetime.now() - timedelta(days=120),
+            expiry_date=datetime.now() + timedelta(days=300),
+            generation=1,
+        )
+        db_session.add(yeast)
+        db_session.commit()
+
+        response = client.get("/yeasts/inventory/viability", params={"source": "inventory", "limit": 1000})
+        assert response.status_code == 200
+        row = next(item for item in response.json() if item["id"] == yeast.id)
+
+        single = client.get(f"/yeasts/inventory/{yeast.id}/viability").json()
+        assert row["source"] == "inventory"
+        assert row["current_viability"] == single["current_viability"]
+        assert row["viability_status"] == single["viability_status"]
+        assert row["days_until_expiry"] == single["days_until_expiry"]
+        # 100 - 4 months * 3 - 12 for one generation
+        assert row["current_viability"] == 76.0
+        assert row["starter_recommended"] is True
+        # Viability reaches 50% after (100 - 12 - 50) / 3 months, before the label
+        predicted = datetime.fromisoformat(row["predicted_expiry_date"])
+        assert predicted.date() == (yeast.manufacture_date + timedelta(days=380)).date()
+
+    def test_report_includes_active_harvests(self, sample_yeast_strain, db_session):
+        """Test harvests are aged from the harvest date at their storage temperature"""
+        active = models.YeastHarvest(
+            yeast_strain_id=sample_yeast_strain.id,
+            harvest_date=datetime.now() - timedelta(days=30),
+            generation=2,
+            quantity_harvested=200.0,
+            viability_at_harvest=90.0,
+            storage_temperature=14.0,
+        )
+        used = models.YeastHarvest(
+            yeast_strain_id=sample_yeast_strain.id,
+            harvest_date=datetime.now() - timedelta(days=30),
+            quantity_harvested=200.0,
+            status="used",
+        )
+        db_session.add_all([active, used])
+        db_session.commit()
+
+        response = client.get("/yeasts/inventory/viability", params={"source": "harvest", "limit": 1000})
+        assert response.status_code == 200
+        rows = {item["id"]: item for item in response.json()}
+        assert used.id not in rows
+        row = rows[active.id]
+        assert row["source"] == "harvest"
+        assert row["name"] == sample_yeast_strain.name
+        assert row["generation"] == 2
+        # Measured 90% less one month of liquid decay at 2.5x for 14°C
+        assert row["current_viability"] == 82.5
+
+        response = client.get(
+            "/yeasts/inventory/viability",
+            params={"source": "harvest", "include_unavailable": True, "limit": 1000},
+        )
+        assert used.id in {item["id"] for item in response.json()}
+
+    def test_report_filters_and_sorts_by_predicted_expiry(self, db_session):
+        """Test expiry filtering and ordering"""
+        soon = models.InventoryYeast(
+            name="Report Soon", form="Dry", expiry_date=datetime.now() + timedelta(days=5)
+        )
+        later = models.InventoryYeast(
+            name="Report Later", form="Dry", expiry_date=datetime.now() + timedelta(days=20)
+        )
+        far = models.InventoryYeast(
+            name="Report Far", form="Dry", expiry_date=datetime.now() + timedelta(days=400)
+        )
+        db_session.add_all([later, soon, far])
+        db_session.commit()
+
+        response = client.get(
+            "/yeasts/inventory/viability",
+            params={
+                "expires_before": (datetime.now() + timedelta(days=30)).isoformat(),
+                "limit": 1000,
+            },
+        )
+        assert response.status_code == 200
+        ids = [item["id"] for item in response.json()]
+        assert soon.id in ids and later.id in ids
+        assert far.id not in ids
+        assert ids.index(soon.id) < ids.index(later.id)
+        dates = [item["predicted_expiry_date"] for item in response.json()]
+        assert dates == sorted(dates)
+
+    def test_report_rejects_unknown_sort(self):
+        """Test invalid query parameters"""
+        response = client.get("/yeasts/inventory/viability", params={"sort": "age"})
+        assert response.status_code == 422
+
+
 class TestHarvestGenealogy:
     """Test harvest genealogy endpoint"""
 
@@ -382,3 +484,76 @@ class TestHarvestGenealogy:
         assert data["current"]["id"] == child.id
         assert len(data["ancestors"]) == 1
         assert data["ancestors"][0]["id"] == parent.id
+
+    def _chain(self, strain_id, db_session, length):
+        """Create a repitch chain of harvests, oldest first"""
+        harvests = []
+        for generation in range(1, length + 1):
+            harvest = models.YeastHarvest(
+                yeast_strain_id=strain_id,
+                generation=generation,
+                parent_harvest_id=harvests[-1].id if harvests else None,
+                quantity_harvested=100.0,
+                unit="ml"
+            )
+            db_session.add(harvest)
+            db_session.commit()
+            harvests.append(harvest)
+        return harvests
+
+    def test_genealogy_tree_and_depth_limit(self, sample_yeast_strain, db_session):
+        """Test descendants are nested and both directions respect max_depth"""
+        root, child, grandchild, great_grandchild = self._chain(
+            sample_yeast_strain.id, db_session, 4
+        )
+        sibling = models.YeastHarvest(
+            yeast_strain_id=sample_yeast_strain.id,
+            generation=2,
+            parent_harvest_id=root.id,
+            quantity_harvested=50.0,
+            unit="ml"
+        )
+        db_session.add(sibling)
+        db_session.commit()
+
+        data = client.get(f"/yeast-harvests/{root.id}/genealogy").json()
+        assert data["ancestors"] == []
+        assert [node["harvest"]["id"] for node in data["descendants"]] == [child.id, sibling.id]
+        (grandchild_node,) = data["descendants"][0]["children"]
+        assert grandchild_node["harvest"]["id"] == grandchild.id
+        assert grandchild_node["children"][0]["harvest"]["id"] == great_grandchild.id
+
+        data = client.get(
+            f"/yeast-harvests/{great_grandchild.id}/genealogy", params={"max_depth": 2}
+        ).json()
+        assert [harvest["id"] for harvest in data["ancestors"]] == [grandchild.id, child.id]
+
+        data = client.get(f"/yeast-harvests/{root.id}/genealogy", params={"max_depth": 1}).json()
+        assert all(node["children"] == [] for node in data["descendants"])
+
+    def test_paginated_ancestors_and_descendants(self, sample_yeast_strain, db_session):
+        """Test flat lineage endpoints report depth and paginate"""
+        chain = self._chain(sample_yeast_strain.id, db_session, 5)
+
+        response = client.get(
+            f"/yeast-harvests/{chain[0].id}/descendants", params={"skip": 1, "limit": 2}
+        )
+        assert response.status_code == 200
+        assert [(h["id"], h["depth"]) for h in response.json()] == [
+            (chain[2].id, 2),
+            (chain[3].id, 3),
+        ]
+
+        response = client.get(f"/yeast-harvests/{chain[-1].id}/ancestors")
+        assert [h["id"] for h in response.json()] == [h.id for h in reversed(chain[:-1])]
+
+        assert client.get("/yeast-harvests/999999/descendants").status_code == 404
+
+    def test_deleting_a_harvest_detaches_its_descendants(self, sample_yeast_strain, db_session):
+        """Test lineage rows through a deleted harvest are removed"""
+        root, middle, leaf = self._chain(sample_yeast_strain.id, db_session, 3)
+
+        assert client.delete(f"/yeast-harvests/{middle.id}").status_code == 200
+
+        assert client.get(f"/yeast-harvests/{root.id}/descendants").json() == []
+        assert client.get(f"/yeast-harvests/{leaf.id}/ancestors").json() == []
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from modules.fermentation_charts import (
+    downsample_indices,
+    gravity_progress,
+    lttb_indices,
+    minmax_indices,
+)
+
+
+def _curve(n=2000):
+    x = np.arange(n, dtype=float) * 300
+    gravity = 1.010 + 0.040 / (1 + np.exp((x - x.mean()) / 40000))
+    return x, gravity
+
+
+def test_lttb_keeps_endpoints_and_size():
+    x, y = _curve()
+    keep = lttb_indices(x, y, 100)
+
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[537] = 5.0
+
+    assert 537 in lttb_indices(x, y, 50)
+
+
+def test_minmax_keeps_bucket_extremes():
+    y = np.sin(np.linspace(0, 20, 1000))
+    y[401] = -3.0
+    y[650] = 3.0
+    keep = minmax_indices(y, 40)
+
+    assert len(keep) <= 40
+    assert {0, 401, 650, 999} <= set(keep.tolist())
+
+
+def test_short_series_is_not_downsampled():
+    x, y = _curve(10)
+    assert downsample_indices(x, y, y, 50).tolist() == list(range(10))
+
+
+def test_downsample_falls_back_to_temperature_and_gaps():
+    x, temperature = _curve(500)
+    gravity = np.full(500, np.nan)
+    keep = downsample_indices(x, gravity, temperature, 20, "minmax")
+    assert 0 < len(keep) <= 20
+
+    gravity = temperature.copy()
+    gravity[::3] = np.nan
+    assert len(downsample_indices(x, gravity, temperature, 20)) == 20
+
+    with pytest.raises(ValueError):
+        downsample_indices(x, gravity, temperature, 20, "average")
+
+
+def test_gravity_progress_matches_scalar_formulas():
+    abv, attenuation = gravity_progress(1.048, np.array([1.048, 1.032, np.nan, 1.012, 1.050]))
+
+    assert abv.tolist() == [0.0, 2.1, 0.0, 4.73, 0.0]
+    assert attenuation.tolist() == [0.0, 33.3, 0.0, 75.0, 0.0]
+
+    abv, attenuation = gravity_progress(None, np.array([1.020]))
+    assert abv.tolist() == [0.0] and attenuation.tolist() == [0.0]
@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import Database.Models as models
+from modules.fermentation_forecast import (
+    ForecastCache,
+    fit_gravity_curve,
+    forecast_fermentation,
+)
+from modules.fermentation_ingest import insert_readings
+
+START = datetime(2024, 3, 21, 12, 0, 0)
+
+
+def _series(model, days=6.0, points=145, noise=0.0003, seed=1):
+    t = np.linspace(0, days, points)
+    rng = np.random.default_rng(seed)
+    if model == "exponential":
+        g = 1.011 + 0.040 * np.exp(-0.6 * t)
+    else:
+        g = 1.012 + 0.038 / (1 + np.exp(1.8 * (t - 2.5)))
+    return t, g + rng.normal(0, noise, t.size)
+
+
+def _store(db_session, batch_id, t, g):
+    insert_readings(
+        db_session,
+        [
+            {"batch_id": batch_id, "timestamp": START + timedelta(days=float(day)),
+             "gravity": float(gravity), "temperature": 19.0, "ph": None, "notes": None,
+             "created_at": START}
+            for day, gravity in zip(t, g)
+        ],
+    )
+    db_session.commit()
+
+
+@pytest.mark.parametrize(
+    "model,final_gravity", [("exponential", 1.011), ("logistic", 1.012)]
+)
+def test_fit_recovers_curve(model, final_gravity):
+    t, g = _series(model)
+    best, fits = fit_gravity_curve(t, g)
+
+    assert best.model == model
+    assert best.final_gravity == pytest.approx(final_gravity, abs=0.0005)
+    assert set(fits) == {"exponential", "logistic"}
+
+
+def test_warm_start_matches_full_fit():
+    t, g = _series("logistic", days=4.0, points=100)
+    _, fits = fit_gravity_curve(t[:80], g[:80])
+
+    warm, _ = fit_gravity_curve(t, g, previous=fits)
+    cold, _ = fit_gravity_curve(t, g)
+    assert warm.final_gravity == pytest.approx(cold.final_gravity, abs=0.0005)
+
+
+def test_rising_series_has_no_fit():
+    t = np.linspace(0, 2, 20)
+    assert fit_gravity_curve(t, 1.0 + t / 100) is None
+
+
+def test_forecast_predicts_finish(db_session, sample_batch):
+    t, g = _series("logistic", days=3.0, points=73)
+    _store(db_session, sample_batch["id"], t, g)
+
+    result, _ = forecast_fermentation(db_session, sample_batch["id"], 1.050, 1.012)
+    assert result.status == "ok"
+    assert result.predicted_fg == pytest.approx(1.012, abs=0.001)
+    assert result.hours_to_terminal > 24
+    assert result.terminal_at > result.last_reading_at
+    assert result.is_stuck is False
+
+
+def test_forecast_flags_stuck_batch(db_session, sample_batch):
+    t = np.linspace(0, 5, 121)
+    g = np.where(t < 2, 1.050 - 0.010 * t, 1.030)
+    _store(db_session, sample_batch["id"], t, g)
+
+    result, _ = forecast_fermentation(db_session, sample_batch["id"], 1.050, 1.010)
+    assert result.is_stuck is True
+
+    result, _ = forecast_fermentation(db_session, sample_batch["id"], 1.050, 1.031)
+    assert result.is_stuck is False
+
+
+def test_forecast_needs_enough_readings(db_session, sample_batch):
+    _store(db_session, sample_batch["id"], [0.0, 0.1], [1.050, 1.049])
+
+    result, fits = forecast_fermentation(db_session, sample_batch["id"])
+    assert result.status == "insufficient_data"
+    assert result.reading_count == 2 and fits is None
+
+
+def test_cache_refits_only_after_new_readings(db_session, sample_batch, monkeypatch):
+    batch_id = sample_batch["id"]
+    t, g = _series("exponential", days=3.0, points=50)
+    _store(db_session, batch_id, t[:40], g[:40])
+
+    calls = []
+
+    def recording_forecast(db, batch_id, original_gravity, target_fg, previous):
+        calls.append(previous)
+        return forecast_fermentation(db, batch_id, original_gravity, target_fg, previous)
+
+    monkeypatch.setattr(
+        "modules.fermentation_forecast.forecast_fermentation", recording_forecast
+    )
+    cache = ForecastCache()
+
+    first = cache.get(db_session, batch_id)
+    assert cache.get(db_session, batch_id) is first
+    assert calls == [None]
+
+    _store(db_session, batch_id, t[40:], g[40:])
+    second = cache.get(db_session, batch_id)
+    assert second is not first
+    assert len(calls) == 2 and calls[1] is not None
+
+    cache.invalidate(batch_id)
+    assert cache.get(db_session, batch_id) is not second
+
+
+def test_forecast_cache_refits_after_reading_edit(db_session, sample_batch):
+    """An edit made elsewhere (no invalidate call) changes the fingerprint"""
+    batch_id = sample_batch["id"]
+    t, g = _series("exponential")
+    _store(db_session, batch_id, t, g)
+    cache = ForecastCache()
+    first = cache.get(db_session, batch_id)
+
+    reading = (
+        db_session.query(models.FermentationReadings)
+        .filter(models.FermentationReadings.batch_id == batch_id)
+        .order_by(models.FermentationReadings.timestamp.desc())
+        .first()
+    )
+    reading.gravity = 1.030
+    db_session.commit()
+    assert reading.version == 2
+
+    assert cache.get(db_session, batch_id) is not first
+
+
+def test_forecast_cache_keeps_most_recently_used_batches(db_session):
+    cache = ForecastCache(max_entries=2)
+    first = cache.get(db_session, 101)
+    cache.get(db_session, 102)
+    assert cache.get(db_session, 101) is first
+
+    cache.get(db_session, 103)
+    assert len(cache) == 2
+    assert cache.get(db_session, 101) is first
+    assert 102 not in cache._entries
@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import Database.Models as models
+from modules.fermentation_ingest import insert_readings
+from modules.fermentation_rollups import (
+    aggregate_readings,
+    apply_readings,
+    choose_resolution,
+    load_rollup_series,
+    rebuild_rollups,
+)
+
+START = datetime(2024, 3, 21, 10, 0, 0)
+
+
+def _row(batch_id, minutes, gravity=None, temperature=None, ph=None):
+    return {
+        "batch_id": batch_id,
+        "timestamp": START + timedelta(minutes=minutes),
+        "gravity": gravity,
+        "temperature": temperature,
+        "ph": ph,
+        "notes": None,
+        "created_at": START,
+    }
+
+
+def _rollups(db_session, batch_id, resolution):
+    rollup = models.FermentationReadingRollup
+    return (
+        db_session.query(rollup)
+        .filter(rollup.batch_id == batch_id, rollup.resolution == resolution)
+        .order_by(rollup.bucket_start)
+        .all()
+    )
+
+
+def _columns(rollup):
+    return {
+        column.name: getattr(rollup, column.name)
+        for column in rollup.__table__.columns
+        if column.name != "id"
+    }
+
+
+def test_aggregate_readings_buckets_and_last_value():
+    aggregates = aggregate_readings(
+        [_row(1, 50, gravity=1.040), _row(1, 5, gravity=1.050, temperature=18.0),
+         _row(1, 70, gravity=1.030)]
+    )
+
+    hour = aggregates[(1, "hour", START)]
+    assert hour["reading_count"] == 2
+    assert hour["gravity_min"] == 1.040 and hour["gravity_max"] == 1.050
+    assert hour["gravity_sum"] == pytest.approx(2.090)
+    # Last is by timestamp, not arrival order
+    assert hour["gravity_last"] == 1.040
+    assert hour["temperature_count"] == 1
+
+    day = aggregates[(1, "day", START.replace(hour=0))]
+    assert day["reading_count"] == 3
+    assert day["gravity_last"] == 1.030
+
+
+def test_incremental_rollups_match_rebuild(db_session, sample_batch):
+    batch_id = sample_batch["id"]
+    insert_readings(db_session, [_row(batch_id, 0, 1.050, 18.0), _row(batch_id, 20, 1.049, 18.4)])
+    insert_readings(db_session, [_row(batch_id, 40, 1.047, 17.9, 5.2), _row(batch_id, 65, 1.045)])
+    db_session.commit()
+
+    incremental = [_columns(r) for r in _rollups(db_session, batch_id, "hour")]
+    assert [r["reading_count"] for r in incremental] == [3, 1]
+    assert incremental[0]["temperature_min"] == 17.9
+    assert incremental[0]["gravity_last"] == 1.047
+
+    rebuild_rollups(db_session, [batch_id])
+    db_session.commit()
+    rebuilt = [_columns(r) for r in _rollups(db_session, batch_id, "hour")]
+    assert rebuilt == incremental
+    assert [r.reading_count for r in _rollups(db_session, batch_id, "day")] == [4]
+
+
+def test_apply_readings_merges_into_existing_bucket(db_session, sample_batch):
+    """The upsert folds late and partial readings into a stored bucket"""
+    batch_id = sample_batch["id"]
+    apply_readings(db_session, [_row(batch_id, 30, gravity=1.048)])
+    db_session.commit()
+
+    # An older reading, and a first temperature for the bucket
+    apply_readings(
+        db_session,
+        [_row(batch_id, 10, gravity=1.052, temperature=18.5), _row(batch_id, 20, gravity=1.046)],
+    )
+    db_session.commit()
+
+    (hour,) = _rollups(db_session, batch_id, "hour")
+    assert hour.reading_count == 3
+    assert hour.gravity_count == 3
+    assert hour.gravity_sum == pytest.approx(3.146)
+    assert (hour.gravity_min, hour.gravity_max) == (1.046, 1.052)
+    assert hour.gravity_last == 1.048
+    assert hour.gravity_last_at == START + timedelta(minutes=30)
+    assert (hour.temperature_count, hour.temperature_sum) == (1, 18.5)
+    assert hour.temperature_last == 18.5
+    assert hour.ph_count == 0 and hour.ph_sum is None and hour.ph_min is None
+
+
+def test_rebuild_limited_to_days(db_session, sample_batch):
+    batch_id = sample_batch["id"]
+    insert_readings(
+        db_session, [_row(batch_id, 0, 1.050), _row(batch_id, 24 * 60, 1.040)]
+    )
+    db_session.commit()
+
+    db_session.query(models.FermentationReadings).filter(
+        models.FermentationReadings.gravity == 1.050
+    ).delete()
+    rebuild_rollups(db_session, [batch_id], days=[START])
+    db_session.commit()
+
+    days = _rollups(db_session, batch_id, "day")
+    assert [(d.bucket_start.day, d.gravity_last) for d in days] == [(22, 1.040)]
+
+
+def test_choose_resolution():
+    assert choose_resolution(timedelta(days=2), 1000) is None
+    assert choose_resolution(timedelta(days=60), 1000) == "hour"
+    assert choose_resolution(timedelta(days=60), 50) == "day"
+
+
+def test_load_rollup_series_means(db_session, sample_batch):
+    batch_id = sample_batch["id"]
+    apply_readings(
+        db_session,
+        [_row(batch_id, 0, 1.050, 18.0), _row(batch_id, 30, 1.048), _row(batch_id, 90, None, 19.0)],
+    )
+    db_session.commit()
+
+    timestamps, series, total = load_rollup_series(db_session, batch_id, "hour")
+    assert timestamps == [START, START + timedelta(hours=1)]
+    assert total == 3
+    assert series["gravity"][0] == 1.049
+    assert series["temperature"].tolist() == [18.0, 19.0]
+
+    timestamps, _, total = load_rollup_series(
+        db_session, batch_id, "hour", start=START + timedelta(minutes=75)
+    )
+    assert timestamps == [START + timedelta(hours=1)] and total == 1
@@ -0,0 +1,88 @@
+"""
+Tests for set-based recipe cloning
+"""
+
+from datetime import datetime
+
+import Database.Models as models
+from modules.recipe_cloning import clone_recipe, copy_recipe_to_inventory
+
+
+def _recipe(db_session):
+    recipe = models.Recipes(
+        name="Clone Source",
+        version=3,
+        type="All Grain",
+        brewer="Tester",
+        batch_size=20.0,
+        boil_time=60,
+        ibu=35.0,
+        color_units=12.5,
+        hops=[
+            models.RecipeHop(name="Magnum", alpha=12.0, amount=0.02, use="Boil", time=60,
+                             inventory="25 g"),
+            models.RecipeHop(name="Citra", alpha=13.0, amount=0.05, use="Dry Hop", time=0),
+        ],
+        fermentables=[models.RecipeFermentable(name="Pale Malt", amount=5.0, yield_=80.0)],
+        miscs=[models.RecipeMisc(name="Irish Moss", amount=1.0, display_amount=None)],
+        yeasts=[models.RecipeYeast(name="US-05", attenuation=78.0, times_cultured=2)],
+    )
+    db_session.add(recipe)
+    db_session.commit()
+    return recipe
+
+
+def test_clone_recipe_copies_row_and_ingredients(db_session):
+    recipe = _recipe(db_session)
+
+    clone_id = clone_recipe(db_session, recipe.id)
+    db_session.commit()
+
+    clone = db_session.get(models.Recipes, clone_id)
+    assert clone_id != recipe.id
+    assert clone.is_batch is True
+    assert clone.origin_recipe_id == recipe.id
+    assert (clone.name, clone.version, clone.ibu, clone.color_units) == ("Clone Source", 3, 35.0, 12.5)
+    assert [(h.name, h.alpha, h.use) for h in clone.hops] == [
+        ("Magnum", 12.0, "Boil"),
+        ("Citra", 13.0, "Dry Hop"),
+    ]
+    assert clone.fermentables[0].yield_ == 80.0
+    assert clone.yeasts[0].times_cultured == 2
+    assert len(clone.miscs) == 1
+
+    # The source keeps its own ingredients
+    db_session.refresh(recipe)
+    assert len(recipe.hops) == 2
+    assert recipe.is_batch is False
+
+
+def test_clone_recipe_unknown_recipe(db_session):
+    assert clone_recipe(db_session, 12345) is None
+    assert db_session.query(models.Recipes).count() == 0
+
+
+def test_copy_recipe_to_inventory(db_session):
+    recipe = _recipe(db_session)
+    batch = models.Batches(
+        recipe_id=recipe.id,
+        batch_name="Inventory Batch",
+        batch_number=1,
+        batch_size=20.0,
+        brewer="Tester",
+        brew_date=datetime(2024, 5, 1, 9, 0),
+    )
+    db_session.add(batch)
+    db_session.flush()
+
+    assert copy_recipe_to_inventory(db_session, recipe.id, batch.id) == 5
+    db_session.commit()
+    db_session.refresh(batch)
+
+    hops = {hop.name: hop for hop in batch.inventory_hops}
+    assert float(hops["Magnum"].inventory) == 25.0
+    assert float(hops["Citra"].inventory) == 0.0
+    assert hops["Citra"].display_time == ""
+    assert batch.inventory_miscs[0].display_amount == ""
+    assert batch.inventory_fermentables[0].yield_ == 80.0
+    assert batch.inventory_yeasts[0].attenuation == 78.0
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+from sqlalchemy import event
+
+import Database.Models as models
+from Database.Models.table_versions import table_versions
+from modules.recipe_feasibility import FeasibilityCache, FeasibilityIndex
+
+
+def _index():
+    # Recipe 10: 5 kg pale malt + 0.1 kg cascade (listed twice)
+    # Recipe 20: 4 kg pale malt + 1 packet yeast
+    # Recipe 30: no ingredients
+    ingredients = [("fermentable", "pale malt"), ("hop", "cascade"), ("yeast", "us-05")]
+    return FeasibilityIndex(
+        recipe_ids=[10, 20, 30],
+        ingredients=ingredients,
+        recipe_index=[0, 0, 0, 1, 1],
+        ingredient_index=[0, 1, 1, 0, 2],
+        required=[5.0, 0.05, 0.05, 4.0, 1.0],
+    )
+
+
+def test_repeated_ingredients_are_summed():
+    index = _index()
+    assert index.ingredient_counts.tolist() == [2, 2, 0]
+    entries = sorted(zip(index.recipe_index, index.ingredient_index, index.required))
+    assert entries == [(0, 0, 5.0), (0, 1, pytest.approx(0.1)), (1, 0, 4.0), (1, 2, 1.0)]
+
+
+def test_evaluate_coverage_and_satisfied_entries():
+    index = _index()
+    coverage, satisfied = index.evaluate(np.array([4.5, 0.1, 0.0]))
+
+    assert coverage.tolist() == pytest.approx([(0.9 + 1.0) / 2, (1.0 + 0.0) / 2, 1.0])
+    assert satisfied.tolist() == [False, True, True, False]
+
+
+def test_feasibility_filters_and_ranks():
+    index = _index()
+    stock = np.array([4.5, 0.1, 0.0])
+
+    brewable = index.feasibility(stock)
+    assert [(r.recipe_id, r.brewable) for r in brewable] == [(30, True)]
+
+    ranked = index.feasibility(stock, min_coverage=0.0)
+    assert [r.recipe_id for r in ranked] == [30, 10, 20]
+    assert ranked[1].missing == [("fermentable", "pale malt")]
+    assert ranked[2].missing == [("yeast", "us-05")]
+
+    assert [r.recipe_id for r in index.feasibility(stock, recipe_ids=[20], min_coverage=0)] == [20]
+    assert len(index.feasibility(stock, min_coverage=0.0, limit=2)) == 2
+
+
+def test_cache_applies_reported_stock_writes(db_session):
+    recipe = models.Recipes(name="Pale")
+    db_session.add(recipe)
+    db_session.flush()
+    db_session.add_all(
+        [
+            models.RecipeFermentable(name="Pale Malt", amount=5.0, recipe_id=recipe.id),
+            models.InventoryFermentable(name="pale malt", amount=6.0),
+        ]
+    )
+    db_session.commit()
+
+    cache = FeasibilityCache()
+    index, stock = cache.get(db_session)
+    assert stock.tolist() == [6.0]
+
+    # A consumption commits one inventory write; reporting it keeps the
+    # vector without a reload
+    item = db_session.query(models.InventoryFermentable).one()
+    db_session.execute(
+        models.InventoryFermentable.__table__.update()
+        .where(models.InventoryFermentable.id == item.id)
+        .values(stock=2.0, amount=2.0, version=models.InventoryFermentable.version + 1)
+    )
+    db_session.commit()
+    cache.apply_stock_writes([("fermentable", "pale malt", True, -4.0)])
+    cached_index, stock = cache.get(db_session)
+    assert cached_index is index
+    assert stock.tolist() == [2.0]
+    assert index.feasibility(stock) == []
+
+    # Writes that were not reported are picked up from the counters
+    db_session.add(models.InventoryFermentable(name="Pale  Malt", amount=3.0))
+    db_session.commit()
+    _, stock = cache.get(db_session)
+    assert stock.tolist() == [5.0]
+    assert [r.recipe_id for r in index.feasibility(stock)] == [recipe.id]
+
+
+def test_cache_reads_only_the_table_versions(db_session):
+    """Lookups without writes issue one query instead of table aggregates"""
+    cache = FeasibilityCache()
+    cache.get(db_session)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        cache.get(db_session)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert len(statements) == 1 and "table_versions" in statements[0]
+
+
+def test_session_writes_bump_table_versions(db_session):
+    def versions():
+        return table_versions(db_session, ("recipe_ingredients", "inventory"))
+
+    before = versions()
+    recipe = models.Recipes(name="Stout")
+    db_session.add(recipe)
+    db_session.commit()
+    assert versions() == {**before, "recipe_ingredients": before["recipe_ingredients"] + 1}
+
+    # Bulk statements count, once per transaction
+    db_session.execute(models.InventoryHop.__table__.insert(), [{"name": "Fuggle"}, {"name": "EKG"}])
+    db_session.execute(models.InventoryHop.__table__.update().values(amount=1.0))
+    db_session.commit()
+    assert versions()["inventory"] == before["inventory"] + 1
+
+    # Rolled back writes do not
+    db_session.add(models.InventoryHop(name="Saaz"))
+    db_session.flush()
+    db_session.rollback()
+    db_session.commit()
+    assert versions()["inventory"] == before["inventory"] + 1
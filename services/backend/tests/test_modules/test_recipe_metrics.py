@@ -0,0 +1,196 @@
+import math
+
+import pytest
+
+from modules.brewing_calculations import (
+    calculate_abv,
+    calculate_ibu_tinseth,
+    calculate_srm_morey,
+)
+import Database.Models as models
+from modules.recipe_metrics import (
+    METRIC_TOTAL_COLUMNS,
+    RecipeMetricsEngine,
+    apply_ingredient_change,
+    fermentable_ppg,
+    ingredient_contribution,
+    rebuild_recipe_metrics,
+)
+
+
+def _two_recipe_engine():
+    engine = RecipeMetricsEngine(
+        batch_size_gal=[5.0, 10.0],
+        boil_size_gal=[6.0, None],
+        efficiency=[75.0, 70.0],
+        og=[1.050, None],
+        fg=[1.010, None],
+    )
+    engine.add_hops(
+        recipe_index=[0, 0, 1],
+        alpha=[12.0, 5.0, 8.0],
+        weight_oz=[1.0, 2.0, 1.5],
+        boil_time_min=[60, 10, 30],
+    )
+    engine.add_fermentables(
+        recipe_index=[0, 1, 1],
+        weight_lb=[10.0, 8.0, 1.0],
+        color=[3.0, 2.0, 40.0],
+        ppg=[37.0, 36.0, 46.0],
+        mashed=[True, True, False],
+    )
+    engine.add_yeasts(recipe_index=[1], attenuation=[80.0])
+    return engine
+
+
+def test_ibu_matches_scalar_tinseth():
+    values = _two_recipe_engine().compute()
+
+    expected_first = calculate_ibu_tinseth(12.0, 1.0, 60, 6.0, 1.050) + calculate_ibu_tinseth(
+        5.0, 2.0, 10, 6.0, 1.050
+    )
+    assert values["ibu"][0] == pytest.approx(expected_first)
+
+    # Second recipe has no measured OG, so its estimate is used for utilization
+    est_og = values["est_og"][1]
+    assert values["ibu"][1] == pytest.approx(calculate_ibu_tinseth(8.0, 1.5, 30, 10.0, est_og))
+
+
+def test_srm_matches_morey():
+    values = _two_recipe_engine().compute()
+
+    assert values["srm"][0] == pytest.approx(calculate_srm_morey(3.0, 10.0, 5.0))
+    mcu = (8.0 * 2.0 + 1.0 * 40.0) / 10.0
+    assert values["srm"][1] == pytest.approx(1.4922 * mcu ** 0.6859)
+
+
+def test_gravity_estimates_and_abv():
+    values = _two_recipe_engine().compute()
+
+    assert values["est_og"][0] == pytest.approx(1 + 10.0 * 37.0 * 0.75 / 5.0 / 1000)
+    # Sugar is not scaled by efficiency
+    est_og = 1 + (8.0 * 36.0 * 0.70 + 1.0 * 46.0) / 10.0 / 1000
+    assert values["est_og"][1] == pytest.approx(est_og)
+    assert values["est_fg"][1] == pytest.approx(est_og - (est_og - 1) * 0.80)
+
+    # Measured gravities take precedence for ABV
+    assert values["abv"][0] == pytest.approx(calculate_abv(1.050, 1.010))
+    assert values["abv"][1] == pytest.approx((est_og - values["est_fg"][1]) * 131.25)
+
+
+def test_rager_ibu():
+    values = _two_recipe_engine().compute(ibu_method="rager")
+
+    utilization = (18.11 + 13.86 * math.tanh((60 - 31.32) / 18.27)) / 100
+    assert values["ibu"][0] > 0
+    first_hop = 0.12 * 1.0 * utilization * 7490 / 6.0
+    assert values["ibu"][0] > first_hop
+
+
+def test_missing_inputs_yield_none():
+    engine = RecipeMetricsEngine(batch_size_gal=[None, 5.0])
+    engine.add_hops(recipe_index=[1], alpha=[None], weight_oz=[1.0], boil_time_min=[60])
+
+    values = engine.compute()
+
+    assert values == {
+        "est_og": [None, None],
+        "est_fg": [None, None],
+        "est_abv": [None, None],
+        "abv": [None, None],
+        "ibu": [None, None],
+        "srm": [None, None],
+    }
+
+
+def test_invalid_ibu_method():
+    with pytest.raises(ValueError):
+        _two_recipe_engine().compute(ibu_method="garetz")
+
+
+def test_fermentable_ppg():
+    assert fermentable_ppg(80.0) == pytest.approx(0.8 * 46.214)
+    assert fermentable_ppg(None, 1.037) == pytest.approx(37.0)
+    assert fermentable_ppg(80.0, not_fermentable=True) == 0.0
+    assert fermentable_ppg(None) is None
+
+
+def test_recipe_ibu_method_selects_formula():
+    engine = RecipeMetricsEngine(batch_size_gal=[5.0, 5.0], og=[1.050, 1.050], ibu_methods=["Rager", None])
+    engine.add_hops(recipe_index=[0, 1], alpha=[10.0, 10.0], weight_oz=[1.0, 1.0], boil_time_min=[60, 60])
+
+    values = engine.compute()
+
+    assert values["ibu"][1] == pytest.approx(calculate_ibu_tinseth(10.0, 1.0, 60, 5.0, 1.050))
+    assert values["ibu"][0] != pytest.approx(values["ibu"][1])
+
+
+def _stored_recipe(db_session):
+    recipe = models.Recipes(
+        name="Maintained",
+        batch_size=20.0,
+        boil_size=25.0,
+        efficiency=72.0,
+        hops=[
+            models.RecipeHop(name="Magnum", alpha=12.0, amount=1.0, time=60, use="Boil"),
+            models.RecipeHop(name="Citra", alpha=13.0, amount=2.0, time=0, use="Dry Hop"),
+        ],
+        fermentables=[
+            models.RecipeFermentable(name="Pale", amount=5.0, yield_=80.0, color=3, type="Grain"),
+        ],
+        yeasts=[models.RecipeYeast(name="US-05", attenuation=78.0)],
+    )
+    db_session.add(recipe)
+    db_session.flush()
+    rebuild_recipe_metrics(db_session, [recipe.id])
+    db_session.commit()
+    db_session.refresh(recipe)
+    return recipe
+
+
+def _stored_metrics(recipe):
+    return {
+        column: getattr(recipe, column)
+        for column in ("est_og", "est_fg", "est_abv", "est_color", "ibu", *METRIC_TOTAL_COLUMNS)
+    }
+
+
+def test_rebuild_matches_engine(db_session):
+    recipe = _stored_recipe(db_session)
+
+    values = RecipeMetricsEngine.from_recipes([recipe]).compute()
+
+    assert recipe.est_og == pytest.approx(values["est_og"][0])
+    assert recipe.est_fg == pytest.approx(values["est_fg"][0])
+    assert recipe.est_abv == pytest.approx(values["est_abv"][0])
+    assert recipe.est_color == pytest.approx(values["srm"][0])
+    assert recipe.ibu == pytest.approx(values["ibu"][0])
+    assert recipe.attenuation_samples == 1
+
+
+def test_incremental_changes_match_full_rebuild(db_session):
+    recipe = _stored_recipe(db_session)
+
+    hop = models.RecipeHop(name="Cascade", alpha=6.0, amount=1.5, time=15, use="Boil", recipe_id=recipe.id)
+    db_session.add(hop)
+    apply_ingredient_change(db_session, recipe, new=ingredient_contribution(hop))
+
+    fermentable = recipe.fermentables[0]
+    old = ingredient_contribution(fermentable)
+    fermentable.amount = 6.5
+    apply_ingredient_change(db_session, recipe, old=old, new=ingredient_contribution(fermentable))
+
+    yeast = recipe.yeasts[0]
+    apply_ingredient_change(db_session, recipe, old=ingredient_contribution(yeast))
+    db_session.delete(yeast)
+    db_session.commit()
+    incremental = _stored_metrics(recipe)
+
+    rebuild_recipe_metrics(db_session, [recipe.id])
+    db_session.commit()
+    db_session.refresh(recipe)
+    rebuilt = _stored_metrics(recipe)
+
+    assert incremental.keys() == rebuilt.keys()
+    for column, value in rebuilt.items():
+        assert incremental[column] == pytest.approx(value), column
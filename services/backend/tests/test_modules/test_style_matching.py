@@ -0,0 +1,75 @@
+import math
+
+import numpy as np
+import pytest
+
+from modules.style_matching import StyleIndex
+
+NAN = math.nan
+
+
+def _index():
+    # og, fg, abv, ibu, srm
+    return StyleIndex(
+        style_ids=[1, 2, 3],
+        names=["Pale Ale", "Stout", "Open IBU"],
+        style_codes=["18B", "15B", None],
+        guideline_source_ids=[1, 1, 2],
+        low=[
+            [1.045, 1.010, 4.5, 30, 5],
+            [1.036, 1.007, 4.0, 25, 25],
+            [NAN, NAN, NAN, 50, NAN],
+        ],
+        high=[
+            [1.060, 1.015, 6.2, 50, 10],
+            [1.044, 1.011, 4.5, 45, 40],
+            [NAN, NAN, NAN, NAN, NAN],
+        ],
+    )
+
+
+def test_score_centre_edge_and_outside():
+    index = _index()
+    centre = [1.0525, 1.0125, 5.35, 40, 7.5]
+    score, in_range, compared, outside = index.score([centre])
+
+    assert score[0, 0] == pytest.approx(1.0)
+    assert in_range[0, 0]
+    assert compared[0].tolist() == [5, 5, 1]
+    # IBU 40 is inside the stout range, 5 off its centre; FG is just outside
+    # (0.0015 past a 0.004 wide range) and everything else is far off
+    assert outside[0, 1].tolist() == [True, True, True, False, True]
+    assert score[0, 1] == pytest.approx(((1 - 5 / 20) + (0.5 - 0.0015 / 0.004)) / 5)
+
+    edge, _, _, _ = index.score([[1.045, 1.010, 4.5, 30, 5]])
+    assert edge[0, 0] == pytest.approx(0.5)
+
+
+def test_missing_ranges_and_metrics_lower_the_score():
+    index = _index()
+    score, in_range, compared, _ = index.score([[1.05, 1.012, 5.0, 60, 8]])
+
+    # Only IBU is compared against the open-ended style; it fits fully but
+    # counts as one metric out of the five the recipe defines
+    assert in_range[0, 2]
+    assert compared[0, 2] == 1
+    assert score[0, 2] == pytest.approx(0.2)
+
+    partial, _, partial_compared, _ = index.score([[NAN, NAN, NAN, 40, NAN]])
+    assert partial_compared[0].tolist() == [1, 1, 1]
+    assert partial[0, 0] == pytest.approx(1.0)
+
+
+def test_match_orders_full_fits_first_and_filters():
+    index = _index()
+    values = np.array([[1.05, 1.012, 5.0, 60, 8], [1.040, 1.009, 4.2, 35, 30]])
+
+    first, second = index.match(values, top=3)
+    assert [m.name for m in first] == ["Open IBU", "Pale Ale", "Stout"]
+    assert first[1].out_of_range == ["ibu"]
+    assert [m.name for m in second][0] == "Stout"
+
+    (only_source,) = index.match(values[:1], guideline_source_id=1, in_range_only=True)
+    assert only_source == []
+
+    assert index.match(values, top=1, guideline_source_id=99) == [[], []]
@@ -0,0 +1,50 @@
+import Database.Models as models
+from modules.yeast_genealogy import ancestors, descendants, rebuild_lineage
+
+
+def _lineage(db_session):
+    return sorted(
+        db_session.query(
+            models.YeastHarvestLineage.ancestor_id,
+            models.YeastHarvestLineage.descendant_id,
+            models.YeastHarvestLineage.depth,
+        ).all()
+    )
+
+
+def _harvest(db_session, strain, parent=None):
+    harvest = models.YeastHarvest(
+        yeast_strain_id=strain.id,
+        parent_harvest_id=parent.id if parent else None,
+        quantity_harvested=100.0,
+    )
+    db_session.add(harvest)
+    db_session.flush()
+    return harvest
+
+
+def test_rebuild_matches_rows_written_on_insert(db_session):
+    strain = models.YeastStrain(name="WLP001")
+    db_session.add(strain)
+    db_session.flush()
+    root = _harvest(db_session, strain)
+    child = _harvest(db_session, strain, root)
+    grandchild = _harvest(db_session, strain, child)
+    other = _harvest(db_session, strain, root)
+    db_session.commit()
+
+    written = _lineage(db_session)
+    assert (root.id, grandchild.id, 2) in written
+    assert len(written) == 4 + 3 + 1
+
+    assert rebuild_lineage(db_session) == len(written)
+    assert _lineage(db_session) == written
+
+    assert [(h.id, depth) for h, depth in descendants(db_session, root.id)] == [
+        (child.id, 1),
+        (other.id, 1),
+        (grandchild.id, 2),
+    ]
+    assert [(h.id, depth) for h, depth in ancestors(db_session, grandchild.id, max_depth=1)] == [
+        (child.id, 1)
+    ]
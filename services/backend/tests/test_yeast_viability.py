@@ -8,6 +8,8 @@ import os
 # Add the backend directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import numpy as np
+
 from utils.yeast_viability import YeastViabilityCalculator
 
 
@@ -251,3 +253,65 @@ class TestYeastViabilityCalculator:
         assert result["current_viability"] > 80.0
         assert result["current_viability"] < 95.0
         assert result["viability_status"] in ["good", "excellent"]
+
+    def test_batch_matches_single_calculation(self):
+        """Test the vectorized calculation against the per-item one"""
+        now = datetime(2026, 1, 15, 12, 0)
+        cases = [
+            ("Dry", now - timedelta(days=400), now + timedelta(days=300), 100.0, None, 0),
+            ("Liquid", now - timedelta(days=95, hours=5), None, 92.0, 12.5, 1),
+            ("Slant", None, now - timedelta(days=3), 100.0, 4.0, 2),
+            ("Wyeast Liquid Culture", now - timedelta(days=30), None, 75.0, 2.0, 0),
+            ("Culture", now - timedelta(days=900), now + timedelta(days=10), 60.0, 8.0, 4),
+            ("Liquid", None, None, 100.0, None, 0),
+        ]
+        result = YeastViabilityCalculator.calculate_viability_batch(
+            *zip(*[(form, made, expires, initial, temp, gen) for form, made, expires, initial, temp, gen in cases]),
+            current_date=now,
+        )
+
+        for position, (form, made, expires, initial, temp, gen) in enumerate(cases):
+            single = YeastViabilityCalculator.calculate_viability(
+                yeast_form=form,
+                manufacture_date=made,
+                expiry_date=expires,
+                current_date=now,
+                initial_viability=initial,
+                storage_temperature=temp,
+                generation=gen,
+            )
+            starter = YeastViabilityCalculator.calculate_starter_size(
+                single["current_viability"], 200.0
+            )
+            assert result["current_viability"][position] == single["current_viability"]
+            assert result["viability_status"][position] == single["viability_status"]
+            assert result["recommendation"][position] == single["recommendation"]
+            for key in ("days_since_manufacture", "days_until_expiry"):
+                value = result[key][position]
+                assert (None if np.isnan(value) else value) == single[key]
+            assert result["starter_recommended"][position] == starter["starter_recommended"]
+            size = result["starter_size_liters"][position]
+            assert (None if np.isnan(size) else size) == starter["starter_size_liters"]
+
+    def test_batch_predicted_expiry(self):
+        """Test predicted expiry is the earlier of decay and label"""
+        now = datetime(2026, 1, 15)
+        made = now - timedelta(days=30)
+        result = YeastViabilityCalculator.calculate_viability_batch(
+            yeast_forms=["Liquid", "Liquid", "Dry", "Liquid"],
+            manufacture_dates=[made, made, None, made],
+            expiry_dates=[None, made + timedelta(days=100), now + timedelta(days=7), None],
+            initial_viabilities=[100.0, 100.0, 100.0, 40.0],
+            storage_temperatures=[None, None, None, None],
+            generations=[0, 0, 0, 0],
+            current_date=now,
+        )
+        predicted = result["predicted_expiry_date"].astype(datetime).tolist()
+
+        # Liquid yeast loses 3% a month, so reaches 50% after 500 days
+        assert predicted[0] == made + timedelta(days=500)
+        assert predicted[1] == made + timedelta(days=100)
+        # Without a manufacture date only the label is known
+        assert predicted[2] == now + timedelta(days=7)
+        # Yeast that starts below 50% expired when it was made
+        assert predicted[3] == made
@@ -0,0 +1,51 @@
+"""
+Inventory stock utilities.
+
+Inventory rows record what is on hand in ``inventory``, a free-form value
+such as ``"0.45 kg"`` (or ``amount`` for tables without one). These helpers
+turn it into the numeric stock the inventory tables keep alongside it, and
+normalize ingredient names so inventory can be matched to recipes by name.
+"""
+
+import re
+from typing import Optional, Union
+
+_LEADING_NUMBER = re.compile(r"(\d+(\.\d+)?)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def parse_numeric_value(value: str) -> float:
+    """Leading number of a value such as ``"25 g"``; 0.0 if there is none."""
+    match = _LEADING_NUMBER.match(value)
+    if match:
+        return float(match.group(1))
+    return 0.0
+
+
+def inventory_stock(
+    inventory: Optional[Union[str, int, float]], amount: Optional[float]
+) -> Optional[float]:
+    """
+    Numeric stock of an inventory row.
+
+    Args:
+        inventory: Stored inventory value, numeric or text
+        amount: Fallback used when there is no inventory value
+
+    Returns:
+        Stock as a float, or None when neither value is set
+    """
+    if isinstance(inventory, (int, float)):
+        return float(inventory)
+    if isinstance(inventory, str):
+        return parse_numeric_value(inventory)
+    if amount is not None:
+        return float(amount)
+    return None
+
+
+def normalize_ingredient_name(name: Optional[str]) -> Optional[str]:
+    """Case-folded name with surrounding and repeated whitespace removed."""
+    if name is None:
+        return None
+    return _WHITESPACE.sub(" ", name).strip().casefold() or None
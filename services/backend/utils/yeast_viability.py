@@ -8,7 +8,9 @@ Calculates yeast viability based on various factors including:
 - Generation number
 """
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional, Sequence
+
+import numpy as np
 
 
 class YeastViabilityCalculator:
@@ -34,6 +36,19 @@ class YeastViabilityCalculator:
     # Generation viability loss
     GENERATION_LOSS_PERCENT = 12.0  # Loss per generation
 
+    # Viability below which yeast is considered expired
+    EXPIRED_VIABILITY = 50.0
+
+    # (status, recommendation) from the highest viability threshold down;
+    # anything below the last threshold is expired
+    VIABILITY_LEVELS = (
+        (95.0, "excellent", "Excellent for direct pitching"),
+        (85.0, "good", "Good for direct pitching, starter recommended for high gravity"),
+        (70.0, "fair", "Starter strongly recommended"),
+        (EXPIRED_VIABILITY, "poor", "Large starter required, consider using fresh yeast"),
+    )
+    EXPIRED_RECOMMENDATION = "Not recommended for use, viability too low"
+
     @classmethod
     def calculate_viability(
         cls,
@@ -147,30 +162,18 @@ class YeastViabilityCalculator:
     @classmethod
     def _determine_status(cls, viability: float) -> str:
         """Determine viability status category"""
-        if viability >= 95:
-            return "excellent"
-        elif viability >= 85:
-            return "good"
-        elif viability >= 70:
-            return "fair"
-        elif viability >= 50:
-            return "poor"
-        else:
-            return "expired"
+        for threshold, status, _ in cls.VIABILITY_LEVELS:
+            if viability >= threshold:
+                return status
+        return "expired"
 
     @classmethod
     def _get_recommendation(cls, viability: float, generation: int) -> str:
         """Get usage recommendation based on viability"""
-        if viability >= 95:
-            return "Excellent for direct pitching"
-        elif viability >= 85:
-            return "Good for direct pitching, starter recommended for high gravity"
-        elif viability >= 70:
-            return "Starter strongly recommended"
-        elif viability >= 50:
-            return "Large starter required, consider using fresh yeast"
-        else:
-            return "Not recommended for use, viability too low"
+        for threshold, _, recommendation in cls.VIABILITY_LEVELS:
+            if viability >= threshold:
+                return recommendation
+        return cls.EXPIRED_RECOMMENDATION
 
     @classmethod
     def calculate_starter_size(cls, viability: float, target_cells: float) -> dict:
@@ -215,3 +218,113 @@ class YeastViabilityCalculator:
             "starter_size_liters": round(starter_size, 1),
             "message": f"Make a {round(starter_size, 1)}L starter to restore cell count"
         }
+
+    @classmethod
+    def calculate_viability_batch(
+        cls,
+        yeast_forms: Sequence[Optional[str]],
+        manufacture_dates: Sequence[Optional[datetime]],
+        expiry_dates: Sequence[Optional[datetime]],
+        initial_viabilities: Sequence[float],
+        storage_temperatures: Sequence[Optional[float]],
+        generations: Sequence[int],
+        current_date: Optional[datetime] = None,
+        target_cells: float = 200.0,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calculate viability and starter size for many yeasts at once.
+
+        Gives the same results as ``calculate_viability`` and
+        ``calculate_starter_size`` for each position of the input sequences,
+        which must all have the same length, up to ties in the last rounded
+        digit. Missing forms count as liquid,
+        missing temperatures as 4°C.
+
+        Also predicts the expiry of each yeast: the earlier of its labelled
+        expiry date and the date its viability falls below
+        ``EXPIRED_VIABILITY``, which is only known with a manufacture date.
+
+        Returns:
+            Dictionary of arrays: current_viability, days_since_manufacture
+            and days_until_expiry (NaN when unknown), viability_status,
+            recommendation, estimated_cell_loss_percent, predicted_expiry_date
+            (NaT when unknown), starter_recommended and starter_size_liters
+            (NaN when fresh yeast is needed)
+        """
+        if current_date is None:
+            current_date = datetime.now()
+        now = np.datetime64(current_date, "us")
+        day = np.timedelta64(1, "D")
+
+        forms = np.array([(form or "").upper() for form in yeast_forms], dtype=object)
+        manufactured = np.array(list(manufacture_dates), dtype="datetime64[us]")
+        expires = np.array(list(expiry_dates), dtype="datetime64[us]")
+        initial = np.asarray(initial_viabilities, dtype=float)
+        temperatures = np.array(
+            [4.0 if temp is None else temp for temp in storage_temperatures], dtype=float
+        )
+        generations = np.asarray(generations, dtype=float)
+
+        # Same substring precedence as _get_decay_rate
+        decay_rate = np.full(len(forms), cls.DECAY_RATE_LIQUID)
+        for marker, rate in reversed((
+            ("DRY", cls.DECAY_RATE_DRY),
+            ("LIQUID", cls.DECAY_RATE_LIQUID),
+            ("SLANT", cls.DECAY_RATE_SLANT),
+            ("CULTURE", cls.DECAY_RATE_CULTURE),
+        )):
+            matches = np.array([marker in form for form in forms], dtype=bool)
+            decay_rate[matches] = rate
+        decay_rate *= 1.0 + np.maximum(temperatures - 4.0, 0.0) * cls.TEMP_MULTIPLIER
+
+        has_manufacture = ~np.isnat(manufactured)
+        # timedelta.days floors, as does floor division of timedelta64
+        days_since = np.where(
+            has_manufacture,
+            (now - np.where(has_manufacture, manufactured, now)) // day,
+            0,
+        )
+        has_expiry = ~np.isnat(expires)
+        days_until = np.where(
+            has_expiry, (np.where(has_expiry, expires, now) - now) // day, 0
+        )
+
+        generation_loss = np.maximum(generations, 0.0) * cls.GENERATION_LOSS_PERCENT
+        viability = initial - days_since / 30.0 * decay_rate - generation_loss
+        viability = np.clip(viability, 0.0, 100.0)
+        rounded = np.round(viability, 1)
+
+        levels = [viability >= threshold for threshold, _, _ in cls.VIABILITY_LEVELS]
+        status = np.select(
+            levels, [status for _, status, _ in cls.VIABILITY_LEVELS], "expired"
+        )
+        recommendation = np.select(
+            levels,
+            [recommendation for _, _, recommendation in cls.VIABILITY_LEVELS],
+            cls.EXPIRED_RECOMMENDATION,
+        )
+
+        # Days after manufacture at which the viability drops below the
+        # expiry level; immediately when it starts below it
+        expiry_days = np.maximum(
+            (initial - generation_loss - cls.EXPIRED_VIABILITY) * 30.0 / decay_rate, 0.0
+        )
+        decayed = manufactured + (expiry_days * 86400e6).astype("timedelta64[us]")
+        predicted = np.fmin(np.where(has_manufacture, decayed, np.datetime64("NaT")), expires)
+
+        factor = np.where(rounded > 0, rounded / 100.0, 1.0)
+        additional_cells = target_cells / factor - target_cells * factor
+        starter_size = np.round(np.clip(additional_cells / 100.0 * 1.5, 0.5, 5.0), 1)
+        starter_size = np.select([rounded <= 0, rounded >= 85], [np.nan, 0.0], starter_size)
+
+        return {
+            "current_viability": rounded,
+            "days_since_manufacture": np.where(has_manufacture, days_since, np.nan),
+            "days_until_expiry": np.where(has_expiry, days_until, np.nan),
+            "viability_status": status,
+            "recommendation": recommendation,
+            "estimated_cell_loss_percent": np.round(initial - viability, 1),
+            "predicted_expiry_date": predicted,
+            "starter_recommended": rounded < 85,
+            "starter_size_liters": starter_size,
+        }